@@ -12,6 +12,7 @@ Paper Trading Hedge Manager - BUY HEDGE ON LOSING SIDE
 from paper_positions import paper_positions
 from market_data_api import market_data
 from config_paper import config
+from option_chain_arrays import ChainArrays
 from simple_logger import logger
 
 class HedgeManager:
@@ -153,47 +154,30 @@ class HedgeManager:
         losing_type = losing_leg.option_type
 
         # Step 3: CRITICAL - Directional constraint for OTM on LOSING side
-        if losing_leg.option_type == 'CE':
-            # CE losing → market moved UP
-            # Buy OTM CE (above current strike, cheaper premium)
-            valid_strikes = [s for s in option_chain.keys() 
-                           if s > straddle_strike]
-            direction = "ABOVE strike (OTM CE)"
-        else:
-            # PE losing → market moved DOWN
-            # Buy OTM PE (below current strike, cheaper premium)
-            valid_strikes = [s for s in option_chain.keys() 
-                           if s < straddle_strike]
-            direction = "BELOW strike (OTM PE)"
+        # CE losing → market moved UP   → BUY OTM CE (above current strike)
+        # PE losing → market moved DOWN → BUY OTM PE (below current strike)
+        chain = ChainArrays.from_chain(option_chain)
+        valid_mask = chain.hedge_candidates(losing_type, straddle_strike)
+        direction = "ABOVE strike (OTM CE)" if losing_type == 'CE' else "BELOW strike (OTM PE)"
 
         print(f"   Market Direction: {losing_leg.option_type} losing → {'UP' if losing_leg.option_type == 'CE' else 'DOWN'}")
         print(f"   Hedge Direction: {direction}")
 
-        if not valid_strikes:
+        if not valid_mask.any():
             print(f"   ⚠️  WARNING: No valid OTM strikes found!")
             # Emergency fallback
-            valid_strikes = [s for s in option_chain.keys() if s != straddle_strike]
-
-        # Step 4: Find best premium match within valid strikes
-        best_strike = None
-        best_diff = float('inf')
-        best_premium = 0
+            valid_mask = chain.strikes != straddle_strike
 
-        for strike in valid_strikes:
-            data = option_chain.get(strike, {})
-            premium = data.get(losing_type, 0)
-
-            if premium > 0:
-                diff = abs(premium - target_premium)
-                if diff < best_diff:
-                    best_diff = diff
-                    best_strike = strike
-                    best_premium = premium
+        # Step 4: Find best premium match within valid strikes (vectorized)
+        best = chain.nearest_premium(losing_type, target_premium, valid_mask)
 
         # Final fallback
-        if not best_strike:
+        if best:
+            best_strike, best_premium = best
+        else:
             print(f"   🚨 EMERGENCY: No hedge found in valid range!")
-            best_strike = valid_strikes[0] if valid_strikes else straddle_strike + config.STRIKE_INTERVAL
+            valid_strikes = chain.strikes[valid_mask]
+            best_strike = int(valid_strikes[0]) if len(valid_strikes) else straddle_strike + config.STRIKE_INTERVAL
             data = option_chain.get(best_strike, {})
             best_premium = data.get(losing_type, target_premium)
 
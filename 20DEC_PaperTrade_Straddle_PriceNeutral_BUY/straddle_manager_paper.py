@@ -6,6 +6,7 @@ from leg import Leg
 from paper_positions import paper_positions
 from market_data_api import market_data
 from config_paper import config
+from option_chain_arrays import ChainArrays
 from datetime import datetime
 from simple_logger import logger  # ✅ ADD LOGGING
 
@@ -176,22 +177,9 @@ class StraddleManager:
 
     def _scan_best_straddle(self, spot_price, option_chain):
         """Select best strike - PAPER VERSION"""
-        min_diff = float('inf')
-        best_strike = None
-        best_ce = 0
-        best_pe = 0
-
-        for strike, data in option_chain.items():
-            ce_prem = data.get('CE', 0)
-            pe_prem = data.get('PE', 0)
-
-            if ce_prem > 0 and pe_prem > 0:
-                diff = abs(ce_prem - pe_prem)
-                if diff < min_diff:
-                    min_diff = diff
-                    best_strike = strike
-                    best_ce = ce_prem
-                    best_pe = pe_prem
+        # ⚡ Vectorized: min |CE - PE| over aligned chain arrays
+        best = ChainArrays.from_chain(option_chain).best_straddle()
+        best_strike, best_ce, best_pe, min_diff = best if best else (None, 0, 0, float('inf'))
 
         if best_strike:
             print(f"✅ Selected ATM: {best_strike} | CE: ₹{best_ce:.2f} | PE: ₹{best_pe:.2f} | Diff: ₹{min_diff:.2f}")
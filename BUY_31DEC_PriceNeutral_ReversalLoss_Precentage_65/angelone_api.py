@@ -1,12 +1,17 @@
 """
-Angel One API Wrapper - SIMPLIFIED REACTIVE AUTHENTICATION
-✅ ONE LOGIN PER DAY (JWT valid 24-28 hours)
-✅ REACTIVE RE-LOGIN ONLY ON AB1007/auth errors
-✅ NO PROACTIVE REFRESHES
-✅ NO JWT REFRESH THREADS
+Angel One API Wrapper - BACKGROUND SESSION MANAGEMENT
+✅ ONE LOGIN AT START (session valid SESSION_VALIDITY_HOURS)
+✅ SESSION MANAGER WORKER (session_manager.py) - re-login on AB1007/auth errors and a proactive
+   refresh SESSION_REFRESH_AHEAD_MINUTES before expiry, both off the trading loop
+✅ NO JWT REFRESH CALLS - a refresh is a full login, swapped in atomically
 ✅ SIMPLIFIED & STABLE
 ✅ CRITICAL OPERATION LOCKS
 ✅ WEB SOCKET AUTO-RECONNECT
+✅ BASKET ORDERS - pre-validated multi-leg payloads, pooled REST connections, automatic rollback
+✅ MULTI-UNDERLYING - scrip master / spot feeds for every config.UNDERLYINGS entry,
+   chain WebSocket subscriptions tracked per strategy (one socket, one rate-limit budget)
+✅ MULTI-STRATEGY - every order id claimed by the placing strategy (config.STRATEGY_ID), fills routed
+   to its own ledger when strategies share a book
 """
 
 import pyotp
@@ -14,14 +19,31 @@ import time
 import json
 import os
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.parse import urljoin
 from typing import Dict, Optional, List
 from SmartApi import SmartConnect
+import SmartApi.smartExceptions as smart_ex
 from SmartApi.smartWebSocketV2 import SmartWebSocketV2
 from SmartApi.smartWebSocketOrderUpdate import SmartWebSocketOrderUpdate
-from config import config
+from config import config, UNDERLYING_SPECS
+from position_ledger import PositionLedger, StrategyLedgers
+from circuit_breaker import CircuitBreaker
+from session_manager import SessionManager
+from tick_decoder import LtpTickDecoder
+from tick_recorder import TickRecorder
+from latency_tracker import latency
+from lock_manager import LockManager
+from order_templates import OrderTemplates
+from order_basket import (BasketLeg, OrderBasket, REVERSE_SIDE, REJECTED, SENT, FILLED, ROLLED_BACK,
+                          ROLLBACK_FAILED)
+from bot_logging import get_logger, get_stats as get_logging_stats
 import threading
 
+log = get_logger('angelone_api')
+
 
 # ============================================================================
 # ANGEL ONE ERROR CODES - Simplified reactive error handling
@@ -99,8 +121,54 @@ ANGEL_ERROR_CODES = {
 }
 
 
+class PooledSmartConnect(SmartConnect):
+    """
+    🧺 SmartConnect whose REST calls reuse keep-alive connections
+    The SDK mounts pool= on self.reqsession but its _request goes through module-level
+    requests.request (new TCP + TLS handshake per call) - same request / response
+    handling here, sent over the pooled session instead
+    """
+
+    def __init__(self, pool_size: int = 8, **kwargs):
+        super().__init__(pool={'pool_connections': pool_size, 'pool_maxsize': pool_size}, **kwargs)
+
+    def _request(self, route, method, parameters=None):
+        params = parameters.copy() if parameters else {}
+        url = urljoin(self.root, self._routes[route].format(**params))
+
+        headers = self.requestHeaders()
+        if self.access_token:
+            headers["Authorization"] = "Bearer {}".format(self.access_token)
+
+        r = self.reqsession.request(method, url,
+                                    data=json.dumps(params) if method in ["POST", "PUT"] else None,
+                                    params=json.dumps(params) if method in ["GET", "DELETE"] else None,
+                                    headers=headers,
+                                    verify=not self.disable_ssl,
+                                    allow_redirects=True,
+                                    timeout=self.timeout,
+                                    proxies=self.proxies)
+
+        if "json" in headers["Content-type"]:
+            try:
+                data = json.loads(r.content.decode("utf8"))
+            except ValueError:
+                raise smart_ex.DataException(
+                    "Couldn't parse the JSON response received from the server: {}".format(r.content))
+            if data.get("error_type"):
+                if self.session_expiry_hook and r.status_code == 403 and data["error_type"] == "TokenException":
+                    self.session_expiry_hook()
+                exp = getattr(smart_ex, data["error_type"], smart_ex.GeneralException)
+                raise exp(data["message"], code=r.status_code)
+            return data
+        if "csv" in headers["Content-type"]:
+            return r.content
+        raise smart_ex.DataException("Unknown Content-type ({}) with response: ({})".format(
+            headers["Content-type"], r.content))
+
+
 class AngelOneAPI:
-    """Production-ready Angel One API wrapper - Simplified reactive authentication"""
+    """Production-ready Angel One API wrapper - session owned by a background SessionManager"""
 
     def __init__(self):
         """Initialize API connection"""
@@ -121,17 +189,57 @@ class AngelOneAPI:
         self.order_fill_events = {}  # {order_id: threading.Event()}
         self.order_statuses = {}  # {order_id: status}
 
+        # 📒 Local net positions from order-update fills (zero-REST reconcile)
+        self.position_ledger = PositionLedger()
+        self.strategy_ledgers = StrategyLedgers()  # 🧩 Strategies sharing a book - fills by order owner
+
         # Scrip master
         self.scrip_master = {}
         self.scrip_master_file = "OpenAPIScripMaster.json"
         self.scrip_master_url = "https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json"
 
         # ✅ WebSocket token cache with timestamps
-        self.token_cache = {}  # token -> {'ltp': float, 'timestamp': float}
+        self.token_cache = {}  # token -> {'ltp', 'timestamp', 'source': 'ws'|'rest', 'generation'}
         self.token_cache_ttl = 60  # Cache validity: 60 seconds
 
+        # 🔢 Cache generations - bumped instead of wiping caches
+        self.session_generation = 0   # +1 per re-login (token cache revalidated lazily)
+        self.position_generation = 0  # +1 per fill (position cache revalidated on next read)
+
+        # 📐 Option chain WebSocket subscriptions per underlying (diffed at window edges)
+        self.chain_subscriptions: Dict[str, set] = {}  # underlying -> chain window tokens
+        self.chain_subscription_lock = threading.Lock()
+        self.extra_subscribed_tokens = set()  # subscribe_instruments_to_websocket
+        self.order_ws_live = False
+        self.ws_failovers = 0
+        self._failover_thread = None
+        self.tick_decoder: Optional[LtpTickDecoder] = None  # ⚡ Fast LTP frame decoder (WS_FAST_DECODER)
+        self.tick_recorder: Optional[TickRecorder] = TickRecorder() if config.TICK_RECORD_ENABLED else None
+
         # ✅ Advanced rate limiting per operation
-        self.last_api_call_time = {}  # operation_type -> timestamp
+        self.last_api_call_time = {}  # operation_type -> timestamp (next free slot)
+        self.rate_limit_lock = threading.Lock()  # Exit engine / hedge threads share the budget
+
+        # 📈 Live counters (plain ints, read by metrics.py at scrape time)
+        self.rest_calls: Dict[str, int] = {}     # operation_type -> calls
+        self.rest_errors: Dict[tuple, int] = {}  # (endpoint, error_code) -> errors
+        self.tick_counts: Dict[str, int] = {}    # token -> WebSocket ticks
+        self.token_cache_hits = 0
+        self.token_cache_misses = 0
+        self.position_cache_hits = 0
+        self.position_cache_misses = 0
+
+        # 🔌 Per-endpoint circuit breakers (AB2001 / AB1004 cooldowns, probed in background)
+        self.breakers = {
+            'order': CircuitBreaker('order', max_cooldown=config.BREAKER_MAX_COOLDOWN_SECONDS),
+            'ltp': CircuitBreaker('ltp', probe=self._probe_market_data,
+                                  max_cooldown=config.BREAKER_MAX_COOLDOWN_SECONDS),
+            'batch_ltp': CircuitBreaker('batch_ltp', probe=self._probe_market_data,
+                                        max_cooldown=config.BREAKER_MAX_COOLDOWN_SECONDS),
+            'position': CircuitBreaker('position', probe=self._probe_positions,
+                                       max_cooldown=config.BREAKER_MAX_COOLDOWN_SECONDS),
+            'default': CircuitBreaker('default', max_cooldown=config.BREAKER_MAX_COOLDOWN_SECONDS),
+        }
 
         # NIFTY spot fallback
         self.nifty_spot_failures = 0
@@ -146,26 +254,52 @@ class AngelOneAPI:
         self.position_cache = []
         self.position_cache_time = 0
         self.position_cache_ttl = 30  # 30 seconds TTL
+        self.position_cache_generation = -1  # position_generation the cache was fetched at
+
+        # 🔀 Keyed position snapshot (securityId -> position) + delta subscribers
+        self.position_map = {}
+        self.position_subscribers = []  # callback(delta: Dict)
 
-        # 🔥 NEW: Critical operation lock
-        self.critical_operation_lock = threading.Lock()
-        self.critical_operation_in_progress = False
+        # 🔒 Keyed order locks (per leg / per instrument, with timeouts) - lock_manager.py
+        self.locks = LockManager()
+        self.critical_leases = threading.local()  # Legacy acquire/release_critical_lock callers
+
+        # 🧺 Basket orders - shared worker pool (created on first basket) + recent baskets for health
+        self.order_pool: Optional[ThreadPoolExecutor] = None
+        self.order_pool_lock = threading.Lock()
+        self.recent_baskets = deque(maxlen=20)
+        self.basket_counts: Dict[str, int] = {}  # final state -> baskets
+
+        # 📝 Pre-built order payloads per chain instrument (refreshed with the option chain)
+        self.order_templates = OrderTemplates(self)
+
+        # 🔐 Session lifecycle - re-logins run on the session manager's worker thread
+        self.login_lock = threading.Lock()
+        self.session = SessionManager(self.login)
 
         # Load scrip master
         self._load_scrip_master()
 
-    def acquire_critical_lock(self, operation_name: str):
-        """Acquire lock before critical operations"""
-        print(f"🔒 Acquiring lock for: {operation_name}")
-        self.critical_operation_lock.acquire()
-        self.critical_operation_in_progress = True
-        print(f"✅ Lock acquired: {operation_name}")
+    @property
+    def critical_operation_in_progress(self) -> bool:
+        return self.locks.busy()
+
+    def acquire_critical_lock(self, operation_name: str, keys: List[str] = None, timeout: float = None):
+        """
+        Legacy whole-bot critical section (SELL variant) - one 'critical' key
+        New code holds only the keys it touches: api.locks.hold(operation, [leg_key(...), instrument_key(...)])
+        """
+        lease = self.locks.acquire(operation_name, keys or ['critical'], timeout)
+        stack = getattr(self.critical_leases, 'stack', None)
+        if stack is None:
+            stack = self.critical_leases.stack = []
+        stack.append(lease)
 
     def release_critical_lock(self, operation_name: str):
-        """Release lock after critical operations"""
-        self.critical_operation_in_progress = False
-        self.critical_operation_lock.release()
-        print(f"🔓 Lock released: {operation_name}")
+        """Release the most recent acquire_critical_lock on this thread"""
+        stack = getattr(self.critical_leases, 'stack', None)
+        if stack:
+            stack.pop().release()
 
     def _rate_limit(self, delay: float = 0.5):
         """Enforce rate limiting between API calls"""
@@ -189,24 +323,61 @@ class AngelOneAPI:
         
         delay = rate_limits.get(operation_type, rate_limits["default"])
         
-        # Get last call time for this operation type
-        last_call = self.last_api_call_time.get(operation_type, 0)
-        elapsed = time.time() - last_call
+        # 🔒 Reserve the next slot for this operation type, sleep outside the lock -
+        # concurrent callers queue up delay apart instead of all passing the same check
+        with self.rate_limit_lock:
+            now = time.time()
+            slot = max(now, self.last_api_call_time.get(operation_type, 0) + delay)
+            self.last_api_call_time[operation_type] = slot
+            self.rest_calls[operation_type] = self.rest_calls.get(operation_type, 0) + 1
         
-        if elapsed < delay:
-            sleep_time = delay - elapsed
-            print(f"   ⏱️ Rate limiting [{operation_type}]: waiting {sleep_time:.2f}s")
+        sleep_time = slot - now
+        if sleep_time > 0:
+            log.debug("   ⏱️ Rate limiting [%s]: waiting %.2fs", operation_type, sleep_time,
+                      extra={'operation': operation_type, 'wait_ms': round(sleep_time * 1000, 1)})
             time.sleep(sleep_time)
-        
-        self.last_api_call_time[operation_type] = time.time()
+        latency.record(f"rate_limit_{operation_type}", max(sleep_time, 0.0) * 1000)
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        return self.breakers.get(endpoint, self.breakers['default'])
+
+    def _probe_market_data(self) -> bool:
+        """🔌 Breaker probe: one spot index LTP call (paced like any LTP call)"""
+        if not self.smart_api:
+            return False
+        self._advanced_rate_limit("ltp")
+        response = self.smart_api.ltpData("NSE", config.SPOT_SYMBOL, config.SPOT_TOKEN)
+        return bool(response and response.get('status'))
 
-    def _handle_api_error(self, error_msg: str, error_code: str = None) -> tuple:
+    def _probe_positions(self) -> bool:
+        """🔌 Breaker probe: position book (paced like any position call)"""
+        if not self.smart_api:
+            return False
+        self._advanced_rate_limit("position")
+        response = self.smart_api.position()
+        return bool(response and response.get('status'))
+
+    def _trip_on_error_code(self, endpoint: str, error_code: str) -> bool:
+        """Open the endpoint breaker for AB2001/AB1004 (returns True if tripped)"""
+        if error_code == 'AB2001':
+            cooldown = (config.ORDER_RATE_LIMIT_COOLDOWN_SECONDS if endpoint == 'order'
+                        else config.RATE_LIMIT_COOLDOWN_SECONDS)
+            self._breaker(endpoint).trip(cooldown, 'AB2001 rate limit')
+            return True
+        if error_code == 'AB1004':
+            self._breaker(endpoint).trip(config.SERVER_ERROR_COOLDOWN_SECONDS, 'AB1004 server error')
+            return True
+        return False
+
+    def _handle_api_error(self, error_msg: str, error_code: str = None, endpoint: str = 'default') -> tuple:
         """
         🔥 SIMPLIFIED REACTIVE ERROR HANDLING
         Full re-login on ANY auth error, NO JWT refresh
+        🔌 Rate limit / server error → endpoint breaker opens, NO sleep on caller's thread
         
         Returns:
             tuple: (recovery_successful: bool, should_retry: bool)
+            Retry only after self._breaker(endpoint) stops reporting open
         """
         # Extract error code if not provided
         if not error_code:
@@ -214,45 +385,37 @@ class AngelOneAPI:
             match = re.search(r"'errorcode':\s*'([^']+)'", error_msg)
             if match:
                 error_code = match.group(1)
+        error_key = (endpoint, error_code)
+        self.rest_errors[error_key] = self.rest_errors.get(error_key, 0) + 1
         
-        print(f"\n{'='*70}")
-        print(f"⚠️ API ERROR")
-        print(f"{'='*70}")
+        log.warning("⚠️ API ERROR [%s] code=%s: %s", endpoint, error_code, error_msg[:200],
+                    extra={'endpoint': endpoint, 'error_code': error_code})
         
-        # 🔥 ALL authentication errors → Full re-login
+        # 🔥 ALL authentication errors → Full re-login (🔐 background worker)
         if error_code in ['AB1007', 'AB1010', 'AB1003', 'AG8001', 'AG8002', 'AG8003']:
-            print(f"   Authentication error ({error_code}) detected")
-            print(f"   🔄 Performing full re-login...")
-            success = self.login()
-            
+            log.warning("   Authentication error (%s) detected", error_code)
+            self.session.request_relogin(error_code)
+
+            if endpoint != 'order':
+                return (False, False)  # Market data callers fall back to WebSocket cache
+
+            # Orders must go out on a valid session - await the worker
+            success = self.session.wait_ready(config.SESSION_WAIT_SECONDS)
             if success:
-                # 🔥 FIX 5: Invalidate caches after re-login
-                print("🧹 Clearing stale caches...")
-                self.invalidate_position_cache()
-                self.token_cache.clear()
-                
-                # Let WebSocket stabilize
-                time.sleep(3)
-                
-                print("✅ Re-login complete, caches cleared")
-            
-            return (success, True)  # Always retry after re-login
-        
-        # Rate limit → Wait and retry
-        elif error_code == 'AB2001':
-            print(f"   Rate limit hit, waiting 60 seconds...")
-            time.sleep(60)
-            return (True, True)
+                log.info("✅ Session ready - retrying")
+            else:
+                log.error("❌ Session not ready in time")
+            return (success, success)
         
-        # Server error → Wait and retry
-        elif error_code == 'AB1004':
-            print(f"   Server error, waiting 5 seconds...")
-            time.sleep(5)
+        # Rate limit / server error → open breaker, retry after cooldown (non-blocking)
+        elif self._trip_on_error_code(endpoint, error_code):
+            log.warning("   %s on [%s] - breaker open, retry in %.0fs",
+                        error_code, endpoint, self._breaker(endpoint).remaining())
             return (True, True)
         
         # Other errors → Don't retry automatically
         else:
-            print(f"   Non-critical error: {error_msg[:100]}")
+            log.warning("   Non-critical error: %s", error_msg[:100])
             return (False, False)
 
     def _load_scrip_master(self):
@@ -264,29 +427,30 @@ class AngelOneAPI:
                 file_age = time.time() - os.path.getmtime(self.scrip_master_file)
                 if file_age < 86400:  # 24 hours
                     should_download = False
-                    print(f"📂 Using cached scrip master (age: {file_age / 3600:.1f} hours)")
+                    log.info(f"📂 Using cached scrip master (age: {file_age / 3600:.1f} hours)")
 
             # Download if needed
             if should_download:
-                print(f"⬇️ Downloading scrip master from Angel One...")
+                log.info(f"⬇️ Downloading scrip master from Angel One...")
                 response = requests.get(self.scrip_master_url, timeout=30)
                 response.raise_for_status()
 
                 with open(self.scrip_master_file, 'w') as f:
                     f.write(response.text)
-                print(f"✅ Downloaded fresh scrip master")
+                log.info(f"✅ Downloaded fresh scrip master")
 
             # Load from file
-            print(f"📖 Loading scrip master...")
+            log.info(f"📖 Loading scrip master...")
             with open(self.scrip_master_file, 'r') as f:
                 data = json.load(f)
 
-            # Filter for NFO (options) only and NIFTY
+            # Filter for NFO contracts of the traded underlyings (exact name - NIFTY never matches BANKNIFTY)
+            underlyings = set(config.UNDERLYINGS) | {config.UNDERLYING}
             count = 0
             for scrip in data:
                 if scrip.get('exch_seg') == 'NFO':
                     symbol = scrip.get('symbol', '')
-                    if 'NIFTY' in symbol and not any(x in symbol for x in ['BANK', 'FINN', 'MIDCP', 'NXT']):
+                    if scrip.get('name') in underlyings:
                         token = scrip.get('token')
                         if symbol and token:
                             # Convert strike from paise to rupees
@@ -302,14 +466,22 @@ class AngelOneAPI:
                             }
                             count += 1
 
-            print(f"✅ Loaded {count} NIFTY option contracts")
+            log.info(f"✅ Loaded {count} {'/'.join(sorted(underlyings))} option contracts")
 
         except Exception as e:
-            print(f"⚠️ Error loading scrip master: {str(e)}")
-            print("   Will use searchScrip API fallback")
+            log.warning(f"⚠️ Error loading scrip master: {str(e)}")
+            log.info("   Will use searchScrip API fallback")
 
-    def _setup_market_websocket_callbacks(self):
-        """Setup callbacks for market data WebSocket"""
+    def _setup_market_websocket_callbacks(self, ws=None, resubscribe: bool = False) -> Dict:
+        """
+        Setup callbacks for market data WebSocket
+        🔁 resubscribe=True (standby socket): subscribe the full token set on open
+
+        Returns:
+            {'opened': Event, 'first_tick': Event} for make-before-break failover
+        """
+        ws = ws or self.market_ws
+        events = {'opened': threading.Event(), 'first_tick': threading.Event()}
 
         def on_data(wsapp, message):
             """Handle market data updates"""
@@ -324,36 +496,59 @@ class AngelOneAPI:
                         ltp_rupees = ltp / 100.0
 
                         # ✅ Update token cache (for get_ltp fallback)
-                        self.token_cache[token] = {
-                            'ltp': ltp_rupees,
-                            'timestamp': time.time()
-                        }
+                        self._cache_ltp(token, ltp_rupees, 'ws')
+                        self.tick_counts[token] = self.tick_counts.get(token, 0) + 1
+                        events['first_tick'].set()
             except Exception as e:
-                print(f"⚠️ Market WS data error: {e}")
+                log.warning(f"⚠️ Market WS data error: {e}")
 
         def on_open(wsapp):
             """Market WebSocket connected"""
-            print("✅ Market WebSocket V2 connected")
+            log.info(f"✅ Market WebSocket V2 connected{' (standby)' if resubscribe else ''}")
+            if resubscribe:
+                self._resubscribe_all(ws)
+            events['opened'].set()
 
         def on_error(wsapp, error):
             """Market WebSocket error"""
-            print(f"⚠️ Market WebSocket error: {error}")
+            log.warning(f"⚠️ Market WebSocket error: {error}")
 
         def on_close(wsapp):
             """Market WebSocket closed"""
-            print("⚠️ Market WebSocket closed")
+            if ws is self.market_ws:
+                log.warning("⚠️ Market WebSocket closed")
 
         # Assign callbacks
-        self.market_ws.on_data = on_data
-        self.market_ws.on_open = on_open
-        self.market_ws.on_error = on_error
-        self.market_ws.on_close = on_close
+        ws.on_data = on_data
+        ws.on_open = on_open
+        ws.on_error = on_error
+        ws.on_close = on_close
+
+        # ⚡ LTP frames bypass the SDK dict parser (QUOTE/SNAP_QUOTE still use on_data)
+        if config.WS_FAST_DECODER:
+            def on_tick(token, ltp_rupees):
+                self._cache_ws_tick(token, ltp_rupees)
+                events['first_tick'].set()
+
+            self.tick_decoder = LtpTickDecoder(on_tick).install(ws)
 
-    def _setup_order_websocket_callbacks(self):
-        """✅ Setup callbacks for order update WebSocket"""
+        # 🎞️ Raw frames recorded ahead of the decoder (replay_engine.py)
+        if self.tick_recorder:
+            self.tick_recorder.wrap_market_ws(ws)
+        return events
+
+    def _setup_order_websocket_callbacks(self, ws=None) -> threading.Event:
+        """
+        ✅ Setup callbacks for order update WebSocket
+        Returns 'opened' Event (make-before-break failover switches on it)
+        """
+        ws = ws or self.order_ws
+        opened = threading.Event()
 
         def on_message(wsapp, message):
             """Handle order update messages"""
+            if self.tick_recorder:
+                self.tick_recorder.record_order(message)
             try:
                 # Messages come as STRING
                 if isinstance(message, str):
@@ -369,7 +564,7 @@ class AngelOneAPI:
                 # Check if this is initial connection message
                 if not order_data or not order_data.get('orderid'):
                     if data.get('status-code') == '200':
-                        print(f"✅ Order WebSocket authenticated (User: {data.get('user-id')})")
+                        log.info(f"✅ Order WebSocket authenticated (User: {data.get('user-id')})")
                     return
 
                 # Extract order info
@@ -392,13 +587,18 @@ class AngelOneAPI:
 
                 # Store status
                 self.order_statuses[order_id] = normalized_status
-                print(f"📢 Order Update: {order_id} - {normalized_status}")
+                log.info("📢 Order Update: %s - %s", order_id, normalized_status,
+                         extra={'order_id': order_id, 'status': normalized_status})
+
+                # 📒 Apply fills to the local position ledger
+                self.position_ledger.on_order_update(order_data)
+                self.strategy_ledgers.on_order_update(order_data)
 
                 # Trigger event if waiting
                 if order_id in self.order_fill_events:
                     if normalized_status in ['TRADED', 'REJECTED', 'CANCELLED']:
                         self.order_fill_events[order_id].set()
-                        print(f"   🔔 Event triggered for final status: {normalized_status}")
+                        log.debug("   🔔 Event triggered for final status: %s", normalized_status)
 
                 # Call callback if registered
                 if order_id in self.order_fill_callbacks:
@@ -406,50 +606,63 @@ class AngelOneAPI:
                     callback(order_id, normalized_status)
 
             except json.JSONDecodeError as e:
-                print(f"⚠️ Order WS JSON parse error: {e}")
+                log.warning(f"⚠️ Order WS JSON parse error: {e}")
             except Exception as e:
-                print(f"⚠️ Order WS message error: {e}")
+                log.warning(f"⚠️ Order WS message error: {e}")
 
         def on_open(wsapp):
             """Order WebSocket connected"""
-            print("✅ Order WebSocket connected")
+            log.info("✅ Order WebSocket connected")
+            opened.set()
+            if ws is self.order_ws:
+                self.order_ws_live = True
+                self.position_ledger.set_stream_live(True)
+                self.strategy_ledgers.set_stream_live(True)
 
         def on_error(wsapp, error):
             """Order WebSocket error"""
-            print(f"⚠️ Order WebSocket error: {error}")
+            log.warning(f"⚠️ Order WebSocket error: {error}")
 
         def on_close(wsapp, close_status_code=None, close_msg=None):
             """Order WebSocket closed"""
-            print(f"⚠️ Order WebSocket closed (code: {close_status_code})")
+            if ws is not self.order_ws:
+                return  # Replaced socket after failover - not a gap
+            log.warning(f"⚠️ Order WebSocket closed (code: {close_status_code})")
+            self.order_ws_live = False
+            self.position_ledger.set_stream_live(False)
+            self.strategy_ledgers.set_stream_live(False)
 
         # Assign callbacks
-        self.order_ws.on_message = on_message
-        self.order_ws.on_open = on_open
-        self.order_ws.on_error = on_error
-        self.order_ws.on_close = on_close
+        ws.on_message = on_message
+        ws.on_open = on_open
+        ws.on_error = on_error
+        ws.on_close = on_close
+        return opened
 
     def login(self) -> bool:
         """
         🎯 ELEGANT RE-LOGIN: Update tokens in existing WebSockets
         Credit: Pravin's brilliant insight - work WITH the library, not against it! 🏆
+        🔐 New session is built aside and swapped in atomically - in-flight calls
+           finish on the old session, so critical orders no longer block re-login
+        After the first login, re-logins run on the session manager worker
+        (use self.session.request_relogin, never call this from the trading loop)
         """
-        if self.critical_operation_in_progress:
-            print("⚠️ Critical operation in progress, deferring re-login...")
-            return False
-        
-        if not self.critical_operation_lock.acquire(blocking=False):
-            print("⚠️ Another login in progress, skipping...")
+        if not self.login_lock.acquire(blocking=False):
+            log.warning("⚠️ Another login in progress, skipping...")
             return False
         
         try:
-            print("\n" + "=" * 80)
-            print("[LOGIN] Logging into Angel One...")
+            log.info("\n" + "=" * 80)
+            log.info("[LOGIN] Logging into Angel One...")
+            config.validate_credentials()
             
-            # Generate new session
-            self.smart_api = SmartConnect(api_key=config.API_KEY)
+            # Generate new session (not visible to other threads until swapped in)
+            # 🧺 Keep-alive connection pool (the SDK's own _request opens a new connection per call)
+            new_api = PooledSmartConnect(pool_size=config.ORDER_HTTP_POOL_SIZE, api_key=config.API_KEY)
             totp = pyotp.TOTP(config.TOTP_SECRET).now()
             
-            data = self.smart_api.generateSession(
+            data = new_api.generateSession(
                 clientCode=config.CLIENT_ID,
                 password=config.PASSWORD,
                 totp=totp
@@ -468,99 +681,106 @@ class AngelOneAPI:
                 # 🔥 PROVEN SOLUTION: Update tokens in existing WebSockets
                 # WebSocket will use NEW tokens in all future requests!
                 if self.market_ws:
-                    print("🔄 Updating market WebSocket tokens...")
+                    log.info("🔄 Updating market WebSocket tokens...")
                     self.market_ws.auth_token = new_auth_token
                     self.market_ws.feed_token = new_feed_token
-                    print("   ✅ Market WS now using NEW token")
+                    log.info("   ✅ Market WS now using NEW token")
                 
                 if self.order_ws:
-                    print("🔄 Updating order WebSocket tokens...")
+                    log.info("🔄 Updating order WebSocket tokens...")
                     self.order_ws.auth_token = new_auth_token
                     self.order_ws.feed_token = new_feed_token
-                    print("   ✅ Order WS now using NEW token")
+                    log.info("   ✅ Order WS now using NEW token")
                 
-                # Update our stored tokens
+                # 🔐 Atomic swap - REST callers pick up the new session on their next call
+                is_relogin = self.smart_api is not None and self.is_connected
+                self.smart_api = new_api
                 self.auth_token_string = new_auth_token
                 self.feed_token = new_feed_token
                 self.is_connected = True
+
+                if is_relogin:
+                    # 🔥 FIX 5: Invalidate caches after re-login (generation bump, no wipe)
+                    # Fresh WebSocket ticks survive, REST entries from the old session are dropped lazily
+                    self.session_generation += 1
+                    self.invalidate_position_cache()
+                    log.info(f"🔢 Cache generation → {self.session_generation} (stale entries revalidated lazily)")
                 
-                print(f"✅ Login successful - Session valid until ~{config.get_current_ist_time() + timedelta(hours=24)}")
-                print(f"   🧵 ZERO NEW THREADS - Existing threads updated with new tokens!")
-                print(f"   No refresh needed for your 6.5-hour trading session")
+                log.info(f"✅ Login successful - Session valid until "
+                         f"~{config.get_current_ist_time() + timedelta(hours=config.SESSION_VALIDITY_HOURS)}")
+                log.info(f"   🔐 WebSockets keep running on the new tokens - session manager refreshes "
+                         f"{config.SESSION_REFRESH_AHEAD_MINUTES:g} min before expiry, re-logins on auth errors")
                 
                 # Only initialize WebSockets if they don't exist yet (first login)
                 if not self.market_ws or not self.order_ws:
-                    print("📡 Creating WebSockets for first time...")
+                    log.info("📡 Creating WebSockets for first time...")
                     self._initialize_websockets()
+
+                self.session.mark_logged_in()
+                self.session.start()
                 
                 return True
             else:
-                print(f"❌ Login failed: {data.get('message', 'Unknown error')}")
+                log.error(f"❌ Login failed: {data.get('message', 'Unknown error')}")
                 return False
         
         except Exception as e:
-            print(f"❌ Login error: {str(e)}")
+            log.error(f"❌ Login error: {str(e)}")
             return False
         
         finally:
-            self.critical_operation_lock.release()
+            self.login_lock.release()
 
     def _initialize_websockets(self):
         """Initialize WebSockets after login"""
         try:
-            print("📡 Initializing WebSockets...")
+            log.info("📡 Initializing WebSockets...")
             
             # Market WebSocket
-            self.market_ws = SmartWebSocketV2(
-                auth_token=self.auth_token_string,
-                api_key=config.API_KEY,
-                client_code=config.CLIENT_ID,
-                feed_token=self.feed_token,
-                max_retry_attempt=3,
-                retry_delay=5
-            )
+            self.market_ws = self._create_market_ws()
             self._setup_market_websocket_callbacks()
+            self.chain_subscriptions = {}  # New socket - nothing subscribed yet
             market_thread = threading.Thread(target=self.market_ws.connect, daemon=True)
             market_thread.start()
             
-            # Subscribe to NIFTY spot
+            # Subscribe to spot indices
             time.sleep(2)
             self._subscribe_nifty_spot()
             
             # Order WebSocket (optional)
             try:
-                self.order_ws = SmartWebSocketOrderUpdate(
-                    self.auth_token_string,
-                    config.API_KEY,
-                    config.CLIENT_ID,
-                    self.feed_token
-                )
+                self.order_ws = self._create_order_ws()
                 self._setup_order_websocket_callbacks()
                 order_thread = threading.Thread(target=self.order_ws.connect, daemon=True)
                 order_thread.start()
-                print("✅ Order WebSocket initialized")
+                log.info("✅ Order WebSocket initialized")
             except Exception as e:
-                print(f"⚠️ Order WebSocket failed: {e}")
+                log.warning(f"⚠️ Order WebSocket failed: {e}")
                 self.order_ws = None
             
             self.ws_enabled = True
-            print("✅ WebSockets ready")
+            log.info("✅ WebSockets ready")
             
         except Exception as e:
-            print(f"⚠️ WebSocket initialization failed: {e}")
+            log.warning(f"⚠️ WebSocket initialization failed: {e}")
             self.ws_enabled = False
 
+    @staticmethod
+    def spot_tokens() -> List[str]:
+        """NSE index tokens of every traded underlying"""
+        names = dict.fromkeys([config.UNDERLYING] + config.UNDERLYINGS)
+        return [UNDERLYING_SPECS[name]['spot_token'] for name in names]
+
     def _subscribe_nifty_spot(self):
-        """Subscribe to NIFTY 50 spot using Official WebSocket V2"""
+        """Subscribe to the spot index of every underlying (NIFTY 50, ...) using Official WebSocket V2"""
         try:
             if not self.market_ws:
                 return
 
-            # NIFTY 50 spot token
             token_list = [
                 {
                     "exchangeType": 1,  # NSE_CM for indices
-                    "tokens": ["99926000"]  # NIFTY 50
+                    "tokens": self.spot_tokens()
                 }
             ]
 
@@ -570,15 +790,16 @@ class AngelOneAPI:
                 token_list=token_list
             )
 
-            print("✅ Subscribed to NIFTY 50 spot (WebSocket V2)")
+            log.info(f"✅ Subscribed to {len(token_list[0]['tokens'])} spot index(es) (WebSocket V2)")
 
         except Exception as e:
-            print(f"⚠️ NIFTY subscription failed: {e}")
+            log.warning(f"⚠️ Spot index subscription failed: {e}")
 
     def check_websocket_health(self) -> bool:
         """
         ✅ FIX 3: WebSocket auto-reconnect with health check
         Check WebSocket health and auto-reconnect if stale
+        🔁 Reconnect is make-before-break on a background thread (returns False meanwhile)
         """
         if not self.ws_enabled or not self.market_ws:
             return False
@@ -596,38 +817,142 @@ class AngelOneAPI:
                     return True
                 
                 # Stale data - reconnect
-                print("⚠️ WebSocket data stale (>60s), reconnecting...")
+                log.warning("⚠️ WebSocket data stale (>60s), reconnecting...")
                 
             except Exception as e:
-                print(f"⚠️ Error checking WebSocket health: {e}")
+                log.warning(f"⚠️ Error checking WebSocket health: {e}")
         
-        # No recent data or error - reconnect
+        # No recent data or error - 🔁 failover in background, old socket keeps serving meanwhile
+        if self._failover_thread and self._failover_thread.is_alive():
+            log.info("⏳ WebSocket failover already in progress")
+            return False
+
+        def failover():
+            try:
+                self._reconnect_websockets()
+            except Exception as e:
+                log.error(f"❌ WebSocket reconnect failed: {e}")
+
+        self._failover_thread = threading.Thread(target=failover, daemon=True, name="ws-failover")
+        self._failover_thread.start()
+        return False
+
+    def _create_market_ws(self) -> SmartWebSocketV2:
+        return SmartWebSocketV2(
+            auth_token=self.auth_token_string,
+            api_key=config.API_KEY,
+            client_code=config.CLIENT_ID,
+            feed_token=self.feed_token,
+            max_retry_attempt=3,
+            retry_delay=5
+        )
+
+    def _create_order_ws(self) -> SmartWebSocketOrderUpdate:
+        return SmartWebSocketOrderUpdate(
+            self.auth_token_string,
+            config.API_KEY,
+            config.CLIENT_ID,
+            self.feed_token
+        )
+
+    def _subscribed_token_set(self) -> set:
+        """
+        All NFO tokens the market socket should carry:
+        chain window + explicit subscriptions + anything still ticking
+        (straddle/hedge legs subscribed directly on market_ws)
+        """
+        spot_tokens = set(self.spot_tokens())
+        ticking = {
+            token for token, data in list(self.token_cache.items())
+            if data.get('source') == 'ws' and token not in spot_tokens
+        }
+        return set(self.chain_subscribed_tokens) | self.extra_subscribed_tokens | ticking
+
+    def _resubscribe_all(self, ws):
+        """Subscribe the full current token set on a (standby) socket"""
         try:
-            self._reconnect_websockets()
-            return True
+            spot_tokens = self.spot_tokens()
+            token_list = [{"exchangeType": 1, "tokens": spot_tokens}]  # Spot indices
+            nfo_tokens = sorted(self._subscribed_token_set())
+            if nfo_tokens:
+                token_list.append({"exchangeType": 2, "tokens": nfo_tokens})
+            ws.subscribe(correlation_id=f"failover_{int(time.time())}", mode=1, token_list=token_list)
+            log.info(f"🔁 Standby socket subscribed {len(nfo_tokens) + len(spot_tokens)} tokens")
         except Exception as e:
-            print(f"❌ WebSocket reconnect failed: {e}")
-            return False
+            log.warning(f"⚠️ Standby resubscribe failed: {e}")
+
+    @staticmethod
+    def _close_ws_async(ws):
+        """Close a replaced socket without blocking the caller"""
+        def close():
+            try:
+                ws.close_connection()
+            except Exception:
+                pass
+        threading.Thread(target=close, daemon=True).start()
 
     def _reconnect_websockets(self):
-        """✅ FIX 3: Reconnect WebSockets after health check failure"""
-        print("🔄 Reconnecting WebSockets...")
-        
-        # Close existing connections
-        try:
-            if self.market_ws:
-                self.market_ws.close_connection()
-            if self.order_ws:
-                self.order_ws.close_connection()
-        except:
-            pass
-        
-        time.sleep(2)
-        
-        # Reinitialize
-        self._initialize_websockets()
-        
-        print("✅ WebSocket reconnected")
+        """
+        ✅ FIX 3: Reconnect WebSockets after health check failure
+        🔁 MAKE-BEFORE-BREAK: standby socket connects and resubscribes while the
+           old one keeps serving, switch happens on the standby's first tick,
+           then missed LTPs are backfilled with one batch REST call
+        """
+        log.info("🔄 Reconnecting WebSockets (make-before-break)...")
+        gap_start = max((d['timestamp'] for d in list(self.token_cache.values())), default=time.time())
+        timeout = config.WS_FAILOVER_TIMEOUT_SECONDS
+
+        # Market socket: standby → first tick → atomic switch
+        standby = self._create_market_ws()
+        events = self._setup_market_websocket_callbacks(standby, resubscribe=True)
+        threading.Thread(target=standby.connect, daemon=True).start()
+
+        if not events['first_tick'].wait(timeout):
+            log.error(f"❌ Standby market socket got no tick in {timeout}s - keeping current socket")
+            self._close_ws_async(standby)
+            return
+
+        old_market, self.market_ws = self.market_ws, standby
+        self.ws_enabled = True
+        self.ws_failovers += 1
+        if old_market:
+            self._close_ws_async(old_market)
+        log.info(f"✅ Market socket switched (failover #{self.ws_failovers})")
+
+        # Order socket: only if the current one is down - switch on open
+        if not self.order_ws_live:
+            try:
+                standby_order = self._create_order_ws()
+                opened = self._setup_order_websocket_callbacks(standby_order)
+                threading.Thread(target=standby_order.connect, daemon=True).start()
+                if opened.wait(timeout):
+                    old_order, self.order_ws = self.order_ws, standby_order
+                    self.order_ws_live = True
+                    self.position_ledger.set_stream_live(True)  # Still unseeded → REST audit reseeds
+                    self.strategy_ledgers.set_stream_live(True)
+                    if old_order:
+                        self._close_ws_async(old_order)
+                    log.info("✅ Order socket switched")
+                else:
+                    self._close_ws_async(standby_order)
+                    log.warning(f"⚠️ Standby order socket did not open in {timeout}s")
+            except Exception as e:
+                log.warning(f"⚠️ Order socket failover failed: {e}")
+
+        self._backfill_gap(gap_start)
+
+    def _backfill_gap(self, gap_start: float):
+        """🔁 One batch REST call for tokens that have not ticked since the gap began"""
+        time.sleep(config.WS_GAP_BACKFILL_GRACE_SECONDS)  # Let snapshot ticks land first
+        stale = [
+            token for token in self._subscribed_token_set()
+            if self.token_cache.get(token, {}).get('timestamp', 0) <= gap_start
+        ]
+        if not stale:
+            log.info("✅ No tick gap to backfill")
+            return
+        log.info(f"🩹 Backfilling {len(stale)} LTPs missed during the gap (1 batch call)")
+        self.get_batch_ltp(stale, "NFO")
 
     def get_token_from_master(self, trading_symbol: str) -> Optional[str]:
         """Get token from scrip master file"""
@@ -647,7 +972,7 @@ class AngelOneAPI:
                     return data[0]['symboltoken']
             return None
         except Exception as e:
-            print(f"   ⚠️ searchScrip failed: {e}")
+            log.warning(f"   ⚠️ searchScrip failed: {e}")
             return None
 
     def search_scrip(self, symbol: str, strike: int, option_type: str) -> Optional[Dict]:
@@ -663,21 +988,21 @@ class AngelOneAPI:
             month = expiry[2:5]
             year = expiry[5:]
 
-            # Format variations to try
+            # Format variations to try (symbol = underlying: NIFTY, BANKNIFTY, ...)
             formats_to_try = [
-                f"NIFTY{expiry}{strike}{option_type}",  # NIFTY04NOV2426000CE
-                f"NIFTY{day}{month}{year}{strike}{option_type}",  # NIFTY04NOV2426000CE
-                f"NIFTY{month}{year}{strike}{option_type}",  # NIFTYNOV2426000CE (monthly)
-                f"NIFTY{year}{month[0]}{day}{strike}{option_type}",  # NIFTY24N0426000CE (compressed)
-                f"NIFTY{day}{month}{year}C{strike}",  # NIFTY04NOV24C26000
-                f"NIFTY{day}{month}{year[:2]}{strike}{option_type}",  # NIFTY04NOV2426000CE
+                f"{symbol}{expiry}{strike}{option_type}",  # NIFTY04NOV2426000CE
+                f"{symbol}{day}{month}{year}{strike}{option_type}",  # NIFTY04NOV2426000CE
+                f"{symbol}{month}{year}{strike}{option_type}",  # NIFTYNOV2426000CE (monthly)
+                f"{symbol}{year}{month[0]}{day}{strike}{option_type}",  # NIFTY24N0426000CE (compressed)
+                f"{symbol}{day}{month}{year}C{strike}",  # NIFTY04NOV24C26000
+                f"{symbol}{day}{month}{year[:2]}{strike}{option_type}",  # NIFTY04NOV2426000CE
             ]
 
             # Try each format and check if it exists in scrip master
             for fmt in formats_to_try:
                 if fmt in self.scrip_master:
                     scrip_data = self.scrip_master[fmt]
-                    return {
+                    scrip = {
                         'symbol': fmt,
                         'security_id': scrip_data['token'],
                         'trading_symbol': fmt,
@@ -685,14 +1010,17 @@ class AngelOneAPI:
                         'option_type': option_type,
                         'lot_size': int(scrip_data['lotsize'])
                     }
+                    if self.tick_recorder:
+                        self.tick_recorder.record_scrip(scrip)
+                    return scrip
 
             # If not found in master, try searchScrip API with first format
-            print(f"   ⚠️ {strike}{option_type} not in master, trying API...")
+            log.warning(f"   ⚠️ {strike}{option_type} not in master, trying API...")
             first_format = formats_to_try[0]
             token = self._fetch_token_from_api(first_format)
 
             if token:
-                return {
+                scrip = {
                     'symbol': first_format,
                     'security_id': token,
                     'trading_symbol': first_format,
@@ -700,15 +1028,18 @@ class AngelOneAPI:
                     'option_type': option_type,
                     'lot_size': config.LOT_SIZE
                 }
+                if self.tick_recorder:
+                    self.tick_recorder.record_scrip(scrip)
+                return scrip
 
             return None
 
         except Exception as e:
-            print(f"   ❌ Error creating symbol: {str(e)}")
+            log.error(f"   ❌ Error creating symbol: {str(e)}")
             return None
 
     def get_spot_price(self, max_retries: int = 3) -> Optional[float]:
-        """Get NIFTY spot price with WebSocket V2-first, REST fallback"""
+        """Get spot price of config.UNDERLYING's index with WebSocket V2-first, REST fallback"""
 
         # If already using futures, continue with that
         if self.use_futures_for_spot:
@@ -717,15 +1048,13 @@ class AngelOneAPI:
         # ✅ Try WebSocket V2 first (fastest)
         if self.ws_enabled and self.market_ws:
             # Check token cache (populated by WebSocket callbacks)
-            if "99926000" in self.token_cache:
-                cache_data = self.token_cache["99926000"]
-                # Check if data is fresh (less than 60 seconds old)
-                if time.time() - cache_data['timestamp'] < 60:
-                    ws_spot = cache_data['ltp']
-                    print(f"📈 NIFTY: {ws_spot:.2f} (WebSocket V2)")
-                    self.nifty_spot_failures = 0
-                    self.connection_failures = 0
-                    return ws_spot
+            # Check if data is fresh (less than 60 seconds old)
+            ws_spot = self._cached_ltp(config.SPOT_TOKEN, max_age=60)
+            if ws_spot is not None:
+                log.debug("📈 %s: %.2f (WebSocket V2)", config.UNDERLYING, ws_spot)
+                self.nifty_spot_failures = 0
+                self.connection_failures = 0
+                return ws_spot
 
         # Fallback to REST API
         for attempt in range(max_retries):
@@ -733,13 +1062,23 @@ class AngelOneAPI:
                 if not config.is_market_open():
                     return None
 
+                # 🔌 Breaker open → last known spot (up to 5 min old) instead of blocking
+                if not self._breaker('ltp').allow():
+                    stale = self._cached_ltp(config.SPOT_TOKEN, max_age=300)
+                    if stale is not None:
+                        log.info("📈 %s: %.2f (cached - LTP breaker open)", config.UNDERLYING, stale)
+                    return stale
+
                 self._advanced_rate_limit('ltp')
 
-                spot_data = self.smart_api.ltpData("NSE", "NIFTY 50", "99926000")
+                spot_data = self.smart_api.ltpData("NSE", config.SPOT_SYMBOL, config.SPOT_TOKEN)
+                if spot_data and not spot_data.get('status'):
+                    self._trip_on_error_code('ltp', spot_data.get('errorcode'))
 
                 if spot_data and spot_data.get('status'):
+                    self._breaker('ltp').record_success()
                     ltp = float(spot_data['data']['ltp'])
-                    print(f"📈 NIFTY: {ltp:.2f} (REST API)")
+                    log.debug("📈 %s: %.2f (REST API)", config.UNDERLYING, ltp)
                     self.nifty_spot_failures = 0
                     self.connection_failures = 0
                     return ltp
@@ -750,28 +1089,28 @@ class AngelOneAPI:
 
             except Exception as e:
                 if attempt < max_retries - 1:
-                    print(f"   ⚠️ Spot price retry {attempt + 1}/{max_retries}...")
+                    log.warning(f"   ⚠️ Spot price retry {attempt + 1}/{max_retries}...")
                     time.sleep(5)
                     if attempt == max_retries - 2:
                         self.reconnect_if_needed()
 
         # Failed to get spot
         self.nifty_spot_failures += 1
-        print(f"   ⚠️ Spot failures: {self.nifty_spot_failures}/5")
+        log.warning(f"   ⚠️ Spot failures: {self.nifty_spot_failures}/5")
 
         # Switch to futures after 5 failures
         if self.nifty_spot_failures >= 5:
-            print(f"   🔄 Switching to NIFTY Futures for spot price")
+            log.info(f"   🔄 Switching to {config.UNDERLYING} Futures for spot price")
             self.use_futures_for_spot = True
             return self._get_spot_from_futures(max_retries)
 
         return None
 
     def _get_spot_from_futures(self, max_retries: int = 3) -> Optional[float]:
-        """Get spot price from NIFTY current month futures"""
+        """Get spot price from the underlying's current month futures"""
         # TODO: Implement futures-based spot price
         # For now, retry spot
-        print(f"   ℹ️ Futures fallback not yet implemented, retrying spot")
+        log.info(f"   ℹ️ Futures fallback not yet implemented, retrying spot")
         self.use_futures_for_spot = False
         self.nifty_spot_failures = 0
         return None
@@ -780,34 +1119,37 @@ class AngelOneAPI:
         """✅ Get LTP with WebSocket V2-first, REST fallback with smart caching"""
         # ✅ Try WebSocket V2 first (fastest)
         if self.ws_enabled and self.market_ws:
-            # Check token cache (WebSocket data)
-            if security_id in self.token_cache:
-                cache_data = self.token_cache[security_id]
-                # Check if data is fresh (less than 60 seconds old)
-                if time.time() - cache_data['timestamp'] < self.token_cache_ttl:
-                    return cache_data['ltp']
+            # Check token cache (WebSocket data, fresh < 60s)
+            cached = self._cached_ltp(security_id)
+            if cached is not None:
+                return cached
         
         # Fallback to REST API with rate limiting
         try:
             if not config.is_market_open():
                 return None
+
+            # 🔌 Breaker open → serve last known price instead of blocking
+            if not self._breaker('ltp').allow():
+                stale = self.token_cache.get(security_id)
+                return stale['ltp'] if stale else None
             
             self._advanced_rate_limit("ltp")
             
             response = self.smart_api.ltpData("NFO", security_id, security_id)
+            if response and not response.get('status'):
+                self._trip_on_error_code('ltp', response.get('errorcode'))
             
             if response and response.get('status'):
+                self._breaker('ltp').record_success()
                 fetched = response.get('data', {}).get('fetched')
                 if fetched and len(fetched) > 0:
                     ltp = float(fetched[0].get('ltp', 0))
                     # Update cache for future use
-                    self.token_cache[security_id] = {
-                        'ltp': ltp,
-                        'timestamp': time.time()
-                    }
+                    self._cache_ltp(security_id, ltp, 'rest')
                     return ltp
         except Exception as e:
-            print(f"❌ Error fetching LTP for {security_id}: {e}")
+            log.error(f"❌ Error fetching LTP for {security_id}: {e}")
         
         return None
 
@@ -821,17 +1163,17 @@ class AngelOneAPI:
 
             if attempt < max_retries - 1:
                 wait_time = 3 if attempt == 0 else 10
-                print(f"   ⚠️ LTP retry {attempt + 1}/{max_retries} in {wait_time}s...")
+                log.warning(f"   ⚠️ LTP retry {attempt + 1}/{max_retries} in {wait_time}s...")
                 time.sleep(wait_time)
 
                 if attempt >= 1:
                     self.reconnect_if_needed()
 
-        print(f"   ❌ Could not fetch LTP after {max_retries} attempts")
+        log.error(f"   ❌ Could not fetch LTP after {max_retries} attempts")
         return None
 
     def subscribe_instruments_to_websocket(self, instruments: List[Dict]):
-        """Subscribe instruments to WebSocket V2 for real-time updates"""
+        """Subscribe instruments to WebSocket V2 for real-time updates (pinned - chain diffs never drop them)"""
         try:
             if not self.ws_enabled or not self.market_ws:
                 return
@@ -857,11 +1199,128 @@ class AngelOneAPI:
                     mode=1,  # LTP mode
                     token_list=token_list
                 )
+                self.extra_subscribed_tokens.update(nfo_tokens)
 
-                print(f"✅ Subscribed {len(nfo_tokens)} instruments to WebSocket V2")
+                log.info(f"✅ Subscribed {len(nfo_tokens)} instruments to WebSocket V2")
 
         except Exception as e:
-            print(f"⚠️ WebSocket subscription failed: {e}")
+            log.warning(f"⚠️ WebSocket subscription failed: {e}")
+
+    @property
+    def chain_subscribed_tokens(self) -> set:
+        """Chain window tokens of every underlying"""
+        return set().union(*self.chain_subscriptions.values())
+
+    def sync_chain_subscriptions(self, security_ids: List[str], owner: str = None) -> List[str]:
+        """
+        📐 Diff option chain tokens against current WebSocket subscriptions
+        Subscribes tokens entering the window, unsubscribes tokens leaving it
+        🌐 Tracked per owner (default config.STRATEGY_ID) - a token another chain still
+           needs is never unsubscribed, one already on the socket is not subscribed twice
+        📌 Position tokens (subscribe_instruments_to_websocket) are never unsubscribed here
+
+        Returns:
+            Newly subscribed tokens (no LTP tick received yet)
+        """
+        if not self.ws_enabled or not self.market_ws:
+            return []
+
+        owner = owner or config.STRATEGY_ID
+        wanted = set(security_ids)
+        with self.chain_subscription_lock:
+            current = self.chain_subscriptions.get(owner, set())
+            others = set().union(*(tokens for name, tokens in self.chain_subscriptions.items() if name != owner))
+            # Open legs / hedges (extra_subscribed_tokens) keep their ticks when the window moves away
+            pinned = others | self.extra_subscribed_tokens
+            added = sorted(wanted - current - pinned)
+            removed = sorted(current - wanted - pinned)
+            try:
+                self._apply_chain_diff(added, removed)
+            except Exception as e:
+                log.warning(f"⚠️ Chain subscription sync failed: {e}")
+                return []
+            self.chain_subscriptions[owner] = wanted
+
+        if added or removed:
+            log.debug("📐 Chain WS %s: +%d / -%d tokens (%d subscribed)", owner, len(added), len(removed), len(wanted))
+
+        return [token for token in added if token not in self.token_cache]
+
+    def _apply_chain_diff(self, added: List[str], removed: List[str]):
+        """Subscribe / unsubscribe one chain diff on the market socket"""
+        if added:
+            self.market_ws.subscribe(
+                correlation_id=f"chain_{int(time.time())}",
+                mode=1,  # LTP mode
+                token_list=[{"exchangeType": 2, "tokens": added}]
+            )
+        if removed:
+            self.market_ws.unsubscribe(
+                correlation_id=f"chain_{int(time.time())}",
+                mode=1,
+                token_list=[{"exchangeType": 2, "tokens": removed}]
+            )
+            for token in removed:
+                self.token_cache.pop(token, None)
+
+    def _cache_ltp(self, token: str, ltp: float, source: str):
+        """Store LTP stamped with the current session generation"""
+        self.token_cache[token] = {
+            'ltp': ltp,
+            'timestamp': time.time(),
+            'source': source,
+            'generation': self.session_generation
+        }
+
+    def _cache_ws_tick(self, token: str, ltp: float):
+        """⚡ Fast-path tick: update the existing WS entry in place (no new dict per tick)"""
+        tick_counts = self.tick_counts
+        tick_counts[token] = tick_counts.get(token, 0) + 1
+        entry = self.token_cache.get(token)
+        if entry is None or entry['source'] != 'ws':
+            self._cache_ltp(token, ltp, 'ws')
+            return
+        entry['ltp'] = ltp
+        entry['timestamp'] = time.time()
+        entry['generation'] = self.session_generation
+
+    def _cached_ltp(self, token: str, max_age: float = None) -> Optional[float]:
+        """
+        🔢 Cached LTP if fresh, revalidated lazily across re-logins
+        Older-generation WebSocket ticks are still market data → re-stamped and kept
+        Older-generation REST entries belong to the previous session → dropped
+        """
+        cache_data = self.token_cache.get(token)
+        if not cache_data:
+            self.token_cache_misses += 1
+            return None
+
+        if time.time() - cache_data['timestamp'] >= (max_age or self.token_cache_ttl):
+            self.token_cache_misses += 1
+            return None
+
+        if cache_data.get('generation', self.session_generation) != self.session_generation:
+            if cache_data.get('source') != 'ws':
+                self.token_cache.pop(token, None)
+                self.token_cache_misses += 1
+                return None
+            cache_data['generation'] = self.session_generation
+
+        self.token_cache_hits += 1
+        return cache_data['ltp']
+
+    def get_tick_time(self, token: str) -> Optional[float]:
+        """Receive time of the cached LTP (origin of tick-to-trade latency)"""
+        cache_data = self.token_cache.get(token)
+        return cache_data['timestamp'] if cache_data else None
+
+    def _wait_for_first_ticks(self, tokens: List[str], max_wait: float = 2.0):
+        """Wait (max 2s) until newly subscribed tokens have a cached LTP"""
+        deadline = time.time() + max_wait
+        pending = set(tokens)
+        while pending and time.time() < deadline:
+            time.sleep(0.1)
+            pending = {t for t in pending if t not in self.token_cache}
 
     def place_order(self, transaction_type: str, symbol: str, security_id: str,
                     quantity: int, order_type: str = "MARKET", price: float = 0) -> Dict:
@@ -869,28 +1328,78 @@ class AngelOneAPI:
         🔥 Place live order with full response
         Returns immediate order status without extra API call
         """
+        # 📝 Pre-built payload for chain instruments - only side + quantity filled in here
+        order_params = None
+        if order_type == "MARKET":
+            order_params = self.order_templates.fill(security_id, symbol, transaction_type, quantity)
+        if order_params is None:
+            order_params = self.build_order_params(transaction_type, symbol, security_id, quantity, order_type, price)
+        return self._submit_order(order_params)
+
+    @staticmethod
+    def build_order_params(transaction_type: str, symbol: str, security_id: str,
+                           quantity: int, order_type: str = "MARKET", price: float = 0) -> Dict:
+        """Broker payload for one NFO intraday order"""
+        return {
+            "variety": "NORMAL",
+            "tradingsymbol": symbol,
+            "symboltoken": security_id,
+            "transactiontype": transaction_type,
+            "exchange": "NFO",
+            "ordertype": order_type,
+            "producttype": "INTRADAY",
+            "duration": "DAY",
+            "quantity": str(quantity),
+            "price": str(price) if order_type == "LIMIT" else "0",
+            "squareoff": "0",
+            "stoploss": "0"
+        }
+
+    def validate_order_params(self, order_params: Dict) -> Optional[str]:
+        """
+        Pre-flight checks on a payload (no API call)
+        Returns an error message, or None when the order can be sent
+        """
+        if order_params.get('transactiontype') not in ('BUY', 'SELL'):
+            return f"Invalid side: {order_params.get('transactiontype')}"
+        if not order_params.get('tradingsymbol') or not order_params.get('symboltoken'):
+            return "Missing symbol or token"
+        if order_params.get('ordertype') not in ('MARKET', 'LIMIT'):
+            return f"Invalid order type: {order_params.get('ordertype')}"
+        if order_params['ordertype'] == 'LIMIT' and float(order_params.get('price') or 0) <= 0:
+            return "LIMIT order without a price"
+
+        try:
+            quantity = int(order_params.get('quantity') or 0)
+        except ValueError:
+            return f"Invalid quantity: {order_params.get('quantity')}"
+        scrip = self.scrip_master.get(order_params['tradingsymbol'], {})
+        if scrip and str(scrip.get('token')) != str(order_params['symboltoken']):
+            return f"Token {order_params['symboltoken']} does not match {order_params['tradingsymbol']}"
+        lot_size = self.lot_size_for(order_params['tradingsymbol'])
+        if quantity <= 0 or quantity % lot_size:
+            return f"Quantity {quantity} is not a multiple of lot size {lot_size}"
+        return None
+
+    def lot_size_for(self, symbol: str) -> int:
+        """Contract lot size from the scrip master (config.LOT_SIZE if unknown)"""
+        try:
+            return int(self.scrip_master.get(symbol, {}).get('lotsize') or config.LOT_SIZE)
+        except ValueError:
+            return config.LOT_SIZE
+
+    def _submit_order(self, order_params: Dict) -> Dict:
+        """Send a built payload - see place_order for the result format"""
+        transaction_type = order_params['transactiontype']
+        symbol = order_params['tradingsymbol']
         try:
             self._advanced_rate_limit('order')
 
-            print(f"   📤 {transaction_type} {symbol}")
-
-            order_params = {
-                "variety": "NORMAL",
-                "tradingsymbol": symbol,
-                "symboltoken": security_id,
-                "transactiontype": transaction_type,
-                "exchange": "NFO",
-                "ordertype": order_type,
-                "producttype": "INTRADAY",
-                "duration": "DAY",
-                "quantity": str(quantity),
-                "price": str(price) if order_type == "LIMIT" else "0",
-                "squareoff": "0",
-                "stoploss": "0"
-            }
+            log.info("   📤 %s %s", transaction_type, symbol)
 
             # 🔥 USE FULL RESPONSE METHOD for immediate status
-            response = self.smart_api.placeOrderFullResponse(order_params)
+            with latency.stage('order_http'):
+                response = self.smart_api.placeOrderFullResponse(order_params)
 
             if not response:
                 return {
@@ -908,7 +1417,7 @@ class AngelOneAPI:
                 if not status:
                     error_msg = response.get('message', 'Unknown error')
                     error_code = response.get('errorcode')
-                    print(f"   ❌ Order failed: {error_msg} (Code: {error_code})")
+                    log.error(f"   ❌ Order failed: {error_msg} (Code: {error_code})")
                     return {
                         'success': False,
                         'order_id': None,
@@ -925,7 +1434,7 @@ class AngelOneAPI:
                 order_status = data.get('orderstatus', data.get('status', 'UNKNOWN'))
 
                 if not order_id:
-                    print(f"   ❌ No order ID in response")
+                    log.error(f"   ❌ No order ID in response")
                     return {
                         'success': False,
                         'order_id': None,
@@ -935,7 +1444,10 @@ class AngelOneAPI:
                     }
 
                 # 🔥 LOG IMMEDIATE STATUS
-                print(f"   ✅ Order placed: {order_id} | Immediate status: {order_status}")
+                log.info("   ✅ Order placed: %s | Immediate status: %s", order_id, order_status,
+                         extra={'order_id': str(order_id), 'symbol': symbol, 'side': transaction_type})
+                latency.order_placed(str(order_id), symbol)
+                self.strategy_ledgers.claim(str(order_id), config.STRATEGY_ID)
 
                 return {
                     'success': True,
@@ -947,7 +1459,9 @@ class AngelOneAPI:
 
             # 🔥 Handle string response (direct order_id)
             if isinstance(response, str):
-                print(f"   ✅ Order placed (direct ID): {response}")
+                log.info(f"   ✅ Order placed (direct ID): {response}")
+                latency.order_placed(response, symbol)
+                self.strategy_ledgers.claim(response, config.STRATEGY_ID)
                 return {
                     'success': True,
                     'order_id': response,
@@ -966,7 +1480,7 @@ class AngelOneAPI:
             }
 
         except Exception as e:
-            print(f"   ❌ Exception: {str(e)}")
+            log.error(f"   ❌ Exception: {str(e)}")
             return {
                 'success': False,
                 'order_id': None,
@@ -975,6 +1489,149 @@ class AngelOneAPI:
                 'raw_response': None
             }
 
+    # ------------------------------------------------------------------
+    # 🧺 Basket orders
+    # ------------------------------------------------------------------
+
+    def order_executor(self) -> ThreadPoolExecutor:
+        """Shared order workers - created once, reused by every basket"""
+        with self.order_pool_lock:
+            if self.order_pool is None:
+                self.order_pool = ThreadPoolExecutor(max_workers=max(1, config.ORDER_WORKERS),
+                                                     thread_name_prefix='order')
+            return self.order_pool
+
+    def place_basket(self, name: str, legs: List[Dict], max_wait: int = 30, rollback: bool = True) -> OrderBasket:
+        """
+        🧺 Submit several orders as one unit
+        
+        Args:
+            name: Basket label (logs / health)
+            legs: [{'name', 'transaction_type', 'symbol', 'security_id', 'quantity', 'order_type'?, 'price'?}]
+            max_wait: WebSocket fill wait per leg (legs wait concurrently)
+            rollback: On a partial fill reverse filled legs and cancel open ones
+            
+        Returns:
+            OrderBasket - state FILLED only if every leg filled (fill prices from one order book call)
+        """
+        basket = OrderBasket(name, [BasketLeg(**leg) for leg in legs])
+        started = time.monotonic()
+
+        # ✅ Every payload ready + validated before anything is sent (templates were validated when built)
+        for leg in basket.legs.values():
+            if leg.order_type == "MARKET":
+                leg.params = self.order_templates.fill(leg.security_id, leg.symbol, leg.transaction_type, leg.quantity)
+            if leg.params is None:
+                leg.params = self.build_order_params(leg.transaction_type, leg.symbol, leg.security_id,
+                                                     leg.quantity, leg.order_type, leg.price)
+                leg.error = self.validate_order_params(leg.params)
+        invalid = [leg for leg in basket.legs.values() if leg.error]
+        if invalid:
+            basket.state = REJECTED
+            for leg in invalid:
+                log.error(f"   ❌ Basket {basket.basket_id} {leg.name} rejected before sending: {leg.error}")
+            return self._settle_basket(basket, started)
+
+        # ⚡ Place + await fill for all legs on the shared pool
+        basket.state = SENT
+        log.info(f"   🧺 Basket {basket.basket_id} {name}: firing {len(basket.legs)} legs")
+        span = latency.current()
+        futures = [self.order_executor().submit(config.wrap(self._basket_leg_worker), leg, span, max_wait)
+                   for leg in basket.legs.values()]
+        for future in futures:
+            future.result()
+
+        if all(leg.filled for leg in basket.legs.values()):
+            prices = self.get_order_fill_prices([leg.order_id for leg in basket.legs.values()])
+            for leg in basket.legs.values():
+                leg.fill_price = prices.get(str(leg.order_id))
+            basket.state = FILLED
+        elif rollback:
+            self._rollback_basket(basket, span)
+
+        return self._settle_basket(basket, started)
+
+    def _basket_leg_worker(self, leg: BasketLeg, span, max_wait: int):
+        """Worker: send one pre-validated leg and wait for its fill"""
+        latency.attach(span)
+        try:
+            leg.result = self._submit_order(leg.params)
+            if leg.placed:
+                if leg.result.get('order_status'):
+                    log.info(f"   📊 {leg.name} immediate status: {leg.result['order_status']}")
+                leg.filled = self.verify_order_fill_websocket(leg.order_id, order_status=leg.result.get('order_status'),
+                                                              max_wait=max_wait)
+        except Exception as e:
+            leg.result = {'success': False, 'order_id': None, 'message': f'Exception: {e}', 'order_status': None}
+        finally:
+            latency.detach()
+
+    def _rollback_basket(self, basket: OrderBasket, span):
+        """
+        Partial fill → flatten: cancel legs still open, reverse legs that filled
+        Reversals are critical orders (3 attempts) and run concurrently
+        """
+        log.warning(f"   🔙 Basket {basket.basket_id} not fully filled - rolling back "
+                    f"({', '.join(leg.name + ': ' + leg.message for leg in basket.failed_legs())})")
+
+        def unwind(leg: BasketLeg):
+            latency.attach(span)
+            try:
+                if not leg.filled and leg.placed:
+                    leg.rollback = self.cancel_order(leg.order_id)
+                    # Cancel lost the race against the fill → reverse it like a filled leg
+                    if not leg.rollback['success'] and self.get_order_status(leg.order_id) == 'TRADED':
+                        leg.filled = True
+                if leg.filled:
+                    log.info(f"   [ROLLBACK] Reversing {leg.name} ({leg.symbol})...")
+                    leg.rollback = self.place_order_with_verification(
+                        transaction_type=REVERSE_SIDE[leg.transaction_type],
+                        symbol=leg.symbol,
+                        security_id=leg.security_id,
+                        quantity=leg.quantity,
+                        is_critical=True
+                    )
+            except Exception as e:
+                leg.rollback = {'success': False, 'message': f'Exception: {e}'}
+            finally:
+                latency.detach()
+
+        futures = [self.order_executor().submit(config.wrap(unwind), leg) for leg in basket.legs.values()
+                   if leg.filled or leg.placed]
+        for future in futures:
+            future.result()
+
+        unwound = all(leg.rollback.get('success') for leg in basket.legs.values() if leg.rollback)
+        basket.state = ROLLED_BACK if unwound else ROLLBACK_FAILED
+        if not unwound:
+            log.error(f"   🚨 Basket {basket.basket_id} rollback FAILED - MANUAL INTERVENTION REQUIRED!")
+
+    def _settle_basket(self, basket: OrderBasket, started: float) -> OrderBasket:
+        basket.elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+        self.basket_counts[basket.state] = self.basket_counts.get(basket.state, 0) + 1
+        self.recent_baskets.append(basket)
+        latency.record('basket', basket.elapsed_ms)
+        log.info(f"   🧺 Basket {basket.basket_id} {basket.name}: {basket.state} in {basket.elapsed_ms:.0f}ms",
+                 extra={'basket': basket.basket_id, 'state': basket.state})
+        return basket
+
+    def cancel_order(self, order_id: str) -> Dict:
+        """Cancel an open order - a fill that races the cancel shows up as a failed cancel"""
+        try:
+            self._advanced_rate_limit('order')
+            with latency.stage('cancel_http', order_id=order_id):
+                response = self.smart_api.cancelOrder(order_id, "NORMAL")
+            if isinstance(response, dict) and not response.get('status'):
+                message = response.get('message', 'Unknown error')
+                log.error(f"   ❌ Cancel {order_id} failed: {message}")
+                return {'success': False, 'message': message}
+            log.info(f"   🚫 Order {order_id} cancelled")
+            self.invalidate_position_cache()
+            return {'success': True, 'message': 'Order cancelled'}
+        except Exception as e:
+            log.error(f"   ❌ Cancel {order_id} exception: {e}")
+            return {'success': False, 'message': f'Exception: {e}'}
+
     def get_order_fill_price(self, order_id: str) -> Optional[float]:
         """
         🔥 Get actual fill price from order book
@@ -985,44 +1642,59 @@ class AngelOneAPI:
         Returns:
             Actual average fill price, or None if not found
         """
+        return self.get_order_fill_prices([order_id]).get(str(order_id))
+
+    def get_order_fill_prices(self, order_ids: List[str]) -> Dict[str, float]:
+        """
+        🔥 Fill prices for several orders from ONE order book call (exit engine square-off)
+        
+        Returns:
+            {order_id: average fill price} - orders not found / unpriced are left out
+        """
+        wanted = [str(order_id) for order_id in order_ids if order_id]
+        if not wanted:
+            return {}
+
         try:
             self._advanced_rate_limit('fill_price')
             
             # Fetch order book
-            response = self.smart_api.orderBook()
+            with latency.stage('fill_price_http', order_id=wanted[0] if len(wanted) == 1 else None):
+                response = self.smart_api.orderBook()
             
             if not response or not response.get('status'):
-                print(f"⚠️ Could not fetch order book for fill price")
-                return None
-            
-            # Find the specific order
-            orders = response.get('data', [])
+                log.warning(f"⚠️ Could not fetch order book for fill price")
+                return {}
             
-            for order in orders:
-                if str(order.get('orderid')) == str(order_id):
-                    # Extract average price (actual fill price)
-                    avg_price = order.get('averageprice')
-                    
-                    if avg_price:
-                        fill_price = float(avg_price)
-                        print(f"   💰 Actual fill price: ₹{fill_price:.2f}")
-                        return fill_price
-                    else:
-                        # Try tradedprice as fallback
-                        traded_price = order.get('price')
-                        if traded_price:
-                            fill_price = float(traded_price)
-                            print(f"   💰 Actual fill price: ₹{fill_price:.2f}")
-                            return fill_price
+            prices = {}
+            for order in response.get('data') or []:
+                order_id = str(order.get('orderid'))
+                if order_id not in wanted:
+                    continue
+                # Average price (actual fill), order price as fallback
+                price = order.get('averageprice') or order.get('price')
+                if price and float(price) > 0:
+                    prices[order_id] = float(price)
+                    log.info(f"   💰 Actual fill price: ₹{prices[order_id]:.2f} ({order_id})")
             
-            print(f"⚠️ Order {order_id} not found in order book")
-            return None
+            for order_id in wanted:
+                if order_id not in prices:
+                    log.warning(f"⚠️ Order {order_id} not found in order book")
+            return prices
             
         except Exception as e:
-            print(f"⚠️ Error fetching fill price for {order_id}: {e}")
-            return None
+            log.warning(f"⚠️ Error fetching fill prices for {', '.join(wanted)}: {e}")
+            return {}
 
     def verify_order_fill_websocket(self, order_id: str, order_status: str = None, max_wait: int = 30) -> bool:
+        """⏱️ Timed fill confirmation - the WebSocket stage of the order latency span"""
+        with latency.stage('ws_confirm', order_id=order_id):
+            filled = self._await_order_fill(order_id, order_status, max_wait)
+        if filled:
+            latency.confirmed(order_id)
+        return filled
+
+    def _await_order_fill(self, order_id: str, order_status: str = None, max_wait: int = 30) -> bool:
         """
         🔥 Verify order fill - WebSocket ONLY
         
@@ -1040,35 +1712,35 @@ class AngelOneAPI:
                 status_lower = order_status.lower()
                 
                 if status_lower in ['complete', 'traded', 'filled']:
-                    print(f"   ✅ Order FILLED (immediate status from place response)")
+                    log.info(f"   ✅ Order FILLED (immediate status from place response)")
                     return True
                     
                 elif status_lower in ['rejected', 'cancelled']:
-                    print(f"   ❌ Order {status_lower.upper()} (immediate status)")
+                    log.error(f"   ❌ Order {status_lower.upper()} (immediate status)")
                     return False
                 
                 # If status is 'PENDING' or 'OPEN', continue to WebSocket verification
-                print(f"   ⏳ Order status: {order_status} - waiting for fill...")
+                log.info(f"   ⏳ Order status: {order_status} - waiting for fill...")
             
             # 🔥 PRIORITY 2: Check if WebSocket ALREADY received notification
             if order_id in self.order_statuses:
                 status = self.order_statuses[order_id]
-                print(f"   ⚡ Found existing status from WebSocket: {status}")
+                log.info(f"   ⚡ Found existing status from WebSocket: {status}")
                 
                 if status == 'TRADED':
-                    print(f"   ✅ Order FILLED (WebSocket already notified before we started waiting!)")
+                    log.info(f"   ✅ Order FILLED (WebSocket already notified before we started waiting!)")
                     # Cleanup
                     del self.order_statuses[order_id]
                     return True
                 elif status in ['REJECTED', 'CANCELLED']:
-                    print(f"   ❌ Order {status}")
+                    log.error(f"   ❌ Order {status}")
                     # Cleanup
                     del self.order_statuses[order_id]
                     return False
             
             # 🔥 PRIORITY 3: WebSocket hasn't notified yet, wait for it
             if self.ws_enabled and self.order_ws:
-                print(f"   ⚡ Waiting for WebSocket fill notification...")
+                log.info(f"   ⚡ Waiting for WebSocket fill notification...")
                 
                 # Create event for this order
                 self.order_fill_events[order_id] = threading.Event()
@@ -1081,33 +1753,33 @@ class AngelOneAPI:
                     status = self.order_statuses[order_id]
                     
                     if status == 'TRADED':
-                        print(f"   ✅ Order FILLED (WebSocket notification)")
+                        log.info(f"   ✅ Order FILLED (WebSocket notification)")
                         return True
                     elif status in ['REJECTED', 'CANCELLED']:
-                        print(f"   ❌ Order {status}")
+                        log.error(f"   ❌ Order {status}")
                         return False
                     else:
-                        print(f"   ⚠️ Event set but status is '{status}', continuing to wait...")
+                        log.warning(f"   ⚠️ Event set but status is '{status}', continuing to wait...")
                 
                 if not filled:
-                    print(f"   ⚠️ WebSocket timeout after {max_wait}s")
+                    log.warning(f"   ⚠️ WebSocket timeout after {max_wait}s")
                     
                     # 🔥 FINAL CHECK: Maybe notification came right after timeout
                     if order_id in self.order_statuses:
                         status = self.order_statuses[order_id]
                         if status == 'TRADED':
-                            print(f"   ✅ Order FILLED (found in final check)")
+                            log.info(f"   ✅ Order FILLED (found in final check)")
                             return True
                     
-                    print(f"   ❌ No TRADED status received - order may still be pending")
+                    log.error(f"   ❌ No TRADED status received - order may still be pending")
                     return False
             
             # No WebSocket - can't verify
-            print(f"   ⚠️ WebSocket not available - cannot verify order")
+            log.warning(f"   ⚠️ WebSocket not available - cannot verify order")
             return False
 
         except Exception as e:
-            print(f"   ❌ Verification error: {e}")
+            log.error(f"   ❌ Verification error: {e}")
             return False
             
         finally:
@@ -1135,27 +1807,27 @@ class AngelOneAPI:
                 
                 # Log status periodically
                 if attempt == 0 or attempt % 3 == 0:
-                    print(f"   📋 Order {order_id}: {order_status}")
+                    log.info(f"   📋 Order {order_id}: {order_status}")
                 
                 # Check final status
                 if order_status == 'TRADED':
-                    print(f"   ✅ Order FILLED!")
+                    log.info(f"   ✅ Order FILLED!")
                     return True
                 elif order_status in ['REJECTED', 'CANCELLED']:
-                    print(f"   ❌ Order {order_status}")
+                    log.error(f"   ❌ Order {order_status}")
                     return False
                 elif order_status == 'PENDING':
                     time.sleep(retry_delay)
                     continue
                 else:
-                    print(f"   ⚠️ Unknown status: {order_status}")
+                    log.warning(f"   ⚠️ Unknown status: {order_status}")
                     time.sleep(retry_delay)
                     
             except Exception as e:
-                print(f"   ⚠️ Error checking order: {e}")
+                log.warning(f"   ⚠️ Error checking order: {e}")
                 time.sleep(retry_delay)
         
-        print(f"   ⏰ Timeout: Order not filled after {max_retries} attempts")
+        log.info(f"   ⏰ Timeout: Order not filled after {max_retries} attempts")
         return False
 
     def place_order_with_verification(self, transaction_type: str, symbol: str,
@@ -1186,7 +1858,7 @@ class AngelOneAPI:
                     error_code = place_result.get('error_code')
                     
                     # Use the centralized error handler
-                    recovery_success, should_retry = self._handle_api_error(error_msg, error_code)
+                    recovery_success, should_retry = self._handle_api_error(error_msg, error_code, endpoint='order')
                     
                     if not should_retry or attempt >= max_attempts - 1:
                         return {
@@ -1197,12 +1869,15 @@ class AngelOneAPI:
                             'raw_response': place_result['raw_response']
                         }
                     
-                    # Retry after recovery
-                    print(f"  🔄 Retrying order after recovery (attempt {attempt + 2}/{max_attempts})...")
-                    time.sleep(10 if is_critical else 5)
+                    # Retry after recovery (order breaker cooldown is short, session already awaited)
+                    order_breaker = self._breaker('order')
+                    wait_time = order_breaker.remaining() if order_breaker.is_open() else 1
+                    log.info(f"  🔄 Retrying order after recovery in {wait_time:.1f}s (attempt {attempt + 2}/{max_attempts})...")
+                    time.sleep(wait_time)
                     continue
 
                 # Order placed successfully
+                self._breaker('order').record_success()
                 order_id = place_result['order_id']
                 order_status = place_result.get('order_status')
 
@@ -1228,16 +1903,16 @@ class AngelOneAPI:
                 # Not filled but is critical - retry
                 if is_critical and attempt < max_attempts - 1:
                     wait_time = 5
-                    print(f"   ⚠️ Critical order not filled, retry {attempt + 2}/{max_attempts} in {wait_time}s...")
+                    log.warning(f"   ⚠️ Critical order not filled, retry {attempt + 2}/{max_attempts} in {wait_time}s...")
                     time.sleep(wait_time)
                     continue
 
             except Exception as e:
                 error_msg = str(e)
-                print(f"   ❌ Exception during order placement: {error_msg}")
+                log.error(f"   ❌ Exception during order placement: {error_msg}")
                 
                 # Try to handle auth errors in exception too
-                recovery_success, should_retry = self._handle_api_error(error_msg)
+                recovery_success, should_retry = self._handle_api_error(error_msg, endpoint='order')
                 
                 if should_retry and attempt < max_attempts - 1:
                     time.sleep(5)
@@ -1270,11 +1945,17 @@ class AngelOneAPI:
             
             # Remove duplicates
             unique_ids = list(set(security_ids))
+
+            # 🔌 Fail fast while the endpoint is cooling down (callers use WebSocket cache)
+            breaker = self._breaker('batch_ltp')
+            if not breaker.allow():
+                log.warning("   🔌 Batch LTP skipped - breaker open (%.0fs left)", breaker.remaining())
+                return {}
             
             # Apply rate limiting BEFORE making the call
             self._advanced_rate_limit("batch_ltp")
             
-            print(f"   🚀 Batch LTP request: {len(unique_ids)} instruments from {exchange}")
+            log.debug("   🚀 Batch LTP request: %d instruments from %s", len(unique_ids), exchange)
             
             try:
                 response = self.smart_api.getMarketData("LTP", unique_ids)
@@ -1295,8 +1976,11 @@ class AngelOneAPI:
                     if 'parse' in err_msg.lower() or 'json' in err_msg.lower():
                         raise Exception(f"JSON parse error - likely token expiry: {err_msg}")
                     
-                    print(f"   ⚠️ Batch LTP failed: {err_msg}")
+                    log.warning(f"   ⚠️ Batch LTP failed: {err_msg}")
+                    self._trip_on_error_code('batch_ltp', response.get('errorcode'))
                     return {}
+
+                breaker.record_success()
                 
                 # Extract LTPs
                 ltp_dict = {}
@@ -1305,61 +1989,33 @@ class AngelOneAPI:
                 
                 for item in fetched:
                     if isinstance(item, dict):
-                        token = item.get('symboltoken') or item.get('token')
+                        token = item.get('symbolToken') or item.get('symboltoken') or item.get('token')
                         ltp = item.get('ltp') or item.get('lastPrice')
                         if token and ltp:
                             ltp_dict[str(token)] = float(ltp)
                             # Update cache
-                            self.token_cache[str(token)] = {
-                                'ltp': float(ltp),
-                                'timestamp': time.time()
-                            }
+                            self._cache_ltp(str(token), float(ltp), 'rest')
                 
                 success_count = len(ltp_dict)
                 total_count = len(unique_ids)
-                print(f"   ✅ Batch LTP: Fetched {success_count}/{total_count} instruments in 1 call")
+                log.debug("   ✅ Batch LTP: Fetched %d/%d instruments in 1 call", success_count, total_count)
                 
                 return ltp_dict
                 
             except Exception as batch_error:
                 error_str = str(batch_error).lower()
                 
-                # 🔥 Handle empty response / token expiry
+                # 🔥 Handle empty response / token expiry - 🔐 re-login in background,
+                # this call returns empty and callers serve the WebSocket cache meanwhile
                 if any(keyword in error_str for keyword in ['empty', 'json', 'parse', 'token', 'expired']):
-                    print("🔄 Empty response detected - re-login...")
-                    
-                    # Re-login
-                    if self.login():
-                        print("✅ Re-login successful - Retrying batch LTP...")
-                        time.sleep(2)
-                        
-                        # Single retry after re-login
-                        try:
-                            response = self.smart_api.getMarketData("LTP", unique_ids)
+                    log.info("🔄 Empty response detected - requesting re-login...")
+                    self.session.request_relogin('empty batch LTP response')
                             
-                            if response and response.get('status'):
-                                # Process retry response
-                                ltp_dict = {}
-                                data = response.get('data', {})
-                                fetched = data.get('fetched', [])
-                                
-                                for item in fetched:
-                                    if isinstance(item, dict):
-                                        token = item.get('symboltoken') or item.get('token')
-                                        ltp = item.get('ltp') or item.get('lastPrice')
-                                        if token and ltp:
-                                            ltp_dict[str(token)] = float(ltp)
-                                
-                                print(f"✅ Retry successful: {len(ltp_dict)} LTPs fetched")
-                                return ltp_dict
-                        except:
-                            pass
-                            
-                print(f"❌ Batch LTP error: {batch_error}")
+                log.error(f"❌ Batch LTP error: {batch_error}")
                 return {}
                 
         except Exception as e:
-            print(f"❌ Batch LTP with fallback error: {e}")
+            log.error(f"❌ Batch LTP with fallback error: {e}")
             return {}
 
     def get_batch_ltp_with_fallback(self, security_ids: List[str], exchange: str = "NFO") -> Dict[str, float]:
@@ -1372,21 +2028,18 @@ class AngelOneAPI:
             
             # STEP 1: Check WebSocket cache first
             for security_id in security_ids:
-                if security_id in self.token_cache:
-                    cache_data = self.token_cache[security_id]
-                    if time.time() - cache_data.get('timestamp', 0) < self.token_cache_ttl:
-                        ltp_dict[security_id] = cache_data['ltp']
-                    else:
-                        missing_ids.append(security_id)
+                cached = self._cached_ltp(security_id)
+                if cached is not None:
+                    ltp_dict[security_id] = cached
                 else:
                     missing_ids.append(security_id)
             
             # If all data from cache, return immediately
             if not missing_ids:
-                print(f"   ✅ All {len(ltp_dict)} LTPs from WebSocket cache (0 API calls)")
+                log.debug("   ✅ All %d LTPs from WebSocket cache (0 API calls)", len(ltp_dict))
                 return ltp_dict
             
-            print(f"   📊 WebSocket cache: {len(ltp_dict)}/{len(security_ids)} | Fetching {len(missing_ids)} from API")
+            log.debug("   📊 WebSocket cache: %d/%d | Fetching %d from API", len(ltp_dict), len(security_ids), len(missing_ids))
             
             # STEP 2: Try batch fetch for missing data
             if len(missing_ids) > 0:
@@ -1398,25 +2051,27 @@ class AngelOneAPI:
                 else:
                     still_missing = missing_ids
                 
-                # STEP 3 - Individual fallback for remaining strikes
-                if still_missing:
-                    print(f"   🔄 Batch failed for {len(still_missing)} strikes, trying individual calls...")
+                # STEP 3 - Individual fallback for remaining strikes (skipped while LTP breaker open)
+                if still_missing and self._breaker('ltp').is_open():
+                    log.warning(f"   🔌 Individual LTP fallback skipped - breaker open")
+                elif still_missing:
+                    log.info("   🔄 Batch failed for %d strikes, trying individual calls...", len(still_missing))
                     
                     for i, sid in enumerate(still_missing):
                         try:
                             ltp = self.get_ltp(sid)
                             if ltp:
                                 ltp_dict[sid] = ltp
-                                print(f"     ✅ Individual fetch {i+1}/{len(still_missing)}: {sid}")
+                                log.debug("     ✅ Individual fetch %d/%d: %s", i + 1, len(still_missing), sid)
                             time.sleep(0.3)  # Rate limit between individual calls
                         except Exception as e:
-                            print(f"     ❌ Failed to fetch {sid}: {e}")
+                            log.error(f"     ❌ Failed to fetch {sid}: {e}")
                             continue
             
             return ltp_dict
             
         except Exception as e:
-            print(f"❌ Batch LTP with fallback error: {e}")
+            log.error(f"❌ Batch LTP with fallback error: {e}")
             return {}
 
     def get_order_status(self, order_id: str) -> Optional[str]:
@@ -1475,16 +2130,19 @@ class AngelOneAPI:
             return None
             
         except Exception as e:
-            print(f"⚠️ Get order status error ({order_id}): {e}")
+            log.warning(f"⚠️ Get order status error ({order_id}): {e}")
             return None
 
-    def get_option_chain(self, strikes: List[int], max_retries: int = 3) -> Dict[int, Dict[str, float]]:
+    def get_option_chain(self, strikes: List[int], max_retries: int = 3,
+                         core_strikes: Optional[List[int]] = None) -> Dict[int, Dict[str, float]]:
         """
         🔥 Get option chain using WebSocket-first Batch LTP API
+        📐 core_strikes: only these may fall back to REST (default: all strikes)
+           Other strikes are served from the WebSocket-maintained chain only
         """
         for attempt in range(max_retries):
             try:
-                print(f"📊 Fetching {len(strikes)} strikes... (Range: {min(strikes)}-{max(strikes)})")
+                log.debug("📊 Fetching %d strikes... (Range: %s-%s)", len(strikes), min(strikes), max(strikes))
 
                 option_chain = {}
                 
@@ -1493,8 +2151,8 @@ class AngelOneAPI:
                 strike_mapping = {}  # Maps strike -> {CE_id, PE_id, symbols}
                 
                 for strike in strikes:
-                    ce_search = self.search_scrip('NIFTY', strike, 'CE')
-                    pe_search = self.search_scrip('NIFTY', strike, 'PE')
+                    ce_search = self.search_scrip(config.UNDERLYING, strike, 'CE')
+                    pe_search = self.search_scrip(config.UNDERLYING, strike, 'PE')
 
                     if ce_search and pe_search:
                         ce_id = ce_search['security_id']
@@ -1509,28 +2167,47 @@ class AngelOneAPI:
                             'PE_symbol': pe_search['symbol']
                         }
 
+                # 📝 Order payloads for every instrument in the window (legs + hedge candidates)
+                self.order_templates.refresh(
+                    (ids[f'{option_type}_symbol'], ids[f'{option_type}_id'])
+                    for ids in strike_mapping.values() for option_type in ('CE', 'PE')
+                )
+
                 if not all_security_ids:
-                    print(f"   ❌ No valid strikes found in scrip master")
+                    log.error(f"   ❌ No valid strikes found in scrip master")
                     if attempt < max_retries - 1:
                         time.sleep(5)
                         continue
                     return {}
 
-                # 🔥 STEP 2: Subscribe to WebSocket V2 if enabled
-                if self.ws_enabled and self.market_ws:
-                    try:
-                        ws_instruments = [{'SecurityId': sid} for sid in all_security_ids]
-                        self.subscribe_instruments_to_websocket(ws_instruments)
-                        time.sleep(2)  # Wait for initial WebSocket data
-                    except Exception as e:
-                        print(f"   ⚠️ WebSocket subscription failed: {e}")
-
-                # 🔥 STEP 3: WebSocket-first batch fetch all LTPs
-                print(f"   🚀 WebSocket-first fetching {len(all_security_ids)} LTPs...")
-                batch_ltps = self.get_batch_ltp_with_fallback(all_security_ids, "NFO")
-                
+                # 🔥 STEP 2: Sync WebSocket V2 subscriptions (only window edges change)
+                new_tokens = self.sync_chain_subscriptions(all_security_ids)
+                if new_tokens:
+                    self._wait_for_first_ticks(new_tokens)  # Wait for initial WebSocket data
+
+                # 🔥 STEP 3: WebSocket-first batch fetch - REST fallback for core strikes only
+                core = set(core_strikes) if core_strikes is not None else set(strike_mapping)
+                rest_ids = []
+                batch_ltps = {}
+                for strike, ids in strike_mapping.items():
+                    if strike in core:
+                        rest_ids.extend([ids['CE_id'], ids['PE_id']])
+                        continue
+                    # Outer ring: WebSocket only, no REST cost
+                    for sid in (ids['CE_id'], ids['PE_id']):
+                        cached = self._cached_ltp(sid)
+                        if cached is not None:
+                            batch_ltps[sid] = cached
+
+                log.debug("   🚀 WebSocket-first fetching %d core LTPs (+%d outer ring from WebSocket)...",
+                          len(rest_ids), len(batch_ltps))
+                core_ltps = self.get_batch_ltp_with_fallback(rest_ids, "NFO") if rest_ids else {}
+                batch_ltps.update(core_ltps)
+
                 if not batch_ltps:
-                    print(f"   ❌ Batch LTP fetch failed")
+                    log.error(f"   ❌ Batch LTP fetch failed")
+                    if self._breaker('batch_ltp').is_open():
+                        return {}  # 🔌 No retry sleeps while REST is cooling down
                     if attempt < max_retries - 1:
                         time.sleep(5)
                         continue
@@ -1552,33 +2229,33 @@ class AngelOneAPI:
                             'CE_security_id': ids['CE_id'],
                             'PE_security_id': ids['PE_id']
                         }
-                    else:
+                    elif strike in core:
                         missing_strikes.append(strike)
 
                 if missing_strikes:
-                    print(f"   ⚠️ Missing strikes: {missing_strikes}")
+                    log.warning(f"   ⚠️ Missing strikes: {missing_strikes}")
 
                 if option_chain:
-                    print(f"   ✅ Chain built: {len(option_chain)} strikes - {len(batch_ltps)} LTPs fetched")
+                    log.debug("   ✅ Chain built: %d strikes - %d LTPs fetched", len(option_chain), len(batch_ltps))
                     self.connection_failures = 0
                     return option_chain
                 else:
                     if attempt < max_retries - 1:
                         wait_time = 5 if attempt == 0 else 20
-                        print(f"   ⚠️ Empty chain, retry {attempt + 1}/{max_retries} in {wait_time}s...")
+                        log.warning(f"   ⚠️ Empty chain, retry {attempt + 1}/{max_retries} in {wait_time}s...")
                         time.sleep(wait_time)
                         continue
                     else:
-                        print(f"   ❌ Option chain empty after {max_retries} attempts!")
+                        log.error(f"   ❌ Option chain empty after {max_retries} attempts!")
                         return {}
 
             except Exception as e:
                 if attempt < max_retries - 1:
                     wait_time = 5 if attempt == 0 else 20
-                    print(f"   ⚠️ Error, retry {attempt + 1}/{max_retries} in {wait_time}s: {str(e)}")
+                    log.warning(f"   ⚠️ Error, retry {attempt + 1}/{max_retries} in {wait_time}s: {str(e)}")
                     time.sleep(wait_time)
                 else:
-                    print(f"   ❌ Error fetching option chain after {max_retries} attempts: {str(e)}")
+                    log.error(f"   ❌ Error fetching option chain after {max_retries} attempts: {str(e)}")
                     return {}
 
         return {}
@@ -1612,7 +2289,7 @@ class AngelOneAPI:
             return result
             
         except Exception as e:
-            print(f"❌ Batch premium update error: {e}")
+            log.error(f"❌ Batch premium update error: {e}")
             return {}
 
     def get_positions(self, force_refresh: bool = False) -> List[Dict]:
@@ -1623,50 +2300,116 @@ class AngelOneAPI:
             # 🔥 Check cache first (unless force refresh requested)
             if not force_refresh:
                 cache_age = time.time() - self.position_cache_time
-                if cache_age < self.position_cache_ttl and self.position_cache:
-                    print(f"📋 Using cached positions (age: {cache_age:.1f}s)")
+                fresh_generation = self.position_cache_generation == self.position_generation
+                if cache_age < self.position_cache_ttl and fresh_generation:
+                    log.debug("📋 Using cached positions (age: %.1fs)", cache_age)
+                    self.position_cache_hits += 1
                     return self.position_cache
+            self.position_cache_misses += 1
             
+            # 🔌 Breaker open → serve last snapshot instead of blocking
+            breaker = self._breaker('position')
+            if not breaker.allow():
+                log.warning("📋 Using last positions snapshot (position breaker open, %.0fs left)",
+                            breaker.remaining())
+                return self.position_cache
+
             # Fetch fresh positions from broker
+            generation = self.position_generation
             self._advanced_rate_limit('position')
             response = self.smart_api.position()
+            if response and not response.get('status'):
+                self._trip_on_error_code('position', response.get('errorcode'))
 
             if response and response.get('status'):
-                positions = response.get('data', [])
+                breaker.record_success()
+                positions = response.get('data') or []
 
-                # Map to DHAN-compatible format
-                mapped_positions = []
+                # Map to DHAN-compatible format, keyed by securityId
+                new_map = {}
                 for pos in positions:
                     # Only include NFO positions with non-zero quantity
-                    if pos.get('exchange') == 'NFO' and int(pos.get('netqty', 0)) != 0:
-                        mapped_positions.append({
-                            'securityId': pos.get('symboltoken'),
-                            'netQty': int(pos.get('netqty', 0)),
-                            'tradingsymbol': pos.get('tradingsymbol')
-                        })
+                    if pos.get('exchange') != 'NFO':
+                        continue
+                    net_qty = int(pos.get('netqty', 0))
+                    if net_qty != 0:
+                        sec_id = str(pos.get('symboltoken'))
+                        previous = self.position_map.get(sec_id)
+                        if previous and previous['netQty'] == net_qty:
+                            new_map[sec_id] = previous  # Unchanged - reuse mapped row
+                        else:
+                            new_map[sec_id] = {
+                                'securityId': sec_id,
+                                'netQty': net_qty,
+                                'tradingsymbol': pos.get('tradingsymbol')
+                            }
+
+                # 🔀 Diff against previous snapshot and notify subscribers
+                delta = self._diff_position_maps(self.position_map, new_map)
+                self.position_map = new_map
 
                 # 🔥 Update cache
+                mapped_positions = list(new_map.values())
                 self.position_cache = mapped_positions
                 self.position_cache_time = time.time()
+                self.position_cache_generation = generation  # A fill during the fetch keeps it stale
                 
-                print(f"\n📋 Fetched {len(mapped_positions)} actual positions from broker (cached for {self.position_cache_ttl}s)")
+                log.debug("📋 Fetched %d actual positions from broker (cached for %ss)", len(mapped_positions), self.position_cache_ttl)
+                if delta['count']:
+                    self._publish_position_delta(delta)
                 return mapped_positions
             else:
-                print(f"⚠️ Failed to fetch positions: {response}")
+                log.warning(f"⚠️ Failed to fetch positions: {response}")
                 return []
 
         except Exception as e:
-            print(f"❌ Error fetching positions: {str(e)}")
+            log.error(f"❌ Error fetching positions: {str(e)}")
             return []
     
+    @staticmethod
+    def _diff_position_maps(old: Dict, new: Dict) -> Dict:
+        """
+        🔀 Delta between two keyed position snapshots
+
+        Returns:
+            {'added': [pos], 'removed': [pos], 'changed': [{**pos, 'previousQty'}], 'count': int}
+        """
+        added = [pos for sec_id, pos in new.items() if sec_id not in old]
+        removed = [pos for sec_id, pos in old.items() if sec_id not in new]
+        changed = [
+            dict(pos, previousQty=old[sec_id]['netQty'])
+            for sec_id, pos in new.items()
+            if sec_id in old and old[sec_id]['netQty'] != pos['netQty']
+        ]
+        return {
+            'added': added,
+            'removed': removed,
+            'changed': changed,
+            'count': len(added) + len(removed) + len(changed)
+        }
+
+    def subscribe_positions(self, callback):
+        """🔀 Register callback(delta) - called only when the position book changes"""
+        if callback not in self.position_subscribers:
+            self.position_subscribers.append(callback)
+
+    def _publish_position_delta(self, delta: Dict):
+        log.info("🔀 Position delta: +%d added, -%d removed, ~%d changed",
+                 len(delta['added']), len(delta['removed']), len(delta['changed']))
+        for callback in list(self.position_subscribers):
+            try:
+                callback(delta)
+            except Exception as e:
+                log.warning(f"⚠️ Position subscriber error: {e}")
+
     def invalidate_position_cache(self):
         """
         🔥 Invalidate position cache after order execution
         Call this after successful order fills
+        🔢 Generation bump - snapshot/map kept for delta diffing, refetched on next read
         """
-        self.position_cache = []
-        self.position_cache_time = 0
-        print("🔄 Position cache invalidated")
+        self.position_generation += 1
+        log.debug("🔄 Position cache invalidated (generation %d)", self.position_generation)
 
     def reconnect_if_needed(self) -> bool:
         """Reconnect if connection is dead"""
@@ -1674,43 +2417,47 @@ class AngelOneAPI:
             self.connection_failures += 1
 
             if self.connection_failures <= self.max_connection_failures:
-                print(f"⚠️ Connection unhealthy (attempt {self.connection_failures}/{self.max_connection_failures}), reconnecting...")
+                log.warning(f"⚠️ Connection unhealthy (attempt {self.connection_failures}/{self.max_connection_failures}), reconnecting...")
 
-                time.sleep(3)
-
-                if self.login():
-                    print("✅ Reconnection successful!")
+                # 🔐 Background re-login - short wait only, the loop keeps running on WebSocket data
+                self.session.request_relogin('connection unhealthy')
+                if self.session.wait_ready(3):
+                    log.info("✅ Reconnection successful!")
                     self.connection_failures = 0
                     return True
                 else:
-                    print("❌ Reconnection failed")
+                    log.info("⏳ Re-login still in progress (background)")
                     return False
             else:
-                print(f"❌ Max reconnection attempts ({self.max_connection_failures}) reached")
+                log.error(f"❌ Max reconnection attempts ({self.max_connection_failures}) reached")
                 return False
         except Exception as e:
-            print(f"❌ Reconnection error: {str(e)}")
+            log.error(f"❌ Reconnection error: {str(e)}")
             return False
 
     def logout(self):
         """Logout from Angel One and stop WebSocket V2"""
         try:
+            self.session.stop()
+            if self.tick_recorder:
+                self.tick_recorder.close()
+
             # Stop WebSocket V2
             if self.ws_enabled:
                 if self.market_ws:
                     self.market_ws.close_connection()
-                    print("✅ Market WebSocket V2 stopped")
+                    log.info("✅ Market WebSocket V2 stopped")
                 if self.order_ws:
                     self.order_ws.close_connection()
-                    print("✅ Order WebSocket stopped")
+                    log.info("✅ Order WebSocket stopped")
 
             # Logout from API
             if self.smart_api:
                 self.smart_api.terminateSession(config.CLIENT_ID)
-                print("✅ Logged out successfully")
+                log.info("✅ Logged out successfully")
                 self.is_connected = False
         except Exception as e:
-            print(f"⚠️ Logout error: {str(e)}")
+            log.warning(f"⚠️ Logout error: {str(e)}")
 
     def get_system_health(self) -> Dict:
         """
@@ -1725,17 +2472,50 @@ class AngelOneAPI:
                 'enabled': self.ws_enabled,
                 'market_ws_active': bool(self.market_ws),
                 'order_ws_active': bool(self.order_ws),
+                'order_ws_live': self.order_ws_live,
+                'failovers': self.ws_failovers,
                 'token_cache_size': len(self.token_cache),
+                'session_generation': self.session_generation,
+                'fast_decoder': self.tick_decoder.get_stats() if self.tick_decoder else None,
             },
             'session': {
                 'has_auth_token': bool(self.auth_token_string),
                 'has_feed_token': bool(self.feed_token),
+                **self.session.get_status(),
             },
             'cache': {
                 'position_cache_size': len(self.position_cache),
                 'position_cache_age': time.time() - self.position_cache_time if self.position_cache_time else None,
+                'position_generation': self.position_generation,
+                'position_cache_fresh': self.position_cache_generation == self.position_generation,
                 'scrip_master_size': len(self.scrip_master),
-            }
+            },
+            'breakers': {
+                name: breaker.get_status() for name, breaker in self.breakers.items()
+            },
+            'latency': latency.get_stats(),
+            'locks': self.locks.get_stats(),
+            'order_templates': self.order_templates.get_stats(),
+            'baskets': {
+                'counts': dict(self.basket_counts),
+                'recent': [basket.to_dict() for basket in list(self.recent_baskets)[-5:]],
+            },
+            'logging': get_logging_stats(),
+            'counters': self._counter_snapshot(),
+        }
+
+    def _counter_snapshot(self) -> Dict:
+        """📈 Live counters since start - rates are left to Prometheus: rate(angel_ticks_total[1m])"""
+        total_ticks = sum(self.tick_counts.values())
+        token_lookups = self.token_cache_hits + self.token_cache_misses
+        position_lookups = self.position_cache_hits + self.position_cache_misses
+        return {
+            'rest_calls': dict(self.rest_calls),
+            'rest_errors': sum(self.rest_errors.values()),
+            'token_cache_hit_ratio': round(self.token_cache_hits / token_lookups, 3) if token_lookups else None,
+            'position_cache_hit_ratio': round(self.position_cache_hits / position_lookups, 3) if position_lookups else None,
+            'ticks_total': total_ticks,
+            'ticking_tokens': len(self.tick_counts),
         }
 
 
@@ -10,6 +10,7 @@ import time
 from datetime import datetime
 from config import config
 from angelone_api import api
+from bot_logging import flush_logs
 
 
 class BotController:
@@ -50,6 +51,7 @@ class BotController:
     
     def _show_menu(self):
         """Display and handle interactive control menu"""
+        flush_logs()  # Queued trading logs before the menu text
         while True:
             print("\n" + "=" * 80)
             print("🎮 TRADING CONTROL MENU (Ctrl+C)")
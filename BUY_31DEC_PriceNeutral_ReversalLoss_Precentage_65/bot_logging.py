@@ -0,0 +1,159 @@
+"""
+Bot Logging - LEVELED, STRUCTURED, ASYNC
+✅ One logger per module (get_logger('angelone_api') → 'bot.angelone_api'), lazy %-formatting
+✅ Trading threads only enqueue records (bounded queue, never blocks - drops + counts when full)
+✅ A single listener thread does all I/O:
+   - JSON lines file (rotating) in LOG_DIR - one object per record, extra={...} fields kept
+   - Human console view (emoji messages as before) - optional, own level
+✅ Disabled levels cost one isEnabledFor() check - hot paths log at DEBUG
+
+Env:
+    LOG_LEVEL=INFO            # DEBUG shows per-call LTP / rate-limit / lock lines
+    LOG_CONSOLE=true          # false = file only (e.g. under sudo / nohup)
+    LOG_CONSOLE_LEVEL=INFO
+    LOG_DIR=bot_logs
+"""
+
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from config import config
+
+ROOT = 'bot'
+
+# LogRecord attributes that are not user extras
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record (ts = epoch seconds)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage().strip(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """The familiar stdout view - message as written, level tag only for DEBUG"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if record.levelno == logging.DEBUG:
+            message = f"[debug] {message}"
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        return message
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller - a full queue (stalled sink) drops the record"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Leave msg % args for the listener thread - formatting is the expensive part
+        return record
+
+
+_setup_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+_queue: Optional[queue.Queue] = None
+
+
+def setup_logging() -> logging.Logger:
+    """Configure the 'bot' logger tree once (idempotent)"""
+    global _listener, _queue_handler, _queue
+    root = logging.getLogger(ROOT)
+    with _setup_lock:
+        if _listener is not None:
+            return root
+
+        sinks = []
+        os.makedirs(config.LOG_DIR, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            os.path.join(config.LOG_DIR, 'bot.jsonl'),
+            maxBytes=int(config.LOG_FILE_MAX_MB * 1024 * 1024),
+            backupCount=config.LOG_FILE_BACKUPS,
+            encoding='utf-8',
+        )
+        file_handler.setFormatter(JsonFormatter())
+        sinks.append(file_handler)
+
+        if config.LOG_CONSOLE:
+            console = logging.StreamHandler(sys.stdout)
+            console.setLevel(config.LOG_CONSOLE_LEVEL)
+            console.setFormatter(ConsoleFormatter())
+            sinks.append(console)
+
+        _queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+        _queue_handler = DroppingQueueHandler(_queue)
+        root.addHandler(_queue_handler)
+        root.setLevel(config.LOG_LEVEL)
+        root.propagate = False
+
+        _listener = QueueListener(_queue, *sinks, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Module logger under 'bot' - safe at import time
+    Entry points call setup_logging(); until then only WARNING+ reaches stderr
+    """
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+def flush_logs(timeout: float = 2.0):
+    """Wait (bounded) until queued records are written - before interactive menus print"""
+    if _queue is None:
+        return
+    for _ in range(int(timeout / 0.01)):
+        if not _queue.unfinished_tasks:
+            return
+        threading.Event().wait(0.01)  # Not time.sleep - the replay clock patches it
+
+
+def shutdown_logging():
+    """Drain the queue and close sinks (atexit)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_stats() -> dict:
+    return {
+        'queued': _queue.qsize() if _queue else 0,
+        'dropped': _queue_handler.dropped if _queue_handler else 0,
+        'level': logging.getLevelName(logging.getLogger(ROOT).level),
+    }
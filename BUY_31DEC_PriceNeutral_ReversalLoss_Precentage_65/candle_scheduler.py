@@ -0,0 +1,232 @@
+"""
+Candle Scheduler - MONOTONIC CLOCK + DRIFT CORRECTION
+✅ Fires at exact wall-clock candle boundaries (IST aligned)
+✅ Sleeps on time.monotonic() - immune to NTP steps / system clock changes
+✅ Re-reads wall/monotonic offset every slice (drift correction)
+✅ Measures lateness per cycle, reports overruns and skipped candles
+✅ Deferred slow work (reconcile, display) runs in the idle slack
+   between candles - never on the candle critical path
+   (a task deferred with a delay runs as soon as it is due, not a candle later)
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import math
+import time
+import pytz
+from latency_tracker import LatencyHistogram
+from bot_logging import get_logger
+
+log = get_logger('candle_scheduler')
+
+
+class DeferredTask:
+    """Slow work queued for the idle time between candles"""
+
+    def __init__(self, name: str, fn: Callable, not_before: float, estimate: float):
+        self.name = name
+        self.fn = fn
+        self.not_before = not_before  # monotonic
+        self.estimate = estimate      # expected run time (seconds)
+        self.postponed = 0
+
+
+class CandleScheduler:
+    """Wall-clock aligned candle timer on a monotonic clock"""
+
+    SLICE_SECONDS = 0.1        # Interrupt check granularity
+    SLACK_MARGIN_SECONDS = 0.5  # Keep this much slack free before a boundary
+    MAX_POSTPONE_CYCLES = 3     # Run deferred task anyway after this many misses
+
+    def __init__(self, interval_seconds: int, should_abort: Optional[Callable[[], bool]] = None,
+                 timezone: str = 'Asia/Kolkata'):
+        self.interval = interval_seconds
+        self.should_abort = should_abort or (lambda: False)
+        self.tz = pytz.timezone(timezone)
+
+        # Boundary alignment (seconds east of UTC, e.g. IST = 19800)
+        self.utc_offset = datetime.now(self.tz).utcoffset().total_seconds()
+
+        self._deferred: "OrderedDict[str, DeferredTask]" = OrderedDict()
+        self._task_estimates: Dict[str, float] = {}
+
+        self._cycle_start = None
+        self._last_boundary_index = None
+
+        # Metrics
+        self.cycles = 0
+        self.overruns = 0
+        self.skipped_candles = 0
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+        self.total_lateness = 0.0
+        self.lateness_histogram = LatencyHistogram()  # ms, exported by metrics.py
+        self.last_cycle_seconds = 0.0
+        self.max_cycle_seconds = 0.0
+        self.deferred_runs = 0
+
+    # ------------------------------------------------------------------
+    # Clock helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _wall_minus_mono() -> float:
+        """Current wall - monotonic offset (re-read for drift correction)"""
+        return time.time() - time.monotonic()
+
+    def _boundary_index(self, wall_time: float) -> int:
+        """Index of the last boundary at or before wall_time"""
+        return int(math.floor((wall_time + self.utc_offset) / self.interval))
+
+    def _boundary_wall_time(self, index: int) -> float:
+        return index * self.interval - self.utc_offset
+
+    def _deadline(self, index: int) -> float:
+        """Monotonic deadline for boundary index (drift corrected)"""
+        return self._boundary_wall_time(index) - self._wall_minus_mono()
+
+    # ------------------------------------------------------------------
+    # Deferred work
+    # ------------------------------------------------------------------
+
+    def defer(self, name: str, fn: Callable, delay: float = 0.0, estimate: float = 1.0):
+        """
+        Queue slow work for the idle slack between candles
+        Same name while still pending → replaced (no duplicate reconciles)
+        """
+        estimate = self._task_estimates.get(name, estimate)
+        self._deferred[name] = DeferredTask(name, fn, time.monotonic() + delay, estimate)
+
+    def _run_deferred(self, deadline: float, count_postpone: bool = True):
+        """
+        Run deferred tasks that fit in the slack before deadline
+        count_postpone=False (re-checks while sleeping): a task that doesn't fit just waits -
+        only the once-per-cycle pass counts postponements / forces overdue tasks
+        """
+        for name in list(self._deferred.keys()):
+            if self.should_abort():
+                return
+
+            task = self._deferred[name]
+            now = time.monotonic()
+            if now < task.not_before:
+                continue
+
+            fits = deadline - now > task.estimate + self.SLACK_MARGIN_SECONDS
+            if not fits:
+                if not count_postpone:
+                    continue
+                if task.postponed < self.MAX_POSTPONE_CYCLES:
+                    task.postponed += 1
+                    continue
+
+            del self._deferred[name]
+            start = time.monotonic()
+            try:
+                task.fn()
+            except Exception as e:
+                log.exception("⚠️ Deferred task '%s' failed: %s", name, e)
+            duration = time.monotonic() - start
+
+            # Track worst-case-ish run time for slack budgeting
+            self._task_estimates[name] = max(duration, 0.7 * task.estimate + 0.3 * duration)
+            self.deferred_runs += 1
+
+    # ------------------------------------------------------------------
+    # Candle timing
+    # ------------------------------------------------------------------
+
+    def next_candle_time(self) -> datetime:
+        """Wall-clock time of the next candle boundary (IST)"""
+        index = self._boundary_index(time.time()) + 1
+        return datetime.fromtimestamp(self._boundary_wall_time(index), self.tz)
+
+    def wait_for_next_candle(self) -> Optional[datetime]:
+        """
+        End the current cycle, run deferred work in the slack, then sleep
+        on the monotonic clock until the next boundary
+
+        Returns:
+            Boundary time (IST) or None if aborted
+        """
+        now_wall = time.time()
+        current_index = self._boundary_index(now_wall)
+        next_index = current_index + 1
+
+        self._finish_cycle(current_index)
+
+        deadline = self._deadline(next_index)
+        wait_seconds = deadline - time.monotonic()
+        boundary_time = datetime.fromtimestamp(self._boundary_wall_time(next_index), self.tz)
+        log.info("⏰ Waiting %.1fs until next candle at %s", wait_seconds, boundary_time.strftime('%H:%M:%S'))
+
+        self._run_deferred(deadline)
+
+        while True:
+            if self.should_abort():
+                self._cycle_start = None  # Time spent aborted (Ctrl+C menu) is not a cycle
+                return None
+            # Drift correction: re-derive deadline from fresh wall/monotonic offset
+            deadline = self._deadline(next_index)
+            if self._deferred:
+                self._run_deferred(deadline, count_postpone=False)  # Delayed tasks now due
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(self.SLICE_SECONDS, remaining))
+
+        lateness = time.monotonic() - self._deadline(next_index)
+        self._start_cycle(next_index, lateness)
+        return boundary_time
+
+    def _finish_cycle(self, current_index: int):
+        """Measure cycle duration, overruns and boundaries skipped while processing"""
+        if self._cycle_start is None:
+            return
+
+        self.last_cycle_seconds = time.monotonic() - self._cycle_start
+        self.max_cycle_seconds = max(self.max_cycle_seconds, self.last_cycle_seconds)
+
+        if self.last_cycle_seconds > self.interval:
+            self.overruns += 1
+            log.warning("⚠️ Candle overrun: cycle took %.1fs (interval %ds)", self.last_cycle_seconds, self.interval,
+                        extra={'cycle_s': round(self.last_cycle_seconds, 2)})
+
+        skipped = current_index - self._last_boundary_index
+        if skipped > 0:
+            self.skipped_candles += skipped
+            log.warning("⚠️ Skipped %d candle boundar%s (total skipped: %d)",
+                        skipped, 'y' if skipped == 1 else 'ies', self.skipped_candles)
+
+    def _start_cycle(self, index: int, lateness: float):
+        self._cycle_start = time.monotonic()
+        self._last_boundary_index = index
+        self.cycles += 1
+        self.last_lateness = lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+        self.total_lateness += lateness
+        self.lateness_histogram.observe(lateness * 1000)
+
+    def get_metrics(self) -> Dict:
+        """Scheduler health metrics"""
+        return {
+            'cycles': self.cycles,
+            'last_lateness_ms': round(self.last_lateness * 1000, 1),
+            'avg_lateness_ms': round(self.total_lateness / self.cycles * 1000, 1) if self.cycles else 0.0,
+            'max_lateness_ms': round(self.max_lateness * 1000, 1),
+            'last_cycle_seconds': round(self.last_cycle_seconds, 2),
+            'max_cycle_seconds': round(self.max_cycle_seconds, 2),
+            'overruns': self.overruns,
+            'skipped_candles': self.skipped_candles,
+            'deferred_runs': self.deferred_runs,
+            'deferred_pending': len(self._deferred),
+        }
+
+    def display_metrics(self):
+        """Print one-line scheduler summary"""
+        m = self.get_metrics()
+        print(f"⏱️ Scheduler: {m['cycles']} cycles | lateness avg {m['avg_lateness_ms']}ms "
+              f"max {m['max_lateness_ms']}ms | cycle max {m['max_cycle_seconds']}s | "
+              f"overruns {m['overruns']} | skipped {m['skipped_candles']} | "
+              f"deferred {m['deferred_runs']} run / {m['deferred_pending']} pending")
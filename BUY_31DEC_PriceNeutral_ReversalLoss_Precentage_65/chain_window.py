@@ -0,0 +1,93 @@
+"""
+Chain Window - ADAPTIVE OPTION CHAIN STRIKE RANGE
+✅ Half-width sized from realized spot volatility and active hedge distance
+✅ Grows from ±CHAIN_WINDOW_MIN_STRIKES up to ±CHAIN_WINDOW_MAX_STRIKES
+✅ Core strikes (±MIN around ATM + pinned legs/hedges) are REST-eligible,
+   outer ring is served from the WebSocket-maintained chain only
+"""
+
+from collections import deque
+from typing import List, Optional, Tuple
+import math
+import time
+import numpy as np
+from config import config
+from bot_logging import get_logger
+
+log = get_logger('chain_window')
+
+
+class ChainWindow:
+    """Tracks realized volatility and decides which strikes to watch"""
+
+    def __init__(self):
+        self.min_half_width = config.CHAIN_WINDOW_MIN_STRIKES
+        self.max_half_width = config.CHAIN_WINDOW_MAX_STRIKES
+        self.vol_multiplier = config.CHAIN_WINDOW_VOL_MULTIPLIER
+        self.horizon_candles = config.CHAIN_WINDOW_HORIZON_CANDLES
+
+        # Spot samples (one per candle) for realized volatility
+        self.spot_history = deque(maxlen=config.CHAIN_WINDOW_VOL_LOOKBACK + 1)
+        self._last_sample_time = 0.0
+        self._min_sample_gap = config.CANDLE_INTERVAL_SECONDS / 2
+
+        self.half_width = self.min_half_width
+        self.core_strikes: List[int] = []
+
+    def record_spot(self, spot_price: float):
+        """Record spot once per candle (extra calls inside a candle are ignored)"""
+        now = time.monotonic()
+        if self.spot_history and now - self._last_sample_time < self._min_sample_gap:
+            return
+        self.spot_history.append(float(spot_price))
+        self._last_sample_time = now
+
+    def expected_move(self) -> float:
+        """Expected spot move over the horizon (points) from realized candle volatility"""
+        if len(self.spot_history) < 3:
+            return 0.0
+        sigma = float(np.std(np.diff(np.asarray(self.spot_history))))
+        return self.vol_multiplier * sigma * math.sqrt(self.horizon_candles)
+
+    def compute_half_width(self, base_atm: int, pinned_strikes: List[int]) -> int:
+        """max(min, volatility, hedge distance + buffer), clipped to max"""
+        interval = config.STRIKE_INTERVAL
+        vol_half = math.ceil(self.expected_move() / interval)
+
+        pin_half = 0
+        for strike in pinned_strikes:
+            # Hedges search further OTM than the pinned strike itself
+            pin_half = max(pin_half, abs(strike - base_atm) // interval + 2)
+
+        half = max(self.min_half_width, vol_half, pin_half)
+        return int(min(half, self.max_half_width))
+
+    def build(self, spot_price: float, pinned_strikes: Optional[List[int]] = None) -> Tuple[List[int], List[int]]:
+        """
+        Build strike window around ATM
+
+        Returns:
+            (all_strikes, core_strikes) - both sorted, pinned strikes in both
+        """
+        pinned = [int(s) for s in (pinned_strikes or []) if s]
+        self.record_spot(spot_price)
+
+        interval = config.STRIKE_INTERVAL
+        base_atm = int(round(spot_price / interval) * interval)
+
+        # Grow immediately, shrink one strike per candle (avoids subscribe churn)
+        previous = self.half_width
+        self.half_width = max(self.compute_half_width(base_atm, pinned), previous - 1)
+        if self.half_width != previous:
+            log.info("📐 Chain window ±%d → ±%d strikes (expected move %.0f pts)",
+                     previous, self.half_width, self.expected_move())
+
+        offsets = np.arange(-self.half_width, self.half_width + 1)
+        strikes = set((base_atm + offsets * interval).tolist())
+        core = set((base_atm + offsets[np.abs(offsets) <= self.min_half_width] * interval).tolist())
+
+        strikes.update(pinned)
+        core.update(pinned)
+
+        self.core_strikes = sorted(core)
+        return sorted(strikes), self.core_strikes
@@ -0,0 +1,170 @@
+"""
+Circuit Breaker - NON-BLOCKING REST BACKOFF PER ENDPOINT
+✅ AB2001 (rate limit) / AB1004 (server error) open the breaker for a cooldown
+   instead of sleeping on the caller's thread
+✅ While OPEN callers fail fast (or serve cached data) - the trading loop keeps
+   evaluating triggers on WebSocket ticks
+✅ After the cooldown ONE trial call (or the probe) goes through - everyone else keeps failing fast
+   until it succeeds (CLOSED) or trips again (OPEN); an unresolved trial expires after trial_timeout
+✅ Background probe closes the breaker as soon as the endpoint answers again
+✅ Repeated trips back off exponentially (capped)
+"""
+
+from typing import Callable, Dict, Optional
+import threading
+import time
+from bot_logging import get_logger
+
+log = get_logger('circuit_breaker')
+
+
+class CircuitBreaker:
+    """CLOSED → OPEN (cooldown) → HALF_OPEN (one trial / probe) → CLOSED"""
+
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+    def __init__(self, name: str, probe: Optional[Callable[[], bool]] = None,
+                 max_cooldown: float = 300.0, trial_timeout: float = 10.0):
+        self.name = name
+        self.probe = probe            # Cheap call that returns True when the endpoint is healthy
+        self.max_cooldown = max_cooldown
+        self.trial_timeout = trial_timeout
+
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.open_until = 0.0         # monotonic
+        self.cooldown = 0.0           # current cooldown length (seconds)
+        self.reason = None
+        self.consecutive_trips = 0
+        self.trial_until = 0.0        # monotonic - HALF_OPEN trial in flight until then
+        self._probe_thread = None
+
+        # Stats
+        self.trips = 0
+        self.fast_fails = 0
+
+    # ------------------------------------------------------------------
+    # State changes
+    # ------------------------------------------------------------------
+
+    def trip(self, cooldown: float, reason: str = ''):
+        """Open the breaker - repeated trips double the cooldown (capped)"""
+        with self.lock:
+            cooldown = min(cooldown * (2 ** min(self.consecutive_trips, 4)), self.max_cooldown)
+            self.state = self.OPEN
+            self.open_until = time.monotonic() + cooldown
+            self.cooldown = cooldown
+            self.reason = reason
+            self.consecutive_trips += 1
+            self.trips += 1
+            self.trial_until = 0.0
+            # Started under the lock - concurrent trips never share a not-yet-started thread
+            if self.probe is not None and not (self._probe_thread and self._probe_thread.is_alive()):
+                self._probe_thread = threading.Thread(target=self._probe_loop, daemon=True,
+                                                      name=f"breaker-probe-{self.name}")
+                self._probe_thread.start()
+
+        log.warning("🔌 Breaker [%s] OPEN for %.0fs (%s)", self.name, cooldown, reason,
+                    extra={'endpoint': self.name, 'cooldown_s': round(cooldown, 1)})
+
+    def record_success(self):
+        """Successful call - close the breaker"""
+        with self.lock:
+            if self.state == self.CLOSED and not self.consecutive_trips:
+                return
+            was_open = self.state != self.CLOSED
+            self.state = self.CLOSED
+            self.consecutive_trips = 0
+            self.trial_until = 0.0
+            self.reason = None
+        if was_open:
+            log.info("🔌 Breaker [%s] CLOSED - endpoint recovered", self.name, extra={'endpoint': self.name})
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def allow(self) -> bool:
+        """
+        True if a REST call may be made now
+        OPEN past its cooldown → HALF_OPEN, this caller makes the one trial call
+        HALF_OPEN with a trial in flight → fail fast
+        """
+        with self.lock:
+            if self.state == self.CLOSED or self._start_trial():
+                return True
+            self.fast_fails += 1
+            return False
+
+    def _start_trial(self) -> bool:
+        """Claim the trial call (caller holds self.lock)"""
+        now = time.monotonic()
+        if self.state == self.OPEN and now < self.open_until:
+            return False
+        if self.state == self.HALF_OPEN and now < self.trial_until:
+            return False
+        self.state = self.HALF_OPEN
+        self.trial_until = now + self.trial_timeout
+        return True
+
+    def is_open(self) -> bool:
+        with self.lock:
+            return self.state == self.OPEN and time.monotonic() < self.open_until
+
+    def remaining(self) -> float:
+        """Seconds of cooldown left (0 if not open)"""
+        with self.lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.open_until - time.monotonic())
+
+    def get_status(self) -> Dict:
+        return {
+            'state': self.state,
+            'remaining_s': round(self.remaining(), 1),
+            'reason': self.reason,
+            'trips': self.trips,
+            'fast_fails': self.fast_fails,
+        }
+
+    # ------------------------------------------------------------------
+    # Background recovery probe
+    # ------------------------------------------------------------------
+
+    def _probe_loop(self):
+        """Wait out the cooldown, probe, close on success or re-trip on failure"""
+        while True:
+            wait = self.remaining()
+            if wait > 0:
+                time.sleep(min(wait, 1.0))
+                continue
+
+            with self.lock:
+                if self.state == self.CLOSED:
+                    return
+                trial = self._start_trial()
+            if not trial:
+                time.sleep(1.0)  # A caller's trial call is in flight
+                continue
+
+            try:
+                healthy = bool(self.probe())
+            except Exception as e:
+                log.warning("⚠️ Breaker [%s] probe error: %s", self.name, e)
+                healthy = False
+
+            if healthy:
+                self.record_success()
+                return
+
+            # Still unhealthy - reopen (backs off) and keep probing from this thread
+            with self.lock:
+                self.state = self.OPEN
+                self.cooldown = min(max(self.cooldown, 1.0) * 2, self.max_cooldown)
+                self.open_until = time.monotonic() + self.cooldown
+                self.consecutive_trips += 1
+                self.trial_until = 0.0
+            log.warning("🔌 Breaker [%s] probe failed - OPEN for %.0fs", self.name, self.cooldown,
+                        extra={'endpoint': self.name, 'cooldown_s': round(self.cooldown, 1)})
@@ -13,16 +13,45 @@ SIMPLIFIED: Weekend + Time checks only (user monitors holidays manually)
 ✅ CORRECTED: Removed obsolete HEDGE_OFFSET_STRIKES parameter
 ✅ UPDATED: Strike range display to 17 strikes (±8)
 ✅ ADDED: HEDGE_REVERSAL_EXIT_PCT parameter for adjustable hedge exit thresholds
+✅ ADDED: Multi-underlying (UNDERLYINGS) - per-strategy Config copies bound per thread (ScopedConfig)
+✅ ADDED: Named strategies (STRATEGIES) - expiry / hedge side / levels per strategy over one feed
 """
 
 import os
+import copy
+import threading
+from contextlib import contextmanager
 from datetime import datetime, time
-from typing import List
+from typing import Callable, List
 from dotenv import load_dotenv
 import pytz
 
 load_dotenv(override=True)
 
+# Index option underlyings: NSE spot index (name / token for LTP + WebSocket) + contract defaults
+# Lot size / strike interval defaults are overridable per underlying (<NAME>_LOT_SIZE, <NAME>_STRIKE_INTERVAL)
+UNDERLYING_SPECS = {
+    'NIFTY': {'spot_symbol': 'NIFTY 50', 'spot_token': '99926000', 'lot_size': 65, 'strike_interval': 50},
+    'BANKNIFTY': {'spot_symbol': 'Nifty Bank', 'spot_token': '99926009', 'lot_size': 30, 'strike_interval': 100},
+    'FINNIFTY': {'spot_symbol': 'Nifty Fin Service', 'spot_token': '99926037', 'lot_size': 60, 'strike_interval': 50},
+    'MIDCPNIFTY': {'spot_symbol': 'NIFTY MID SELECT', 'spot_token': '99926074', 'lot_size': 120, 'strike_interval': 25},
+}
+
+# 🧩 Settings overridable per underlying / strategy as <NAME>_<SETTING> (multi_engine.py)
+STRATEGY_OVERRIDES = {
+    'EXPIRY_DATE': str.upper,
+    'LOT_SIZE': int,
+    'STRIKE_INTERVAL': int,
+    'MANUAL_STRIKE': int,
+    'HEDGE_SIDE': str.upper,
+    'PROGRESSIVE_HEDGING_LEVELS': lambda value: [float(x.strip()) for x in value.split(',')],
+    'LEVEL_3_HARD_STOP': float,
+    'HEDGE_REVERSAL_EXIT_PCT': float,
+    'FORCE_EXIT_RATIO': float,
+}
+
+HEDGE_SIDES = ('BUY', 'SELL')
+
 
 class Config:
     """Configuration class for strategy parameters"""
@@ -66,7 +95,25 @@ class Config:
 
     def load_trading_parameters(self):
         """Load trading parameters"""
-        self.UNDERLYING = os.getenv('UNDERLYING', 'NIFTY')
+        self.UNDERLYING = os.getenv('UNDERLYING', 'NIFTY').upper()
+        self.SPOT_SYMBOL = UNDERLYING_SPECS.get(self.UNDERLYING, {}).get('spot_symbol')
+        self.SPOT_TOKEN = UNDERLYING_SPECS.get(self.UNDERLYING, {}).get('spot_token')
+
+        # 🌐 multi_engine.py: one strategy instance per underlying over one session / feed
+        underlyings = os.getenv('UNDERLYINGS', self.UNDERLYING)
+        self.UNDERLYINGS = [name.strip().upper() for name in underlyings.split(',') if name.strip()]
+
+        # 🧩 multi_engine.py: named strategies (default one per underlying), each may set its own
+        # <NAME>_UNDERLYING / _EXPIRY_DATE / _HEDGE_SIDE / _PROGRESSIVE_HEDGING_LEVELS / ...
+        strategies = os.getenv('STRATEGIES', ','.join(self.UNDERLYINGS))
+        self.STRATEGIES = [name.strip().upper() for name in strategies.split(',') if name.strip()]
+        for name in self.STRATEGIES:
+            underlying = self.strategy_underlying(name)
+            if underlying not in self.UNDERLYINGS:
+                self.UNDERLYINGS.append(underlying)  # Scrip master + spot feed cover every strategy
+        self.STRATEGY_ID = self.UNDERLYING
+        self.BOOK_PEERS: List[str] = []  # Other strategies on the same underlying + expiry (set by multi_engine)
+
         self.LOT_SIZE = int(os.getenv('LOT_SIZE', '65'))
         self.STRIKE_INTERVAL = int(os.getenv('STRIKE_INTERVAL', '50'))
 
@@ -90,6 +137,9 @@ class Config:
         # 🔥 NEW: Hedge reversal exit percentage
         self.HEDGE_REVERSAL_EXIT_PCT = float(os.getenv('HEDGE_REVERSAL_EXIT_PCT', '10'))
 
+        # 🧩 Hedge direction (hedge_side.py): BUY on the losing side (this folder) | SELL on the profit side
+        self.HEDGE_SIDE = os.getenv('HEDGE_SIDE', 'BUY').upper()
+
         # ✅ CORRECTED: Removed HEDGE_STRIKE_DISTANCE calculation
         # Dynamic strike selection based on premium matching - no fixed distances
 
@@ -118,12 +168,86 @@ class Config:
         self.POLL_INTERVAL_SECONDS = int(os.getenv('POLL_INTERVAL_SECONDS', '30'))
         self.POSITION_RECONCILE_FREQUENCY = int(os.getenv('POSITION_RECONCILE_FREQUENCY', '5'))
 
+        # 📒 Position ledger (order-update fills) is diffed every candle at zero REST cost,
+        # the full REST position book is only a low-frequency audit
+        self.POSITION_AUDIT_INTERVAL_SECONDS = int(os.getenv('POSITION_AUDIT_INTERVAL_SECONDS', '900'))
+        self.POSITION_FALLBACK_INTERVAL_SECONDS = int(os.getenv('POSITION_FALLBACK_INTERVAL_SECONDS', '300'))
+        self.POSITION_LEDGER_MISMATCH_CHECKS = int(os.getenv('POSITION_LEDGER_MISMATCH_CHECKS', '2'))
+
+        # 🔌 REST circuit breakers (cooldown instead of sleeping on the caller's thread)
+        self.RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv('RATE_LIMIT_COOLDOWN_SECONDS', '60'))
+        self.ORDER_RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv('ORDER_RATE_LIMIT_COOLDOWN_SECONDS', '2'))
+        self.SERVER_ERROR_COOLDOWN_SECONDS = float(os.getenv('SERVER_ERROR_COOLDOWN_SECONDS', '5'))
+        self.BREAKER_MAX_COOLDOWN_SECONDS = float(os.getenv('BREAKER_MAX_COOLDOWN_SECONDS', '300'))
+
+        # 🔐 Background session manager
+        self.SESSION_VALIDITY_HOURS = float(os.getenv('SESSION_VALIDITY_HOURS', '24'))
+        self.SESSION_REFRESH_AHEAD_MINUTES = float(os.getenv('SESSION_REFRESH_AHEAD_MINUTES', '30'))
+        self.SESSION_WAIT_SECONDS = float(os.getenv('SESSION_WAIT_SECONDS', '20'))
+
+        # 🔁 WebSocket make-before-break failover
+        self.WS_FAILOVER_TIMEOUT_SECONDS = float(os.getenv('WS_FAILOVER_TIMEOUT_SECONDS', '10'))
+        self.WS_GAP_BACKFILL_GRACE_SECONDS = float(os.getenv('WS_GAP_BACKFILL_GRACE_SECONDS', '0.5'))
+
+        # ⚡ LTP frames decoded with struct directly into the tick store (no per-tick dict)
+        self.WS_FAST_DECODER = os.getenv('WS_FAST_DECODER', 'true').lower() == 'true'
+
+        # 📈 Prometheus text endpoint (/metrics, /health) on a local daemon thread
+        self.METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+        self.METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+        self.METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+
+        # 🔒 Keyed order locks - a hung order call fails other callers fast instead of freezing the bot
+        self.LOCK_TIMEOUT_SECONDS = float(os.getenv('LOCK_TIMEOUT_SECONDS', '30'))
+        self.LOCK_EXIT_TIMEOUT_SECONDS = float(os.getenv('LOCK_EXIT_TIMEOUT_SECONDS', '90'))  # > hedge order max_wait
+
+        # 🖥️ Status dashboard - renderers read published snapshots on their own threads
+        self.DASHBOARD_MODE = os.getenv('DASHBOARD_MODE', 'console').lower()  # console | web | both | off
+        self.DASHBOARD_REFRESH_SECONDS = float(os.getenv('DASHBOARD_REFRESH_SECONDS', '2'))
+        self.DASHBOARD_HOST = os.getenv('DASHBOARD_HOST', '127.0.0.1')
+        self.DASHBOARD_PORT = int(os.getenv('DASHBOARD_PORT', '9109'))
+
+        # 🚪 Exit engine - straddle square-off orders fired concurrently from a shared pool
+        self.EXIT_WORKERS = int(os.getenv('EXIT_WORKERS', '4'))
+        self.EXIT_HEDGES_AFTER_LEGS = os.getenv('EXIT_HEDGES_AFTER_LEGS', 'true').lower() == 'true'  # Margin
+        self.EXIT_FILL_TIMEOUT_SECONDS = int(os.getenv('EXIT_FILL_TIMEOUT_SECONDS', '60'))
+
+        # 🧺 Basket orders - keep-alive REST connection pool + shared order workers (no thread per entry)
+        self.ORDER_HTTP_POOL_SIZE = int(os.getenv('ORDER_HTTP_POOL_SIZE', '8'))
+        self.ORDER_WORKERS = int(os.getenv('ORDER_WORKERS', '4'))
+
+        # 📐 Adaptive option chain window (half-width in strikes)
+        # Core ±MIN strikes may use REST fallback, outer ring is WebSocket-only
+        self.CHAIN_WINDOW_MIN_STRIKES = int(os.getenv('CHAIN_WINDOW_MIN_STRIKES', '8'))
+        self.CHAIN_WINDOW_MAX_STRIKES = int(os.getenv('CHAIN_WINDOW_MAX_STRIKES', '25'))
+        self.CHAIN_WINDOW_VOL_LOOKBACK = int(os.getenv('CHAIN_WINDOW_VOL_LOOKBACK', '30'))
+        self.CHAIN_WINDOW_HORIZON_CANDLES = int(os.getenv('CHAIN_WINDOW_HORIZON_CANDLES', '30'))
+        self.CHAIN_WINDOW_VOL_MULTIPLIER = float(os.getenv('CHAIN_WINDOW_VOL_MULTIPLIER', '3.0'))
+
         # 🔥 NEW: Debug mode (optional)
         self.ENABLE_DEBUG_MODE = os.getenv('ENABLE_DEBUG_MODE', 'False').lower() == 'true'
 
     def load_file_settings(self):
         """Load file paths"""
         self.EXCEL_LOG_PATH = os.getenv('EXCEL_FILE', 'angelone_live_trades.xlsx')
+
+        # 📓 Trade journal (system of record, one file per day) + Excel export cadence
+        self.JOURNAL_DIR = os.getenv('JOURNAL_DIR', 'trade_journal')
+        self.EXCEL_EXPORT_INTERVAL_SECONDS = float(os.getenv('EXCEL_EXPORT_INTERVAL_SECONDS', '60'))
+
+        # 🎞️ Tick recorder (WebSocket ticks + order updates → binary log for replay_engine.py)
+        self.TICK_RECORD_ENABLED = os.getenv('TICK_RECORD_ENABLED', 'false').lower() == 'true'
+        self.TICK_RECORD_DIR = os.getenv('TICK_RECORD_DIR', 'tick_logs')
+        self.TICK_RECORD_FLUSH_SECONDS = float(os.getenv('TICK_RECORD_FLUSH_SECONDS', '1'))
+
+        # 🪵 Structured logging (bot_logging.py): JSON lines file + optional console view
+        self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG' if self.ENABLE_DEBUG_MODE else 'INFO').upper()
+        self.LOG_CONSOLE = os.getenv('LOG_CONSOLE', 'true').lower() == 'true'
+        self.LOG_CONSOLE_LEVEL = os.getenv('LOG_CONSOLE_LEVEL', 'INFO').upper()
+        self.LOG_DIR = os.getenv('LOG_DIR', 'bot_logs')
+        self.LOG_FILE_MAX_MB = float(os.getenv('LOG_FILE_MAX_MB', '50'))
+        self.LOG_FILE_BACKUPS = int(os.getenv('LOG_FILE_BACKUPS', '5'))
+        self.LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
         
         # Emergency stop system
         self.EMERGENCY_STOP_FILE = "EMERGENCY_STOP.flag"
@@ -214,41 +338,63 @@ class Config:
             print(f"[ERROR] Error validating expiry format: {e}")
             return False
 
-    def validate_config(self):
-        """Validate configuration - HYBRID: Updated for 2 levels"""
-        # Validate API credentials
+    def validate_credentials(self):
+        """
+        Angel One credentials - checked at login, not at import, so the offline tools
+        (mock_broker, replay_engine, tick_decoder) run without a .env
+        """
         if not self.API_KEY or not self.CLIENT_ID or not self.PASSWORD or not self.TOTP_SECRET:
             raise ValueError("[ERROR] Angel One credentials not configured in .env file")
 
+    def validate_config(self):
+        """Validate configuration - HYBRID: Updated for 2 levels"""
+        # Validate underlyings
+        for name in [self.UNDERLYING] + self.UNDERLYINGS:
+            if name not in UNDERLYING_SPECS:
+                raise ValueError(f"[ERROR] Unknown underlying '{name}'. Supported: {', '.join(UNDERLYING_SPECS)}")
+
+        self.validate_strategy()
+
+        # Validate chain window
+        if not (1 <= self.CHAIN_WINDOW_MIN_STRIKES <= self.CHAIN_WINDOW_MAX_STRIKES):
+            raise ValueError("[ERROR] CHAIN_WINDOW_MIN_STRIKES must be >= 1 and <= CHAIN_WINDOW_MAX_STRIKES")
+
+        # Validate time sequence
+        if not (self.MARKET_OPEN_TIME < self.ENTRY_WINDOW_START <
+                self.ENTRY_WINDOW_END < self.SQUARE_OFF_TIME < self.MARKET_CLOSE_TIME):
+            raise ValueError("[ERROR] Invalid time sequence in configuration")
+
+        print("[OK] Configuration validated successfully")
+
+    def validate_strategy(self, name: str = None):
+        """Expiry + hedging settings - checked for the base config and every strategy copy"""
+        label = f" for {name}" if name else ""
+
         # Validate expiry format
         if not self.validate_expiry_format():
-            raise ValueError(f"[ERROR] Invalid expiry format: '{self.EXPIRY_DATE}'. Expected DDMMMYY (e.g., '04NOV25')")
+            raise ValueError(f"[ERROR] Invalid expiry format{label}: '{self.EXPIRY_DATE}'. Expected DDMMMYY (e.g., '04NOV25')")
+
+        if self.HEDGE_SIDE not in HEDGE_SIDES:
+            raise ValueError(f"[ERROR] HEDGE_SIDE{label} must be BUY or SELL, found '{self.HEDGE_SIDE}'")
 
         # 🔥 HYBRID: Validate 2 hedging levels instead of 4
         if len(self.PROGRESSIVE_HEDGING_LEVELS) != 2:
-            raise ValueError(f"[ERROR] Must have exactly 2 hedging levels, found {len(self.PROGRESSIVE_HEDGING_LEVELS)}")
+            raise ValueError(f"[ERROR] Must have exactly 2 hedging levels{label}, found {len(self.PROGRESSIVE_HEDGING_LEVELS)}")
 
         # ✅ CORRECTED: Removed HEDGE_STRIKE_DISTANCE validation
 
         # Validate hedging levels are in ascending order
         for i in range(len(self.PROGRESSIVE_HEDGING_LEVELS) - 1):
             if self.PROGRESSIVE_HEDGING_LEVELS[i] >= self.PROGRESSIVE_HEDGING_LEVELS[i + 1]:
-                raise ValueError("[ERROR] Hedging levels must be in ascending order")
+                raise ValueError(f"[ERROR] Hedging levels{label} must be in ascending order")
 
         # 🔥 HYBRID: Validate Level 3 is higher than Level 2
         if self.LEVEL_3_HARD_STOP <= self.PROGRESSIVE_HEDGING_LEVELS[-1]:
-            raise ValueError("Level 3 hard stop must be higher than Level 2")
+            raise ValueError(f"Level 3 hard stop{label} must be higher than Level 2")
 
         # Validate HEDGE_REVERSAL_EXIT_PCT is positive and reasonable
         if self.HEDGE_REVERSAL_EXIT_PCT <= 0 or self.HEDGE_REVERSAL_EXIT_PCT >= 30:
-            raise ValueError("[ERROR] HEDGE_REVERSAL_EXIT_PCT must be between 0 and 30")
-
-        # Validate time sequence
-        if not (self.MARKET_OPEN_TIME < self.ENTRY_WINDOW_START <
-                self.ENTRY_WINDOW_END < self.SQUARE_OFF_TIME < self.MARKET_CLOSE_TIME):
-            raise ValueError("[ERROR] Invalid time sequence in configuration")
-
-        print("[OK] Configuration validated successfully")
+            raise ValueError(f"[ERROR] HEDGE_REVERSAL_EXIT_PCT{label} must be between 0 and 30")
 
     def display_config(self):
         """✅ UPDATED: Display configuration with manual strike selection + PURE PRICE-NEUTRAL"""
@@ -256,6 +402,10 @@ class Config:
         print(f"PROGRESSIVE HEDGING STRADDLE - ANGEL ONE CONFIGURATION")
         print(f"{'=' * 80}")
         print(f"Underlying: {self.UNDERLYING}")
+        if len(self.UNDERLYINGS) > 1:
+            print(f"Underlyings (multi_engine.py): {', '.join(self.UNDERLYINGS)}")
+        if self.STRATEGIES != self.UNDERLYINGS:
+            print(f"Strategies (multi_engine.py): {', '.join(self.STRATEGIES)}")
         print(f"Lot Size: {self.LOT_SIZE}")
         print(f"Expiry Date: {self.EXPIRY_DATE} (Angel One format: DDMMMYY)")
         print(f"Strike Interval: {self.STRIKE_INTERVAL}")
@@ -301,25 +451,41 @@ class Config:
         print(f"\nCORE LOGIC - Progressive Hedging Levels (PURE PRICE-NEUTRAL):")
         for i, level in enumerate(self.PROGRESSIVE_HEDGING_LEVELS, 1):
             exit_level = level - self.HEDGE_REVERSAL_EXIT_PCT
-            print(f"   Level {i}: Entry @ {level}% loss, Exit @ {exit_level}% loss → SELL Hedge")
+            print(f"   Level {i}: Entry @ {level}% loss, Exit @ {exit_level}% loss → {self.HEDGE_SIDE} Hedge")
         print(f"   Level 3: {self.LEVEL_3_HARD_STOP}% loss → HARD STOP (No Hedge)")
         print(f"\nHedge Reversal Exit: {self.HEDGE_REVERSAL_EXIT_PCT}% retrace from entry level")
 
         print(f"\nCORE LOGIC - Exit Parameters:")
         print(f"   Premium Ratio Threshold: <= {self.FORCE_EXIT_RATIO} (1:{1 / self.FORCE_EXIT_RATIO:.1f})")
-        print(f"   🚫 NO BUFFER/NO TRAILING - Pure SELL hedge strategy")
+        print(f"   🚫 NO BUFFER/NO TRAILING - Pure {self.HEDGE_SIDE} hedge strategy")
 
         print(f"\nOption Chain Configuration:")
-        print(f"   ✅ BALANCED: 17 strikes (±8) for optimal hedge coverage")  # ✅ UPDATED: Changed from 13 to 17 strikes
+        print(f"   ✅ ADAPTIVE: ±{self.CHAIN_WINDOW_MIN_STRIKES} to ±{self.CHAIN_WINDOW_MAX_STRIKES} strikes (core ±{self.CHAIN_WINDOW_MIN_STRIKES} REST, outer ring WebSocket)")
+
+        print(f"\nPosition Reconciliation:")
+        print(f"   📒 Ledger diff every candle (order-update fills, zero REST)")
+        print(f"   REST audit every {self.POSITION_AUDIT_INTERVAL_SECONDS}s "
+              f"({self.POSITION_FALLBACK_INTERVAL_SECONDS}s while order stream is down)")
 
         print(f"\nHedge Configuration:")
         # ✅ CORRECTED: Removed HEDGE_TYPE and HEDGE_OFFSET_STRIKES display
         print(f"   🔥 DYNAMIC Strike Selection: Based on premium matching")
-        print(f"   🔥 FALLBACK: Sell opposing leg at SAME strike (profit leg)")
+        if self.HEDGE_SIDE == 'BUY':
+            print(f"   🔥 BUY losing leg's type, OTM beyond the straddle strike")
+        else:
+            print(f"   🔥 SELL profit leg's type on the profit side of spot")
         print(f"   🔥 NO FIXED OFFSET - Pure price-neutral logic")
 
         print(f"\nFiles:")
         print(f"   Excel Log: {self.EXCEL_LOG_PATH}")
+        print(f"   Tick Recorder: {self.TICK_RECORD_DIR + '/' if self.TICK_RECORD_ENABLED else 'OFF'}")
+        print(f"   Log: {self.LOG_DIR}/bot.jsonl ({self.LOG_LEVEL}) | Console: {self.LOG_CONSOLE_LEVEL if self.LOG_CONSOLE else 'OFF'}")
+        print(f"   Metrics: {f'http://{self.METRICS_HOST}:{self.METRICS_PORT}/metrics' if self.METRICS_ENABLED else 'OFF'}")
+        print(f"   Dashboard: {self.DASHBOARD_MODE.upper()}"
+              f"{f' (http://{self.DASHBOARD_HOST}:{self.DASHBOARD_PORT}/)' if self.DASHBOARD_MODE in ('web', 'both') else ''}")
+        print(f"   Exit Engine: {self.EXIT_WORKERS} workers | hedges "
+              f"{'after their leg fills' if self.EXIT_HEDGES_AFTER_LEGS else 'with the legs'}")
+        print(f"   Basket Orders: {self.ORDER_WORKERS} workers | {self.ORDER_HTTP_POOL_SIZE} pooled REST connections")
         print(f"{'=' * 80}\n")
 
         # Display AMX session info
@@ -329,7 +495,8 @@ class Config:
         """Display AMX session management info"""
         print(f"\n⚡ AMX SESSION MANAGEMENT:")
         print(f"   AMX Gateway Timeout: ~25 minutes")
-        print(f"   Proactive Refresh: Every 20 minutes")
+        print(f"   Proactive Refresh: {self.SESSION_REFRESH_AHEAD_MINUTES:g} min before "
+              f"{self.SESSION_VALIDITY_HOURS:g}h session expiry (background session manager)")
         print(f"   Error Codes Handled:")
         print(f"     • AB1007 = AMX Error (session expired)")
         print(f"     • AB1010 = AMX Session Expired")
@@ -337,6 +504,65 @@ class Config:
         print(f"     • AG8002 = Token Expired (JWT)")
         print(f"   Recovery: Full re-login (creates new AMX session)")
 
+    def strategy_underlying(self, name: str) -> str:
+        """<NAME>_UNDERLYING, else the strategy's own name when it is an underlying, else UNDERLYING"""
+        name = name.upper()
+        default = name if name in UNDERLYING_SPECS else self.UNDERLYING
+        return os.getenv(f'{name}_UNDERLYING', default).upper()
+
+    def _apply_overrides(self, name: str):
+        """<NAME>_<SETTING> env overrides (STRATEGY_OVERRIDES) onto this copy"""
+        for setting, parse in STRATEGY_OVERRIDES.items():
+            value = os.getenv(f'{name}_{setting}')
+            if value:
+                setattr(self, setting, parse(value))
+
+    def for_underlying(self, name: str) -> 'Config':
+        """
+        🌐 Copy of this config trading `name` (multi_engine.py)
+        Per-underlying env overrides: <NAME>_EXPIRY_DATE, <NAME>_LOT_SIZE, <NAME>_STRIKE_INTERVAL,
+        <NAME>_MANUAL_STRIKE, ... (STRATEGY_OVERRIDES)
+        """
+        name = name.upper()
+        spec = UNDERLYING_SPECS[name]
+        scoped = copy.copy(self)
+        scoped.UNDERLYING = name
+        scoped.STRATEGY_ID = name
+        scoped.SPOT_SYMBOL = spec['spot_symbol']
+        scoped.SPOT_TOKEN = spec['spot_token']
+
+        # Contract settings from .env belong to the base UNDERLYING
+        if name != self.UNDERLYING:
+            scoped.LOT_SIZE = spec['lot_size']
+            scoped.STRIKE_INTERVAL = spec['strike_interval']
+            scoped.MANUAL_STRIKE = None
+        scoped._apply_overrides(name)
+        scoped.validate_strategy(name)
+        return scoped
+
+    def for_strategy(self, name: str) -> 'Config':
+        """
+        🧩 Copy of this config for strategy `name` (multi_engine.py STRATEGIES)
+        Its underlying's settings (for_underlying) first, then the strategy's own <NAME>_<SETTING>
+        overrides - e.g. NIFTY_SELL_HEDGE_SIDE=SELL, NIFTY_SELL_EXPIRY_DATE=13JAN26
+        With several strategies the Excel log and trade journal are split per strategy
+        """
+        name = name.upper()
+        scoped = self.for_underlying(self.strategy_underlying(name))
+        scoped.STRATEGY_ID = name
+        if name != scoped.UNDERLYING:
+            scoped._apply_overrides(name)
+            scoped.validate_strategy(name)
+
+        if len(self.STRATEGIES) > 1:
+            scoped.EXCEL_LOG_PATH = self.EXCEL_LOG_PATH.replace('.xlsx', f'_{name}.xlsx')
+            scoped.JOURNAL_DIR = os.path.join(self.JOURNAL_DIR, name)
+        return scoped
+
+    def owns_symbol(self, symbol: str) -> bool:
+        """Option of this config's underlying + expiry (NIFTY06JAN26... - not BANKNIFTY / NIFTYNXT50 / other expiries)"""
+        return bool(symbol) and symbol.startswith(f"{self.UNDERLYING}{self.EXPIRY_DATE}")
+
     def is_emergency_stop(self) -> bool:
         """Check if emergency stop flag exists"""
         return os.path.exists(self.EMERGENCY_STOP_FILE)
@@ -365,5 +591,51 @@ class Config:
             print("✅ Emergency stop flag removed - trading re-enabled")
 
 
+class ScopedConfig:
+    """
+    🧵 The module-level `config` - attributes resolve to the Config bound on the calling thread
+    (multi_engine.py binds one per strategy), else to the base Config loaded from .env
+    Worker threads started for a strategy inherit its Config via config.wrap(fn)
+    """
+
+    def __init__(self, base: Config):
+        object.__setattr__(self, '_base', base)
+        object.__setattr__(self, '_local', threading.local())
+
+    def current(self) -> Config:
+        return getattr(self._local, 'config', None) or self._base
+
+    def bind(self, scoped: Config = None):
+        """Bind `scoped` to this thread (None → back to the base config)"""
+        self._local.config = scoped
+
+    @contextmanager
+    def scoped(self, scoped: Config):
+        previous = getattr(self._local, 'config', None)
+        self._local.config = scoped
+        try:
+            yield scoped
+        finally:
+            self._local.config = previous
+
+    def wrap(self, fn: Callable) -> Callable:
+        """fn running under the caller's Config on whatever thread executes it"""
+        scoped = self.current()
+
+        def run(*args, **kwargs):
+            with self.scoped(scoped):
+                return fn(*args, **kwargs)
+        return run
+
+    def __getattr__(self, name):
+        return getattr(self.current(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.current(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self.current(), name)
+
+
 # Global config instance
-config = Config()
\ No newline at end of file
+config = ScopedConfig(Config())
\ No newline at end of file
@@ -2,57 +2,48 @@
 Enhanced Excel Logger - Detailed Trade and Hedge Tracking
 Tracks every entry/exit of straddle legs and hedges with timestamps
 🔥 CLEANED: Removed buffer_target_pct column (PURE SELL hedge strategy)
+📓 JOURNAL: Events are appended to the per-day TradeJournal (system of record)
+   - O(1) append on the trading thread, no workbook held in memory
+   - Excel workbook generated on demand from the journal
+   - Background export every EXCEL_EXPORT_INTERVAL_SECONDS + on close()
 """
 
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from datetime import datetime
+from typing import Dict, List
+import atexit
 import os
+import threading
+import time as time_module
 from config import config
+from trade_journal import TradeJournal, EVENT_FIELDS
+from latency_tracker import latency
 
 
-class ExcelLogger:
-    """Enhanced logger with detailed trade and hedge tracking"""
+class WorkbookBuilder:
+    """Builds the Trades / Hedges / Legs workbook by replaying journal events"""
 
-    def __init__(self, filename: str = None):
-        """Initialize Excel logger with multiple sheets"""
-        # Use config file path or default
-        self.filename = filename or config.EXCEL_LOG_PATH
-        self.wb = None
-        self.trade_sheet = None
-        self.hedge_sheet = None
-        self.leg_sheet = None
+    def __init__(self):
+        """Create workbook with three sheets: Trades, Hedges, Legs"""
+        self.wb = openpyxl.Workbook()
         self.trade_row = 2
         self.hedge_row = 2
         self.leg_row = 2
-        self.current_trade_id = 0
-
-        self.setup_workbook()
-
-    def setup_workbook(self):
-        """Create workbook with three sheets: Trades, Hedges, Legs"""
-        try:
-            # Backup existing file
-            if os.path.exists(self.filename):
-                backup_name = f"{self.filename.replace('.xlsx', '')}_backup_{config.get_current_ist_time().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                os.rename(self.filename, backup_name)
-                print(f"📦 Backup created: {backup_name}")
 
-            # Create new workbook
-            self.wb = openpyxl.Workbook()
+        # Setup three sheets
+        self._setup_trade_sheet()
+        self._setup_hedge_sheet()
+        self._setup_leg_sheet()
 
-            # Setup three sheets
-            self._setup_trade_sheet()
-            self._setup_hedge_sheet()
-            self._setup_leg_sheet()
-
-            # Save
-            self.wb.save(self.filename)
-            print(f"✅ Enhanced Excel initialized: {self.filename}")
-            print(f"   📊 3 sheets created: Trades, Hedges, Legs")
-
-        except Exception as e:
-            print(f"❌ Error setting up Excel: {str(e)}")
+        self.handlers = {
+            'ENTRY': self._apply_entry,
+            'LEG_ACTION': self._apply_leg_action,
+            'HEDGE_ENTRY': self._apply_hedge_entry,
+            'HEDGE_EXIT': self._apply_hedge_exit,
+            'EXIT': self._apply_exit,
+            'MANUAL': self._apply_manual_intervention,
+        }
 
     def _setup_trade_sheet(self):
         """Setup main trade summary sheet"""
@@ -120,22 +111,267 @@ class ExcelLogger:
         for col in range(1, len(headers) + 1):
             sheet.column_dimensions[openpyxl.utils.get_column_letter(col)].width = 15
 
+    def _apply_entry(self, trade_id, entry_time, atm_strike, ce_premium, pe_premium, spot_price):
+        # Previous trade never exited (crash/restart) - keep its row
+        if self.trade_sheet.cell(row=self.trade_row, column=1).value is not None:
+            self.trade_row += 1
+
+        row = self.trade_row
+        self.trade_sheet.cell(row=row, column=1, value=trade_id)
+        self.trade_sheet.cell(row=row, column=2, value=entry_time)
+        self.trade_sheet.cell(row=row, column=5, value=atm_strike)
+        self.trade_sheet.cell(row=row, column=6, value=spot_price)
+        self.trade_sheet.cell(row=row, column=7, value=ce_premium)
+        self.trade_sheet.cell(row=row, column=8, value=pe_premium)
+        self.trade_sheet.cell(row=row, column=9, value=round((ce_premium or 0) + (pe_premium or 0), 2))
+
+    def _apply_leg_action(self, trade_id, leg_type, action, time, strike, symbol,
+                          security_id, premium, quantity, order_status, notes):
+        row = self.leg_row
+
+        self.leg_sheet.cell(row=row, column=1, value=trade_id)
+        self.leg_sheet.cell(row=row, column=2, value=leg_type)
+        self.leg_sheet.cell(row=row, column=3, value=action)
+        self.leg_sheet.cell(row=row, column=4, value=time)
+        self.leg_sheet.cell(row=row, column=5, value=strike)
+        self.leg_sheet.cell(row=row, column=6, value=symbol)
+        self.leg_sheet.cell(row=row, column=7, value=security_id)
+        self.leg_sheet.cell(row=row, column=8, value=premium)
+        self.leg_sheet.cell(row=row, column=9, value=quantity)
+        self.leg_sheet.cell(row=row, column=10, value=order_status)
+        self.leg_sheet.cell(row=row, column=11, value=notes)
+
+        # Color code by action
+        action_cell = self.leg_sheet.cell(row=row, column=3)
+        if action == "SELL":
+            action_cell.font = Font(color="FF0000", bold=True)  # Red
+        elif action == "BUY":
+            action_cell.font = Font(color="00FF00", bold=True)  # Green
+
+        self.leg_row += 1
+
+    def _apply_hedge_entry(self, trade_id, leg_type, level, strike, entry_time,
+                           entry_premium, entry_loss_pct):
+        row = self.hedge_row
+
+        self.hedge_sheet.cell(row=row, column=1, value=trade_id)
+        self.hedge_sheet.cell(row=row, column=2, value=leg_type)
+        self.hedge_sheet.cell(row=row, column=3, value=level)
+        self.hedge_sheet.cell(row=row, column=4, value=strike)
+        self.hedge_sheet.cell(row=row, column=5, value=entry_time)
+        self.hedge_sheet.cell(row=row, column=6, value=entry_premium)
+        self.hedge_sheet.cell(row=row, column=7, value=entry_loss_pct)
+        # 🔥 REMOVED: Column 12 (buffer_target_pct) no longer exists
+
+        self.hedge_row += 1
+
+    def _apply_hedge_exit(self, trade_id, leg_type, level, exit_time, exit_premium,
+                          exit_loss_pct, duration, trail_activated, hedge_pnl, exit_reason):
+        # Find the corresponding hedge entry row (work backwards)
+        hedge_row_to_update = None
+        for row in range(self.hedge_row - 1, 1, -1):
+            if (self.hedge_sheet.cell(row=row, column=1).value == trade_id and
+                    self.hedge_sheet.cell(row=row, column=2).value == leg_type and
+                    self.hedge_sheet.cell(row=row, column=3).value == level and
+                    self.hedge_sheet.cell(row=row, column=8).value is None):  # No exit time yet
+                hedge_row_to_update = row
+                break
+
+        if not hedge_row_to_update:
+            print(f"   ⚠️ No open L{level} {leg_type} hedge row for trade #{trade_id}")
+            return
+
+        # Update exit details (columns shifted after buffer removal)
+        self.hedge_sheet.cell(row=hedge_row_to_update, column=8, value=exit_time)
+        self.hedge_sheet.cell(row=hedge_row_to_update, column=9, value=exit_premium)
+        self.hedge_sheet.cell(row=hedge_row_to_update, column=10, value=exit_loss_pct)
+        self.hedge_sheet.cell(row=hedge_row_to_update, column=11, value=duration)
+        self.hedge_sheet.cell(row=hedge_row_to_update, column=12, value="Yes" if trail_activated else "No")
+
+        pnl_cell = self.hedge_sheet.cell(row=hedge_row_to_update, column=13, value=hedge_pnl)
+        self.hedge_sheet.cell(row=hedge_row_to_update, column=14, value=exit_reason)
+
+        # Color code P&L
+        if hedge_pnl > 0:
+            pnl_cell.font = Font(color="00FF00", bold=True)
+        elif hedge_pnl < 0:
+            pnl_cell.font = Font(color="FF0000", bold=True)
+
+    def _apply_exit(self, trade_id, exit_time, duration, ce_exit_premium, pe_exit_premium,
+                    ce_pnl, pe_pnl, ce_hedge_pnl, pe_hedge_pnl, total_pnl, exit_reason,
+                    ce_hedges_used, pe_hedges_used):
+        row = self.trade_row
+
+        # Update exit details
+        self.trade_sheet.cell(row=row, column=3, value=exit_time)
+        self.trade_sheet.cell(row=row, column=4, value=duration)
+        self.trade_sheet.cell(row=row, column=10, value=ce_exit_premium)
+        self.trade_sheet.cell(row=row, column=11, value=pe_exit_premium)
+        self.trade_sheet.cell(row=row, column=12, value=ce_pnl)
+        self.trade_sheet.cell(row=row, column=13, value=pe_pnl)
+        self.trade_sheet.cell(row=row, column=14, value=ce_hedge_pnl)
+        self.trade_sheet.cell(row=row, column=15, value=pe_hedge_pnl)
+        self.trade_sheet.cell(row=row, column=16, value=round((ce_hedge_pnl or 0) + (pe_hedge_pnl or 0), 2))
+
+        pnl_cell = self.trade_sheet.cell(row=row, column=17, value=total_pnl)
+        self.trade_sheet.cell(row=row, column=18, value=exit_reason)
+        self.trade_sheet.cell(row=row, column=19, value=ce_hedges_used)
+        self.trade_sheet.cell(row=row, column=20, value=pe_hedges_used)
+
+        # Color code P&L
+        if total_pnl > 0:
+            pnl_cell.font = Font(color="00FF00", bold=True)
+        elif total_pnl < 0:
+            pnl_cell.font = Font(color="FF0000", bold=True)
+
+        # Move to next row
+        self.trade_row += 1
+
+    def _apply_manual_intervention(self, trade_id, intervention_type, leg_type, level, time, notes):
+        row = self.leg_row
+
+        self.leg_sheet.cell(row=row, column=1, value=trade_id)
+        self.leg_sheet.cell(row=row, column=2, value=leg_type)
+        self.leg_sheet.cell(row=row, column=3, value=intervention_type)
+        self.leg_sheet.cell(row=row, column=4, value=time)
+        self.leg_sheet.cell(row=row, column=5, value=0)  # Strike unknown
+        self.leg_sheet.cell(row=row, column=6, value=f"Manual L{level}")
+        self.leg_sheet.cell(row=row, column=7, value="")  # Security ID
+        self.leg_sheet.cell(row=row, column=8, value=0)  # Premium
+        self.leg_sheet.cell(row=row, column=9, value=config.LOT_SIZE)
+        self.leg_sheet.cell(row=row, column=10, value="MANUAL")
+        self.leg_sheet.cell(row=row, column=11, value=notes)
+
+        # Color code manual actions
+        action_cell = self.leg_sheet.cell(row=row, column=3)
+        action_cell.font = Font(color="FFA500", bold=True)  # Orange
+
+        self.leg_row += 1
+
+    def apply(self, row: Dict):
+        """Apply one journal row to the workbook"""
+        event = row['event']
+        handler = self.handlers.get(event)
+        if not handler:
+            return
+        kwargs = {name: row.get(name) for name in EVENT_FIELDS[event]}
+        handler(trade_id=row.get('trade_id'), **kwargs)
+
+    def save(self, filename: str):
+        self.wb.save(filename)
+        self.wb.close()
+
+
+def build_workbook(rows: List[Dict], filename: str) -> bool:
+    """Generate the Excel workbook from journal rows"""
+    try:
+        builder = WorkbookBuilder()
+        for row in rows:
+            try:
+                builder.apply(row)
+            except Exception as e:
+                print(f"   ⚠️ Skipping journal row ({row.get('event')}): {str(e)}")
+        builder.save(filename)
+        print(f"✅ Excel generated from journal: {filename} ({len(rows)} events)")
+        return True
+    except Exception as e:
+        print(f"❌ Error generating Excel: {str(e)}")
+        return False
+
+
+class ExcelLogger:
+    """Enhanced logger with detailed trade and hedge tracking"""
+
+    def __init__(self, filename: str = None):
+        """Initialize journal-backed Excel logger"""
+        # Use config file path or default
+        self.filename = filename or config.EXCEL_LOG_PATH
+        self.journal = TradeJournal()
+
+        # Continue trade numbering after a same-day restart
+        self.current_trade_id = self.journal.last_trade_id()
+
+        # Caller-side state (nothing read back from the workbook)
+        self.trade_entry_time = None
+        self.open_hedge_entries = {}  # (trade_id, leg_type, level) -> entry_time
+        self.trades_logged = 0
+        self.hedges_logged = 0
+        self.leg_actions_logged = 0
+
+        # ⚡ Background export
+        self.export_interval = config.EXCEL_EXPORT_INTERVAL_SECONDS
+        self.dirty = threading.Event()
+        self.stop_event = threading.Event()
+        self.exports = 0
+        self._closed = False
+
+        self.setup_workbook()
+
+        self.export_thread = threading.Thread(target=config.wrap(self._export_loop), name="ExcelExport", daemon=True)
+        self.export_thread.start()
+        atexit.register(self.close)
+
+    def setup_workbook(self):
+        """Backup previous workbook and generate today's from the journal"""
+        try:
+            # Backup existing file
+            if os.path.exists(self.filename):
+                backup_name = f"{self.filename.replace('.xlsx', '')}_backup_{config.get_current_ist_time().strftime('%Y%m%d_%H%M%S')}.xlsx"
+                os.rename(self.filename, backup_name)
+                print(f"📦 Backup created: {backup_name}")
+
+            self.export_workbook()
+            print(f"✅ Enhanced Excel initialized: {self.filename}")
+            print(f"   📊 3 sheets: Trades, Hedges, Legs (generated from journal)")
+            if self.current_trade_id:
+                print(f"   📓 Continuing after trade #{self.current_trade_id} from today's journal")
+
+        except Exception as e:
+            print(f"❌ Error setting up Excel: {str(e)}")
+
+    def export_workbook(self, filename: str = None, day=None) -> bool:
+        """Generate the workbook on demand from the journal (default: today)"""
+        ok = build_workbook(self.journal.read_day(day), filename or self.filename)
+        if ok:
+            self.exports += 1
+        return ok
+
+    def _submit(self, event: str, payload: dict):
+        """Append event to the journal (O(1), fsync'd) and mark Excel stale"""
+        payload['trade_id'] = payload.get('trade_id', self.current_trade_id)
+        try:
+            with latency.stage('journal_append'):
+                self.journal.append(event, payload)
+        except Exception as e:
+            print(f"   ⚠️ Journal append failed ({event}): {str(e)}")
+        self.dirty.set()
+
+    def _export_loop(self):
+        """Regenerate Excel off the trading thread when the journal changed"""
+        while not self.stop_event.wait(self.export_interval):
+            if self.dirty.is_set():
+                self.dirty.clear()
+                self.export_workbook()
+
+    # ------------------------------------------------------------------
+    # Public logging API (called from trading threads - no workbook I/O)
+    # ------------------------------------------------------------------
+
     def log_entry(self, entry_time: datetime, atm_strike: int, ce_premium: float,
                   pe_premium: float, spot_price: float):
         """Log straddle entry"""
         try:
             self.current_trade_id += 1
+            self.trade_entry_time = entry_time
+            self.trades_logged += 1
 
-            # Main trade sheet
-            self.trade_sheet.cell(row=self.trade_row, column=1, value=self.current_trade_id)
-            self.trade_sheet.cell(row=self.trade_row, column=2, value=entry_time.strftime('%Y-%m-%d %H:%M:%S'))
-            self.trade_sheet.cell(row=self.trade_row, column=5, value=atm_strike)
-            self.trade_sheet.cell(row=self.trade_row, column=6, value=round(spot_price, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=7, value=round(ce_premium, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=8, value=round(pe_premium, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=9, value=round(ce_premium + pe_premium, 2))
-
-            self.wb.save(self.filename)
+            self._submit('ENTRY', {
+                'entry_time': entry_time.strftime('%Y-%m-%d %H:%M:%S'),
+                'atm_strike': atm_strike,
+                'ce_premium': round(ce_premium, 2),
+                'pe_premium': round(pe_premium, 2),
+                'spot_price': round(spot_price, 2)
+            })
 
             print(f"\n{'=' * 80}")
             print(f"📝 TRADE #{self.current_trade_id} LOGGED TO EXCEL")
@@ -153,29 +389,19 @@ class ExcelLogger:
                        premium: float, quantity: int, order_status: str, notes: str = ""):
         """Log individual leg action (BUY/SELL)"""
         try:
-            row = self.leg_row
-
-            self.leg_sheet.cell(row=row, column=1, value=self.current_trade_id)
-            self.leg_sheet.cell(row=row, column=2, value=leg_type)
-            self.leg_sheet.cell(row=row, column=3, value=action)
-            self.leg_sheet.cell(row=row, column=4, value=time.strftime('%Y-%m-%d %H:%M:%S'))
-            self.leg_sheet.cell(row=row, column=5, value=strike)
-            self.leg_sheet.cell(row=row, column=6, value=symbol)
-            self.leg_sheet.cell(row=row, column=7, value=security_id)
-            self.leg_sheet.cell(row=row, column=8, value=round(premium, 2))
-            self.leg_sheet.cell(row=row, column=9, value=quantity)
-            self.leg_sheet.cell(row=row, column=10, value=order_status)
-            self.leg_sheet.cell(row=row, column=11, value=notes)
-
-            # Color code by action
-            action_cell = self.leg_sheet.cell(row=row, column=3)
-            if action == "SELL":
-                action_cell.font = Font(color="FF0000", bold=True)  # Red
-            elif action == "BUY":
-                action_cell.font = Font(color="00FF00", bold=True)  # Green
-
-            self.leg_row += 1
-            self.wb.save(self.filename)
+            self.leg_actions_logged += 1
+            self._submit('LEG_ACTION', {
+                'leg_type': leg_type,
+                'action': action,
+                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'strike': strike,
+                'symbol': symbol,
+                'security_id': security_id,
+                'premium': round(premium, 2),
+                'quantity': quantity,
+                'order_status': order_status,
+                'notes': notes
+            })
 
             print(f"   📋 Leg Action Logged: {action} {leg_type} @ ₹{premium:.2f} - {order_status}")
 
@@ -190,18 +416,17 @@ class ExcelLogger:
         Note: buffer_target_pct parameter kept for backward compatibility but ignored
         """
         try:
-            row = self.hedge_row
-
-            self.hedge_sheet.cell(row=row, column=1, value=self.current_trade_id)
-            self.hedge_sheet.cell(row=row, column=2, value=leg_type)
-            self.hedge_sheet.cell(row=row, column=3, value=level)
-            self.hedge_sheet.cell(row=row, column=4, value=strike)
-            self.hedge_sheet.cell(row=row, column=5, value=entry_time.strftime('%Y-%m-%d %H:%M:%S'))
-            self.hedge_sheet.cell(row=row, column=6, value=round(entry_premium, 2))
-            self.hedge_sheet.cell(row=row, column=7, value=round(entry_loss_pct, 2))
-            # 🔥 REMOVED: Column 12 (buffer_target_pct) no longer exists
-
-            self.wb.save(self.filename)
+            self.open_hedge_entries[(self.current_trade_id, leg_type, level)] = entry_time
+            self.hedges_logged += 1
+
+            self._submit('HEDGE_ENTRY', {
+                'leg_type': leg_type,
+                'level': level,
+                'strike': strike,
+                'entry_time': entry_time.strftime('%Y-%m-%d %H:%M:%S'),
+                'entry_premium': round(entry_premium, 2),
+                'entry_loss_pct': round(entry_loss_pct, 2)
+            })
 
             print(f"\n{'=' * 60}")
             print(f"🛡️ HEDGE L{level} ENTRY LOGGED - Trade #{self.current_trade_id}")
@@ -220,50 +445,30 @@ class ExcelLogger:
                        trail_activated: bool, hedge_pnl: float, exit_reason: str):
         """Log hedge exit"""
         try:
-            # Find the corresponding hedge entry row (work backwards)
-            hedge_row_to_update = None
-            for row in range(self.hedge_row - 1, 1, -1):
-                if (self.hedge_sheet.cell(row=row, column=1).value == self.current_trade_id and
-                        self.hedge_sheet.cell(row=row, column=2).value == leg_type and
-                        self.hedge_sheet.cell(row=row, column=3).value == level and
-                        self.hedge_sheet.cell(row=row, column=8).value is None):  # No exit time yet
-                    hedge_row_to_update = row
-                    break
-
-            if hedge_row_to_update:
-                # Calculate duration
-                entry_time_str = self.hedge_sheet.cell(row=hedge_row_to_update, column=5).value
-                entry_time = datetime.strptime(entry_time_str, '%Y-%m-%d %H:%M:%S')
-                duration = (exit_time - entry_time).total_seconds() / 60
-
-                # Update exit details (columns shifted after buffer removal)
-                self.hedge_sheet.cell(row=hedge_row_to_update, column=8, value=exit_time.strftime('%Y-%m-%d %H:%M:%S'))
-                self.hedge_sheet.cell(row=hedge_row_to_update, column=9, value=round(exit_premium, 2))
-                self.hedge_sheet.cell(row=hedge_row_to_update, column=10, value=round(exit_loss_pct, 2))
-                self.hedge_sheet.cell(row=hedge_row_to_update, column=11, value=round(duration, 1))
-                self.hedge_sheet.cell(row=hedge_row_to_update, column=12, value="Yes" if trail_activated else "No")
-
-                pnl_cell = self.hedge_sheet.cell(row=hedge_row_to_update, column=13, value=round(hedge_pnl, 2))
-                self.hedge_sheet.cell(row=hedge_row_to_update, column=14, value=exit_reason)
-
-                # Color code P&L
-                if hedge_pnl > 0:
-                    pnl_cell.font = Font(color="00FF00", bold=True)
-                elif hedge_pnl < 0:
-                    pnl_cell.font = Font(color="FF0000", bold=True)
-
-                self.hedge_row += 1
-                self.wb.save(self.filename)
-
-                print(f"\n{'=' * 60}")
-                print(f"✅ HEDGE L{level} EXIT LOGGED - Trade #{self.current_trade_id}")
-                print(f"{'=' * 60}")
-                print(f"   {leg_type} @ Exit Premium: ₹{exit_premium:.2f}")
-                print(f"   Duration: {duration:.1f} min")
-                print(f"   Trail: {'Yes' if trail_activated else 'No'}")
-                print(f"   Hedge P&L: ₹{hedge_pnl:.2f}")
-                print(f"   Reason: {exit_reason}")
-                print(f"{'=' * 60}\n")
+            entry_time = self.open_hedge_entries.pop((self.current_trade_id, leg_type, level), None)
+            duration = (exit_time - entry_time).total_seconds() / 60 if entry_time else 0
+
+            self._submit('HEDGE_EXIT', {
+                'leg_type': leg_type,
+                'level': level,
+                'exit_time': exit_time.strftime('%Y-%m-%d %H:%M:%S'),
+                'exit_premium': round(exit_premium, 2),
+                'exit_loss_pct': round(exit_loss_pct, 2),
+                'duration': round(duration, 1),
+                'trail_activated': trail_activated,
+                'hedge_pnl': round(hedge_pnl, 2),
+                'exit_reason': exit_reason
+            })
+
+            print(f"\n{'=' * 60}")
+            print(f"✅ HEDGE L{level} EXIT LOGGED - Trade #{self.current_trade_id}")
+            print(f"{'=' * 60}")
+            print(f"   {leg_type} @ Exit Premium: ₹{exit_premium:.2f}")
+            print(f"   Duration: {duration:.1f} min")
+            print(f"   Trail: {'Yes' if trail_activated else 'No'}")
+            print(f"   Hedge P&L: ₹{hedge_pnl:.2f}")
+            print(f"   Reason: {exit_reason}")
+            print(f"{'=' * 60}\n")
 
         except Exception as e:
             print(f"   ⚠️ Error logging hedge exit: {str(e)}")
@@ -274,33 +479,23 @@ class ExcelLogger:
         """Log trade exit with complete P&L breakdown"""
         try:
             # Calculate duration
-            entry_time_str = self.trade_sheet.cell(row=self.trade_row, column=2).value
-            entry_time = datetime.strptime(entry_time_str, '%Y-%m-%d %H:%M:%S')
+            entry_time = self.trade_entry_time or exit_time
             duration = (exit_time - entry_time).total_seconds() / 60
 
-            # Update exit details
-            self.trade_sheet.cell(row=self.trade_row, column=3, value=exit_time.strftime('%Y-%m-%d %H:%M:%S'))
-            self.trade_sheet.cell(row=self.trade_row, column=4, value=round(duration, 1))
-            self.trade_sheet.cell(row=self.trade_row, column=10, value=round(ce_exit_premium, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=11, value=round(pe_exit_premium, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=12, value=round(ce_pnl, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=13, value=round(pe_pnl, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=14, value=round(ce_hedge_pnl, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=15, value=round(pe_hedge_pnl, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=16, value=round(ce_hedge_pnl + pe_hedge_pnl, 2))
-
-            pnl_cell = self.trade_sheet.cell(row=self.trade_row, column=17, value=round(total_pnl, 2))
-            self.trade_sheet.cell(row=self.trade_row, column=18, value=exit_reason)
-            self.trade_sheet.cell(row=self.trade_row, column=19, value=ce_hedges_used)
-            self.trade_sheet.cell(row=self.trade_row, column=20, value=pe_hedges_used)
-
-            # Color code P&L
-            if total_pnl > 0:
-                pnl_cell.font = Font(color="00FF00", bold=True)
-            elif total_pnl < 0:
-                pnl_cell.font = Font(color="FF0000", bold=True)
-
-            self.wb.save(self.filename)
+            self._submit('EXIT', {
+                'exit_time': exit_time.strftime('%Y-%m-%d %H:%M:%S'),
+                'duration': round(duration, 1),
+                'ce_exit_premium': round(ce_exit_premium, 2),
+                'pe_exit_premium': round(pe_exit_premium, 2),
+                'ce_pnl': round(ce_pnl, 2),
+                'pe_pnl': round(pe_pnl, 2),
+                'ce_hedge_pnl': round(ce_hedge_pnl, 2),
+                'pe_hedge_pnl': round(pe_hedge_pnl, 2),
+                'total_pnl': round(total_pnl, 2),
+                'exit_reason': exit_reason,
+                'ce_hedges_used': ce_hedges_used,
+                'pe_hedges_used': pe_hedges_used
+            })
 
             print(f"\n{'=' * 80}")
             print(f"📊 TRADE #{self.current_trade_id} EXIT LOGGED")
@@ -314,8 +509,7 @@ class ExcelLogger:
             print(f"   CE Hedges Used: {ce_hedges_used} | PE Hedges Used: {pe_hedges_used}")
             print(f"{'=' * 80}\n")
 
-            # Move to next row
-            self.trade_row += 1
+            self.trade_entry_time = None
 
         except Exception as e:
             print(f"❌ Error logging exit: {str(e)}")
@@ -333,41 +527,44 @@ class ExcelLogger:
             notes: Additional notes
         """
         try:
-            row = self.leg_row
-
-            self.leg_sheet.cell(row=row, column=1, value=self.current_trade_id)
-            self.leg_sheet.cell(row=row, column=2, value=leg_type)
-            self.leg_sheet.cell(row=row, column=3, value=intervention_type)
-            self.leg_sheet.cell(row=row, column=4, value=time.strftime('%Y-%m-%d %H:%M:%S'))
-            self.leg_sheet.cell(row=row, column=5, value=0)  # Strike unknown
-            self.leg_sheet.cell(row=row, column=6, value=f"Manual L{level}")
-            self.leg_sheet.cell(row=row, column=7, value="")  # Security ID
-            self.leg_sheet.cell(row=row, column=8, value=0)  # Premium
-            self.leg_sheet.cell(row=row, column=9, value=config.LOT_SIZE)
-            self.leg_sheet.cell(row=row, column=10, value="MANUAL")
-            self.leg_sheet.cell(row=row, column=11, value=notes)
-
-            # Color code manual actions
-            action_cell = self.leg_sheet.cell(row=row, column=3)
-            action_cell.font = Font(color="FFA500", bold=True)  # Orange
-
-            self.leg_row += 1
-            self.wb.save(self.filename)
+            self.leg_actions_logged += 1
+            self._submit('MANUAL', {
+                'intervention_type': intervention_type,
+                'leg_type': leg_type,
+                'level': level,
+                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'notes': notes
+            })
 
             print(f"   📋 Manual Intervention Logged: {intervention_type} {leg_type} L{level}")
 
         except Exception as e:
             print(f"   ⚠️ Error logging manual intervention: {str(e)}")
 
+    def log_order_latency(self, row: Dict):
+        """⏱️ Tick-to-trade timing of one order (journal only - not in the workbook)"""
+        try:
+            self._submit('ORDER_LATENCY', dict(row))
+            if row.get('latency_ms') is not None:
+                tick_age = f" (+{row['tick_age_ms']:.0f}ms tick age)" if row.get('tick_age_ms') is not None else ""
+                print(f"   ⏱️ {row['action']} {row['order_id']}: trigger → fill {row['latency_ms']:.0f}ms{tick_age}")
+        except Exception as e:
+            print(f"   ⚠️ Error logging order latency: {str(e)}")
+
     def close(self):
-        """Close workbook"""
+        """Final export from journal and close journal"""
+        if self._closed:
+            return
+        self._closed = True
         try:
-            if self.wb:
-                self.wb.save(self.filename)
-                self.wb.close()
-                print(f"✅ Excel closed: {self.filename}")
-                print(f"   📊 {self.trade_row - 2} trades logged")
-                print(f"   🛡️ {self.hedge_row - 2} hedges logged")
-                print(f"   📋 {self.leg_row - 2} leg actions logged")
+            self.stop_event.set()
+            self.export_thread.join(timeout=30)
+
+            self.export_workbook()
+            self.journal.close()
+            print(f"✅ Excel closed: {self.filename} ({self.exports} exports)")
+            print(f"   📊 {self.trades_logged} trades logged")
+            print(f"   🛡️ {self.hedges_logged} hedges logged")
+            print(f"   📋 {self.leg_actions_logged} leg actions logged")
         except Exception as e:
             print(f"❌ Error closing Excel: {str(e)}")
@@ -0,0 +1,191 @@
+"""
+Exit Engine - CONCURRENT STRADDLE SQUARE-OFF
+✅ All closing orders fired together from a shared worker pool (no per-exit thread creation)
+✅ Margin-safe ordering: a leg's protective (bought) hedge is sold only after that leg's buy-back fills
+   (EXIT_HEDGES_AFTER_LEGS=false fires all four at once)
+   - a leg that fails to close keeps its hedge - never left short AND unhedged
+   - legs already bought back (leg.is_active False, earlier partial exit) only get their hedge closed
+   - sold hedges (HEDGE_SIDE=SELL) are bought back together with the legs
+✅ Each order = place_order_with_verification(is_critical) → 3 attempts + WebSocket fill wait
+✅ Fill prices for the whole square-off from ONE order book call (no per-order sleep + fetch)
+✅ Orders join the caller's latency span (ORDER_LATENCY journal rows as before)
+
+Usage:
+    orders = exit_engine.square_off([ce_leg, pe_leg])
+    orders['CE'].filled, orders['CE'].price, orders['CE_HEDGE'].price
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+import threading
+import time
+from leg import Leg
+from angelone_api import api
+from config import config
+from latency_tracker import latency
+from bot_logging import get_logger
+
+log = get_logger('exit_engine')
+
+
+class ExitOrder:
+    """One closing order of a square-off"""
+
+    def __init__(self, name: str, symbol: str, security_id: str, side: str, quantity: int,
+                 last_premium: float):
+        self.name = name                  # CE / PE / CE_HEDGE / PE_HEDGE
+        self.symbol = symbol
+        self.security_id = security_id
+        self.side = side                  # BUY = cover short leg / sold hedge, SELL = close bought hedge
+        self.quantity = quantity
+        self.last_premium = last_premium  # Fallback when no fill price is available
+
+        self.submitted = False
+        self.result: Optional[Dict] = None
+        self.fill_price: Optional[float] = None
+        self.elapsed_ms = 0.0
+
+    @property
+    def success(self) -> bool:
+        return bool(self.result and self.result.get('success'))
+
+    @property
+    def filled(self) -> bool:
+        return bool(self.result and self.result.get('filled'))
+
+    @property
+    def order_id(self) -> Optional[str]:
+        return self.result.get('order_id') if self.result else None
+
+    @property
+    def message(self) -> str:
+        return self.result.get('message', 'Unknown error') if self.result else 'Not sent'
+
+    @property
+    def price(self) -> float:
+        """Actual fill price, else the last known premium"""
+        return self.fill_price if self.fill_price else self.last_premium
+
+
+class ExitEngine:
+    """Fires a straddle's closing orders concurrently"""
+
+    def __init__(self):
+        self.pool: Optional[ThreadPoolExecutor] = None
+        self.pool_lock = threading.Lock()
+
+        # Stats
+        self.square_offs = 0
+        self.orders_sent = 0
+        self.orders_failed = 0
+        self.hedges_kept = 0
+        self.last_elapsed_ms = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self.pool_lock:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=max(1, config.EXIT_WORKERS),
+                                               thread_name_prefix='exit')
+            return self.pool
+
+    def square_off(self, legs: List[Leg]) -> Dict[str, ExitOrder]:
+        """
+        Close the given short legs (those still open) and their active hedges
+        Returns {name: ExitOrder} for every order that was sent
+        """
+        covers = [ExitOrder(leg.name, leg.symbol, leg.security_id, 'BUY', config.LOT_SIZE, leg.current_premium)
+                  for leg in legs if leg.is_active]
+        hedges = {
+            leg.name: ExitOrder(f"{leg.name}_HEDGE", leg.hedge_symbol, leg.hedge_security_id,
+                                leg.hedge_side.exit_side, leg.lot_size, leg.hedge_current_premium)
+            for leg in legs if leg.hedge_active
+        }
+        # Protective hedges wait for their leg's fill, the rest go out with the legs
+        deferred = {
+            leg.name: hedges[leg.name] for leg in legs
+            if leg.is_active and leg.hedge_active and leg.hedge_side.protective and config.EXIT_HEDGES_AFTER_LEGS
+        }
+
+        span = latency.current()
+        started = time.monotonic()
+        first_wave = covers + [order for name, order in hedges.items() if name not in deferred]
+        log.info(f"   ⚡ Firing {len(first_wave)} exit orders concurrently: "
+                 f"{', '.join(order.name for order in first_wave)}")
+
+        futures = {self._submit(order, span): order for order in first_wave}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                order = futures[future]
+                self._report(order)
+
+                hedge = deferred.get(order.name)
+                if hedge is None or hedge.submitted:
+                    continue
+                if order.filled:
+                    # Leg is flat - its hedge no longer carries margin
+                    follow_up = self._submit(hedge, span)
+                    futures[follow_up] = hedge
+                    pending.add(follow_up)
+                else:
+                    self.hedges_kept += 1
+                    log.error(f"   🚨 {order.name} buy-back not filled - keeping {hedge.symbol} hedge open "
+                              f"(MANUAL INTERVENTION REQUIRED)")
+
+        sent = [order for order in covers + list(hedges.values()) if order.submitted]
+        prices = api.get_order_fill_prices([order.order_id for order in sent if order.filled])
+        for order in sent:
+            order.fill_price = prices.get(str(order.order_id)) if order.order_id else None
+
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.square_offs += 1
+        self.last_elapsed_ms = round(elapsed_ms, 1)
+        latency.record('exit_square_off', elapsed_ms)
+        log.info(f"   ⚡ Square-off: {sum(order.filled for order in sent)}/{len(sent)} filled "
+                 f"in {elapsed_ms:.0f}ms " + ' | '.join(f"{order.name} {order.elapsed_ms:.0f}ms" for order in sent))
+        return {order.name: order for order in sent}
+
+    def _submit(self, order: ExitOrder, span):
+        order.submitted = True
+        self.orders_sent += 1
+        return self._executor().submit(config.wrap(self._send), order, span)
+
+    def _send(self, order: ExitOrder, span):
+        """Worker: one critical order, timed into the exit span"""
+        latency.attach(span)
+        started = time.monotonic()
+        try:
+            order.result = api.place_order_with_verification(
+                transaction_type=order.side,
+                symbol=order.symbol,
+                security_id=order.security_id,
+                quantity=order.quantity,
+                is_critical=True,  # 3 attempts + recovery via _handle_api_error
+                max_wait=config.EXIT_FILL_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            order.result = {'success': False, 'order_id': None, 'message': f'Exception: {e}', 'filled': False}
+        finally:
+            order.elapsed_ms = (time.monotonic() - started) * 1000
+            latency.detach()
+
+    def _report(self, order: ExitOrder):
+        if order.filled:
+            log.info(f"   ✅ {order.name} {order.side} filled ({order.symbol}) in {order.elapsed_ms:.0f}ms")
+        else:
+            self.orders_failed += 1
+            log.error(f"   ❌ {order.name} {order.side} FAILED ({order.symbol}): {order.message}")
+
+    def get_stats(self) -> Dict:
+        return {
+            'square_offs': self.square_offs,
+            'orders_sent': self.orders_sent,
+            'orders_failed': self.orders_failed,
+            'hedges_kept': self.hedges_kept,
+            'last_elapsed_ms': self.last_elapsed_ms,
+        }
+
+
+# Global instance
+exit_engine = ExitEngine()
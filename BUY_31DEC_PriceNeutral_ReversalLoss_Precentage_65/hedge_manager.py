@@ -10,15 +10,26 @@ Exit L1 at 0%, Exit L2 at 20%
 🔥 MODIFIED: Hedge placed on LOSING side (same option type)
 🔥 MODIFIED: Strike selection finds OTM on losing side
 🔥 MODIFIED: Order types changed (BUY to enter, SELL to exit)
+🧩 Direction is the leg's hedge side plug-in (hedge_side.py) - HEDGE_SIDE=SELL runs the
+   SELL variant (profit-side strike, SELL to enter, BUY to exit) through the same plan / execute path
 
 """
 
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from leg import Leg
+from hedge_side import hedge_side
 from angelone_api import api
 from config import config
+from option_chain_arrays import ChainArrays
+from latency_tracker import latency
+from lock_manager import LockTimeout, leg_key, instrument_key
+from bot_logging import get_logger
+import threading
 import time
 
+log = get_logger('hedge_manager')
+
+
 class HedgeManager:
     """Manages hedge BUYING and holding logic WITH REVERSAL EXITS + UPGRADES"""
 
@@ -26,99 +37,109 @@ class HedgeManager:
         """Initialize hedge manager"""
         self.hedge_events = []
 
+    def process_hedging(self, ce_leg: Leg, pe_leg: Leg, option_chain: Dict) -> List[Dict]:
+        """
+        ⚡ Both legs per candle: decide first, then fire the order batch together
+        1. PLAN  - each leg's hedge decision from the same candle (no orders, no state changes)
+        2. FIRE  - one worker per planned leg (own leg lock + latency span), awaited together
+        A gap move needing CE and PE action no longer queues the second leg behind the first leg's fills
+        """
+        plans = []
+        for losing_leg, profit_leg in ((ce_leg, pe_leg), (pe_leg, ce_leg)):
+            latency.begin('HEDGE', losing_leg.symbol)
+            plan = self.plan_leg_hedging(losing_leg, profit_leg, option_chain)
+            span = latency.detach()
+            if plan:
+                plan['span'] = span
+                plans.append(plan)
+
+        if len(plans) == 1:
+            event = self._execute_in_span(plans[0])
+            return [event] if event else []
+
+        results = {}
+        workers = [
+            threading.Thread(target=config.wrap(lambda p=plan: results.__setitem__(p['leg'].name, self._execute_in_span(p))),
+                             name=f"hedge-{plan['leg'].name}")
+            for plan in plans
+        ]
+        log.info(f"⚡ Firing {len(workers)} hedge actions concurrently: "
+                 f"{', '.join(plan['leg'].name + ' ' + plan['action'] for plan in plans)}")
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return [results[plan['leg'].name] for plan in plans if results.get(plan['leg'].name)]
+
     def process_leg_hedging(self, losing_leg: Leg, profit_leg: Leg, option_chain: Dict) -> Optional[Dict]:
         """
-        ✅ MODIFIED: Process hedging with UPGRADE + REVERSAL EXIT logic
+        ✅ MODIFIED: Process hedging with UPGRADE + REVERSAL EXIT logic (one leg, plan + execute inline)
 
         Args:
             losing_leg: The leg that's losing (CE or PE)
             profit_leg: The opposing leg that's in profit
             option_chain: Current option chain data
         """
+        plan = self.plan_leg_hedging(losing_leg, profit_leg, option_chain)
+        return self.execute_plan(plan) if plan else None
+
+    def _execute_in_span(self, plan: Dict) -> Optional[Dict]:
+        """Worker body - the plan's latency span is carried onto this thread"""
+        latency.attach(plan.get('span'))
+        try:
+            return self.execute_plan(plan)
+        except Exception as e:
+            log.exception(f"❌ [{plan['leg'].name}] Hedge {plan['action']} failed: {e}")
+            return None
+        finally:
+            latency.end()
+
+    # ------------------------------------------------------------------
+    # PLAN - decisions only
+    # ------------------------------------------------------------------
+
+    def plan_leg_hedging(self, losing_leg: Leg, profit_leg: Leg, option_chain: Dict) -> Optional[Dict]:
+        """
+        Decide this leg's hedge action for the candle
+        Returns {'action': 'UPGRADE' | 'EXIT' | 'ENTRY', 'leg', 'level', hedge contract...} or None
+        """
         loss_pct = losing_leg.current_loss_pct
 
         if losing_leg.hedge_active:
             # ✅ CASE 1: Hedge is ACTIVE - Check for UPGRADE or EXIT
-            should_upgrade = False
-            target_level = None
-
-            # ✅ CHECK FOR UPGRADE CONDITIONS
             if losing_leg.hedge_level == 1 and loss_pct >= config.PROGRESSIVE_HEDGING_LEVELS[1]:  # 40%
                 # L1 active, but loss reached L2 threshold (40%)
-                should_upgrade = True
-                target_level = 2
-                print(f"⚠️  [{losing_leg.name}] L1 → L2 UPGRADE TRIGGERED!")
-                print(f"   Current Loss: {loss_pct:.1f}% | L2 Trigger: {config.PROGRESSIVE_HEDGING_LEVELS[1]:.0f}%")
+                log.warning(f"⚠️  [{losing_leg.name}] L1 → L2 UPGRADE TRIGGERED!")
+                log.info(f"   Current Loss: {loss_pct:.1f}% | L2 Trigger: {config.PROGRESSIVE_HEDGING_LEVELS[1]:.0f}%")
+                latency.trigger('HEDGE_UPGRADE', losing_leg.symbol, tick_ts=api.get_tick_time(losing_leg.security_id))
 
-            elif losing_leg.hedge_level == 2 and loss_pct >= config.LEVEL_3_HARD_STOP:  # 60%
+                # New hedge is priced from the legs alone (hedge excluded) - plan it now
+                # No contract found → still square off L1 (as before), nothing to enter
+                entry = self._plan_hedge_entry(losing_leg, profit_leg, option_chain, level=2)
+                return {**(entry or {'leg': losing_leg, 'level': 2}), 'action': 'UPGRADE'}
+
+            if losing_leg.hedge_level == 2 and loss_pct >= config.LEVEL_3_HARD_STOP:  # 60%
                 # L2 active, but loss reached L3 threshold (60%) - Complete exit handled by main script
-                should_upgrade = False  # L3 is complete exit, not upgrade
-                print(f"🚨 [{losing_leg.name}] LEVEL 3 TRIGGER - Complete exit required!")
-
-            # ✅ EXECUTE UPGRADE
-            if should_upgrade and target_level:
-                print(f"📊 Squaring off L{losing_leg.hedge_level} hedge...")
-
-                # Calculate P&L before closing
-                current_hedge_pnl = 0
-                if losing_leg.hedge_entry_premium and losing_leg.hedge_current_premium:
-                    # ✅ MODIFIED: BUY hedge P&L (current - entry)
-                    current_hedge_pnl = (losing_leg.hedge_current_premium - losing_leg.hedge_entry_premium) * losing_leg.lot_size
-                    losing_leg.realized_hedge_pnl += current_hedge_pnl
-                print(f"   L{losing_leg.hedge_level} Hedge P&L: ₹{current_hedge_pnl:,.0f}")
-
-                # Get current hedge premium for exit
-                exit_premium = api.get_ltp_with_retry(losing_leg.hedge_security_id)
-                if not exit_premium:
-                    print(f"⚠️  Using last known premium for exit")
-                    exit_premium = losing_leg.hedge_current_premium
-
-                # ✅ MODIFIED: Place exit order (SELL the bought hedge)
-                success, order_id = self._place_hedge_exit_order(
-                    losing_leg.hedge_symbol,
-                    losing_leg.hedge_security_id,
-                    losing_leg.lot_size
-                )
-
-                if success:
-                    print(f"✅ L{losing_leg.hedge_level} squared off successfully")
-
-                    # Get actual fill price if available
-                    if order_id:
-                        time.sleep(1)
-                        actual_exit_price = api.get_order_fill_price(order_id)
-                        if actual_exit_price:
-                            exit_premium = actual_exit_price
-                            print(f"   💰 Actual exit price: ₹{actual_exit_price:.2f}")
-
-                    # Save old level for logging
-                    old_level = losing_leg.hedge_level
-
-                    # Reset hedge state (but preserve loading states)
-                    losing_leg.hedge_active = False
-                    losing_leg.hedge_symbol = None
-                    losing_leg.hedge_security_id = None
-                    losing_leg.hedge_strike = None
-                    losing_leg.hedge_entry_premium = None
-                    losing_leg.hedge_current_premium = None
-
-                    print(f"🎯 Entering L{target_level} hedge immediately...")
-                    print(f"   Loading State: L1={'LOADED' if losing_leg.l1_loaded else 'UNLOADED'}, L2={'LOADED' if losing_leg.l2_loaded else 'UNLOADED'}")
-
-                    # ✅ IMMEDIATELY ENTER NEW LEVEL
-                    return self._check_hedge_entry(losing_leg, profit_leg, option_chain, force_level=target_level)
-                else:
-                    print(f"❌ Failed to square off L{losing_leg.hedge_level} - Cannot upgrade!")
-                    return None
-            else:
-                # ✅ No upgrade needed, check for reversal exit
-                return self._check_hedge_exit(losing_leg)
+                log.error(f"🚨 [{losing_leg.name}] LEVEL 3 TRIGGER - Complete exit required!")
+                return None
 
-        else:
-            # ✅ CASE 2: No hedge active - Check for entry trigger
-            return self._check_hedge_entry(losing_leg, profit_leg, option_chain)
+            # ✅ No upgrade needed, check for reversal exit
+            return self._plan_hedge_exit(losing_leg)
+
+        # ✅ CASE 2: No hedge active - Check for entry trigger
+        if not losing_leg.should_enter_hedge():
+            return None
+
+        # Determine level from next stop loss
+        level = self._get_level_from_stop_loss(losing_leg.next_stop_loss_pct)
+        if level > 2:
+            log.error(f"\n🚨 {losing_leg.name} at Level 3 ({losing_leg.current_loss_pct:.1f}%) - NO HEDGE AVAILABLE!")
+            return None
 
-    def _check_hedge_exit(self, losing_leg: Leg) -> Optional[Dict]:
+        latency.trigger('HEDGE_ENTRY', losing_leg.symbol, tick_ts=api.get_tick_time(losing_leg.security_id))
+        return self._plan_hedge_entry(losing_leg, profit_leg, option_chain, level)
+
+    def _plan_hedge_exit(self, losing_leg: Leg) -> Optional[Dict]:
         """Check if active hedge should be exited due to reversal"""
         # Get the hedge level
         if not hasattr(losing_leg, 'hedge_level') or losing_leg.hedge_level is None:
@@ -131,100 +152,188 @@ class HedgeManager:
             # L1 hedge: Exit when loss retraces by configured % from L1 entry
             exit_threshold = config.PROGRESSIVE_HEDGING_LEVELS[0] - config.HEDGE_REVERSAL_EXIT_PCT
             if losing_leg.current_loss_pct <= exit_threshold:
-                print(f"\n🔄 L1 REVERSAL EXIT - {losing_leg.name} retraced to {losing_leg.current_loss_pct:.1f}%")
-                print(f"   (Entry: {config.PROGRESSIVE_HEDGING_LEVELS[0]:.0f}%, Exit: {exit_threshold:.0f}%, Retrace: {config.HEDGE_REVERSAL_EXIT_PCT:.0f}%)")
+                log.info(f"\n🔄 L1 REVERSAL EXIT - {losing_leg.name} retraced to {losing_leg.current_loss_pct:.1f}%")
+                log.info(f"   (Entry: {config.PROGRESSIVE_HEDGING_LEVELS[0]:.0f}%, Exit: {exit_threshold:.0f}%, Retrace: {config.HEDGE_REVERSAL_EXIT_PCT:.0f}%)")
                 exit_triggered = True
 
         elif losing_leg.hedge_level == 2:
             # L2 hedge: Exit when loss retraces by configured % from L2 entry
             exit_threshold = config.PROGRESSIVE_HEDGING_LEVELS[1] - config.HEDGE_REVERSAL_EXIT_PCT
             if losing_leg.current_loss_pct <= exit_threshold:
-                print(f"\n🔄 L2 REVERSAL EXIT - {losing_leg.name} retraced to {losing_leg.current_loss_pct:.1f}%")
-                print(f"   (Entry: {config.PROGRESSIVE_HEDGING_LEVELS[1]:.0f}%, Exit: {exit_threshold:.0f}%, Retrace: {config.HEDGE_REVERSAL_EXIT_PCT:.0f}%)")
+                log.info(f"\n🔄 L2 REVERSAL EXIT - {losing_leg.name} retraced to {losing_leg.current_loss_pct:.1f}%")
+                log.info(f"   (Entry: {config.PROGRESSIVE_HEDGING_LEVELS[1]:.0f}%, Exit: {exit_threshold:.0f}%, Retrace: {config.HEDGE_REVERSAL_EXIT_PCT:.0f}%)")
                 exit_triggered = True
 
-        if exit_triggered:
-            # Close the hedge
-            exit_premium = api.get_ltp_with_retry(losing_leg.hedge_security_id)
-            if not exit_premium:
-                print(f"⚠️  Using last known premium for reversal exit")
-                exit_premium = losing_leg.hedge_current_premium
-
-            # ✅ MODIFIED: SELL the bought hedge
-            success, order_id = self._place_hedge_exit_order(
-                losing_leg.hedge_symbol,
-                losing_leg.hedge_security_id,
-                losing_leg.lot_size
-            )
-
-            if success:
-                # Get actual exit price if available
-                if order_id:
-                    time.sleep(1)
-                    actual_exit_price = api.get_order_fill_price(order_id)
-                    if actual_exit_price:
-                        exit_premium = actual_exit_price
-                        print(f"   💰 Hedge actual exit: ₹{actual_exit_price:.2f}")
-
-                # Close hedge in leg
-                losing_leg.close_hedge(exit_premium)
-
-                # Record exit event
-                exit_event = {
-                    'type': 'HEDGE_EXIT',
-                    'leg': losing_leg.name,
-                    'level': losing_leg.hedge_level,
-                    'exit_premium': exit_premium,
-                    'current_loss_pct': losing_leg.current_loss_pct,
-                    'timestamp': time.time()
-                }
-                self.hedge_events.append(exit_event)
-
-                return exit_event
-
-        # No exit triggered, hold hedge
-        return None
-
-    def _check_hedge_entry(self, losing_leg: Leg, profit_leg: Leg, option_chain: Dict, force_level: int = None) -> Optional[Dict]:
-        """✅ MODIFIED: Check if hedge should be entered (BUY hedge on LOSING side)"""
-
-        # ✅ Determine which level to enter
-        if force_level is not None:
-            # Forced level (used for upgrades)
-            level = force_level
-            print(f"   Using FORCED level: L{level} (upgrade path)")
-        else:
-            # Normal entry - check if should buy hedge
-            if not losing_leg.should_buy_hedge():
-                return None
-
-            # Determine level from next stop loss
-            level = self._get_level_from_stop_loss(losing_leg.next_stop_loss_pct)
+        if not exit_triggered:
+            return None  # Hold hedge
 
-        # Level check for 2-level system
-        if level > 2:
-            print(f"\n🚨 {losing_leg.name} at Level 3 ({losing_leg.current_loss_pct:.1f}%) - NO HEDGE AVAILABLE!")
-            return None
+        latency.trigger('HEDGE_EXIT', losing_leg.symbol, tick_ts=api.get_tick_time(losing_leg.security_id))
+        return {'action': 'EXIT', 'leg': losing_leg, 'level': losing_leg.hedge_level}
 
-        # ✅ MODIFIED: Find OTM strike on LOSING side with target premium
-        hedge_strike, target_premium = self._calculate_hedge_strike_losing_side(
+    def _plan_hedge_entry(self, losing_leg: Leg, profit_leg: Leg, option_chain: Dict, level: int) -> Optional[Dict]:
+        """✅ MODIFIED: Pick the hedge contract (BUY: losing side, SELL: profit side)"""
+        # ✅ MODIFIED: Find the hedge-side strike with target premium
+        hedge_strike, target_premium = self._calculate_hedge_strike(
             losing_leg, profit_leg, option_chain, level
         )
 
-        # ✅ MODIFIED: Get hedge details from SAME option type (losing side)
+        # ✅ MODIFIED: Option type from the hedge side (BUY: SAME type, SELL: opposite)
         hedge_symbol, hedge_security_id, hedge_premium = self._get_hedge_from_chain(
-            option_chain, hedge_strike, losing_leg.option_type  # SAME type, not opposite!
+            option_chain, hedge_strike, losing_leg.hedge_side.hedge_type(losing_leg)
         )
 
         if not hedge_symbol:
-            print(f"❌ Could not find hedge in option chain for {losing_leg.name}")
+            log.error(f"❌ Could not find hedge in option chain for {losing_leg.name}")
             return None
 
-        # ✅ MODIFIED: Place BUY order (buying hedge)
-        success, order_id = self._place_hedge_order(hedge_symbol, hedge_security_id, losing_leg.lot_size)
+        return {
+            'action': 'ENTRY',
+            'leg': losing_leg,
+            'level': level,
+            'hedge_strike': hedge_strike,
+            'hedge_symbol': hedge_symbol,
+            'hedge_security_id': hedge_security_id,
+            'hedge_premium': hedge_premium,
+        }
+
+    # ------------------------------------------------------------------
+    # EXECUTE - orders + leg state (under the leg's lock)
+    # ------------------------------------------------------------------
+
+    def execute_plan(self, plan: Dict) -> Optional[Dict]:
+        """Run one planned action - 🔒 holds only this leg's lock"""
+        leg = plan['leg']
+        try:
+            with api.locks.hold(f"HEDGE_{plan['action']}_{leg.name}", [leg_key(leg.name)]):
+                # Leg may have changed since the plan (menu action) - act only on the state it was planned for
+                if leg.hedge_active != (plan['action'] in ('UPGRADE', 'EXIT')):
+                    log.warning(f"⚠️ [{leg.name}] Hedge state changed since plan - {plan['action']} skipped")
+                    return None
+                if plan['action'] == 'UPGRADE':
+                    return self._execute_upgrade(plan)
+                if plan['action'] == 'EXIT':
+                    return self._execute_exit(plan)
+                return self._execute_entry(plan)
+        except LockTimeout as e:
+            log.warning(f"⚠️ [{leg.name}] Hedge {plan['action']} skipped this candle - {e}")
+            return None
+
+    def _execute_upgrade(self, plan: Dict) -> Optional[Dict]:
+        """Square off the current hedge, then enter the planned next level immediately"""
+        losing_leg = plan['leg']
+        log.info(f"📊 Squaring off L{losing_leg.hedge_level} hedge...")
+
+        # Calculate P&L before closing
+        current_hedge_pnl = 0
+        if losing_leg.hedge_entry_premium and losing_leg.hedge_current_premium:
+            # ✅ MODIFIED: Hedge-side P&L (BUY: current - entry)
+            current_hedge_pnl = losing_leg.hedge_pnl(losing_leg.hedge_current_premium)
+            losing_leg.realized_hedge_pnl += current_hedge_pnl
+        log.info(f"   L{losing_leg.hedge_level} Hedge P&L: ₹{current_hedge_pnl:,.0f}")
+
+        # Get current hedge premium for exit
+        exit_premium = api.get_ltp_with_retry(losing_leg.hedge_security_id)
+        if not exit_premium:
+            log.warning(f"⚠️  Using last known premium for exit")
+            exit_premium = losing_leg.hedge_current_premium
+
+        # ✅ MODIFIED: Place exit order (SELL a bought hedge / BUY back a sold one)
+        success, order_id = self._place_hedge_exit_order(
+            losing_leg.hedge_symbol,
+            losing_leg.hedge_security_id,
+            losing_leg.lot_size,
+            side=losing_leg.hedge_side
+        )
 
         if not success:
-            print(f"❌ Failed to place hedge order for {losing_leg.name}")
+            log.error(f"❌ Failed to square off L{losing_leg.hedge_level} - Cannot upgrade!")
+            return None
+
+        log.info(f"✅ L{losing_leg.hedge_level} squared off successfully")
+
+        # Get actual fill price if available
+        if order_id:
+            time.sleep(1)
+            actual_exit_price = api.get_order_fill_price(order_id)
+            if actual_exit_price:
+                exit_premium = actual_exit_price
+                log.info(f"   💰 Actual exit price: ₹{actual_exit_price:.2f}")
+
+        # Reset hedge state (but preserve loading states)
+        losing_leg.hedge_active = False
+        losing_leg.hedge_symbol = None
+        losing_leg.hedge_security_id = None
+        losing_leg.hedge_strike = None
+        losing_leg.hedge_entry_premium = None
+        losing_leg.hedge_current_premium = None
+
+        log.info(f"🎯 Entering L{plan['level']} hedge immediately...")
+        log.info(f"   Loading State: L1={'LOADED' if losing_leg.l1_loaded else 'UNLOADED'}, L2={'LOADED' if losing_leg.l2_loaded else 'UNLOADED'}")
+
+        # ✅ IMMEDIATELY ENTER NEW LEVEL
+        if not plan.get('hedge_symbol'):
+            return None
+        return self._execute_entry(plan)
+
+    def _execute_exit(self, plan: Dict) -> Optional[Dict]:
+        """Close the hedge on reversal"""
+        losing_leg = plan['leg']
+
+        # Close the hedge
+        exit_premium = api.get_ltp_with_retry(losing_leg.hedge_security_id)
+        if not exit_premium:
+            log.warning(f"⚠️  Using last known premium for reversal exit")
+            exit_premium = losing_leg.hedge_current_premium
+
+        # ✅ MODIFIED: Close the hedge (hedge side's exit order)
+        success, order_id = self._place_hedge_exit_order(
+            losing_leg.hedge_symbol,
+            losing_leg.hedge_security_id,
+            losing_leg.lot_size,
+            side=losing_leg.hedge_side
+        )
+
+        if not success:
+            return None
+
+        # Get actual exit price if available
+        if order_id:
+            time.sleep(1)
+            actual_exit_price = api.get_order_fill_price(order_id)
+            if actual_exit_price:
+                exit_premium = actual_exit_price
+                log.info(f"   💰 Hedge actual exit: ₹{actual_exit_price:.2f}")
+
+        # Close hedge in leg
+        losing_leg.close_hedge(exit_premium)
+
+        # Record exit event
+        exit_event = {
+            'type': 'HEDGE_EXIT',
+            'leg': losing_leg.name,
+            'level': losing_leg.hedge_level,
+            'exit_premium': exit_premium,
+            'current_loss_pct': losing_leg.current_loss_pct,
+            'timestamp': time.time()
+        }
+        self.hedge_events.append(exit_event)
+
+        return exit_event
+
+    def _execute_entry(self, plan: Dict) -> Optional[Dict]:
+        """✅ MODIFIED: Enter the planned hedge (BUY on the LOSING side by default)"""
+        losing_leg = plan['leg']
+        level = plan['level']
+        hedge_symbol = plan['hedge_symbol']
+        hedge_security_id = plan['hedge_security_id']
+        hedge_premium = plan['hedge_premium']
+
+        # ✅ MODIFIED: Place the hedge side's entry order
+        success, order_id = self._place_hedge_order(hedge_symbol, hedge_security_id, losing_leg.lot_size,
+                                                    side=losing_leg.hedge_side)
+
+        if not success:
+            log.error(f"❌ Failed to place hedge order for {losing_leg.name}")
             return None
 
         # Get actual hedge fill price
@@ -233,41 +342,28 @@ class HedgeManager:
             actual_hedge_price = api.get_order_fill_price(order_id)
             if actual_hedge_price:
                 hedge_premium = actual_hedge_price
-                print(f"   💰 Hedge actual fill: ₹{actual_hedge_price:.2f}")
-
-        # ✅ ADDED: Subscribe hedge to WebSocket
-        if api.ws_enabled and api.market_ws:
-            try:
-                token_list = [{
-                    "exchangeType": 2,  # NSE_FO
-                    "tokens": [hedge_security_id]
-                }]
-                api.market_ws.subscribe(
-                    correlation_id=f"hedge_{int(time.time())}",
-                    mode=1,  # LTP mode
-                    token_list=token_list
-                )
-                print(f"✅ Subscribed hedge to WebSocket: {hedge_symbol}")
-            except Exception as e:
-                print(f"⚠️  Hedge WebSocket subscription failed: {e}")
-
-        # ✅ MODIFIED: Call buy_hedge instead of sell_hedge
-        event = losing_leg.buy_hedge(hedge_symbol, hedge_security_id, hedge_strike, hedge_premium, level)
+                log.info(f"   💰 Hedge actual fill: ₹{actual_hedge_price:.2f}")
+
+        # ✅ ADDED: Subscribe hedge to WebSocket (pinned - an OTM hedge outside the chain window keeps ticking)
+        api.subscribe_instruments_to_websocket([{'security_id': hedge_security_id}])
+
+        # ✅ MODIFIED: Record the hedge on the leg
+        event = losing_leg.enter_hedge(hedge_symbol, hedge_security_id, plan['hedge_strike'], hedge_premium, level)
         self.hedge_events.append(event)
 
         return event
 
-    def _calculate_hedge_strike_losing_side(self, losing_leg: Leg, profit_leg: Leg,
-                                           option_chain: Dict, level: int) -> tuple:
+    def _calculate_hedge_strike(self, losing_leg: Leg, profit_leg: Leg,
+                                option_chain: Dict, level: int) -> tuple:
         """
-        ✅ MODIFIED: Find OTM strike on LOSING side
+        ✅ MODIFIED: Find the hedge strike on the leg's hedge side
 
         Logic:
         1. Calculate difference between both legs
-        2. Find OTM strike on LOSING side with premium ≈ difference
-        3. Direction constraint:
-           - CE losing (market UP) → BUY OTM CE (above current strike)
-           - PE losing (market DOWN) → BUY OTM PE (below current strike)
+        2. Find a hedge-side strike with premium ≈ difference
+        3. Direction constraint (hedge_side.py):
+           - BUY:  CE losing → OTM CE above strike, PE losing → OTM PE below strike
+           - SELL: CE losing → PE at/below spot,     PE losing → CE at/above spot
 
         Returns:
             (hedge_strike, target_premium)
@@ -278,10 +374,12 @@ class HedgeManager:
         profit_total = profit_leg.get_total_side_premium(include_hedge=False)
         target_premium = abs(losing_total - profit_total)
 
-        print(f"\n🎯 HEDGE CALCULATION (BUY ON LOSING SIDE):")
-        print(f"   {losing_leg.option_type} (losing): ₹{losing_total:.2f}")
-        print(f"   {profit_leg.option_type} (profit): ₹{profit_total:.2f}")
-        print(f"   → Need to BUY {losing_leg.option_type} @ ₹{target_premium:.2f}")
+        side = losing_leg.hedge_side
+        hedge_type = side.hedge_type(losing_leg)
+        log.info(f"\n🎯 HEDGE CALCULATION ({side.description}):")
+        log.info(f"   {losing_leg.option_type} (losing): ₹{losing_total:.2f}")
+        log.info(f"   {profit_leg.option_type} (profit): ₹{profit_total:.2f}")
+        log.info(f"   → Need to {side.entry_side} {hedge_type} @ ₹{target_premium:.2f}")
 
         # Step 2: Get current spot and straddle strike
         spot = api.get_spot_price()
@@ -289,110 +387,87 @@ class HedgeManager:
             spot = losing_leg.strike  # Fallback
 
         straddle_strike = losing_leg.strike
-        losing_type = losing_leg.option_type
-
-        # Step 3: CRITICAL - Directional constraint for OTM on LOSING side
-        if losing_leg.option_type == 'CE':
-            # CE losing → market moved UP
-            # Buy OTM CE (above current strike, cheaper premium)
-            valid_strikes = [s for s in option_chain.keys()
-                           if s > straddle_strike]
-            direction = "ABOVE strike (OTM CE)"
-        else:
-            # PE losing → market moved DOWN
-            # Buy OTM PE (below current strike, cheaper premium)
-            valid_strikes = [s for s in option_chain.keys()
-                           if s < straddle_strike]
-            direction = "BELOW strike (OTM PE)"
-
-        print(f"   Market Direction: {losing_leg.option_type} losing → {'UP' if losing_leg.option_type == 'CE' else 'DOWN'}")
-        print(f"   Hedge Direction: {direction}")
-        print(f"   Valid strikes: {len(valid_strikes)} from {len(option_chain)} total")
-
-        if not valid_strikes:
-            print(f"   ⚠️  WARNING: No valid OTM strikes found!")
-            # Emergency fallback
-            valid_strikes = [s for s in option_chain.keys() if s != straddle_strike]
 
-        # Step 4: Find best premium match within valid strikes
-        best_strike = None
-        best_premium_diff = float('inf')
-        best_premium = 0
+        # Step 3: CRITICAL - Directional constraint from the hedge side
+        chain = ChainArrays.from_chain(option_chain)
+        valid_mask, direction = side.candidates(chain, losing_leg, spot)
+        valid_count = int(valid_mask.sum())
+
+        log.info(f"   Market Direction: {losing_leg.option_type} losing → {'UP' if losing_leg.option_type == 'CE' else 'DOWN'}")
+        log.info(f"   Hedge Direction: {direction}")
+        log.info(f"   Valid strikes: {valid_count} from {len(option_chain)} total")
 
-        for strike in valid_strikes:
-            strike_data = option_chain.get(strike, {})
-            premium = strike_data.get(losing_type, 0)
+        other_strikes = chain.strikes != straddle_strike
+        if not valid_count:
+            log.warning(f"   ⚠️  WARNING: No valid OTM strikes found!")
+            # Emergency fallback
+            valid_mask = other_strikes
 
-            if premium > 0:
-                diff = abs(premium - target_premium)
-                if diff < best_premium_diff:
-                    best_premium_diff = diff
-                    best_strike = strike
-                    best_premium = premium
+        # Step 4: Find best premium match within valid strikes (vectorized)
+        best = chain.nearest_premium(hedge_type, target_premium, valid_mask)
 
         # Final fallback
-        if not best_strike:
-            print(f"   🚨 EMERGENCY: No hedge found in valid range!")
-            best_strike = min(
-                [s for s in option_chain.keys() if s != straddle_strike],
-                key=lambda s: abs(option_chain.get(s, {}).get(losing_type, 0) - target_premium),
-                default=straddle_strike
-            )
-            best_premium = option_chain.get(best_strike, {}).get(losing_type, 0)
+        if best is None:
+            log.error(f"   🚨 EMERGENCY: No hedge found in valid range!")
+            best = chain.nearest_premium(hedge_type, target_premium, other_strikes)
 
-        print(f"   ✅ Selected: {best_strike} {losing_type} @ ₹{best_premium:.2f}")
-        print(f"   Target Premium: ₹{target_premium:.2f}")
-        print(f"   Difference: ₹{abs(best_premium - target_premium):.2f}")
+        best_strike, best_premium = best if best else (straddle_strike, 0)
+
+        log.info(f"   ✅ Selected: {best_strike} {hedge_type} @ ₹{best_premium:.2f}")
+        log.info(f"   Target Premium: ₹{target_premium:.2f}")
+        log.info(f"   Difference: ₹{abs(best_premium - target_premium):.2f}")
 
         return best_strike, target_premium
 
     def _get_hedge_from_chain(self, option_chain: Dict, hedge_strike: int,
-                             losing_leg_type: str) -> tuple:
+                             hedge_type: str) -> tuple:
         """
-        ✅ MODIFIED: Get hedge details - SAME type as losing leg
+        ✅ MODIFIED: Get hedge details for the hedge side's option type
 
         Args:
-            losing_leg_type: 'CE' or 'PE' (the LOSING leg type)
+            hedge_type: 'CE' or 'PE' (hedge_side.hedge_type - SAME as the losing leg for BUY)
 
         Returns:
-            (symbol, security_id, premium) for SAME type
+            (symbol, security_id, premium) for hedge_type
         """
         try:
             chain_data = option_chain.get(hedge_strike, {})
             if not chain_data:
-                print(f"   ❌ No data found for hedge strike {hedge_strike}")
+                log.error(f"   ❌ No data found for hedge strike {hedge_strike}")
                 return None, None, None
 
-            # ✅ MODIFIED: Get SAME option type (CE if CE losing, PE if PE losing)
-            same_type = losing_leg_type
-            premium = chain_data.get(same_type)
-            symbol_key = f'{same_type}_symbol'
-            security_id_key = f'{same_type}_security_id'
+            premium = chain_data.get(hedge_type)
+            symbol_key = f'{hedge_type}_symbol'
+            security_id_key = f'{hedge_type}_security_id'
 
             symbol = chain_data.get(symbol_key)
             security_id = chain_data.get(security_id_key)
 
             if premium and symbol and security_id:
-                print(f"   ✅ Found hedge: {symbol} @ ₹{premium:.2f}")
+                log.info(f"   ✅ Found hedge: {symbol} @ ₹{premium:.2f}")
                 return symbol, security_id, premium
             else:
-                print(f"   ❌ Hedge data incomplete for {same_type} {hedge_strike}")
-                print(f"   Premium: {premium}, Symbol: {symbol}, Security ID: {security_id}")
+                log.error(f"   ❌ Hedge data incomplete for {hedge_type} {hedge_strike}")
+                log.info(f"   Premium: {premium}, Symbol: {symbol}, Security ID: {security_id}")
                 return None, None, None
 
         except Exception as e:
-            print(f"❌ Error finding hedge in chain: {str(e)}")
+            log.error(f"❌ Error finding hedge in chain: {str(e)}")
             return None, None, None
 
-    def _place_hedge_order(self, symbol: str, security_id: str, quantity: int) -> tuple:
-        """✅ MODIFIED: Place hedge BUY order with CRITICAL flag + LOCK"""
+    def _place_hedge_order(self, symbol: str, security_id: str, quantity: int, leg_name: str = None,
+                           side=None) -> tuple:
+        """✅ MODIFIED: Place hedge entry order (hedge side: BUY by default) with CRITICAL flag + LOCK"""
+        side = side or hedge_side()
+        lease = None
         try:
-            # Acquire critical lock
-            api.acquire_critical_lock(f"HEDGE_ENTRY_{symbol}")
-            print(f"   📤 Placing BUY order: {symbol}")
+            # 🔒 This contract (+ the leg, for menu actions outside execute_plan)
+            keys = [instrument_key(security_id)] + ([leg_key(leg_name)] if leg_name else [])
+            lease = api.locks.acquire(f"HEDGE_ENTRY_{symbol}", keys)
+            log.info(f"   📤 Placing {side.entry_side} order: {symbol}")
 
             response = api.place_order_with_verification(
-                transaction_type='BUY',  # ✅ MODIFIED: BUY hedge
+                transaction_type=side.entry_side,  # ✅ MODIFIED: hedge side entry
                 symbol=symbol,
                 security_id=security_id,
                 quantity=quantity,
@@ -402,32 +477,37 @@ class HedgeManager:
 
             if not response or not response.get('success'):
                 error_msg = response.get('message', 'Unknown error') if response else 'No response'
-                print(f"   ❌ Hedge order placement failed: {error_msg}")
+                log.error(f"   ❌ Hedge order placement failed: {error_msg}")
                 return False, None
 
             if response.get('filled'):
-                print(f"   ✅ Hedge order filled")
+                log.info(f"   ✅ Hedge order filled")
                 api.invalidate_position_cache()
                 return True, response.get('order_id')
             else:
-                print(f"   ❌ Hedge order not filled after all retries")
+                log.error(f"   ❌ Hedge order not filled after all retries")
                 return False, response.get('order_id')
 
         except Exception as e:
-            print(f"   ❌ Error placing hedge order: {str(e)}")
+            log.error(f"   ❌ Error placing hedge order: {str(e)}")
             return False, None
         finally:
-            api.release_critical_lock(f"HEDGE_ENTRY_{symbol}")
-
-    def _place_hedge_exit_order(self, symbol: str, security_id: str, quantity: int) -> tuple:
-        """✅ MODIFIED: Place hedge SELL order with CRITICAL flag + LOCK"""
+            if lease:
+                lease.release()
+
+    def _place_hedge_exit_order(self, symbol: str, security_id: str, quantity: int, leg_name: str = None,
+                                side=None) -> tuple:
+        """✅ MODIFIED: Place hedge exit order (SELL a bought hedge by default) with CRITICAL flag + LOCK"""
+        side = side or hedge_side()
+        lease = None
         try:
-            # Acquire critical lock
-            api.acquire_critical_lock(f"HEDGE_EXIT_{symbol}")
-            print(f"   📤 Placing SELL order: {symbol}")
+            # 🔒 This contract (+ the leg, for menu actions outside execute_plan)
+            keys = [instrument_key(security_id)] + ([leg_key(leg_name)] if leg_name else [])
+            lease = api.locks.acquire(f"HEDGE_EXIT_{symbol}", keys)
+            log.info(f"   📤 Placing {side.exit_side} order: {symbol}")
 
             response = api.place_order_with_verification(
-                transaction_type='SELL',  # ✅ MODIFIED: SELL to exit bought hedge
+                transaction_type=side.exit_side,  # ✅ MODIFIED: close the hedge
                 symbol=symbol,
                 security_id=security_id,
                 quantity=quantity,
@@ -437,22 +517,23 @@ class HedgeManager:
 
             if not response or not response.get('success'):
                 error_msg = response.get('message', 'Unknown error') if response else 'No response'
-                print(f"   ❌ Hedge exit order placement failed: {error_msg}")
+                log.error(f"   ❌ Hedge exit order placement failed: {error_msg}")
                 return False, None
 
             if response.get('filled'):
-                print(f"   ✅ Hedge exit order filled")
+                log.info(f"   ✅ Hedge exit order filled")
                 api.invalidate_position_cache()
                 return True, response.get('order_id')
             else:
-                print(f"   ❌ Hedge exit order not filled after all retries")
+                log.error(f"   ❌ Hedge exit order not filled after all retries")
                 return False, response.get('order_id')
 
         except Exception as e:
-            print(f"   ❌ Error exiting hedge: {str(e)}")
+            log.error(f"   ❌ Error exiting hedge: {str(e)}")
             return False, None
         finally:
-            api.release_critical_lock(f"HEDGE_EXIT_{symbol}")
+            if lease:
+                lease.release()
 
     def _get_level_from_stop_loss(self, stop_loss_pct: float) -> int:
         """Get level number from stop loss percentage"""
@@ -467,30 +548,31 @@ class HedgeManager:
     def check_level_3_trigger(self, leg: Leg) -> bool:
         """Check if Level 3 hard stop triggered"""
         if leg and leg.is_level_3_triggered():
-            print(f"\n🚨 LEVEL 3 TRIGGERED - {leg.name}")
-            print(f"   Loss: {leg.current_loss_pct:.1f}%")
-            print(f"   Hedge Active: {leg.hedge_active}")
+            log.error(f"\n🚨 LEVEL 3 TRIGGERED - {leg.name}")
+            log.info(f"   Loss: {leg.current_loss_pct:.1f}%")
+            log.info(f"   Hedge Active: {leg.hedge_active}")
             return True
         return False
 
     def exit_all_hedges(self, ce_leg: Leg, pe_leg: Leg):
         """Exit all active hedges (for force exits)"""
         if ce_leg and ce_leg.hedge_active:
-            print(f"\n🚪 Force exiting CE hedge...")
+            log.info(f"\n🚪 Force exiting CE hedge...")
             self._force_close_hedge(ce_leg)
 
         if pe_leg and pe_leg.hedge_active:
-            print(f"\n🚪 Force exiting PE hedge...")
+            log.info(f"\n🚪 Force exiting PE hedge...")
             self._force_close_hedge(pe_leg)
 
     def _force_close_hedge(self, leg: Leg):
         """Force close a hedge"""
         exit_premium = api.get_ltp_with_retry(leg.hedge_security_id)
         if not exit_premium:
-            print(f"⚠️  Using last known premium for force exit")
+            log.warning(f"⚠️  Using last known premium for force exit")
             exit_premium = leg.hedge_current_premium
 
-        success, order_id = self._place_hedge_exit_order(leg.hedge_symbol, leg.hedge_security_id, leg.lot_size)
+        success, order_id = self._place_hedge_exit_order(leg.hedge_symbol, leg.hedge_security_id, leg.lot_size,
+                                                         side=leg.hedge_side)
 
         if success:
             # Get actual exit price if available
@@ -499,11 +581,11 @@ class HedgeManager:
                 actual_exit_price = api.get_order_fill_price(order_id)
                 if actual_exit_price:
                     exit_premium = actual_exit_price
-                    print(f"   💰 Hedge actual exit: ₹{actual_exit_price:.2f}")
+                    log.info(f"   💰 Hedge actual exit: ₹{actual_exit_price:.2f}")
 
             leg.close_hedge(exit_premium)
         else:
-            print(f"❌ Failed to force exit hedge for {leg.name}")
+            log.error(f"❌ Failed to force exit hedge for {leg.name}")
 
     def reset_for_new_session(self):
         """Reset for new session"""
@@ -0,0 +1,92 @@
+"""
+Hedge Side - HEDGE DIRECTION AS A STRATEGY PLUG-IN
+✅ BUY  (this folder): BUY the LOSING leg's option type, OTM beyond the straddle strike
+   - LONG hedge, P&L = current - entry, SELL to exit, caps the short leg's margin
+✅ SELL (SELL_* variant): SELL the PROFIT leg's option type on the profit side of spot (price-neutral)
+   - SHORT hedge, P&L = entry - current, BUY to exit
+✅ Picked per strategy by config.HEDGE_SIDE - a Leg captures it when created, so an open
+   straddle keeps its direction for life
+✅ Everything direction-specific lives here: strike candidates, option type, order sides,
+   P&L sign, reconciler position sign / classification, exit ordering
+
+Usage:
+    side = hedge_side()                       # config.HEDGE_SIDE of the calling strategy
+    side.hedge_type(losing_leg)               # 'CE' / 'PE' to trade
+    side.candidates(chain, losing_leg, spot)  # (strike mask, description)
+    side.pnl(entry, current, lot_size)
+"""
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+from config import config
+from option_chain_arrays import ChainArrays
+
+OPPOSITE_TYPE = {'CE': 'PE', 'PE': 'CE'}
+
+
+class BuyHedge:
+    """BUY hedge on the LOSING side (same option type, OTM)"""
+
+    name = 'BUY'
+    entry_side = 'BUY'
+    exit_side = 'SELL'
+    qty_sign = 1        # LONG position
+    protective = True   # Close only after its leg is bought back (margin)
+    description = 'BUY hedge on LOSING side (same type, OTM)'
+
+    def hedge_type(self, losing_leg) -> str:
+        return losing_leg.option_type
+
+    def hedged_leg(self, option_type: str) -> str:
+        """Leg a hedge position of `option_type` protects"""
+        return option_type
+
+    def candidates(self, chain: ChainArrays, losing_leg, spot: float) -> Tuple[np.ndarray, str]:
+        """
+        CE losing → market moved UP   → BUY OTM CE (above current strike)
+        PE losing → market moved DOWN → BUY OTM PE (below current strike)
+        """
+        direction = "ABOVE strike (OTM CE)" if losing_leg.option_type == 'CE' else "BELOW strike (OTM PE)"
+        return chain.hedge_candidates(losing_leg.option_type, losing_leg.strike), direction
+
+    def pnl(self, entry_premium: float, current_premium: float, lot_size: int) -> float:
+        return (current_premium - entry_premium) * lot_size
+
+
+class SellHedge:
+    """SELL hedge on the PROFIT side (opposite option type, price-neutral)"""
+
+    name = 'SELL'
+    entry_side = 'SELL'
+    exit_side = 'BUY'
+    qty_sign = -1       # SHORT position
+    protective = False  # Adds margin - closed together with the legs
+    description = 'SELL hedge on PROFIT side (opposite type)'
+
+    def hedge_type(self, losing_leg) -> str:
+        return OPPOSITE_TYPE[losing_leg.option_type]
+
+    def hedged_leg(self, option_type: str) -> str:
+        return OPPOSITE_TYPE[option_type]
+
+    def candidates(self, chain: ChainArrays, losing_leg, spot: float) -> Tuple[np.ndarray, str]:
+        """
+        CE losing → market moved UP   → SELL PE at/below spot
+        PE losing → market moved DOWN → SELL CE at/above spot
+        (straddle strike excluded)
+        """
+        not_straddle = chain.strikes != losing_leg.strike
+        if losing_leg.option_type == 'CE':
+            return (chain.strikes <= spot) & not_straddle, "AT/BELOW spot (PE)"
+        return (chain.strikes >= spot) & not_straddle, "AT/ABOVE spot (CE)"
+
+    def pnl(self, entry_premium: float, current_premium: float, lot_size: int) -> float:
+        return (entry_premium - current_premium) * lot_size
+
+
+HEDGE_SIDES: Dict[str, object] = {side.name: side for side in (BuyHedge(), SellHedge())}
+
+
+def hedge_side(name: Optional[str] = None):
+    """Plug-in for `name`, default the calling strategy's config.HEDGE_SIDE"""
+    return HEDGE_SIDES[(name or config.HEDGE_SIDE).upper()]
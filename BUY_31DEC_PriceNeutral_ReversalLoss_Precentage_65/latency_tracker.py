@@ -0,0 +1,281 @@
+"""
+Latency Tracker - TICK-TO-TRADE TIMING OF THE ORDER PATH
+✅ One span per trigger (hedge entry/exit/upgrade, straddle entry/exit)
+✅ Monotonic stage timings: lock wait, rate-limit sleeps, order HTTP,
+   WebSocket fill confirmation, fill-price fetch, journal append
+✅ Stages keyed by order ID once the broker returns one
+✅ Fixed-bucket histograms per stage (cheap to observe, exportable)
+✅ One ORDER_LATENCY journal row per order when the span ends - to the journal of the
+   strategy that opened the span (sinks keyed by config.STRATEGY_ID)
+
+Usage (instrumentation):
+    latency.begin('HEDGE', symbol)            # span on this thread
+    latency.trigger('HEDGE_ENTRY', symbol, tick_ts=api.get_tick_time(token))
+    latency.record('lock_wait', ms)           # stage, attributed to the span
+    latency.order_placed(order_id, symbol)    # pending stages → this order
+    latency.confirmed(order_id)               # trigger → fill
+    latency.end()                             # journal rows + histograms
+"""
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from collections import deque
+import json
+import threading
+import time
+from config import config
+from bot_logging import get_logger
+
+log = get_logger('latency_tracker')
+
+# Upper bounds (ms) - last bucket is +Inf
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """Cumulative-bucket histogram (Prometheus layout) of millisecond samples"""
+
+    def __init__(self, bounds=BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        index = 0
+        for bound in self.bounds:
+            if ms <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Bucket upper bound holding the q-quantile (max for the +Inf bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return float(self.bounds[index]) if index < len(self.bounds) else round(self.max, 1)
+        return round(self.max, 1)
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.sum / self.count, 1) if self.count else None,
+            'p50_ms': self.quantile(0.50),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'max_ms': round(self.max, 1),
+        }
+
+
+class LatencySpan:
+    """Trigger → confirmed fills (one or more orders)"""
+
+    def __init__(self, name: str, symbol: str = '', strategy: Optional[str] = None):
+        self.name = name
+        self.symbol = symbol
+        self.strategy = strategy                    # Journal the rows go to
+        self.start = time.monotonic()
+        self.triggered = False
+        self.tick_age_ms: Optional[float] = None
+        self.shared: Dict[str, float] = {}          # Stages not tied to one order
+        self.orders: Dict[str, Dict] = {}           # order_id → {symbol, stages, latency_ms}
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.start) * 1000
+
+
+class LatencyTracker:
+    """Process-wide span registry + per-stage histograms"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()              # .span, .pending
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.sinks: Dict[str, Callable[[Dict], None]] = {}  # strategy → ORDER_LATENCY rows
+        self.recent = deque(maxlen=20)
+
+        # Stats
+        self.spans = 0
+        self.orders = 0
+
+    # ------------------------------------------------------------------
+    # Spans
+    # ------------------------------------------------------------------
+
+    def set_sink(self, sink: Callable[[Dict], None], strategy: Optional[str] = None):
+        """Receives one row per timed order of `strategy`'s spans (default the calling strategy)"""
+        self.sinks[strategy or config.STRATEGY_ID] = sink
+
+    def current(self) -> Optional[LatencySpan]:
+        return getattr(self.local, 'span', None)
+
+    def begin(self, name: str, symbol: str = '') -> LatencySpan:
+        """Open a span on this thread (a nested begin keeps the outer span)"""
+        span = self.current()
+        if span is not None:
+            return span
+        span = LatencySpan(name, symbol, config.STRATEGY_ID)
+        self.attach(span)
+        return span
+
+    def attach(self, span: Optional[LatencySpan]):
+        """Carry a span into a worker thread (e.g. simultaneous leg orders)"""
+        self.local.span = span
+        self.local.pending = {}
+
+    def detach(self) -> Optional[LatencySpan]:
+        """Hand this thread's span to another thread (decided here, executed there)"""
+        span = self.current()
+        if span is not None:
+            for stage, ms in self.local.pending.items():
+                span.shared[stage] = span.shared.get(stage, 0.0) + ms
+            self.attach(None)
+        return span
+
+    def trigger(self, name: str, symbol: str = '', tick_ts: float = None):
+        """
+        Trigger fired - restart the span clock here
+        tick_ts: wall-clock receive time of the tick the decision used
+        """
+        span = self.current()
+        if span is None or span.triggered:
+            return
+        span.name = name
+        span.symbol = symbol or span.symbol
+        span.start = time.monotonic()
+        span.triggered = True
+        if tick_ts:
+            span.tick_age_ms = max(0.0, (time.time() - tick_ts) * 1000)
+            self._observe('tick_age', span.tick_age_ms)
+
+    def end(self):
+        """Close this thread's span - journal rows for every order it placed"""
+        span = self.current()
+        if span is None:
+            return
+        for stage, ms in getattr(self.local, 'pending', {}).items():
+            span.shared[stage] = span.shared.get(stage, 0.0) + ms
+        self.attach(None)
+
+        if not span.orders:
+            return  # Evaluated, nothing traded
+
+        self._observe('span_total', span.elapsed_ms())
+        with self.lock:
+            self.spans += 1
+            self.orders += len(span.orders)
+
+        for order_id, order in span.orders.items():
+            stages = dict(span.shared)
+            for stage, ms in order['stages'].items():
+                stages[stage] = stages.get(stage, 0.0) + ms
+            row = {
+                'order_id': order_id,
+                'action': span.name,
+                'symbol': order['symbol'],
+                'order_status': 'FILLED' if order['latency_ms'] is not None else 'UNCONFIRMED',
+                'latency_ms': round(order['latency_ms'], 1) if order['latency_ms'] is not None else None,
+                'tick_age_ms': round(span.tick_age_ms, 1) if span.tick_age_ms is not None else None,
+                'stages': json.dumps({stage: round(ms, 1) for stage, ms in stages.items()}),
+            }
+            self.recent.append(row)
+            sink = self.sinks.get(span.strategy)
+            if sink:
+                try:
+                    sink(row)
+                except Exception as e:
+                    log.warning("   ⚠️ Latency journal write failed: %s", e)
+
+    @contextmanager
+    def span(self, name: str, symbol: str = ''):
+        outer = self.current()
+        self.begin(name, symbol)
+        try:
+            yield
+        finally:
+            if outer is None:
+                self.end()
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _observe(self, stage: str, ms: float):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.observe(ms)
+
+    def record(self, stage: str, ms: float, order_id: str = None):
+        """Stage duration → histogram, and → the active span (order or pending)"""
+        self._observe(stage, ms)
+        span = self.current()
+        if span is None:
+            return
+        order = span.orders.get(order_id) if order_id else None
+        target = order['stages'] if order else self.local.pending
+        target[stage] = target.get(stage, 0.0) + ms
+
+    @contextmanager
+    def stage(self, stage: str, order_id: str = None):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.monotonic() - started) * 1000, order_id)
+
+    def order_placed(self, order_id: str, symbol: str = ''):
+        """Broker accepted the order - stages so far on this thread belong to it"""
+        span = self.current()
+        if span is None:
+            return
+        span.orders[order_id] = {
+            'symbol': symbol,
+            'stages': dict(self.local.pending),
+            'latency_ms': None,
+        }
+        self.local.pending = {}
+
+    def confirmed(self, order_id: str):
+        """Fill confirmed - trigger → fill (and tick → fill) for this order"""
+        span = self.current()
+        order = span.orders.get(order_id) if span else None
+        if order is None or order['latency_ms'] is not None:
+            return
+        order['latency_ms'] = span.elapsed_ms()
+        self._observe('trigger_to_fill', order['latency_ms'])
+        if span.tick_age_ms is not None:
+            self._observe('tick_to_trade', span.tick_age_ms + order['latency_ms'])
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def get_histograms(self) -> Dict[str, LatencyHistogram]:
+        with self.lock:
+            return dict(self.histograms)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stages = {name: histogram.snapshot() for name, histogram in sorted(self.histograms.items())}
+        return {
+            'spans': self.spans,
+            'orders': self.orders,
+            'stages': stages,
+            'recent': list(self.recent)[-5:],
+        }
+
+
+# Global tracker
+latency = LatencyTracker()
@@ -11,12 +11,14 @@ NO BUFFER/NO TRAILING - Hold hedges until Level 3
 🔥 MODIFIED: P&L calculation for bought hedges
 
 ✅ CRITICAL FIX: Added loading/unloading mechanism for L1 and L2 triggers
+🧩 Hedge direction from the strategy's HEDGE_SIDE plug-in (hedge_side.py) - BUY by default
 
 """
 
 from typing import Optional, Dict
 from datetime import datetime
 from config import config
+from hedge_side import hedge_side
 
 class Leg:
     """Represents a single leg (CE or PE) of the straddle"""
@@ -41,7 +43,8 @@ class Leg:
         self.entry_time: Optional[datetime] = None
         self.exit_time: Optional[datetime] = None
 
-        # ✅ HEDGE STATE - BUY HEDGE ON LOSING SIDE
+        # ✅ HEDGE STATE - direction fixed for the life of the leg
+        self.hedge_side = hedge_side()
         self.hedge_active = False
         self.hedge_level = 0
         self.hedge_symbol = None
@@ -66,6 +69,15 @@ class Leg:
         self.l1_loaded = True  # L1 ready to trigger initially
         self.l2_loaded = True  # L2 ready to trigger initially
 
+    @property
+    def HEDGE_QTY_SIGN(self) -> int:
+        """Reconciler expected qty sign: BUY hedge → LONG (+1), SELL hedge → SHORT (-1)"""
+        return self.hedge_side.qty_sign
+
+    def hedge_pnl(self, hedge_premium: float) -> float:
+        """P&L of the active hedge at `hedge_premium` (BUY: current - entry, SELL: entry - current)"""
+        return self.hedge_side.pnl(self.hedge_entry_premium, hedge_premium, self.lot_size)
+
     def update_premium(self, current_premium: float):
         """Update current premium and calculate loss percentage"""
         self.current_premium = current_premium
@@ -77,16 +89,16 @@ class Leg:
         if self.hedge_active:
             self.hedge_current_premium = hedge_premium
 
-    def should_buy_hedge(self) -> bool:
+    def should_enter_hedge(self) -> bool:
         """
-        ✅ MODIFIED: Check if hedge should be BOUGHT
-        🔥 FIXED: Prevents immediate re-buy after manual exit
+        ✅ MODIFIED: Check if hedge should be entered
+        🔥 FIXED: Prevents immediate re-entry after manual exit
         🔥 CRITICAL FIX: Added loading/unloading mechanism
         """
         if self.hedge_active:
             return False
 
-        # 🔥 NEW: Prevent immediate re-buy after manual exit (1 minute cooldown)
+        # 🔥 NEW: Prevent immediate re-entry after manual exit (1 minute cooldown)
         if self.manual_exit_timestamp:
             elapsed = (config.get_current_ist_time() - self.manual_exit_timestamp).total_seconds()
             if elapsed < 60:  # Wait at least 1 minute after manual exit
@@ -108,9 +120,9 @@ class Leg:
 
         return False
 
-    def buy_hedge(self, hedge_symbol: str, hedge_security_id: str,
-                  hedge_strike: int, hedge_premium: float, level: int) -> Dict:
-        """✅ MODIFIED: BUY HEDGE on losing side - Hold until Level 3"""
+    def enter_hedge(self, hedge_symbol: str, hedge_security_id: str,
+                    hedge_strike: int, hedge_premium: float, level: int) -> Dict:
+        """✅ MODIFIED: Record the entered hedge (BUY or SELL per hedge side) - Hold until Level 3"""
         self.hedge_active = True
         self.hedge_level = level
         self.hedge_symbol = hedge_symbol
@@ -132,7 +144,7 @@ class Leg:
             self.next_stop_loss_pct = config.LEVEL_3_HARD_STOP
 
         print(f"\n{'='*60}")
-        print(f"✅ {self.name} L{level} BUY HEDGE")
+        print(f"✅ {self.name} L{level} {self.hedge_side.name} HEDGE")
         print(f"{'='*60}")
         print(f"  Strike: {hedge_strike}")
         print(f"  Premium: ₹{hedge_premium:.2f}")
@@ -142,7 +154,7 @@ class Leg:
         print(f"{'='*60}")
 
         return {
-            'action': 'HEDGE_BUY',
+            'action': f'HEDGE_{self.hedge_side.name}',
             'leg': self.name,
             'level': level,
             'strike': hedge_strike,
@@ -152,11 +164,10 @@ class Leg:
 
     def close_hedge(self, hedge_exit_premium: float) -> Dict:
         """Close hedge (for force exits or reversals)
-        ✅ MODIFIED: BUY hedge P&L calculation
+        ✅ MODIFIED: Hedge P&L from the hedge side (BUY: exit - entry)
         """
 
-        # ✅ MODIFIED: BUY hedge P&L calculation (exit - entry)
-        hedge_pnl = (hedge_exit_premium - self.hedge_entry_premium) * self.lot_size
+        hedge_pnl = self.hedge_pnl(hedge_exit_premium)
         self.realized_hedge_pnl += hedge_pnl  # ACCUMULATE hedge P&L
 
         print(f"\n{'='*60}")
@@ -223,15 +234,15 @@ class Leg:
     def get_pnl(self) -> float:
         """
         Get total P&L including all hedges
-        ✅ MODIFIED: BUY hedge P&L calculation
+        ✅ MODIFIED: Hedge P&L from the hedge side
         """
         # Leg P&L (sell premium collected - current premium)
         leg_pnl = (self.entry_premium - self.current_premium) * self.lot_size
 
-        # Current hedge P&L (if hedge is active) - ✅ MODIFIED for BUY
+        # Current hedge P&L (if hedge is active)
         current_hedge_pnl = 0.0
         if self.hedge_active and self.hedge_current_premium:
-            current_hedge_pnl = (self.hedge_current_premium - self.hedge_entry_premium) * self.lot_size
+            current_hedge_pnl = self.hedge_pnl(self.hedge_current_premium)
 
         # Total P&L = Leg P&L + Realized Hedge P&L + Current Hedge P&L
         total_pnl = leg_pnl + self.realized_hedge_pnl + current_hedge_pnl
@@ -241,14 +252,13 @@ class Leg:
     def get_pnl_breakdown(self) -> Dict:
         """
         Get detailed P&L breakdown for logging
-        ✅ MODIFIED: BUY hedge P&L calculation
+        ✅ MODIFIED: Hedge P&L from the hedge side
         """
         leg_pnl = (self.entry_premium - self.current_premium) * self.lot_size
 
-        # ✅ MODIFIED: BUY hedge P&L calculation
         current_hedge_pnl = 0.0
         if self.hedge_active and self.hedge_current_premium:
-            current_hedge_pnl = (self.hedge_current_premium - self.hedge_entry_premium) * self.lot_size
+            current_hedge_pnl = self.hedge_pnl(self.hedge_current_premium)
 
         return {
             'leg_pnl': leg_pnl,
@@ -294,7 +304,7 @@ class Leg:
         if self.hedge_active:
             # Calculate approximate P&L (won't be exact since we don't know exit price)
             if self.hedge_entry_premium and self.hedge_current_premium:
-                hedge_pnl = (self.hedge_current_premium - self.hedge_entry_premium) * self.lot_size
+                hedge_pnl = self.hedge_pnl(self.hedge_current_premium)
                 self.realized_hedge_pnl += hedge_pnl
 
             # Mark level as completed
@@ -2,37 +2,59 @@
 """
 Angel One Live Trader - Main trading loop
 Progressive Hedging Straddle Strategy - PURE PRICE-NEUTRAL
-✅ REACTIVE AUTHENTICATION: One login per day
-✅ RE-LOGIN ONLY ON AB1007 (reactive)
-✅ NO PROACTIVE REFRESHES
-✅ NO JWT REFRESH THREADS
+✅ ONE LOGIN AT START - background session manager re-logins on AB1007/auth errors
+   and refreshes ahead of expiry (never on the trading loop)
+✅ NO JWT REFRESH CALLS - a refresh is a full login
 ✅ SIMPLIFIED & STABLE
 ✅ SIMPLIFIED KEYBOARD: Ctrl+C only
 ✅ FIXED: Removed conflicting signal handler
 ✅ FIXED: Corrected display bug for next level when hedge active
 ✅ FIXED: Instant resume from menu (no 2-minute delay)
+✅ HEADLESS LOOP: run_headless() for multi_engine.py (no menu / prompts, one trader per underlying)
 """
 
 import time
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List
 from config import config
 from angelone_api import api
 from straddle_manager import StraddleManager
+from option_chain_arrays import ChainArrays
+from chain_window import ChainWindow
+from candle_scheduler import CandleScheduler
 from excel_logger import ExcelLogger
 from position_reconciler import PositionReconciler
 from bot_controller import BotController
+from metrics import metrics, MetricsServer, api_collector, scheduler_collector, latency_collector, lock_collector
+from bot_logging import get_logger, setup_logging, flush_logs
+from status_dashboard import (status_board, build_snapshot, render_status, render_hedge_status,
+                              ConsoleRenderer, DashboardServer, StatusBoard)
+
+log = get_logger('live_trader_main')
 
 
 class LiveTrader:
-    """Main live trading system with simplified reactive authentication"""
+    """Main live trading system - session kept alive by the background session manager"""
     
-    def __init__(self):
+    def __init__(self, board: StatusBoard = None, interactive: bool = True):
+        """
+        Args:
+            board: Status snapshots target (default: the global status_board)
+            interactive: Ctrl+C menu + prompts (False for multi_engine.py traders)
+        """
         self.running = False
+        self.config = config.current()  # Config this trader was built under (multi_engine.py)
+        self.interactive = interactive
+        self.status_board = board or status_board
         self.excel_logger = ExcelLogger()  
         self.straddle_manager = StraddleManager(excel_logger=self.excel_logger)
         self.position_reconciler = PositionReconciler()
+        self.chain_window = ChainWindow()
+        self.scheduler = CandleScheduler(
+            config.CANDLE_INTERVAL_SECONDS,
+            should_abort=lambda: self.interrupt_received
+        )
         self.candles_to_wait = 0
         self.last_exit_time = None
         self.candle_count = 0
@@ -44,8 +66,14 @@ class LiveTrader:
         # 🔥 NEW: Track first entry for manual strike logic
         self.first_entry_done = False
         
-        # ✅ FIX 1: Use BotController - no signal conflicts
-        self.controller = BotController(self)
+        # ✅ FIX 1: Use BotController - no signal conflicts (the engine owns Ctrl+C when headless)
+        self.controller = BotController(self) if interactive else None
+
+        # 📈 Metrics endpoint (METRICS_ENABLED)
+        self.metrics_server = None
+
+        # 🖥️ Status renderers (DASHBOARD_MODE) - trading loop only publishes snapshots
+        self.status_renderers = []
     
     def interruptible_sleep(self, sleep_seconds: int):
         """
@@ -62,7 +90,7 @@ class LiveTrader:
                 time.sleep(check_interval)
             except KeyboardInterrupt:
                 # ✅ NEW: Catch Ctrl+C during sleep
-                print("\n⚠️ Interrupt detected during sleep!")
+                log.warning("\n⚠️ Interrupt detected during sleep!")
                 raise  # Re-raise to trigger main handler
         
         # Sleep remaining time
@@ -71,82 +99,36 @@ class LiveTrader:
             try:
                 time.sleep(remaining)
             except KeyboardInterrupt:
-                print("\n⚠️ Interrupt detected during remaining sleep!")
+                log.warning("\n⚠️ Interrupt detected during remaining sleep!")
                 raise
 
     def _get_next_candle_time(self) -> datetime:
         """Calculate next aligned candle time (NO DRIFT)"""
-        current = config.get_current_ist_time()
-        interval_seconds = config.CANDLE_INTERVAL_SECONDS
-        
-        # Calculate seconds since midnight
-        seconds_since_midnight = (
-            current.hour * 3600 + 
-            current.minute * 60 + 
-            current.second
-        )
-        
-        # Round up to next interval boundary
-        next_interval = ((seconds_since_midnight // interval_seconds) + 1) * interval_seconds
-        
-        # Convert back to time
-        next_hour = next_interval // 3600
-        next_minute = (next_interval % 3600) // 60
-        next_second = next_interval % 60
-        
-        next_time = current.replace(
-            hour=next_hour % 24,
-            minute=next_minute,
-            second=next_second,
-            microsecond=0
-        )
-        
-        # Handle day rollover
-        if next_time <= current:
-            next_time += timedelta(days=1)
-        
-        return next_time
+        return self.scheduler.next_candle_time()
 
     def _wait_for_next_candle(self):
-        """Sleep until next aligned candle time (NO DRIFT)"""
-        next_candle = self._get_next_candle_time()
-        current = config.get_current_ist_time()
-        
-        wait_seconds = (next_candle - current).total_seconds()
-        
-        if wait_seconds > 0:
-            print(f"⏰ Waiting {wait_seconds:.1f}s until next candle at {next_candle.strftime('%H:%M:%S')}")
-            self.interruptible_sleep(int(wait_seconds))
+        """
+        Sleep until next aligned candle time (NO DRIFT)
+        ⏱️ Monotonic clock scheduler - deferred work runs in the idle slack
+        """
+        self.scheduler.wait_for_next_candle()
 
     def _generate_strikes_for_option_chain(self, spot_price: float) -> List[int]:
         """
         Generate list of strikes to fetch option chain
-        ✅ BALANCED: 17 strikes (±8) for optimal hedge coverage
-        ✅ CRITICAL FIX: Always includes active hedge strikes even if out of ATM range
+        📐 ADAPTIVE: ±CHAIN_WINDOW_MIN..MAX strikes from realized volatility + hedge distance
+        ✅ CRITICAL FIX: Always includes straddle + active hedge strikes even if out of ATM range
+        Core strikes for REST fallback are kept in self.chain_window.core_strikes
         """
-        base_atm = round(spot_price / config.STRIKE_INTERVAL) * config.STRIKE_INTERVAL
-        
-        strikes = []
-        for i in range(-8, 9):  # ±8 = 17 strikes ✅ BALANCED COVERAGE
-            strike = int(base_atm + (i * config.STRIKE_INTERVAL))
-            strikes.append(strike)
-        
-        # ⭐ CRITICAL FIX: Force-add active hedge strikes if they exist
+        pinned = []
         if self.straddle_manager.straddle_active:
-            ce_leg = self.straddle_manager.ce_leg
-            pe_leg = self.straddle_manager.pe_leg
-            
-            if ce_leg and ce_leg.hedge_active and ce_leg.hedge_strike:
-                if ce_leg.hedge_strike not in strikes:
-                    strikes.append(ce_leg.hedge_strike)
-                    print(f"🔧 Added CE hedge strike {ce_leg.hedge_strike} (out of ATM range)")
-            
-            if pe_leg and pe_leg.hedge_active and pe_leg.hedge_strike:
-                if pe_leg.hedge_strike not in strikes:
-                    strikes.append(pe_leg.hedge_strike)
-                    print(f"🔧 Added PE hedge strike {pe_leg.hedge_strike} (out of ATM range)")
-        
-        return sorted(strikes)
+            pinned.append(self.straddle_manager.strike)
+            for leg in (self.straddle_manager.ce_leg, self.straddle_manager.pe_leg):
+                if leg and leg.hedge_active and leg.hedge_strike:
+                    pinned.append(leg.hedge_strike)
+
+        strikes, _ = self.chain_window.build(spot_price, pinned)
+        return strikes
 
     def _generate_strikes_around_strike(self, center_strike: int) -> List[int]:
         """
@@ -166,11 +148,11 @@ class LiveTrader:
         OPTIMIZED: Only called when actually needed
         """
         if self.is_executing_trade:
-            print(f"   [WARN] Skipping reconciliation (trade in progress)")
+            log.warning(f"   [WARN] Skipping reconciliation (trade in progress)")
             return
         
         try:
-            print(f"\n[RECONCILING] {reason}")
+            log.info(f"\n[RECONCILING] {reason}")
             reconciliation_result = self.position_reconciler.reconcile(
                 self.straddle_manager,
                 self.straddle_manager.hedge_manager
@@ -178,8 +160,8 @@ class LiveTrader:
             
             # ✅ NEW: Check if all positions were manually closed
             if reconciliation_result and reconciliation_result.get('all_positions_closed', False):
-                print(f"🚨 EMERGENCY: All positions manually closed!")
-                print(f"Creating emergency stop flag...")
+                log.error(f"🚨 EMERGENCY: All positions manually closed!")
+                log.info(f"Creating emergency stop flag...")
                 config.create_emergency_stop("All positions manually closed from broker terminal")
                 self.running = False  # Stop the trading loop
                 return
@@ -187,9 +169,9 @@ class LiveTrader:
             # 🔥 FIX #2: Log manual hedge changes (CORRECTED)
             manual_changes = reconciliation_result.get('manual_hedge_changes', [])
             if manual_changes:
-                print(f"\n🔧 AUTO-SYNCED {len(manual_changes)} manual broker changes:")
+                log.info(f"\n🔧 AUTO-SYNCED {len(manual_changes)} manual broker changes:")
                 for change in manual_changes:
-                    print(f"   {change['leg']} hedge L{change['level']} {change['action']}")
+                    log.info(f"   {change['leg']} hedge L{change['level']} {change['action']}")
                     
                     # Log to Excel if available
                     if self.excel_logger:
@@ -203,12 +185,12 @@ class LiveTrader:
             
             self.last_reconcile_time = config.get_current_ist_time()
         except Exception as e:
-            print(f"   [WARN] Reconciliation failed (non-critical): {e}")
+            log.warning(f"   [WARN] Reconciliation failed (non-critical): {e}")
     
     def _try_periodic_reconcile(self):
         """
         Periodic reconciliation (fallback safety net)
-        OPTIMIZED: Only triggers if event-driven reconciliation missed
+        OPTIMIZED: Ledger diff every candle, REST audit on a long interval or ledger mismatch
         """
         if self.is_executing_trade:
             return
@@ -216,37 +198,78 @@ class LiveTrader:
         if not self.straddle_manager.straddle_active:
             return
         
+        # 📒 Zero-REST ledger diff every candle - REST audit only when due or mismatched
+        self.position_reconciler.check_ledger(self.straddle_manager, self.straddle_manager.hedge_manager)
+
         # NEW: Check if reconciliation is needed (smart logic)
         if self.position_reconciler.should_reconcile():
-            self._safe_reconcile("Periodic Check (Fallback)")
+            self._safe_reconcile("Periodic Audit")
     
     def initialize_system(self) -> bool:
-        """Initialize trading system - ONE LOGIN PER DAY"""
+        """Initialize trading system - one login, then the session manager keeps it valid"""
         try:
-            print("\n" + "=" * 80)
-            print("ANGEL ONE LIVE TRADING SYSTEM")
-            print("PROGRESSIVE HEDGING STRADDLE STRATEGY - PURE PRICE-NEUTRAL")
-            print("✅ REACTIVE AUTHENTICATION MODE")
-            print("✅ ONE LOGIN AT START")
-            print("✅ RE-LOGIN ONLY ON AB1007")
-            print("✅ NO PROACTIVE REFRESHES")
-            print("✅ SIMPLIFIED KEYBOARD: Ctrl+C only")
-            print("=" * 80)
+            log.info("\n" + "=" * 80)
+            log.info("ANGEL ONE LIVE TRADING SYSTEM")
+            log.info("PROGRESSIVE HEDGING STRADDLE STRATEGY - PURE PRICE-NEUTRAL")
+            log.info("✅ ONE LOGIN AT START")
+            log.info("✅ BACKGROUND SESSION MANAGER: re-login on AB1007 / auth errors")
+            log.info(f"✅ PROACTIVE REFRESH {config.SESSION_REFRESH_AHEAD_MINUTES:g} MIN BEFORE SESSION EXPIRY")
+            log.info("✅ SIMPLIFIED KEYBOARD: Ctrl+C only")
+            log.info("=" * 80)
             
             config.display_config()
             
             # Single login attempt - valid for entire trading session
             if not api.login():
-                print("[ERROR] Failed to login to Angel One")
+                log.error("[ERROR] Failed to login to Angel One")
                 return False
             
-            print("[OK] System initialized - One login for entire day\n")
+            self._start_metrics()
+            self._start_dashboard()
+
+            log.info("[OK] System initialized - session manager running\n")
             return True
             
         except Exception as e:
-            print(f"[ERROR] Initialization error: {str(e)}")
+            log.error(f"[ERROR] Initialization error: {str(e)}")
             return False
     
+    def _start_metrics(self):
+        """📈 Prometheus /metrics + JSON /health (never fatal to trading)"""
+        if not config.METRICS_ENABLED or self.metrics_server:
+            return
+        try:
+            metrics.register(api_collector(api))
+            metrics.register(scheduler_collector(self.scheduler))
+            metrics.register(latency_collector())
+            metrics.register(lock_collector(api.locks))
+            self.metrics_server = MetricsServer(
+                metrics,
+                health=lambda: {**api.get_system_health(), 'scheduler': self.scheduler.get_metrics()}
+            ).start()
+        except OSError as e:
+            log.warning(f"⚠️ Metrics endpoint not started: {e}")
+
+    def _start_dashboard(self):
+        """🖥️ Console / web status renderers on their own threads (never fatal to trading)"""
+        if self.status_renderers:
+            return
+        mode = config.DASHBOARD_MODE
+        if mode in ('console', 'both'):
+            self.status_renderers.append(ConsoleRenderer(self.status_board, paused=lambda: self.menu_active).start())
+        if mode in ('web', 'both'):
+            try:
+                self.status_renderers.append(DashboardServer(self.status_board).start())
+            except OSError as e:
+                log.warning(f"⚠️ Status dashboard not started: {e}")
+
+    def _publish_status(self):
+        """Snapshot for the renderers - plain data, no formatting on the trading thread"""
+        try:
+            self.status_board.publish(build_snapshot(self))
+        except Exception as e:
+            log.warning("⚠️ Status snapshot failed: %s", e)
+
     def check_force_exit_conditions(self) -> tuple:
         """CORE LOGIC: Check force exit (Priority 1) WITHOUT token refresh"""
         if config.should_force_squareoff():
@@ -259,15 +282,15 @@ class LiveTrader:
         self.is_executing_trade = True
         
         try:
-            print(f"\n{'='*80}")
-            print(f"{'EOD SQUARE-OFF' if 'EOD' in reason else 'EXITING POSITIONS'}")
-            print(f"{'='*80}")
+            log.info(f"\n{'='*80}")
+            log.info(f"{'EOD SQUARE-OFF' if 'EOD' in reason else 'EXITING POSITIONS'}")
+            log.info(f"{'='*80}")
             
             # Direct exit - no token refresh
             exit_details = self.straddle_manager.exit_straddle(reason)
             
             if not exit_details:
-                print("⚠️ Exit failed - possible auth error")
+                log.warning("⚠️ Exit failed - possible auth error")
                 # If auth error, it will be caught by error handler on next API call
             
             self.last_exit_time = config.get_current_ist_time()
@@ -279,24 +302,29 @@ class LiveTrader:
             self.position_reconciler.mark_order_filled()
             
         except Exception as e:
-            print(f"\n🚨 Error during exit: {e}")
+            log.error(f"\n🚨 Error during exit: {e}")
         
         finally:
             self.is_executing_trade = False
         
+        # Partial exit - the open contracts stay tracked, exit retried next candle (no EOD stop, no re-entry)
+        if self.straddle_manager.straddle_active:
+            log.error(f"🚨 Positions still open after exit - retrying next candle ({reason})")
+            return
+        
         # Handle post-exit logic
         if 'EOD' in reason:
-            print("\n🏁 EOD complete - stopping script")
+            log.info("\n🏁 EOD complete - stopping script")
             self.running = False
             return
         
         if not config.is_entry_window_open():
-            print("[STOP] Entry window closed")
+            log.info("[STOP] Entry window closed")
             return
         
         # CORE LOGIC: Wait 1 candle
         self.candles_to_wait = config.RE_ENTRY_WAIT_CANDLES
-        print(f"\n[WAITING] {self.candles_to_wait} candle(s) before re-entry...\n")
+        log.info(f"\n[WAITING] {self.candles_to_wait} candle(s) before re-entry...\n")
     
     def process_candle(self):
         """Process one candle with MARKET HOURS CHECK"""
@@ -304,25 +332,26 @@ class LiveTrader:
             # CRITICAL FIX: Check if market is open first
             if not config.is_market_open():
                 if self.straddle_manager.straddle_active:
-                    print(f"[MARKET CLOSED] Market is closed but positions active - monitoring for exit")
+                    log.info(f"[MARKET CLOSED] Market is closed but positions active - monitoring for exit")
                     # Still process monitoring for active positions
                     self._process_monitoring()
                 else:
                     current_time = config.get_current_ist_time()
-                    print(f"[MARKET CLOSED] Skipping candle - Market closed - {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                    log.info(f"[MARKET CLOSED] Skipping candle - Market closed - {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 return
             
             # ✅ NEW: Add emergency stop check
             if config.is_emergency_stop():
-                print(f"⏸️ Skipping candle processing - emergency stop active")
+                log.info(f"⏸️ Skipping candle processing - emergency stop active")
                 return
 
             self.candle_count += 1
             current_time = config.get_current_ist_time()
             
-            print(f"\n{'-' * 80}")
-            print(f"[CANDLE] Candle #{self.candle_count} | {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"{'-' * 80}")
+            log.info(f"\n{'-' * 80}")
+            log.info(f"[CANDLE] Candle #{self.candle_count} | {current_time.strftime('%Y-%m-%d %H:%M:%S')} "
+                  f"| Late: {self.scheduler.last_lateness * 1000:.0f}ms")
+            log.info(f"{'-' * 80}")
             
             # PRIORITY 1: Force Exit Check
             should_exit, reason = self.check_force_exit_conditions()
@@ -334,9 +363,9 @@ class LiveTrader:
             # RE-ENTRY COOLDOWN
             if self.candles_to_wait > 0:
                 self.candles_to_wait -= 1
-                print(f"[WAITING] Cooldown: {self.candles_to_wait} candle(s) remaining")
+                log.info(f"[WAITING] Cooldown: {self.candles_to_wait} candle(s) remaining")
                 if self.candles_to_wait == 0:
-                    print("[OK] Cooldown complete - Ready for re-entry\n")
+                    log.info("[OK] Cooldown complete - Ready for re-entry\n")
                 return
             
             # ENTRY LOGIC
@@ -344,36 +373,37 @@ class LiveTrader:
                 if config.is_entry_window_open():
                     self._process_entry()
                 else:
-                    print("[STOP] Entry window closed")
+                    log.info("[STOP] Entry window closed")
                 return
             
             # MONITORING & HEDGING
             self._process_monitoring()
             
-            # OPTIMIZED RECONCILIATION (event-driven + fallback)
-            self._try_periodic_reconcile()
+            # OPTIMIZED RECONCILIATION (event-driven + fallback) - off the critical path
+            self.scheduler.defer('periodic_reconcile', self._try_periodic_reconcile, estimate=3.0)
         
         except Exception as e:
-            print(f"[ERROR] Error processing candle: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            log.exception(f"[ERROR] Error processing candle: {str(e)}")
+
+        finally:
+            self._publish_status()
     
     def _process_entry(self):
         """
         Safe straddle entry with AUTO scanning or MANUAL strike selection
         MANUAL mode: Uses manual strike ONLY for first entry, then AUTO for re-entries
-        BALANCED: Uses 17 strikes (±8) for optimal hedge coverage
+        AUTO mode: Uses adaptive chain window (±8 core, wider WebSocket-only outer ring)
         """
         if config.is_emergency_stop():
-            print("[STOP] Emergency stop active - skipping entry")
+            log.info("[STOP] Emergency stop active - skipping entry")
             return
         
         if not config.is_market_open():
-            print("[STOP] Market is closed - skipping entry")
+            log.info("[STOP] Market is closed - skipping entry")
             return
 
         if not config.is_entry_window_open():
-            print("[STOP] Entry window closed - skipping entry")
+            log.info("[STOP] Entry window closed - skipping entry")
             return
 
         self.is_executing_trade = True
@@ -382,7 +412,7 @@ class LiveTrader:
         try:
             spot_price = api.get_spot_price()
             if not spot_price:
-                print("[ERROR] Could not fetch spot price")
+                log.error("[ERROR] Could not fetch spot price")
                 return
             
             # 🎯 Determine strike selection
@@ -400,31 +430,31 @@ class LiveTrader:
                 # MANUAL mode: Use manual strike ONLY for first entry
                 use_manual_strike = True
                 selected_strike = int(manual_strike)
-                print(f"\n{'='*80}")
-                print(f"📍 MANUAL MODE - FIRST ENTRY")
-                print(f"{'='*80}")
-                print(f"   Using Manual Strike: {selected_strike}")
-                print(f"   Current NIFTY Spot: {spot_price:.2f}")
-                print(f"   (Re-entries will use AUTO scanning)")
-                print(f"{'='*80}\n")
+                log.info(f"\n{'='*80}")
+                log.info(f"📍 MANUAL MODE - FIRST ENTRY")
+                log.info(f"{'='*80}")
+                log.info(f"   Using Manual Strike: {selected_strike}")
+                log.info(f"   Current {config.UNDERLYING} Spot: {spot_price:.2f}")
+                log.info(f"   (Re-entries will use AUTO scanning)")
+                log.info(f"{'='*80}\n")
             
             elif strike_mode == 'MANUAL' and not is_first_entry:
                 # Re-entry: Switch to AUTO mode
-                print(f"\n{'='*80}")
-                print(f"🔄 RE-ENTRY - AUTO MODE")
-                print(f"{'='*80}")
-                print(f"   First entry used manual strike: {manual_strike}")
-                print(f"   Now scanning for best strike...")
-                print(f"   Current NIFTY Spot: {spot_price:.2f}")
-                print(f"{'='*80}\n")
+                log.info(f"\n{'='*80}")
+                log.info(f"🔄 RE-ENTRY - AUTO MODE")
+                log.info(f"{'='*80}")
+                log.info(f"   First entry used manual strike: {manual_strike}")
+                log.info(f"   Now scanning for best strike...")
+                log.info(f"   Current {config.UNDERLYING} Spot: {spot_price:.2f}")
+                log.info(f"{'='*80}\n")
             
             else:
                 # AUTO mode from start
-                print(f"\n{'='*80}")
-                print(f"🔍 AUTO MODE - SCANNING FOR BEST STRADDLE")
-                print(f"{'='*80}")
-                print(f"   Current NIFTY Spot: {spot_price:.2f}")
-                print(f"{'='*80}\n")
+                log.info(f"\n{'='*80}")
+                log.info(f"🔍 AUTO MODE - SCANNING FOR BEST STRADDLE")
+                log.info(f"{'='*80}")
+                log.info(f"   Current {config.UNDERLYING} Spot: {spot_price:.2f}")
+                log.info(f"{'='*80}\n")
             
             # 🔥 BALANCED: Generate 17 strikes (±8) for both modes
             if use_manual_strike:
@@ -434,29 +464,25 @@ class LiveTrader:
                 for i in range(-8, 9):  # ✅ 17 strikes (±8)
                     strike = int(base_strike + (i * config.STRIKE_INTERVAL))
                     strikes_to_fetch.append(strike)
-                print(f"[FETCHING] Fetching 17 strikes around manual strike {selected_strike}...")
+                log.info(f"[FETCHING] Fetching 17 strikes around manual strike {selected_strike}...")
             else:
-                # For auto mode, fetch ±8 strikes around ATM
+                # For auto mode, fetch adaptive window around ATM
                 strikes_to_fetch = self._generate_strikes_for_option_chain(spot_price)
-                print(f"[FETCHING] Scanning 17 strikes for minimum CE-PE difference...")
+                log.info(f"[FETCHING] Scanning {len(strikes_to_fetch)} strikes for minimum CE-PE difference...")
             
-            print(f"   Strike range: {min(strikes_to_fetch)} to {max(strikes_to_fetch)}")
+            log.info(f"   Strike range: {min(strikes_to_fetch)} to {max(strikes_to_fetch)}")
             
-            option_chain = api.get_option_chain(strikes_to_fetch)
+            core_strikes = None if use_manual_strike else self.chain_window.core_strikes
+            option_chain = api.get_option_chain(strikes_to_fetch, core_strikes=core_strikes)
             if not option_chain:
-                print("[ERROR] Could not fetch option chain")
+                log.error("[ERROR] Could not fetch option chain")
                 return
             
             # Validate option chain has reasonable premiums
-            valid_strikes = 0
-            for strike, data in option_chain.items():
-                ce_premium = data.get('CE', 0)
-                pe_premium = data.get('PE', 0)
-                if ce_premium > 5 and pe_premium > 5:
-                    valid_strikes += 1
+            valid_strikes = ChainArrays.from_chain(option_chain).valid_count(min_premium=5)
             
             if valid_strikes < 3:
-                print(f"[WARN] Insufficient valid strikes ({valid_strikes}), skipping entry")
+                log.warning(f"[WARN] Insufficient valid strikes ({valid_strikes}), skipping entry")
                 return
             
             # ✅ Validate manual strike if using manual mode
@@ -466,8 +492,8 @@ class LiveTrader:
                 
                 if validate_strike:
                     if selected_strike not in option_chain:
-                        print(f"[ERROR] Manual strike {selected_strike} not found in option chain!")
-                        print(f"   Available strikes: {sorted(option_chain.keys())}")
+                        log.error(f"[ERROR] Manual strike {selected_strike} not found in option chain!")
+                        log.info(f"   Available strikes: {sorted(option_chain.keys())}")
                         return
                     
                     strike_data = option_chain[selected_strike]
@@ -475,15 +501,15 @@ class LiveTrader:
                     pe_premium = strike_data.get('PE', 0)
                     
                     if ce_premium < min_premium or pe_premium < min_premium:
-                        print(f"[ERROR] Manual strike {selected_strike} has invalid premiums!")
-                        print(f"   CE: ₹{ce_premium:.2f}, PE: ₹{pe_premium:.2f}")
-                        print(f"   Minimum required: ₹{min_premium:.2f}")
+                        log.error(f"[ERROR] Manual strike {selected_strike} has invalid premiums!")
+                        log.info(f"   CE: ₹{ce_premium:.2f}, PE: ₹{pe_premium:.2f}")
+                        log.info(f"   Minimum required: ₹{min_premium:.2f}")
                         return
                     
-                    print(f"[OK] Manual strike {selected_strike} validated")
-                    print(f"   CE Premium: ₹{ce_premium:.2f}")
-                    print(f"   PE Premium: ₹{pe_premium:.2f}")
-                    print(f"   Total Premium: ₹{ce_premium + pe_premium:.2f}\n")
+                    log.info(f"[OK] Manual strike {selected_strike} validated")
+                    log.info(f"   CE Premium: ₹{ce_premium:.2f}")
+                    log.info(f"   PE Premium: ₹{pe_premium:.2f}")
+                    log.info(f"   Total Premium: ₹{ce_premium + pe_premium:.2f}\n")
             
             # ✅ Enter straddle
             if use_manual_strike:
@@ -499,25 +525,25 @@ class LiveTrader:
                 )
             
             if not success:
-                print("\n[WARN] Straddle entry returned False")
-                print("[ACTION] Checking for orphaned positions...")
+                log.warning("\n[WARN] Straddle entry returned False")
+                log.info("[ACTION] Checking for orphaned positions...")
                 self.interruptible_sleep(3)
                 
                 if self.position_reconciler:
                     actual_positions = self.position_reconciler.get_actual_positions()
                     if actual_positions:
-                        print(f"\n🚨 FOUND {len(actual_positions)} OPEN POSITIONS!")
-                        print("="*80)
+                        log.error(f"\n🚨 FOUND {len(actual_positions)} OPEN POSITIONS!")
+                        log.info("="*80)
                         for pos in actual_positions:
-                            print(f"   Security ID: {pos.get('securityId')}")
-                            print(f"   Quantity: {pos.get('netQty')}")
-                            print(f"   Symbol: {pos.get('tradingsymbol')}")
-                        print("="*80)
-                        print("\n⚠️ MANUAL ACTION REQUIRED:")
-                        print("   1. Go to Angel One terminal")
-                        print("   2. Square off ALL positions listed above")
-                        print("   3. Then restart the script")
-                        print("="*80 + "\n")
+                            log.info(f"   Security ID: {pos.get('securityId')}")
+                            log.info(f"   Quantity: {pos.get('netQty')}")
+                            log.info(f"   Symbol: {pos.get('tradingsymbol')}")
+                        log.info("="*80)
+                        log.warning("\n⚠️ MANUAL ACTION REQUIRED:")
+                        log.info("   1. Go to Angel One terminal")
+                        log.info("   2. Square off ALL positions listed above")
+                        log.info("   3. Then restart the script")
+                        log.info("="*80 + "\n")
                 return
             
             if success:
@@ -525,23 +551,26 @@ class LiveTrader:
                 self.position_reconciler.mark_order_filled()
         
         except Exception as e:
-            print(f"\n[CRITICAL ERROR] Exception in _process_entry: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception(f"\n[CRITICAL ERROR] Exception in _process_entry: {e}")
             
-            print("\n[EMERGENCY] Checking for open positions...")
+            log.info("\n[EMERGENCY] Checking for open positions...")
             self.interruptible_sleep(2)
             try:
-                actual_positions = api.get_positions()
+                actual_positions = PositionReconciler.strategy_positions(api.get_positions())
                 if actual_positions:
-                    print(f"\n🚨 EMERGENCY: FOUND {len(actual_positions)} OPEN POSITIONS!")
-                    print("="*80)
+                    log.error(f"\n🚨 EMERGENCY: FOUND {len(actual_positions)} OPEN POSITIONS!")
+                    log.info("="*80)
                     for pos in actual_positions:
-                        print(f"   Security ID: {pos.get('securityId')}")
-                        print(f"   Quantity: {pos.get('netQty')}")
-                        print(f"   Symbol: {pos.get('tradingsymbol')}")
-                    print("="*80)
-                    print("\n⚠️ SCRIPT WILL PAUSE - SQUARE OFF MANUALLY FIRST!")
+                        log.info(f"   Security ID: {pos.get('securityId')}")
+                        log.info(f"   Quantity: {pos.get('netQty')}")
+                        log.info(f"   Symbol: {pos.get('tradingsymbol')}")
+                    log.info("="*80)
+                    if not self.interactive:
+                        # No one to press ENTER - block entries (all strategies) until the flag is removed
+                        config.create_emergency_stop(f"{config.STRATEGY_ID}: open positions after failed entry")
+                        return
+                    log.warning("\n⚠️ SCRIPT WILL PAUSE - SQUARE OFF MANUALLY FIRST!")
+                    flush_logs()
                     input("Press ENTER after squaring off positions...")
             except:
                 pass
@@ -564,33 +593,21 @@ class LiveTrader:
         
         spot_price = api.get_spot_price()
         if not spot_price:
-            print("[ERROR] Could not fetch spot price")
+            log.error("[ERROR] Could not fetch spot price")
             return
         
         # ✅ FIX 3: Check WebSocket health every candle
         websocket_healthy = api.check_websocket_health()
         if not websocket_healthy:
-            print("⚠️ WebSocket unhealthy - attempting to resubscribe instruments...")
+            log.warning("⚠️ WebSocket unhealthy - attempting to resubscribe instruments...")
             
-            # Resubscribe to active straddle
+            # Resubscribe to active straddle + hedges (pinned)
             try:
-                ce_id = self.straddle_manager.ce_leg.security_id
-                pe_id = self.straddle_manager.pe_leg.security_id
-                
-                token_list = [{
-                    "exchangeType": 2,
-                    "tokens": [ce_id, pe_id]
-                }]
-                
-                if api.market_ws:
-                    api.market_ws.subscribe(
-                        correlation_id=f"resubscribe_{int(time.time())}",
-                        mode=1,
-                        token_list=token_list
-                    )
-                    print("✅ Resubscribed to straddle legs")
+                legs = (self.straddle_manager.ce_leg, self.straddle_manager.pe_leg)
+                tokens = [leg.security_id for leg in legs] + [leg.hedge_security_id for leg in legs if leg.hedge_active]
+                api.subscribe_instruments_to_websocket([{'security_id': token} for token in tokens])
             except Exception as e:
-                print(f"⚠️ Resubscribe failed: {e}")
+                log.warning(f"⚠️ Resubscribe failed: {e}")
         
         # ⭐ CRITICAL FIX: Generate strikes WITH hedge strike protection
         strikes_to_fetch = self._generate_strikes_for_option_chain(spot_price)
@@ -602,15 +619,15 @@ class LiveTrader:
             
             if ce_leg and ce_leg.hedge_active and ce_leg.hedge_strike:
                 in_range = ce_leg.hedge_strike in strikes_to_fetch
-                print(f"🔍 CE Hedge Strike {ce_leg.hedge_strike}: {'✅ IN range' if in_range else '❌ OUT of range'}")
+                log.debug(f"🔍 CE Hedge Strike {ce_leg.hedge_strike}: {'✅ IN range' if in_range else '❌ OUT of range'}")
             
             if pe_leg and pe_leg.hedge_active and pe_leg.hedge_strike:
                 in_range = pe_leg.hedge_strike in strikes_to_fetch
-                print(f"🔍 PE Hedge Strike {pe_leg.hedge_strike}: {'✅ IN range' if in_range else '❌ OUT of range'}")
+                log.debug(f"🔍 PE Hedge Strike {pe_leg.hedge_strike}: {'✅ IN range' if in_range else '❌ OUT of range'}")
         
-        option_chain = api.get_option_chain(strikes_to_fetch)
+        option_chain = api.get_option_chain(strikes_to_fetch, core_strikes=self.chain_window.core_strikes)
         if not option_chain:
-            print("[ERROR] Could not fetch option chain")
+            log.error("[ERROR] Could not fetch option chain")
             return
         
         # Track if hedges exist before update
@@ -625,123 +642,27 @@ class LiveTrader:
         pe_added_hedge = (not pe_had_hedge and self.straddle_manager.pe_leg.hedge_active)
         
         if ce_added_hedge or pe_added_hedge:
-            # Wait for broker settlement
-            self.interruptible_sleep(3)
-            
             # NEW: Mark orders filled - triggers reconciliation
             self.position_reconciler.mark_order_filled()
             
-            # Reconcile after hedge (event-driven)
-            if self.position_reconciler.should_reconcile():
-                self._safe_reconcile("After Hedge Entry")
+            # Reconcile after hedge (event-driven) - ledger already holds the fill, REST only if untrusted
+            self.scheduler.defer('hedge_reconcile', self._reconcile_after_hedge, delay=1, estimate=0.1)
         
         if force_exit_reason:
             self.process_force_exit_and_reentry(force_exit_reason)
             return
-        
-        self._display_status()
+
+    def _reconcile_after_hedge(self):
+        """Event-driven reconciliation after hedge entry (runs deferred) - 📒 ledger first"""
+        self.position_reconciler.check_ledger(self.straddle_manager, self.straddle_manager.hedge_manager)
+        if self.position_reconciler.should_reconcile():
+            self._safe_reconcile("After Hedge Entry")
     
     def _display_status(self):
-        """ULTIMATE DISPLAY - Shows all stop loss states dynamically - PURE PRICE-NEUTRAL
-        🆕 ENHANCED: Shows next target + exit zone for ALL levels on BOTH legs
-        ✅ CORRECT EXIT LOGIC:
-           - L1 exits at 0% (break-even)
-           - L2 exits at 20% (L1 trigger level)
-        ✅ FIXED: Correct next level display when hedge active
-        """
-        if not self.straddle_manager.straddle_active or not self.straddle_manager.ce_leg or not self.straddle_manager.pe_leg:
-            return
-        
-        ce = self.straddle_manager.ce_leg
-        pe = self.straddle_manager.pe_leg
-        
-        print(f"🎯 POSITION STATUS - PURE PRICE-NEUTRAL:")
-        print(f"{'─'*60}")
-        
-        for leg, name in [(ce, "CE"), (pe, "PE")]:
-            status_icon = "🛡️" if leg.hedge_active else "✅"
-            print(f"   {name}: {status_icon} ₹{leg.current_premium:.2f} | Loss: {leg.current_loss_pct:+.1f}%")
-            
-            if leg.hedge_active:
-                # ============================================================
-                # ACTIVE HEDGE - Show next level + exit zone
-                # ============================================================
-                print(f"        ✅ L{leg.hedge_level} HEDGE ACTIVE: {leg.hedge_symbol}")
-                
-                # ✅ FIX: Determine next level based on CURRENT hedge level
-                # L1 active → next is L2 at 40%
-                # L2 active → next is L3 at 60%
-                if leg.hedge_level == 1:
-                    # L1 hedge active → show L2 as next
-                    next_sl_pct = config.PROGRESSIVE_HEDGING_LEVELS[1]  # 40%
-                    next_sl_price = leg.entry_premium * (1 + next_sl_pct / 100)
-                    distance_to_next = next_sl_pct - leg.current_loss_pct
-                    print(f"        ⏫ NEXT: L2 at {next_sl_pct:.0f}% (₹{next_sl_price:.2f})")
-                    print(f"        📏 Distance UP: {distance_to_next:+.1f}%")
-                    
-                elif leg.hedge_level == 2:
-                    # L2 hedge active → show L3 as next
-                    l3_pct = config.LEVEL_3_HARD_STOP
-                    l3_price = leg.entry_premium * (1 + l3_pct / 100)
-                    distance_to_l3 = l3_pct - leg.current_loss_pct
-                    print(f"        🚨 NEXT: L3 HARD STOP at {l3_pct:.0f}% (₹{l3_price:.2f})")
-                    print(f"        📏 Distance UP: {distance_to_l3:+.1f}%")
-                
-                # ✅ CORRECT EXIT LOGIC:
-                # L1 exits at 0% (break-even)
-                # L2 exits at 20% (L1 trigger level)
-                if leg.hedge_level == 1:
-                    exit_zone_pct = 0  # L1 exits at break-even
-                elif leg.hedge_level == 2:
-                    exit_zone_pct = config.PROGRESSIVE_HEDGING_LEVELS[0]  # L2 exits at L1 trigger (20%)
-                else:
-                    exit_zone_pct = 0  # Fallback
-                
-                exit_zone_price = leg.entry_premium * (1 + exit_zone_pct / 100)
-                distance_to_exit = exit_zone_pct - leg.current_loss_pct
-                print(f"        📉 Exit zone: {exit_zone_pct:.0f}% (₹{exit_zone_price:.2f})")
-                print(f"        📏 Distance DOWN: {distance_to_exit:+.1f}%")
-                
-                # 🆕 SHOW HEDGE P&L if available
-                if leg.hedge_current_premium:
-                    hedge_pnl = (leg.hedge_entry_premium - leg.hedge_current_premium) * leg.lot_size
-                    hedge_icon = "💚" if hedge_pnl >= 0 else "❌"
-                    print(f"        {hedge_icon} Hedge P&L: ₹{hedge_pnl:+.2f}")
-                
-            else:
-                # ============================================================
-                # NO HEDGE - Show next hedge trigger
-                # ============================================================
-                next_level = leg.get_next_level()
-                if next_level:
-                    next_sl_pct = leg.next_stop_loss_pct
-                    next_sl_price = leg.entry_premium * (1 + next_sl_pct / 100)
-                    distance_to_hedge = next_sl_pct - leg.current_loss_pct
-                    print(f"        ⏫ NEXT: L{next_level} at {next_sl_pct:.0f}% (₹{next_sl_price:.2f})")
-                    print(f"        📏 Distance: {distance_to_hedge:+.1f}%")
-                else:
-                    # All levels completed - show L3 hard stop
-                    l3_pct = config.LEVEL_3_HARD_STOP
-                    l3_price = leg.entry_premium * (1 + l3_pct / 100)
-                    distance_to_l3 = l3_pct - leg.current_loss_pct
-                    print(f"        🚨 NEXT: L3 HARD STOP at {l3_pct:.0f}% (₹{l3_price:.2f})")
-                    print(f"        📏 Distance: {distance_to_l3:+.1f}%")
-            
-            print(f"{'─'*60}")
-        
-        # Show P&L summary
-        try:
-            ce_pnl = ce.get_pnl()
-            pe_pnl = pe.get_pnl()
-            total_pnl = ce_pnl + pe_pnl
-            pnl_icon = "💰" if total_pnl >= 0 else "💸"
-            print(f"   {pnl_icon} P&L: CE ₹{ce_pnl:+.2f} | PE ₹{pe_pnl:+.2f} | TOTAL ₹{total_pnl:+.2f}")
-        except Exception as e:
-            print(f"   💰 P&L: Calculation Error: {e}")
-        
-        # WebSocket status
-        if api.ws_enabled and api.market_ws:
-            print(f"   📡 WebSocket: [ONLINE]")
+        """🎯 Position status (Ctrl+C menu P&L) - fresh snapshot, same view as the dashboard"""
+        lines = render_status(build_snapshot(self))
+        if lines:
+            print('\n'.join(lines))
     
     def _action_skip_ce_level(self):
         """Skip CE's next level"""
@@ -843,7 +764,7 @@ class LiveTrader:
         print(f"\n⚠️ CONFIRM: Force BUY CE hedge at Level {next_level}?")
         print(f"   Current Loss: {leg.current_loss_pct:.1f}%")
         print(f"   Level threshold: {config.PROGRESSIVE_HEDGING_LEVELS[next_level-1]:.1f}%")
-        print(f"   ⚠️ Will BUY hedge on SAME type at MARKET PRICE")
+        print(f"   ⚠️ Will {leg.hedge_side.description} at MARKET PRICE")
         confirm = input("   Type 'YES' to confirm: ").strip().upper()
         
         if confirm != 'YES':
@@ -872,7 +793,7 @@ class LiveTrader:
         print(f"\n⚠️ CONFIRM: Force BUY PE hedge at Level {next_level}?")
         print(f"   Current Loss: {leg.current_loss_pct:.1f}%")
         print(f"   Level threshold: {config.PROGRESSIVE_HEDGING_LEVELS[next_level-1]:.1f}%")
-        print(f"   ⚠️ Will BUY hedge on SAME type at MARKET PRICE")
+        print(f"   ⚠️ Will {leg.hedge_side.description} at MARKET PRICE")
         confirm = input("   Type 'YES' to confirm: ").strip().upper()
         
         if confirm != 'YES':
@@ -896,7 +817,7 @@ class LiveTrader:
         print(f"   Hedge: {leg.hedge_symbol}")
         print(f"   Entry: ₹{leg.hedge_entry_premium:.2f}")
         print(f"   Current: ₹{leg.hedge_current_premium:.2f}")
-        print(f"   ⚠️ Will SELL at MARKET PRICE (close BUY position)")
+        print(f"   ⚠️ Will {leg.hedge_side.exit_side} at MARKET PRICE (close {leg.hedge_side.entry_side} position)")
         confirm = input("   Type 'YES' to confirm: ").strip().upper()
         
         if confirm != 'YES':
@@ -920,7 +841,7 @@ class LiveTrader:
         print(f"   Hedge: {leg.hedge_symbol}")
         print(f"   Entry: ₹{leg.hedge_entry_premium:.2f}")
         print(f"   Current: ₹{leg.hedge_current_premium:.2f}")
-        print(f"   ⚠️ Will SELL at MARKET PRICE (close BUY position)")
+        print(f"   ⚠️ Will {leg.hedge_side.exit_side} at MARKET PRICE (close {leg.hedge_side.entry_side} position)")
         confirm = input("   Type 'YES' to confirm: ").strip().upper()
         
         if confirm != 'YES':
@@ -941,60 +862,7 @@ class LiveTrader:
     
     def _display_hedge_status(self):
         """Display current hedge status"""
-        print("\n" + "="*80)
-        print("📊 CURRENT HEDGE STATUS")
-        print("="*80)
-        
-        if not self.straddle_manager.straddle_active:
-            print("No active straddle")
-            print("="*80)
-            return
-        
-        for leg, name in [(self.straddle_manager.ce_leg, "CE"), 
-                          (self.straddle_manager.pe_leg, "PE")]:
-            if not leg:
-                continue
-            
-            print(f"\n{name} LEG:")
-            print(f"  Current Loss: {leg.current_loss_pct:+.1f}%")
-            print(f"  Completed Levels: {leg.completed_levels if leg.completed_levels else 'None'}")
-            
-            # Show next level
-            next_level = self._get_next_level_for_leg(leg)
-            if next_level:
-                print(f"  ⏭️ Next Level: {next_level} (triggers at {config.PROGRESSIVE_HEDGING_LEVELS[next_level-1]:.1f}%)")
-            else:
-                # 🔥 HYBRID: Updated for Level 3 hard stop
-                print(f"  ⚠️ All levels completed - At Level 3 ({config.LEVEL_3_HARD_STOP:.1f}%)")
-            
-            if leg.hedge_active:
-                print(f"\n  🛡️ ACTIVE HEDGE:")
-                print(f"     Level: {leg.hedge_level}")
-                print(f"     Symbol: {leg.hedge_symbol}")
-                print(f"     Entry: ₹{leg.hedge_entry_premium:.2f} (at {leg.current_loss_pct:.1f}% loss)")
-                print(f"     Current: ₹{leg.hedge_current_premium:.2f}")
-                
-                # Calculate hedge P&L
-                hedge_pnl = (leg.hedge_entry_premium - leg.hedge_current_premium) * leg.lot_size
-                pnl_icon = "💰" if hedge_pnl >= 0 else "💸"
-                print(f"     {pnl_icon} Hedge P&L: ₹{hedge_pnl:+.2f}")
-            else:
-                print(f"\n  ❌ No active hedge")
-            
-            print(f"  {'-'*76}")
-        
-        # Total P&L
-        try:
-            ce_pnl = self.straddle_manager.ce_leg.get_pnl()
-            pe_pnl = self.straddle_manager.pe_leg.get_pnl()
-            total_pnl = ce_pnl + pe_pnl
-            
-            print(f"\n💰 TOTAL P&L:")
-            print(f"  CE: ₹{ce_pnl:+.2f} | PE: ₹{pe_pnl:+.2f} | TOTAL: ₹{total_pnl:+.2f}")
-        except:
-            pass
-        
-        print("="*80)
+        print('\n'.join(render_hedge_status(build_snapshot(self))))
     
     def _execute_force_buy_hedge(self, leg, leg_type: str, level: int):
         """Execute force BUY hedge - protective strategy"""
@@ -1002,7 +870,7 @@ class LiveTrader:
         
         try:
             print(f"\n{'='*80}")
-            print(f"🛡️ FORCE BUYING {leg_type} HEDGE LEVEL {level}")
+            print(f"🛡️ FORCE {leg.hedge_side.entry_side} {leg_type} HEDGE LEVEL {level}")
             print(f"{'='*80}")
             
             spot_price = api.get_spot_price()
@@ -1012,7 +880,7 @@ class LiveTrader:
             
             # ⭐ CRITICAL FIX: Use hedge strike protection method
             strikes_to_fetch = self._generate_strikes_for_option_chain(spot_price)
-            option_chain = api.get_option_chain(strikes_to_fetch)
+            option_chain = api.get_option_chain(strikes_to_fetch, core_strikes=self.chain_window.core_strikes)
             
             if not option_chain:
                 print("❌ Could not fetch option chain")
@@ -1026,14 +894,14 @@ class LiveTrader:
                 losing_leg = self.straddle_manager.pe_leg
                 profit_leg = self.straddle_manager.ce_leg
             
-            # 🔥 FIXED: Use corrected hedge manager method with BOTH legs
+            # 🔥 FIXED: Use corrected hedge manager method with BOTH legs (hedge side from the leg)
             hm = self.straddle_manager.hedge_manager
-            hedge_strike, target_premium = hm._calculate_hedge_strike_losing_side(
+            hedge_strike, target_premium = hm._calculate_hedge_strike(
                 losing_leg, profit_leg, option_chain, level
             )
             
             hedge_symbol, hedge_security_id, hedge_premium = hm._get_hedge_from_chain(
-                option_chain, hedge_strike, losing_leg.option_type
+                option_chain, hedge_strike, losing_leg.hedge_side.hedge_type(losing_leg)
             )
             
             if not hedge_symbol:
@@ -1043,7 +911,7 @@ class LiveTrader:
             print(f"   Hedge: {hedge_symbol} @ ₹{hedge_premium:.2f}")
             
             success, order_id = hm._place_hedge_order(
-                hedge_symbol, hedge_security_id, leg.lot_size
+                hedge_symbol, hedge_security_id, leg.lot_size, leg_name=leg.name, side=leg.hedge_side
             )
             
             if not success:
@@ -1057,7 +925,7 @@ class LiveTrader:
                     hedge_premium = actual_hedge_price
                     print(f"   💰 Actual fill: ₹{actual_hedge_price:.2f}")
             
-            leg.buy_hedge(hedge_symbol, hedge_security_id, hedge_strike, hedge_premium, level)
+            leg.enter_hedge(hedge_symbol, hedge_security_id, hedge_strike, hedge_premium, level)
             
             if self.excel_logger:
                 self.excel_logger.log_manual_intervention(
@@ -1078,7 +946,7 @@ class LiveTrader:
                     buffer_target_pct=0  # No buffer in pure system
                 )
             
-            print(f"✅ {leg_type} hedge Level {level} BOUGHT!")
+            print(f"✅ {leg_type} hedge Level {level} ENTERED ({leg.hedge_side.entry_side})!")
             print(f"{'='*80}")
             
             # 🔥 FIX #1: Invalidate cache + trigger reconciliation
@@ -1119,7 +987,7 @@ class LiveTrader:
             # ✅ FIX: Reuse existing hedge manager
             hm = self.straddle_manager.hedge_manager
             success, order_id = hm._place_hedge_exit_order(
-                leg.hedge_symbol, leg.hedge_security_id, leg.lot_size
+                leg.hedge_symbol, leg.hedge_security_id, leg.lot_size, leg_name=leg.name, side=leg.hedge_side
             )
             
             if not success:
@@ -1283,6 +1151,7 @@ class LiveTrader:
     
     def _handle_interactive_exit(self):
         """Handle interactive exit - ask user what to do"""
+        flush_logs()
         self._display_exit_summary()
         
         print("="*80)
@@ -1390,19 +1259,19 @@ class LiveTrader:
         print("\n[STARTING] Trading loop started")
         print(f"[CONFIG] Press Ctrl+C to open Control Menu")
         print(f"[CONFIG] Candle Interval: {config.CANDLE_INTERVAL_SECONDS} seconds")
-        print(f"[CONFIG] ⏰ CANDLES ALIGNED TO WALL CLOCK")
+        print(f"[CONFIG] ⏰ CANDLES ALIGNED TO WALL CLOCK (monotonic scheduler + drift correction)")
         print(f"[CONFIG] Production-Safe Reconciliation: Enabled")
         print(f"[CONFIG] Event-Driven Reconciliation: Enabled")
         print(f"[CONFIG] Interactive Exit: Enabled")
-        print(f"[CONFIG] ✅ SIMPLIFIED AUTHENTICATION: One login per day")
-        print(f"[CONFIG] ✅ REACTIVE RE-LOGIN: Only on AB1007 errors")
-        print(f"[CONFIG] ✅ NO PROACTIVE REFRESHES")
+        print(f"[CONFIG] ✅ SESSION MANAGER: background re-login on AB1007 / auth errors")
+        print(f"[CONFIG] ✅ PROACTIVE REFRESH: {config.SESSION_REFRESH_AHEAD_MINUTES:g} min before "
+              f"{config.SESSION_VALIDITY_HOURS:g}h session expiry")
         print(f"[CONFIG] ✅ SIMPLIFIED KEYBOARD: Ctrl+C only")
         print(f"[CONFIG] HYBRID: 2-Level Price-Neutral + Level 3 Hard Stop")
-        print(f"[CONFIG] PURE: NO BUFFER/NO TRAILING - Hold SELL hedges until Level 3")
-        print(f"[CONFIG] BALANCED: 17 strikes (±8) coverage")
+        print(f"[CONFIG] PURE: NO BUFFER/NO TRAILING - Hold {config.HEDGE_SIDE} hedges until Level 3")
+        print(f"[CONFIG] ADAPTIVE chain window: ±{config.CHAIN_WINDOW_MIN_STRIKES} to ±{config.CHAIN_WINDOW_MAX_STRIKES} strikes")
         print(f"[CONFIG] 🛡️ HEDGE STRIKE PROTECTION: ACTIVE ✅")
-        print(f"[CONFIG] ✅ WebSocket Health Check: Reactive only")
+        print(f"[CONFIG] ✅ WebSocket Health Check: every candle, make-before-break reconnect")
         print(f"[CONFIG] ✅ FIXED: Instant resume from menu (no 2-minute delay)\n")
         
         try:
@@ -1426,6 +1295,7 @@ class LiveTrader:
                 
                 except KeyboardInterrupt:
                     # This catches Ctrl+C in main loop
+                    flush_logs()
                     print("\n\n" + "="*80)
                     print("[INTERRUPT] KEYBOARD INTERRUPT RECEIVED (Ctrl+C)")
                     print("="*80)
@@ -1444,27 +1314,45 @@ class LiveTrader:
                     break
                 
                 except Exception as e:
-                    print(f"[ERROR] Error in main loop: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+                    log.exception(f"[ERROR] Error in main loop: {str(e)}")
                     
                     # 🔥 NEW: Don't continue if there's an error with open positions
                     if self.straddle_manager.straddle_active:
-                        print("\n🚨 ERROR WITH ACTIVE POSITIONS!")
-                        print("Pausing for safety...")
-                        print("Press Ctrl+C to handle positions, or wait 30s to continue")
+                        log.error("\n🚨 ERROR WITH ACTIVE POSITIONS!")
+                        log.error("Pausing for safety...")
+                        log.error("Press Ctrl+C to handle positions, or wait 30s to continue")
                         self.interruptible_sleep(30)
                     else:
                         self.interruptible_sleep(5)
         
         except Exception as e:
-            print(f"\n[CRITICAL] Unhandled exception in main loop: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception(f"\n[CRITICAL] Unhandled exception in main loop: {e}")
         
         finally:
+            flush_logs()
+            self.scheduler.display_metrics()
             print("\n[STOP] Trading loop stopped")
     
+    def run_headless(self):
+        """
+        🌐 Candle loop without menu / prompts (multi_engine.py runs one per strategy on its own thread)
+        Stops on EOD, emergency, or interrupt_received (set by the engine on Ctrl+C)
+        """
+        self.running = True
+        log.info(f"[STARTING] {config.STRATEGY_ID} trading loop started ({config.UNDERLYING} {config.EXPIRY_DATE}, "
+                 f"lot {config.LOT_SIZE}, {config.HEDGE_SIDE} hedge)")
+        try:
+            while self.running and not self.interrupt_received:
+                try:
+                    self.process_candle()
+                    self._wait_for_next_candle()
+                except Exception as e:
+                    log.exception(f"[ERROR] Error in {config.STRATEGY_ID} loop: {str(e)}")
+                    self.interruptible_sleep(30 if self.straddle_manager.straddle_active else 5)
+        finally:
+            self.running = False
+            log.info(f"[STOP] {config.STRATEGY_ID} trading loop stopped")
+
     def run(self):
         """Run the trading system"""
         if not self.initialize_system():
@@ -1482,6 +1370,7 @@ class LiveTrader:
 
 def main():
     """Entry point"""
+    setup_logging()
     trader = LiveTrader()
     trader.run()
 
@@ -0,0 +1,193 @@
+"""
+Lock Manager - KEYED ORDER LOCKS WITH TIMEOUTS
+✅ Replaces the single global critical_operation_lock
+✅ One re-entrant lock per key, created on first use:
+   - leg:<UNDERLYING>:<CE|PE> → state of one straddle leg (hedge decisions, upgrades)
+   - instrument:<token>     → orders on one contract
+✅ Multi-key acquire in a fixed order (legs before instruments, then by name) - no lock-order deadlocks
+✅ Every acquire has a deadline: a hung order call holding a key makes the next caller
+   fail fast (LockTimeout) instead of freezing the whole bot
+✅ Wait time per key class (histogram) + timeouts + current holders for health / metrics
+
+Usage:
+    with api.locks.hold(f"HEDGE_ENTRY_{symbol}", [leg_key('CE'), instrument_key(token)]):
+        api.place_order_with_verification(...)
+
+    lease = api.locks.acquire("STRADDLE_EXIT_26000", keys, timeout=config.LOCK_EXIT_TIMEOUT_SECONDS)
+    try: ...
+    finally: lease.release()
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+import threading
+import time
+from config import config
+from latency_tracker import LatencyHistogram, latency
+from bot_logging import get_logger
+
+log = get_logger('lock_manager')
+
+# Acquire order - coarser scopes first
+KEY_RANKS = {'leg': 0, 'instrument': 1}
+
+
+def leg_key(name: str) -> str:
+    """Leg of the calling strategy's straddle (each strategy has its own CE / PE)"""
+    return f"leg:{config.STRATEGY_ID}:{name}"
+
+
+def instrument_key(token) -> str:
+    return f"instrument:{token}"
+
+
+def _key_class(key: str) -> str:
+    return key.split(':', 1)[0]
+
+
+class LockTimeout(Exception):
+    """A key could not be acquired before the deadline"""
+
+
+class LockLease:
+    """Keys held by one operation - release() is idempotent"""
+
+    def __init__(self, manager: 'LockManager', operation: str):
+        self.manager = manager
+        self.operation = operation
+        self.keys: List[str] = []
+
+    def release(self):
+        while self.keys:
+            self.manager._release(self.keys.pop())
+
+
+class LockManager:
+    """Registry of keyed RLocks"""
+
+    def __init__(self):
+        self.lock = threading.Lock()                  # Guards the registry and stats
+        self.locks: Dict[str, threading.RLock] = {}
+        self.holders: Dict[str, Dict] = {}            # key → {operation, thread, since, depth}
+        self.wait_histograms: Dict[str, LatencyHistogram] = {}
+
+        # Stats
+        self.acquisitions = 0
+        self.contended = 0
+        self.timeouts: Dict[str, int] = {}
+
+    def _lock_for(self, key: str) -> threading.RLock:
+        with self.lock:
+            lock = self.locks.get(key)
+            if lock is None:
+                lock = self.locks[key] = threading.RLock()
+            return lock
+
+    @staticmethod
+    def _order(keys: Iterable[str]) -> List[str]:
+        return sorted(set(keys), key=lambda key: (KEY_RANKS.get(_key_class(key), len(KEY_RANKS)), key))
+
+    def acquire(self, operation: str, keys: Iterable[str], timeout: float = None) -> LockLease:
+        """
+        Acquire all keys (re-entrant per thread) or none
+        Raises LockTimeout after `timeout` seconds (default LOCK_TIMEOUT_SECONDS)
+        """
+        timeout = config.LOCK_TIMEOUT_SECONDS if timeout is None else timeout
+        lease = LockLease(self, operation)
+        started = time.monotonic()
+        deadline = started + timeout
+
+        for key in self._order(keys):
+            lock = self._lock_for(key)
+            key_started = time.monotonic()
+            acquired = lock.acquire(blocking=False)
+            if not acquired:
+                log.debug("🔒 %s waiting for %s (held by %s)", operation, key,
+                          self.holders.get(key, {}).get('operation'))
+                acquired = lock.acquire(timeout=max(0.0, deadline - time.monotonic()))
+                with self.lock:
+                    self.contended += 1
+
+            wait_ms = (time.monotonic() - key_started) * 1000
+            if not acquired:
+                lease.release()
+                with self.lock:
+                    key_class = _key_class(key)
+                    self.timeouts[key_class] = self.timeouts.get(key_class, 0) + 1
+                    holder = dict(self.holders.get(key, {}))
+                latency.record('lock_wait', (time.monotonic() - started) * 1000)
+                raise LockTimeout(f"{operation}: {key} not acquired within {timeout:g}s "
+                                  f"(held by {holder.get('operation', 'unknown')} on {holder.get('thread', '?')})")
+
+            self._held(key, operation, wait_ms)
+            lease.keys.append(key)
+
+        latency.record('lock_wait', (time.monotonic() - started) * 1000)
+        log.debug("✅ Locks acquired: %s %s", operation, lease.keys)
+        return lease
+
+    def _held(self, key: str, operation: str, wait_ms: float):
+        with self.lock:
+            self.acquisitions += 1
+            histogram = self.wait_histograms.get(_key_class(key))
+            if histogram is None:
+                histogram = self.wait_histograms[_key_class(key)] = LatencyHistogram()
+            histogram.observe(wait_ms)
+
+            holder = self.holders.get(key)
+            if holder is None:
+                self.holders[key] = {
+                    'operation': operation,
+                    'thread': threading.current_thread().name,
+                    'since': time.monotonic(),
+                    'depth': 1,
+                }
+            else:
+                holder['depth'] += 1
+
+    def _release(self, key: str):
+        with self.lock:
+            holder = self.holders.get(key)
+            if holder is not None:
+                holder['depth'] -= 1
+                if holder['depth'] <= 0:
+                    del self.holders[key]
+            lock = self.locks[key]
+        lock.release()
+
+    @contextmanager
+    def hold(self, operation: str, keys: Iterable[str], timeout: float = None):
+        lease = self.acquire(operation, keys, timeout)
+        try:
+            yield lease
+        finally:
+            lease.release()
+            log.debug("🔓 Locks released: %s", operation)
+
+    def busy(self) -> bool:
+        """Any order operation in progress"""
+        with self.lock:
+            return bool(self.holders)
+
+    def get_histograms(self) -> Dict[str, LatencyHistogram]:
+        with self.lock:
+            return dict(self.wait_histograms)
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        with self.lock:
+            return {
+                'keys': len(self.locks),
+                'acquisitions': self.acquisitions,
+                'contended': self.contended,
+                'timeouts': dict(self.timeouts),
+                'held': {
+                    key: {
+                        'operation': holder['operation'],
+                        'thread': holder['thread'],
+                        'held_s': round(now - holder['since'], 1),
+                    }
+                    for key, holder in self.holders.items()
+                },
+                'wait': {key_class: histogram.snapshot() for key_class, histogram in self.wait_histograms.items()},
+            }
@@ -0,0 +1,270 @@
+"""
+Metrics - PROMETHEUS TEXT ENDPOINT FOR THE LIVE BOT
+✅ Pull-based: hot paths only bump plain ints on objects they already own
+   (api.tick_counts, api.rest_calls, ...) - collectors read them at scrape time
+✅ REST calls / errors per endpoint, rate-limit waits, token / position / order template hit ratios,
+   ticks per token, WebSocket failovers, candle lateness, order-path latency, order lock waits
+✅ Local HTTP server (daemon thread): /metrics (Prometheus text), /health (JSON)
+✅ Off by default - METRICS_ENABLED=true, METRICS_HOST / METRICS_PORT
+
+Scrape:
+    curl http://127.0.0.1:9108/metrics
+    rate(angel_ticks_total[1m])   # tick rate per token in Prometheus/Grafana
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional
+import json
+import threading
+from config import config
+from latency_tracker import LatencyHistogram, latency
+from bot_logging import get_logger
+
+log = get_logger('metrics')
+
+PREFIX = 'angel'
+
+
+# ----------------------------------------------------------------------
+# Metric families (plain dicts, built at scrape time)
+# ----------------------------------------------------------------------
+
+def counter(name: str, help_text: str, samples: Iterable) -> Dict:
+    """samples: [(labels dict, value), ...]"""
+    return {'name': name, 'type': 'counter', 'help': help_text, 'samples': list(samples)}
+
+
+def gauge(name: str, help_text: str, samples: Iterable) -> Dict:
+    return {'name': name, 'type': 'gauge', 'help': help_text, 'samples': list(samples)}
+
+
+def histogram(name: str, help_text: str, label: str, histograms: Dict[str, LatencyHistogram]) -> Dict:
+    """One labelled series per LatencyHistogram (bounds in ms)"""
+    return {'name': name, 'type': 'histogram', 'help': help_text,
+            'samples': [({label: key}, hist) for key, hist in sorted(histograms.items())]}
+
+
+def _labels(labels: Dict, extra: Dict = None) -> str:
+    merged = dict(labels)
+    if extra:
+        merged.update(extra)
+    if not merged:
+        return ''
+    parts = []
+    for key, value in merged.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _ratio(hits: int, misses: int) -> float:
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+
+# ----------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------
+
+class MetricsRegistry:
+    """Collectors return metric families; render() formats Prometheus text 0.0.4"""
+
+    def __init__(self, prefix: str = PREFIX):
+        self.prefix = prefix
+        self.collectors: List[Callable[[], List[Dict]]] = []
+        self.lock = threading.Lock()
+        self.scrapes = 0
+
+    def register(self, collector: Callable[[], List[Dict]]):
+        with self.lock:
+            self.collectors.append(collector)
+
+    def collect(self) -> List[Dict]:
+        with self.lock:
+            collectors = list(self.collectors)
+        families = []
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                log.warning("⚠️ Metrics collector error: %s", e)
+        return families
+
+    def render(self) -> str:
+        self.scrapes += 1
+        lines = []
+        for family in self.collect():
+            name = f"{self.prefix}_{family['name']}"
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            if family['type'] == 'histogram':
+                for labels, hist in family['samples']:
+                    cumulative = 0
+                    for bound, count in zip(hist.bounds, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels, {'le': bound})} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(labels, {'le': '+Inf'})} {hist.count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {round(hist.sum, 3)}")
+                    lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+            else:
+                for labels, value in family['samples']:
+                    lines.append(f"{name}{_labels(labels)} {float(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+# ----------------------------------------------------------------------
+# Collectors
+# ----------------------------------------------------------------------
+
+def api_collector(api) -> Callable[[], List[Dict]]:
+    """REST, caches, ticks, WebSocket and breakers from AngelOneAPI counters"""
+
+    def collect() -> List[Dict]:
+        token_hits, token_misses = api.token_cache_hits, api.token_cache_misses
+        position_hits, position_misses = api.position_cache_hits, api.position_cache_misses
+        template_hits, template_misses = api.order_templates.hits, api.order_templates.misses
+        return [
+            counter('rest_calls_total', 'REST calls by rate-limit operation',
+                    (({'operation': op}, n) for op, n in list(api.rest_calls.items()))),
+            counter('rest_errors_total', 'REST errors by endpoint and broker error code',
+                    (({'endpoint': endpoint, 'code': code or 'none'}, n)
+                     for (endpoint, code), n in list(api.rest_errors.items()))),
+            counter('cache_requests_total', 'Cache lookups by cache and result', [
+                ({'cache': 'token', 'result': 'hit'}, token_hits),
+                ({'cache': 'token', 'result': 'miss'}, token_misses),
+                ({'cache': 'position', 'result': 'hit'}, position_hits),
+                ({'cache': 'position', 'result': 'miss'}, position_misses),
+                ({'cache': 'order_template', 'result': 'hit'}, template_hits),
+                ({'cache': 'order_template', 'result': 'miss'}, template_misses),
+            ]),
+            gauge('cache_hit_ratio', 'Hit ratio since start', [
+                ({'cache': 'token'}, _ratio(token_hits, token_misses)),
+                ({'cache': 'position'}, _ratio(position_hits, position_misses)),
+                ({'cache': 'order_template'}, _ratio(template_hits, template_misses)),
+            ]),
+            gauge('token_cache_size', 'Tokens with a cached LTP', [({}, len(api.token_cache))]),
+            counter('ticks_total', 'WebSocket LTP ticks per token',
+                    (({'token': token}, n) for token, n in list(api.tick_counts.items()))),
+            counter('ws_failovers_total', 'Market WebSocket make-before-break failovers',
+                    [({}, api.ws_failovers)]),
+            gauge('ws_connected', 'WebSocket liveness (1 = up)', [
+                ({'socket': 'market'}, int(bool(api.market_ws))),
+                ({'socket': 'order'}, int(bool(api.order_ws_live))),
+            ]),
+            gauge('session_generation', 'Re-logins since start', [({}, api.session_generation)]),
+            gauge('breaker_open', 'REST circuit breaker open (1) / closed (0)',
+                  (({'endpoint': name}, int(breaker.is_open())) for name, breaker in api.breakers.items())),
+        ]
+
+    return collect
+
+
+def scheduler_collector(scheduler) -> Callable[[], List[Dict]]:
+    """Candle loop lateness / overruns from CandleScheduler ({underlying: scheduler} → one series each)"""
+    if isinstance(scheduler, dict):
+        label, schedulers = 'strategy', scheduler
+    else:
+        label, schedulers = 'loop', {'candle': scheduler}
+
+    def samples(attr: str) -> List:
+        if label == 'loop':
+            return [({}, getattr(scheduler, attr))]
+        return [({label: name}, getattr(item, attr)) for name, item in schedulers.items()]
+
+    def collect() -> List[Dict]:
+        return [
+            histogram('candle_lateness_ms', 'Candle boundary to cycle start (ms)', label,
+                      {name: item.lateness_histogram for name, item in schedulers.items()}),
+            counter('candle_cycles_total', 'Candle cycles processed', samples('cycles')),
+            counter('candle_overruns_total', 'Cycles longer than the candle interval', samples('overruns')),
+            counter('candles_skipped_total', 'Candle boundaries skipped while processing',
+                    samples('skipped_candles')),
+        ]
+
+    return collect
+
+
+def latency_collector(tracker=latency) -> Callable[[], List[Dict]]:
+    """Order-path stage histograms (latency_tracker.py) - includes rate-limit waits"""
+
+    def collect() -> List[Dict]:
+        return [
+            histogram('order_stage_ms', 'Order path stage latency (ms)', 'stage', tracker.get_histograms()),
+            counter('orders_timed_total', 'Orders with a journaled latency span', [({}, tracker.orders)]),
+        ]
+
+    return collect
+
+
+def lock_collector(locks) -> Callable[[], List[Dict]]:
+    """Keyed order locks (lock_manager.py) - wait per key class, contention, timeouts"""
+
+    def collect() -> List[Dict]:
+        stats = locks.get_stats()
+        return [
+            histogram('lock_wait_ms', 'Order lock wait by key class (ms)', 'key_class', locks.get_histograms()),
+            counter('lock_acquisitions_total', 'Order lock acquisitions', [({}, stats['acquisitions'])]),
+            counter('lock_contended_total', 'Acquisitions that had to wait', [({}, stats['contended'])]),
+            counter('lock_timeouts_total', 'Acquisitions that hit the deadline',
+                    (({'key_class': key_class}, n) for key_class, n in stats['timeouts'].items())),
+            gauge('locks_held', 'Order lock keys currently held', [({}, len(stats['held']))]),
+        ]
+
+    return collect
+
+
+# ----------------------------------------------------------------------
+# HTTP endpoint
+# ----------------------------------------------------------------------
+
+class MetricsServer:
+    """/metrics and /health on a daemon thread (never blocks the trading loop)"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = None, port: int = None,
+                 health: Optional[Callable[[], Dict]] = None):
+        self.registry = registry
+        self.health = health
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics'):
+                    body = server.registry.render().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path.startswith('/health') and server.health:
+                    body = json.dumps(server.health(), default=str).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds - keep stdout for trading
+
+        self.httpd = ThreadingHTTPServer((host or config.METRICS_HOST, config.METRICS_PORT if port is None else port),
+                                         Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="MetricsServer", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MetricsServer':
+        self.thread.start()
+        log.info("📈 Metrics endpoint: %s/metrics", self.url)
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# Global registry
+metrics = MetricsRegistry()
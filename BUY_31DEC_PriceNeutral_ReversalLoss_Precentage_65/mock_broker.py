@@ -0,0 +1,856 @@
+"""
+Mock Broker - OFFLINE ANGEL ONE STAND-IN FOR REPLAY, LOAD AND LATENCY TESTS
+✅ SmartConnect REST surface used by AngelOneAPI (placeOrderFullResponse, getMarketData,
+   ltpData, position, orderBook, searchScrip, getCandleData)
+✅ In-process (MockSmartConnect) or real HTTP on localhost (MockRestServer + the pooled SDK client)
+✅ Market WebSocket double is a SmartWebSocketV2 subclass - same binary frames, same decoders
+✅ Order WebSocket double pushes Angel One style order updates
+✅ Configurable latency per endpoint, fill latency, random rejects, per-second rate limits
+   (AB2001), injected error codes and session expiry
+✅ Tick streams from a recorded tick log or a synthetic NIFTY option chain
+
+Usage:
+    python mock_broker.py bench                 # order / batch LTP / tick benchmarks (in-process)
+    python mock_broker.py bench --http          # through the SDK over localhost
+    python mock_broker.py bench --check         # CI: exit 1 if a BENCH_THRESHOLDS limit is missed
+    python mock_broker.py bench --paced         # keep the client-side limiter (measures pacing too)
+    python mock_broker.py bench --burst         # + AB2001 burst - checks the batch breaker opens
+
+CI (no .env / broker credentials needed - they are only checked at login):
+    cd BUY_31DEC_PriceNeutral_ReversalLoss_Precentage_65
+    LOG_CONSOLE=false python mock_broker.py bench --check && \
+    LOG_CONSOLE=false python mock_broker.py bench --http --burst --check
+    python mock_broker.py serve --port 8765     # REST server + synthetic ticks until Ctrl+C
+
+    broker = MockBroker(latency={'placeOrder': 0.05}, reject_rate=0.02)
+    broker.install(api)
+"""
+
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+import json
+import math
+import random
+import sys
+import threading
+import time
+from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+from tick_decoder import LTP_FRAME, LTP_MODE, BINARY
+
+NIFTY_SPOT_TOKEN = "99926000"
+
+# Typical SmartAPI per-second limits - check the current published table before relying on them
+DEFAULT_RATE_LIMITS = {
+    'placeOrder': 20,
+    'getMarketData': 10,
+    'ltpData': 10,
+    'orderBook': 1,
+    'position': 1,
+    'searchScrip': 1,
+    'getCandleData': 3,
+}
+
+# bench --check pass/fail limits (generous - a CI runner, not a trading box; override per flag)
+BENCH_THRESHOLDS = {
+    'min_ticks_per_second': 20000,
+    'max_batch_ltp_p95_ms': 100.0,
+    'max_order_p95_ms': 100.0,
+}
+
+CANDLE_MINUTES = {
+    'ONE_MINUTE': 1, 'THREE_MINUTE': 3, 'FIVE_MINUTE': 5, 'TEN_MINUTE': 10,
+    'FIFTEEN_MINUTE': 15, 'THIRTY_MINUTE': 30, 'ONE_HOUR': 60,
+}
+
+
+class MockBroker:
+    """Order matching + price state shared by the REST and WebSocket doubles"""
+
+    def __init__(self, latency: Optional[Dict[str, float]] = None, latency_jitter: float = 0.2,
+                 fill_latency: float = 0.0, reject_rate: float = 0.0,
+                 rate_limits: Optional[Dict[str, int]] = None, seed: int = 7):
+        self.latency = latency or {}            # endpoint (or 'default') → seconds
+        self.latency_jitter = latency_jitter    # ± fraction of the latency
+        self.fill_latency = fill_latency        # seconds from accept to fill (0 = immediate)
+        self.reject_rate = reject_rate          # probability an order is rejected
+        self.rate_limits = rate_limits or {}    # endpoint → calls per second
+        self.random = random.Random(seed)
+
+        self.lock = threading.RLock()
+        self.ltp: Dict[str, float] = {}            # token → last traded price (rupees)
+        self.scrips: Dict[str, Dict] = {}          # tradingsymbol → {'token', 'lotsize', ...}
+        self.positions: Dict[str, Dict] = {}       # token → position book row
+        self.orders: List[Dict] = []               # order book (oldest first)
+        self.bars: Dict[str, Dict[int, List[float]]] = {}  # token → minute → [o, h, l, c, ticks]
+        self.market_sockets: List["MockMarketWS"] = []
+        self.order_sockets: List["MockOrderWS"] = []
+        self.session_valid = True
+        self._next_order_id = 1
+        self._sequence = 0
+        self._calls: Dict[str, deque] = {}       # endpoint → recent call times (rate limit window)
+        self._injected: Dict[str, List[str]] = {}  # endpoint → queued error codes
+
+        # Stats
+        self.ticks = 0
+        self.rest_calls: Dict[str, int] = {}
+        self.rate_limited: Dict[str, int] = {}
+        self.rejects = 0
+
+    # ------------------------------------------------------------------
+    # Market data in
+    # ------------------------------------------------------------------
+
+    def add_scrip(self, symbol: str, token: str, lot_size: int = 0, strike: int = 0):
+        self.scrips[symbol] = {'token': str(token), 'lotsize': lot_size, 'strike': strike}
+
+    def push_frame(self, frame: bytes):
+        """Deliver a raw market frame (recorded or built) to subscribed sockets"""
+        token = None
+        if len(frame) >= LTP_FRAME.size:
+            _, _, raw_token, _, _, ltp = LTP_FRAME.unpack_from(frame)
+            token = raw_token.split(b'\x00', 1)[0].decode('ascii')
+            if ltp:
+                self._on_price(token, ltp / 100.0)
+        self.ticks += 1
+
+        for ws in list(self.market_sockets):
+            if token is None or token in ws.subscribed:
+                ws._on_data(None, frame, BINARY, True)
+
+    def push_tick(self, token: str, ltp: float, exchange_type: int = 2):
+        """Build an LTP-mode frame and deliver it"""
+        self._sequence += 1
+        frame = LTP_FRAME.pack(LTP_MODE, exchange_type, str(token).encode('ascii'),
+                               self._sequence, int(time.time() * 1000), int(round(ltp * 100)))
+        self.push_frame(frame)
+
+    def _on_price(self, token: str, price: float):
+        self.ltp[token] = price
+        minute = int(time.time() // 60)
+        bars = self.bars.setdefault(token, {})
+        bar = bars.get(minute)
+        if bar is None:
+            bars[minute] = [price, price, price, price, 1]
+        else:
+            bar[1] = max(bar[1], price)
+            bar[2] = min(bar[2], price)
+            bar[3] = price
+            bar[4] += 1
+
+    # ------------------------------------------------------------------
+    # Fault injection
+    # ------------------------------------------------------------------
+
+    def inject_error(self, endpoint: str, error_code: str, count: int = 1):
+        """Next `count` calls to endpoint fail with error_code (AB2001, AB1004, AG8001, ...)"""
+        self._injected.setdefault(endpoint, []).extend([error_code] * count)
+
+    def expire_session(self):
+        """Every call fails with AG8001 until generateSession"""
+        self.session_valid = False
+
+    @staticmethod
+    def _error(code: str, message: str) -> Dict:
+        return {'status': False, 'message': message, 'errorcode': code, 'data': None}
+
+    def _gate(self, endpoint: str) -> Optional[Dict]:
+        """Latency, injected errors, session and rate limit for one REST call (None = proceed)"""
+        self.rest_calls[endpoint] = self.rest_calls.get(endpoint, 0) + 1
+
+        delay = self.latency.get(endpoint, self.latency.get('default', 0.0))
+        if delay > 0:
+            jitter = self.latency_jitter
+            time.sleep(delay * (1 + self.random.uniform(-jitter, jitter)))
+
+        with self.lock:
+            queued = self._injected.get(endpoint)
+            if queued:
+                code = queued.pop(0)
+                return self._error(code, f"Injected error {code}")
+
+            if not self.session_valid:
+                return self._error('AG8001', 'Invalid Token')
+
+            limit = self.rate_limits.get(endpoint)
+            if limit:
+                now = time.time()
+                window = self._calls.setdefault(endpoint, deque())
+                while window and now - window[0] >= 1.0:
+                    window.popleft()
+                if len(window) >= limit:
+                    self.rate_limited[endpoint] = self.rate_limited.get(endpoint, 0) + 1
+                    return self._error('AB2001', 'Access denied because of exceeding access rate')
+                window.append(now)
+        return None
+
+    # ------------------------------------------------------------------
+    # Orders
+    # ------------------------------------------------------------------
+
+    def place_order(self, params: Dict) -> Dict:
+        """MARKET order → fill at the last tick (immediately or after fill_latency)"""
+        error = self._gate('placeOrder')
+        if error:
+            return error
+
+        with self.lock:
+            order_id = f"MOCK{self._next_order_id:08d}"
+            self._next_order_id += 1
+
+            token = str(params.get('symboltoken', ''))
+            side = str(params.get('transactiontype', '')).upper()
+            qty = int(float(params.get('quantity') or 0))
+
+            order = {
+                'orderid': order_id,
+                'tradingsymbol': params.get('tradingsymbol'),
+                'symboltoken': token,
+                'exchange': params.get('exchange', 'NFO'),
+                'transactiontype': side,
+                'ordertype': params.get('ordertype', 'MARKET'),
+                'producttype': params.get('producttype', 'INTRADAY'),
+                'quantity': str(qty),
+                'price': params.get('price', '0'),
+                'filledshares': '0',
+                'averageprice': 0,
+                'updatetime': datetime.fromtimestamp(time.time()).strftime('%d-%b-%Y %H:%M:%S'),
+            }
+
+            if self.ltp.get(token) is None or qty <= 0 or side not in ('BUY', 'SELL'):
+                self._reject(order, 'No market price for instrument' if self.ltp.get(token) is None
+                             else 'Invalid order')
+            elif self.reject_rate and self.random.random() < self.reject_rate:
+                self._reject(order, 'RMS: simulated reject')
+            elif self.fill_latency > 0:
+                order['orderstatus'] = 'open'
+            else:
+                self._fill(order)
+            self.orders.append(order)
+            update = dict(order)
+
+        self._push_order_update(update)
+        if update['orderstatus'] == 'open':
+            threading.Timer(self.fill_latency, self._complete, args=(order,)).start()
+
+        return {
+            'status': True,
+            'message': 'SUCCESS',
+            'errorcode': '',
+            'data': {'script': order['tradingsymbol'], 'orderid': order_id, 'uniqueorderid': order_id},
+        }
+
+    def cancel_order(self, params: Dict) -> Dict:
+        """Cancel an order still open (fill_latency) - filled / rejected orders cannot be cancelled"""
+        error = self._gate('cancelOrder')
+        if error:
+            return error
+
+        order_id = str(params.get('orderid', ''))
+        with self.lock:
+            order = next((o for o in self.orders if o['orderid'] == order_id), None)
+            if order is None:
+                return self._error('AB4008', 'Order not found')
+            if order['orderstatus'] != 'open':
+                return self._error('AB4008', f"Order is {order['orderstatus']}")
+            order.update(orderstatus='cancelled', text='Cancelled by user')
+            update = dict(order)
+
+        self._push_order_update(update)
+        return self._ok({'orderid': order_id, 'uniqueorderid': order_id})
+
+    def _reject(self, order: Dict, reason: str):
+        order.update(orderstatus='rejected', text=reason)
+        self.rejects += 1
+
+    def _fill(self, order: Dict):
+        """Fill the whole order at the current LTP and update the position book"""
+        qty = int(order['quantity'])
+        price = self.ltp[order['symboltoken']]
+        order.update(orderstatus='complete', filledshares=str(qty), averageprice=price)
+
+        row = self.positions.setdefault(order['symboltoken'], {
+            'exchange': order['exchange'],
+            'symboltoken': order['symboltoken'],
+            'tradingsymbol': order['tradingsymbol'],
+            'producttype': order['producttype'],
+            'netqty': 0, 'buyqty': 0, 'sellqty': 0, 'buyamount': 0.0, 'sellamount': 0.0,
+        })
+        if order['transactiontype'] == 'BUY':
+            row['buyqty'] += qty
+            row['buyamount'] += qty * price
+            row['netqty'] += qty
+        else:
+            row['sellqty'] += qty
+            row['sellamount'] += qty * price
+            row['netqty'] -= qty
+
+    def _complete(self, order: Dict):
+        """Delayed fill (fill_latency) for an open order"""
+        with self.lock:
+            if order['orderstatus'] != 'open':
+                return
+            self._fill(order)
+            update = dict(order)
+        self._push_order_update(update)
+
+    def _push_order_update(self, order: Dict):
+        message = json.dumps({'user-id': 'MOCK', 'status-code': '200', 'order-status': order['orderstatus'],
+                              'orderData': order})
+        for ws in list(self.order_sockets):
+            if ws.on_message:
+                ws.on_message(None, message)
+
+    # ------------------------------------------------------------------
+    # REST views
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _ok(data) -> Dict:
+        return {'status': True, 'message': 'SUCCESS', 'errorcode': '', 'data': data}
+
+    def position_book(self) -> Dict:
+        error = self._gate('position')
+        if error:
+            return error
+        with self.lock:
+            rows = []
+            for row in self.positions.values():
+                ltp = self.ltp.get(row['symboltoken'], 0.0)
+                pnl = row['sellamount'] - row['buyamount'] + row['netqty'] * ltp
+                rows.append({**row, 'netqty': str(row['netqty']), 'ltp': ltp, 'pnl': round(pnl, 2)})
+        return self._ok(rows or None)
+
+    def order_book(self) -> Dict:
+        error = self._gate('orderBook')
+        if error:
+            return error
+        with self.lock:
+            return self._ok([dict(o) for o in self.orders])
+
+    def market_data(self, mode: str, exchange_tokens) -> Dict:
+        error = self._gate('getMarketData')
+        if error:
+            return error
+        tokens = exchange_tokens if isinstance(exchange_tokens, list) else \
+            [t for values in exchange_tokens.values() for t in values]
+        fetched, unfetched = [], []
+        for token in tokens:
+            token = str(token)
+            if token in self.ltp:
+                fetched.append({'exchange': 'NFO', 'symbolToken': token, 'ltp': self.ltp[token]})
+            else:
+                unfetched.append({'symbolToken': token, 'message': 'Invalid token'})
+        return self._ok({'fetched': fetched, 'unfetched': unfetched})
+
+    def ltp_data(self, exchange: str, symbol: str, token: str) -> Dict:
+        error = self._gate('ltpData')
+        if error:
+            return error
+        if str(token) not in self.ltp:
+            return self._error('AB1018', 'Invalid token')
+        return self._ok({'exchange': exchange, 'tradingsymbol': symbol, 'symboltoken': token,
+                         'ltp': self.ltp[str(token)]})
+
+    def search_scrip(self, exchange: str, symbol: str) -> Dict:
+        error = self._gate('searchScrip')
+        if error:
+            return error
+        scrip = self.scrips.get(symbol)
+        if not scrip:
+            return self._ok([])
+        return self._ok([{'exchange': exchange, 'tradingsymbol': symbol, 'symboltoken': scrip['token']}])
+
+    def candle_data(self, params: Dict) -> Dict:
+        """OHLC bars built from the ticks pushed so far ([time, o, h, l, c, volume])"""
+        error = self._gate('getCandleData')
+        if error:
+            return error
+        step = CANDLE_MINUTES.get(params.get('interval', 'ONE_MINUTE'), 1)
+        fmt = '%Y-%m-%d %H:%M'
+        start = int(datetime.strptime(params['fromdate'], fmt).timestamp() // 60) if params.get('fromdate') else 0
+        end = int(datetime.strptime(params['todate'], fmt).timestamp() // 60) if params.get('todate') else math.inf
+
+        grouped: Dict[int, List[float]] = {}
+        with self.lock:
+            for minute, (o, h, l, c, n) in sorted(self.bars.get(str(params.get('symboltoken')), {}).items()):
+                if not start <= minute <= end:
+                    continue
+                key = minute - minute % step
+                bar = grouped.get(key)
+                if bar is None:
+                    grouped[key] = [o, h, l, c, n]
+                else:
+                    bar[1], bar[2], bar[3], bar[4] = max(bar[1], h), min(bar[2], l), c, bar[4] + n
+
+        return self._ok([
+            [datetime.fromtimestamp(key * 60).astimezone().isoformat(timespec='seconds'), *bar]
+            for key, bar in sorted(grouped.items())
+        ])
+
+    def login(self) -> Dict:
+        self.session_valid = True
+        return self._ok({'jwtToken': 'MOCK', 'refreshToken': 'MOCK', 'feedToken': 'MOCK'})
+
+    # ------------------------------------------------------------------
+    # Wiring
+    # ------------------------------------------------------------------
+
+    def install(self, api, rest_url: Optional[str] = None):
+        """
+        Point an AngelOneAPI at this broker (no login, no threads)
+        rest_url: use the real SDK over HTTP against a MockRestServer instead of MockSmartConnect
+        """
+        if rest_url:
+            from angelone_api import PooledSmartConnect
+            smart_api = PooledSmartConnect(api_key='MOCK', root=rest_url)
+            smart_api.setAccessToken('MOCK')
+            api.smart_api = smart_api
+        else:
+            api.smart_api = MockSmartConnect(self)
+        api.auth_token_string = 'Bearer MOCK'
+        api.feed_token = 'MOCK'
+        api.is_connected = True
+
+        # Failover builds its standby sockets from these
+        api._create_market_ws = lambda: MockMarketWS(self)
+        api._create_order_ws = lambda: MockOrderWS(self)
+
+        api.market_ws = api._create_market_ws()
+        api._setup_market_websocket_callbacks()
+        api.chain_subscriptions = {}
+        api.order_ws = api._create_order_ws()
+        api._setup_order_websocket_callbacks()
+        api.ws_enabled = True
+
+        api.market_ws.connect()
+        api.order_ws.connect()
+        api._subscribe_nifty_spot()
+        api.session.mark_logged_in()  # Ready without starting the re-login worker
+        return self
+
+    def get_stats(self) -> Dict:
+        return {
+            'ticks': self.ticks,
+            'orders': len(self.orders),
+            'rejects': self.rejects,
+            'rest_calls': dict(self.rest_calls),
+            'rate_limited': dict(self.rate_limited),
+        }
+
+
+class MockSmartConnect:
+    """SmartConnect method names → MockBroker (in-process, no HTTP)"""
+
+    def __init__(self, broker: MockBroker):
+        self.broker = broker
+
+    def generateSession(self, clientCode, password, totp):
+        return self.broker.login()
+
+    def terminateSession(self, clientCode):
+        return {'status': True, 'data': 'Logout Successfully'}
+
+    def placeOrderFullResponse(self, orderparams):
+        return self.broker.place_order(orderparams)
+
+    def placeOrder(self, orderparams):
+        response = self.broker.place_order(orderparams)
+        return response['data']['orderid'] if response.get('status') else None
+
+    def cancelOrder(self, order_id, variety):
+        return self.broker.cancel_order({'orderid': order_id, 'variety': variety})
+
+    def orderBook(self):
+        return self.broker.order_book()
+
+    def position(self):
+        return self.broker.position_book()
+
+    def getMarketData(self, mode, exchangeTokens):
+        return self.broker.market_data(mode, exchangeTokens)
+
+    def ltpData(self, exchange, tradingsymbol, symboltoken):
+        return self.broker.ltp_data(exchange, tradingsymbol, symboltoken)
+
+    def searchScrip(self, exchange, searchscrip):
+        return self.broker.search_scrip(exchange, searchscrip)
+
+    def getCandleData(self, historicDataParams):
+        return self.broker.candle_data(historicDataParams)
+
+
+class MockMarketWS(SmartWebSocketV2):
+    """SmartWebSocketV2 without the network - frames arrive via MockBroker.push_frame"""
+
+    def __init__(self, broker: MockBroker):
+        super().__init__('MOCK', 'MOCK', 'MOCK', 'MOCK')
+        self.broker = broker
+        self.subscribed = set()
+
+    def connect(self):
+        if self not in self.broker.market_sockets:
+            self.broker.market_sockets.append(self)
+        if self.on_open:
+            self.on_open(None)
+
+    def subscribe(self, correlation_id, mode, token_list):
+        new_tokens = []
+        for group in token_list:
+            for token in group.get('tokens', []):
+                if token not in self.subscribed:
+                    self.subscribed.add(token)
+                    new_tokens.append((token, group.get('exchangeType', 2)))
+
+        # Snapshot tick on subscribe (as the real feed does)
+        for token, exchange_type in new_tokens:
+            ltp = self.broker.ltp.get(token)
+            if ltp:
+                frame = LTP_FRAME.pack(LTP_MODE, exchange_type, token.encode('ascii'), 0,
+                                       int(time.time() * 1000), int(round(ltp * 100)))
+                self._on_data(None, frame, BINARY, True)
+
+    def unsubscribe(self, correlation_id, mode, token_list):
+        for group in token_list:
+            self.subscribed.difference_update(group.get('tokens', []))
+
+    def close_connection(self):
+        if self in self.broker.market_sockets:
+            self.broker.market_sockets.remove(self)
+        if self.on_close:
+            self.on_close(None)
+
+
+class MockOrderWS:
+    """SmartWebSocketOrderUpdate double - messages arrive via MockBroker"""
+
+    def __init__(self, broker: MockBroker):
+        self.broker = broker
+        self.auth_token = 'MOCK'
+        self.feed_token = 'MOCK'
+        self.on_open = None
+        self.on_message = None
+        self.on_error = None
+        self.on_close = None
+
+    def connect(self):
+        if self not in self.broker.order_sockets:
+            self.broker.order_sockets.append(self)
+        if self.on_open:
+            self.on_open(None)
+
+    def close_connection(self):
+        if self in self.broker.order_sockets:
+            self.broker.order_sockets.remove(self)
+        if self.on_close:
+            self.on_close(None)
+
+
+# ----------------------------------------------------------------------
+# Localhost REST server (real SDK + HTTP stack against the mock)
+# ----------------------------------------------------------------------
+
+class MockRestServer:
+    """SmartAPI REST routes on 127.0.0.1 - use PooledSmartConnect(root=server.url)"""
+
+    def __init__(self, broker: MockBroker, port: int = 0):
+        self.broker = broker
+        routes = {
+            '/rest/auth/angelbroking/user/v1/loginByPassword': lambda body: broker.login(),
+            '/rest/secure/angelbroking/user/v1/getProfile': lambda body: broker._ok({'clientcode': 'MOCK', 'name': 'MOCK'}),
+            '/rest/secure/angelbroking/user/v1/logout': lambda body: broker._ok('Logout Successfully'),
+            '/rest/secure/angelbroking/order/v1/placeOrder': broker.place_order,
+            '/rest/secure/angelbroking/order/v1/cancelOrder': broker.cancel_order,
+            '/rest/secure/angelbroking/order/v1/getOrderBook': lambda body: broker.order_book(),
+            '/rest/secure/angelbroking/order/v1/getPosition': lambda body: broker.position_book(),
+            '/rest/secure/angelbroking/market/v1/quote': lambda body: broker.market_data(body.get('mode'), body.get('exchangeTokens', {})),
+            '/rest/secure/angelbroking/order/v1/getLtpData': lambda body: broker.ltp_data(body.get('exchange'), body.get('tradingsymbol'), body.get('symboltoken')),
+            '/rest/secure/angelbroking/order/v1/searchScrip': lambda body: broker.search_scrip(body.get('exchange'), body.get('searchscrip')),
+            '/rest/secure/angelbroking/historical/v1/getCandleData': broker.candle_data,
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            def _dispatch(self):
+                route = routes.get(self.path.split('?', 1)[0])
+                if route is None:
+                    self._send(404, {'status': False, 'message': 'Not found', 'errorcode': 'AB1004', 'data': None})
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+                self._send(200, route(body))
+
+            def _send(self, code: int, payload: Dict):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = _dispatch
+            protocol_version = 'HTTP/1.1'  # Keep-alive - pooled clients reuse their connections
+            disable_nagle_algorithm = True  # Headers + body are two writes - no 40ms delayed-ACK stall
+
+            def log_message(self, format, *args):
+                pass  # Quiet - benchmarks measure, not log
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="mock-rest")
+        self.thread.start()
+        print(f"🧪 Mock REST server on {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ----------------------------------------------------------------------
+# Tick sources
+# ----------------------------------------------------------------------
+
+class SyntheticFeed:
+    """Random-walk index spot (NIFTY by default) + a symmetric option chain priced off it"""
+
+    def __init__(self, broker: MockBroker, spot: float = 26000.0, strikes_each_side: int = 20,
+                 strike_interval: int = 50, expiry: str = '06JAN26', lot_size: int = 65,
+                 volatility: float = 4.0, seed: int = 1, underlying: str = 'NIFTY',
+                 spot_token: str = NIFTY_SPOT_TOKEN, first_token: int = 50000):
+        self.broker = broker
+        self.spot = spot
+        self.spot_token = spot_token
+        self.volatility = volatility
+        self.random = random.Random(seed)
+        self.options: Dict[str, tuple] = {}  # token → (strike, 'CE'/'PE')
+
+        atm = int(round(spot / strike_interval) * strike_interval)
+        token = first_token
+        for i in range(-strikes_each_side, strikes_each_side + 1):
+            strike = atm + i * strike_interval
+            for option_type in ('CE', 'PE'):
+                token += 1
+                self.options[str(token)] = (strike, option_type)
+                broker.add_scrip(f"{underlying}{expiry}{strike}{option_type}", str(token), lot_size, strike)
+
+    @property
+    def tokens(self) -> List[str]:
+        return list(self.options)
+
+    def premium(self, strike: int, option_type: str) -> float:
+        intrinsic = max(0.0, self.spot - strike) if option_type == 'CE' else max(0.0, strike - self.spot)
+        return round(intrinsic + 120 * math.exp(-((strike - self.spot) / 300) ** 2) + 2, 2)
+
+    def step(self):
+        """Move spot one step and tick every contract once"""
+        self.spot += self.random.gauss(0, self.volatility)
+        self.broker.push_tick(self.spot_token, round(self.spot, 2), exchange_type=1)
+        for token, (strike, option_type) in self.options.items():
+            self.broker.push_tick(token, self.premium(strike, option_type))
+
+    def run(self, steps_per_second: float, stop: threading.Event):
+        """Background stream until stop is set"""
+        def loop():
+            while not stop.wait(1.0 / steps_per_second):
+                self.step()
+        threading.Thread(target=loop, daemon=True, name="synthetic-feed").start()
+
+
+def feed_log(broker: MockBroker, path: str, speed: float = 1.0):
+    """Push recorded market frames from a tick log (speed 0 = as fast as possible)"""
+    from tick_recorder import read_log, KIND_MARKET
+    previous = None
+    for kind, ts, payload in read_log(path):
+        if kind != KIND_MARKET:
+            continue
+        if speed > 0 and previous is not None and ts > previous:
+            time.sleep((ts - previous) / speed)
+        previous = ts
+        broker.push_frame(payload)
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+def _percentiles(samples: List[float]) -> Dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+    return {'p50_ms': pick(0.5), 'p95_ms': pick(0.95), 'max_ms': round(ordered[-1] * 1000, 2)}
+
+
+def _format_value(value) -> str:
+    if isinstance(value, dict) and 'p50_ms' in value:
+        return f"p50 {value['p50_ms']:7.2f}ms | p95 {value['p95_ms']:7.2f}ms | max {value['max_ms']:7.2f}ms"
+    return str(value)
+
+
+def run_benchmark(orders: int = 50, batch_calls: int = 10, tick_steps: int = 2000,
+                  http: bool = False, paced: bool = False, burst: bool = False,
+                  latency: float = 0.0) -> Dict:
+    """
+    Order round trips, batch LTP calls and tick ingestion against the mock
+    Default resets AngelOneAPI's client-side limiter before each call (measures the code path,
+    not the pacing); paced=True keeps it
+    burst=True adds an AB2001 burst at the end - the batch breaker is expected to open
+    """
+    from angelone_api import api
+
+    broker = MockBroker(latency={'default': latency} if latency else None)
+    feed = SyntheticFeed(broker)
+    server = MockRestServer(broker).start() if http else None
+    broker.install(api, rest_url=server.url if server else None)
+    api.market_ws.subscribe('bench', 1, [{'exchangeType': 2, 'tokens': feed.tokens}])
+    feed.step()
+
+    results = {'transport': 'HTTP localhost' if http else 'in-process'}
+
+    # Tick ingestion (mock push → decoder → token cache)
+    start = time.perf_counter()
+    for _ in range(tick_steps):
+        feed.step()
+    elapsed = time.perf_counter() - start
+    ticks = tick_steps * (len(feed.options) + 1)
+    results['ticks_per_second'] = round(ticks / elapsed)
+
+    # Batch LTP
+    samples = []
+    for _ in range(batch_calls):
+        if not paced:
+            api.last_api_call_time.clear()
+        start = time.perf_counter()
+        api.get_batch_ltp(feed.tokens)
+        samples.append(time.perf_counter() - start)
+    results['batch_ltp'] = _percentiles(samples)
+
+    # Order round trip (place → order update → verified)
+    samples = []
+    filled = 0
+    token = feed.tokens[0]
+    for i in range(orders):
+        if not paced:
+            api.last_api_call_time.clear()
+        start = time.perf_counter()
+        result = api.place_order_with_verification('BUY' if i % 2 == 0 else 'SELL', 'MOCK', token, 65)
+        samples.append(time.perf_counter() - start)
+        filled += bool(result.get('filled'))
+    results['order_round_trip'] = _percentiles(samples)
+    results['orders_filled'] = f"{filled}/{orders}"
+
+    # Rate limit burst → AB2001 → breaker
+    if burst:
+        broker.rate_limits = {'getMarketData': 2}
+        for _ in range(5):
+            api.last_api_call_time.clear()
+            api.get_batch_ltp(feed.tokens[:10])
+        results['rate_limited_calls'] = broker.rate_limited.get('getMarketData', 0)
+    results['batch_breaker'] = api.breakers['batch_ltp'].get_status()['state']
+
+    results['broker'] = broker.get_stats()
+    if server:
+        server.stop()
+    return results
+
+
+def check_benchmark(results: Dict, thresholds: Optional[Dict] = None) -> List[str]:
+    """Failed limits (empty list = pass)"""
+    limits = {**BENCH_THRESHOLDS, **(thresholds or {})}
+    failures = []
+
+    if results['ticks_per_second'] < limits['min_ticks_per_second']:
+        failures.append(f"ticks/s {results['ticks_per_second']} < {limits['min_ticks_per_second']}")
+    for key, limit in (('batch_ltp', 'max_batch_ltp_p95_ms'), ('order_round_trip', 'max_order_p95_ms')):
+        p95 = results[key].get('p95_ms')
+        if p95 is None or p95 > limits[limit]:
+            failures.append(f"{key} p95 {p95}ms > {limits[limit]}ms")
+
+    filled, sent = results['orders_filled'].split('/')
+    if filled != sent:
+        failures.append(f"orders filled {results['orders_filled']}")
+
+    # Burst must trip the batch breaker, a normal run must never trip it
+    if 'rate_limited_calls' in results:
+        if not results['rate_limited_calls'] or results['batch_breaker'] == 'CLOSED':
+            failures.append(f"AB2001 burst did not open the batch breaker ({results['batch_breaker']})")
+    elif results['batch_breaker'] != 'CLOSED':
+        failures.append(f"batch breaker {results['batch_breaker']} without a burst")
+    return failures
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline Angel One mock broker")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    bench = sub.add_parser('bench', help="order / batch LTP / tick benchmarks")
+    bench.add_argument('--orders', type=int, default=50)
+    bench.add_argument('--batch-calls', type=int, default=10)
+    bench.add_argument('--tick-steps', type=int, default=2000)
+    bench.add_argument('--latency', type=float, default=0.0, help="simulated REST latency (seconds)")
+    bench.add_argument('--http', action='store_true', help="go through the SDK over localhost")
+    bench.add_argument('--paced', action='store_true', help="keep the client-side rate limiter")
+    bench.add_argument('--burst', action='store_true', help="AB2001 burst - batch breaker must open")
+    bench.add_argument('--check', action='store_true', help="exit 1 if a threshold is missed")
+    bench.add_argument('--min-ticks-per-second', type=int, default=BENCH_THRESHOLDS['min_ticks_per_second'])
+    bench.add_argument('--max-batch-ltp-p95-ms', type=float, default=BENCH_THRESHOLDS['max_batch_ltp_p95_ms'])
+    bench.add_argument('--max-order-p95-ms', type=float, default=BENCH_THRESHOLDS['max_order_p95_ms'])
+
+    serve = sub.add_parser('serve', help="REST server + synthetic ticks")
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--steps-per-second', type=float, default=1.0)
+    serve.add_argument('--log', help="stream a recorded tick log instead of synthetic ticks")
+
+    args = parser.parse_args()
+
+    from bot_logging import setup_logging, flush_logs
+    setup_logging()
+
+    if args.command == 'bench':
+        results = run_benchmark(args.orders, args.batch_calls, args.tick_steps, http=args.http,
+                                paced=args.paced, burst=args.burst, latency=args.latency)
+        flush_logs()
+        print(f"\n{'=' * 70}")
+        print(f"🧪 MOCK BROKER BENCHMARK ({results['transport']})")
+        print(f"{'=' * 70}")
+        for key, value in results.items():
+            if key != 'transport':
+                print(f"   {key.replace('_', ' ').title():<20} {_format_value(value)}")
+        print(f"{'=' * 70}\n")
+        if args.check:
+            failures = check_benchmark(results, {
+                'min_ticks_per_second': args.min_ticks_per_second,
+                'max_batch_ltp_p95_ms': args.max_batch_ltp_p95_ms,
+                'max_order_p95_ms': args.max_order_p95_ms,
+            })
+            for failure in failures:
+                print(f"❌ {failure}")
+            print("❌ BENCHMARK CHECK FAILED" if failures else "✅ BENCHMARK CHECK PASSED")
+            sys.exit(1 if failures else 0)
+        return
+
+    broker = MockBroker()
+    server = MockRestServer(broker, args.port).start()
+    stop = threading.Event()
+    try:
+        if args.log:
+            threading.Thread(target=feed_log, args=(broker, args.log), daemon=True, name="log-feed").start()
+        else:
+            SyntheticFeed(broker).run(args.steps_per_second, stop)
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
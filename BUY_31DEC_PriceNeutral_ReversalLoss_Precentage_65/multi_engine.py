@@ -0,0 +1,220 @@
+"""
+Multi Engine - SEVERAL STRATEGIES IN ONE PROCESS
+✅ One strategy instance (LiveTrader: straddle manager, reconciler, Excel log, journal, candle scheduler)
+   per configured strategy, each on its own thread under its own Config (config.for_strategy, bound per thread)
+✅ A strategy = underlying + expiry + hedge side (BUY / SELL plug-in, hedge_side.py) + levels - the
+   per-expiry / per-direction folder copies run side by side as configs instead of separate processes
+✅ Shared by all instances:
+   - ONE login / session (re-login on AB1007 serves everyone)
+   - ONE market WebSocket + tick store - spot indices + every chain window multiplexed, subscriptions tracked per strategy
+   - ONE order WebSocket + position ledger (reconciler scoped to each strategy's own instruments;
+     strategies on the same underlying + expiry reconcile their own order-attributed fills)
+   - ONE rate-limit budget, circuit breakers, order pool and order locks (leg keys per strategy)
+✅ Independent loops - a slow BANKNIFTY cycle never delays the NIFTY candle
+✅ Ctrl+C: every loop stops at its next candle check, then each open straddle gets the usual
+   AUTO SQUARE-OFF / SAFE EXIT choice
+
+Env:
+    UNDERLYINGS=NIFTY,BANKNIFTY,FINNIFTY # One strategy per underlying (STRATEGIES defaults to this)
+    BANKNIFTY_EXPIRY_DATE=27JAN26        # Per underlying - default EXPIRY_DATE
+    BANKNIFTY_LOT_SIZE=30                # Default from config.UNDERLYING_SPECS
+    BANKNIFTY_STRIKE_INTERVAL=100
+    BANKNIFTY_MANUAL_STRIKE=59000        # First entry only (STRIKE_SELECTION_MODE=MANUAL)
+
+    STRATEGIES=NIFTY_BUY,NIFTY_SELL      # Named strategies - any config.STRATEGY_OVERRIDES setting per name
+    NIFTY_BUY_UNDERLYING=NIFTY           # Default: the name itself if it is an underlying, else UNDERLYING
+    NIFTY_SELL_HEDGE_SIDE=SELL           # Default HEDGE_SIDE (BUY)
+    NIFTY_SELL_EXPIRY_DATE=13JAN26
+    NIFTY_SELL_PROGRESSIVE_HEDGING_LEVELS=25,45
+
+Run:
+    python multi_engine.py
+"""
+
+from typing import Dict, List
+from collections import defaultdict
+import threading
+from config import config
+from angelone_api import api
+from live_trader_main import LiveTrader
+from metrics import metrics, MetricsServer, api_collector, scheduler_collector, latency_collector, lock_collector
+from status_dashboard import StatusBoard, ConsoleRenderer, DashboardServer
+from bot_logging import get_logger, setup_logging, flush_logs
+
+log = get_logger('multi_engine')
+
+
+class MultiEngine:
+    """N strategy instances over the shared api singleton"""
+
+    def __init__(self, strategies: List[str] = None):
+        self.strategies = strategies or config.STRATEGIES
+        self.traders: Dict[str, LiveTrader] = {}
+        self.threads: Dict[str, threading.Thread] = {}
+        self.boards: Dict[str, StatusBoard] = {}
+        self.metrics_server = None
+        self.status_renderers = []
+
+    def build(self):
+        """One trader per strategy, constructed under its own Config"""
+        configs = {name: config.for_strategy(name) for name in self.strategies}
+
+        # Strategies on the same underlying + expiry trade the same contracts - net positions
+        # cannot be split by symbol, so each reconciles its own order-attributed fills
+        books = defaultdict(list)
+        for name, cfg in configs.items():
+            books[(cfg.UNDERLYING, cfg.EXPIRY_DATE)].append(name)
+        for name, cfg in configs.items():
+            cfg.BOOK_PEERS = [peer for peer in books[(cfg.UNDERLYING, cfg.EXPIRY_DATE)] if peer != name]
+
+        for name, cfg in configs.items():
+            with config.scoped(cfg):
+                self.boards[name] = StatusBoard()
+                self.traders[name] = LiveTrader(board=self.boards[name], interactive=False)
+
+    def initialize(self) -> bool:
+        """Single login for every strategy"""
+        try:
+            log.info("\n" + "=" * 80)
+            log.info("ANGEL ONE MULTI-STRATEGY ENGINE")
+            log.info(f"✅ {len(self.traders)} strategies: {', '.join(self.traders)}")
+            log.info("✅ ONE LOGIN, ONE MARKET FEED, ONE ORDER STREAM, ONE RATE-LIMIT BUDGET")
+            log.info("=" * 80)
+
+            config.display_config()
+            self._display_strategies()
+
+            if not api.login():
+                log.error("[ERROR] Failed to login to Angel One")
+                return False
+
+            self._start_metrics()
+            self._start_dashboard()
+            log.info("[OK] Engine initialized\n")
+            return True
+
+        except Exception as e:
+            log.error(f"[ERROR] Engine initialization error: {str(e)}")
+            return False
+
+    def _display_strategies(self):
+        print(f"\n🌐 STRATEGIES ({len(self.traders)}):")
+        for name, trader in self.traders.items():
+            cfg = trader.config
+            print(f"   {name:<11} {cfg.UNDERLYING} {cfg.EXPIRY_DATE} | {cfg.HEDGE_SIDE} hedge "
+                  f"@ {'/'.join(f'{level:g}' for level in cfg.PROGRESSIVE_HEDGING_LEVELS)}/{cfg.LEVEL_3_HARD_STOP:g}% "
+                  f"| lot {cfg.LOT_SIZE} | strikes every {cfg.STRIKE_INTERVAL} | {cfg.EXCEL_LOG_PATH}")
+            if cfg.BOOK_PEERS:
+                print(f"   {'':<11} shares its book with {', '.join(cfg.BOOK_PEERS)} - reconciled on own order fills")
+        print()
+
+    def _start_metrics(self):
+        """📈 One /metrics endpoint - candle series labelled per strategy"""
+        if not config.METRICS_ENABLED or self.metrics_server:
+            return
+        try:
+            metrics.register(api_collector(api))
+            metrics.register(scheduler_collector({name: trader.scheduler for name, trader in self.traders.items()}))
+            metrics.register(latency_collector())
+            metrics.register(lock_collector(api.locks))
+            self.metrics_server = MetricsServer(
+                metrics,
+                health=lambda: {**api.get_system_health(), 'strategies': self.get_status()}
+            ).start()
+        except OSError as e:
+            log.warning(f"⚠️ Metrics endpoint not started: {e}")
+
+    def _start_dashboard(self):
+        """🖥️ One status board per strategy (web: DASHBOARD_PORT, +1, +2, ...)"""
+        mode = config.DASHBOARD_MODE
+        for offset, board in enumerate(self.boards.values()):
+            if mode in ('console', 'both'):
+                self.status_renderers.append(ConsoleRenderer(board).start())
+            if mode in ('web', 'both'):
+                try:
+                    self.status_renderers.append(DashboardServer(board, port=config.DASHBOARD_PORT + offset).start())
+                except OSError as e:
+                    log.warning(f"⚠️ Status dashboard not started: {e}")
+
+    def get_status(self) -> Dict:
+        return {
+            name: {
+                'underlying': trader.config.UNDERLYING,
+                'expiry': trader.config.EXPIRY_DATE,
+                'hedge_side': trader.config.HEDGE_SIDE,
+                'running': trader.running,
+                'straddle_active': trader.straddle_manager.straddle_active,
+                'candles': trader.candle_count,
+                'scheduler': trader.scheduler.get_metrics(),
+            }
+            for name, trader in self.traders.items()
+        }
+
+    def _run_trader(self, trader: LiveTrader):
+        """Strategy thread - everything below runs under the trader's Config"""
+        with config.scoped(trader.config):
+            trader.run_headless()
+
+    def run(self):
+        """Build, login once, run every strategy loop until all stop (EOD) or Ctrl+C"""
+        self.build()
+        if not self.initialize():
+            return
+
+        for name, trader in self.traders.items():
+            thread = threading.Thread(target=self._run_trader, args=(trader,), name=name, daemon=True)
+            self.threads[name] = thread
+            thread.start()
+        print(f"[STARTING] {len(self.threads)} trading loops started - press Ctrl+C to stop")
+
+        try:
+            while any(thread.is_alive() for thread in self.threads.values()):
+                for thread in self.threads.values():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self._stop()
+        finally:
+            self._shutdown()
+
+    def _stop(self):
+        """Ctrl+C: stop every loop, then offer square-off per open straddle"""
+        flush_logs()
+        print("\n\n" + "=" * 80)
+        print("[INTERRUPT] KEYBOARD INTERRUPT RECEIVED (Ctrl+C) - stopping all strategy loops")
+        print("=" * 80)
+
+        for trader in self.traders.values():
+            trader.interrupt_received = True
+        for thread in self.threads.values():
+            thread.join(timeout=config.LOCK_EXIT_TIMEOUT_SECONDS)  # An exit in flight finishes first
+
+        for name, trader in self.traders.items():
+            with config.scoped(trader.config):
+                if not trader.straddle_manager.straddle_active:
+                    print(f"\n[OK] {name}: no active positions")
+                    continue
+                print(f"\n🌐 {name}")
+                if not trader._handle_interactive_exit():
+                    print(f"[WARN] {name}: positions remain OPEN in broker - DON'T FORGET to square off!")
+
+    def _shutdown(self):
+        flush_logs()
+        for renderer in self.status_renderers:
+            renderer.stop()
+        print("\n" + "=" * 80)
+        print("ENGINE SHUTDOWN")
+        print("=" * 80)
+        for trader in self.traders.values():
+            with config.scoped(trader.config):
+                trader.excel_logger.close()
+        print("[OK] Logs saved")
+
+
+def main():
+    """Entry point"""
+    setup_logging()
+    MultiEngine().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Order Basket - MULTI-LEG ORDERS TRACKED AS ONE UNIT
+✅ Payloads built and validated for every leg BEFORE anything is sent
+   (a bad leg rejects the basket - never a half-sent straddle)
+✅ State machine for the whole basket:
+   NEW → REJECTED                          (validation failed, nothing sent)
+   NEW → SENT → FILLED                     (every leg filled)
+   NEW → SENT → ROLLED_BACK                (partial fill - filled legs reversed, open legs cancelled)
+   NEW → SENT → ROLLBACK_FAILED            (partial fill AND a reversal failed - manual intervention)
+✅ Submitted by AngelOneAPI.place_basket() on the shared order pool (see angelone_api.py)
+
+Usage:
+    basket = api.place_basket("STRADDLE_ENTRY_26000", [
+        {'name': 'CE', 'transaction_type': 'SELL', 'symbol': ce_symbol, 'security_id': ce_token, 'quantity': 65},
+        {'name': 'PE', 'transaction_type': 'SELL', 'symbol': pe_symbol, 'security_id': pe_token, 'quantity': 65},
+    ])
+    if basket.filled:
+        basket.legs['CE'].fill_price
+"""
+
+from typing import Dict, List, Optional
+import itertools
+import time
+
+NEW = 'NEW'
+REJECTED = 'REJECTED'
+SENT = 'SENT'
+FILLED = 'FILLED'
+ROLLED_BACK = 'ROLLED_BACK'
+ROLLBACK_FAILED = 'ROLLBACK_FAILED'
+
+REVERSE_SIDE = {'BUY': 'SELL', 'SELL': 'BUY'}
+
+_basket_ids = itertools.count(1)
+
+
+class BasketLeg:
+    """One order of a basket - payload, broker result, fill, rollback"""
+
+    def __init__(self, name: str, transaction_type: str, symbol: str, security_id: str, quantity: int,
+                 order_type: str = "MARKET", price: float = 0):
+        self.name = name
+        self.transaction_type = transaction_type
+        self.symbol = symbol
+        self.security_id = security_id
+        self.quantity = quantity
+        self.order_type = order_type
+        self.price = price
+
+        self.params: Optional[Dict] = None      # Pre-validated broker payload
+        self.error: Optional[str] = None        # Validation error
+        self.result: Optional[Dict] = None      # place_order-style result
+        self.filled = False
+        self.fill_price: Optional[float] = None
+        self.rollback: Optional[Dict] = None    # Reversal / cancel result
+
+    @property
+    def placed(self) -> bool:
+        return bool(self.result and self.result.get('success'))
+
+    @property
+    def order_id(self) -> Optional[str]:
+        return self.result.get('order_id') if self.result else None
+
+    @property
+    def message(self) -> str:
+        if self.error:
+            return self.error
+        return self.result.get('message', 'Unknown error') if self.result else 'Not sent'
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'side': self.transaction_type,
+            'symbol': self.symbol,
+            'order_id': self.order_id,
+            'placed': self.placed,
+            'filled': self.filled,
+            'fill_price': self.fill_price,
+            'message': self.message,
+            'rollback': (self.rollback or {}).get('message'),
+        }
+
+
+class OrderBasket:
+    """Legs submitted together and settled as a unit"""
+
+    def __init__(self, name: str, legs: List[BasketLeg]):
+        self.basket_id = f"BSK{next(_basket_ids):05d}"
+        self.name = name
+        self.legs: Dict[str, BasketLeg] = {leg.name: leg for leg in legs}
+        self.state = NEW
+        self.created = time.time()
+        self.elapsed_ms: Optional[float] = None
+
+    @property
+    def filled(self) -> bool:
+        return self.state == FILLED
+
+    def failed_legs(self) -> List[BasketLeg]:
+        return [leg for leg in self.legs.values() if not leg.filled]
+
+    def to_dict(self) -> Dict:
+        return {
+            'basket_id': self.basket_id,
+            'name': self.name,
+            'state': self.state,
+            'elapsed_ms': self.elapsed_ms,
+            'legs': [leg.to_dict() for leg in self.legs.values()],
+        }
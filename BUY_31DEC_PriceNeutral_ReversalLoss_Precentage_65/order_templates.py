@@ -0,0 +1,86 @@
+"""
+Order Templates - PRE-BUILT, PRE-VALIDATED PAYLOADS PER INSTRUMENT
+✅ Built when the option chain is refreshed: every CE/PE in the window
+   (= the straddle legs and all hedge candidates) gets its SmartConnect payload ready
+✅ Validated once at build time (symbol/token match, lot size resolved)
+✅ Submit path only stamps side + quantity onto a copy - no symbol / token / lot lookups
+✅ A payload is static for the session: instruments already built are reused on later refreshes,
+   a changed symbol for the same token (new expiry) rebuilds it
+✅ Miss (unknown instrument, LIMIT order, odd quantity) → caller builds from scratch as before
+
+Usage:
+    api.order_templates.refresh([(symbol, token), ...])       # get_option_chain does this
+    params = api.order_templates.fill(token, symbol, 'SELL', 65)  # None on a miss
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+from bot_logging import get_logger
+
+log = get_logger('order_templates')
+
+SIDES = ('BUY', 'SELL')
+
+
+class OrderTemplates:
+    """security_id → (MARKET payload without side/quantity, lot size)"""
+
+    def __init__(self, api):
+        self.api = api  # build_order_params / validate_order_params / lot_size_for
+        self.templates: Dict[str, Tuple[Dict, int]] = {}
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.invalid = 0
+
+    def refresh(self, instruments: Iterable[Tuple[str, str]]) -> int:
+        """Build templates for instruments not seen yet - returns how many were built"""
+        built = 0
+        for symbol, security_id in instruments:
+            security_id = str(security_id)
+            entry = self.templates.get(security_id)
+            if entry is not None and entry[0]['tradingsymbol'] == symbol:
+                continue
+            if self._build(symbol, security_id):
+                built += 1
+        if built:
+            log.debug("📝 Order templates: %d built (%d cached)", built, len(self.templates))
+        return built
+
+    def _build(self, symbol: str, security_id: str) -> bool:
+        lot_size = self.api.lot_size_for(symbol)
+        template = self.api.build_order_params('BUY', symbol, security_id, lot_size)
+        error = self.api.validate_order_params(template)
+        if error:
+            self.invalid += 1
+            self.templates.pop(security_id, None)
+            log.warning(f"⚠️ No order template for {symbol}: {error}")
+            return False
+        self.templates[security_id] = (template, lot_size)
+        self.builds += 1
+        return True
+
+    def fill(self, security_id: str, symbol: str, transaction_type: str, quantity: int) -> Optional[Dict]:
+        """MARKET payload for this instrument, or None (caller builds + validates from scratch)"""
+        entry = self.templates.get(str(security_id))
+        if (entry is None or entry[0]['tradingsymbol'] != symbol or transaction_type not in SIDES
+                or quantity <= 0 or quantity % entry[1]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        params = entry[0].copy()
+        params['transactiontype'] = transaction_type
+        params['quantity'] = str(quantity)
+        return params
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'templates': len(self.templates),
+            'builds': self.builds,
+            'invalid': self.invalid,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+        }
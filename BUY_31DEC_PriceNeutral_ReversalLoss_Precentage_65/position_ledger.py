@@ -0,0 +1,234 @@
+"""
+Position Ledger - LOCAL NET POSITIONS FROM THE ORDER-UPDATE STREAM
+✅ Net quantity per securityId maintained from order WebSocket fills
+✅ Partial fills applied incrementally (filledshares delta per order id)
+✅ Expected vs actual diff at zero REST cost - safe to run every candle
+✅ Seeded from the REST position book by the low-frequency audit
+✅ Marked stale when the order stream drops (fills may have been missed)
+✅ One ledger for the whole account - diff(owns=...) scopes extras to one strategy's instruments
+🧩 StrategyLedgers: strategies sharing a book (same underlying + expiry) get their own ledger,
+   fed only by the orders they placed (order id → strategy, claimed at submission)
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+import threading
+import time
+from bot_logging import get_logger
+
+log = get_logger('position_ledger')
+
+
+class PositionLedger:
+    """Net positions built from order-update fills"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.positions: Dict[str, int] = {}     # securityId -> net qty (+long / -short)
+        self.symbols: Dict[str, str] = {}       # securityId -> tradingsymbol
+        self._applied_fills: Dict[str, int] = {}  # orderid -> filled qty already applied
+
+        # Trust state - ledger is authoritative only while seeded and streaming
+        self.seeded = False
+        self.stream_live = False
+        self.last_seed_time = None
+        self.last_fill_time = None
+        self.fill_count = 0
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def on_order_update(self, order_data: Dict) -> bool:
+        """
+        Apply an order-update message (the 'orderData' payload)
+
+        Returns:
+            True if the message changed a net position
+        """
+        order_id = str(order_data.get('orderid', ''))
+        security_id = str(order_data.get('symboltoken', ''))
+        side = str(order_data.get('transactiontype', '')).upper()
+        exchange = order_data.get('exchange')
+
+        if not order_id or not security_id or side not in ('BUY', 'SELL'):
+            return False
+        if exchange and exchange != 'NFO':
+            return False
+
+        try:
+            filled = int(float(order_data.get('filledshares') or 0))
+            if not filled and str(order_data.get('orderstatus', '')).lower() == 'complete':
+                filled = int(float(order_data.get('quantity') or 0))
+        except (TypeError, ValueError):
+            return False
+
+        with self.lock:
+            delta = filled - self._applied_fills.get(order_id, 0)
+            if delta <= 0:
+                return False
+
+            self._applied_fills[order_id] = filled
+            signed = delta if side == 'BUY' else -delta
+            net = self.positions.get(security_id, 0) + signed
+            if net:
+                self.positions[security_id] = net
+            else:
+                self.positions.pop(security_id, None)
+            if order_data.get('tradingsymbol'):
+                self.symbols[security_id] = order_data['tradingsymbol']
+
+            self.fill_count += 1
+            self.last_fill_time = time.time()
+
+        log.info("📒 Ledger fill: %s %d %s → net %+d", side, delta, self.symbols.get(security_id, security_id), net,
+                 extra={'order_id': order_id, 'security_id': security_id})
+        return True
+
+    def seed(self, positions: List[Dict]):
+        """Replace ledger with a REST position snapshot (securityId/netQty/tradingsymbol)"""
+        with self.lock:
+            self.positions = {}
+            for pos in positions:
+                sec_id = str(pos.get('securityId', ''))
+                qty = int(pos.get('netQty', 0))
+                if sec_id and qty:
+                    self.positions[sec_id] = qty
+                    if pos.get('tradingsymbol'):
+                        self.symbols[sec_id] = pos['tradingsymbol']
+            self.seeded = True
+            self.last_seed_time = time.time()
+
+    def set_stream_live(self, live: bool):
+        """Order stream up/down - a drop means fills may have been missed"""
+        with self.lock:
+            self.stream_live = live
+            if not live and self.seeded:
+                self.seeded = False
+                log.warning("⚠️ Position ledger stale (order stream closed) - REST audit will reseed")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def is_trusted(self) -> bool:
+        return self.seeded and self.stream_live
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.positions)
+
+    def diff(self, expected: Dict[str, int], owns: Optional[Callable[[str], bool]] = None) -> Dict:
+        """
+        Compare expected {securityId: qty} against the ledger
+        owns(tradingsymbol): positions it rejects are another strategy's, not extras
+        (unknown symbols are kept - never hide a position we cannot attribute)
+
+        Returns:
+            {'matched', 'missing_positions', 'extra_positions', 'actual_positions'}
+        """
+        actual = self.snapshot()
+        missing = [
+            {'security_id': sec_id, 'expected': qty, 'actual': actual.get(sec_id, 0),
+             'difference': qty - actual.get(sec_id, 0)}
+            for sec_id, qty in expected.items() if actual.get(sec_id, 0) != qty
+        ]
+        extra = [
+            {'security_id': sec_id, 'quantity': qty, 'symbol': self.symbols.get(sec_id)}
+            for sec_id, qty in actual.items()
+            if sec_id not in expected and (owns is None or sec_id not in self.symbols or owns(self.symbols[sec_id]))
+        ]
+        return {
+            'matched': not missing and not extra,
+            'missing_positions': missing,
+            'extra_positions': extra,
+            'actual_positions': actual,
+        }
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'trusted': self.seeded and self.stream_live,
+                'positions': len(self.positions),
+                'fills': self.fill_count,
+                'last_fill_age': round(time.time() - self.last_fill_time, 1) if self.last_fill_time else None,
+                'last_seed_age': round(time.time() - self.last_seed_time, 1) if self.last_seed_time else None,
+            }
+
+
+class StrategyLedgers:
+    """
+    Per-strategy ledgers for a shared book - net positions cannot be split by symbol
+    when two strategies trade the same contracts, so fills are routed by order owner
+    An update that arrives before its order id is claimed is held and replayed on claim
+    """
+
+    MAX_UNCLAIMED = 500  # Manual / foreign orders are never claimed - keep only the latest
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ledgers: Dict[str, PositionLedger] = {}
+        self.owners: Dict[str, str] = {}           # orderid -> strategy id
+        self._unclaimed: Dict[str, Dict] = {}      # orderid -> latest order update
+        self.stream_live = False
+
+    def ledger(self, strategy_id: str) -> PositionLedger:
+        """Strategy's ledger - created flat and seeded (a strategy starts with no positions of its own)"""
+        with self.lock:
+            ledger = self.ledgers.get(strategy_id)
+            if ledger is None:
+                ledger = PositionLedger()
+                ledger.seed([])
+                ledger.stream_live = self.stream_live
+                self.ledgers[strategy_id] = ledger
+            return ledger
+
+    def claim(self, order_id: str, strategy_id: str):
+        """Order placed by strategy_id (called right after the broker returns the order id)"""
+        with self.lock:
+            if not self.ledgers:
+                return
+            self.owners[order_id] = strategy_id
+            ledger = self.ledgers.get(strategy_id)
+            pending = self._unclaimed.pop(order_id, None)
+        if ledger and pending:
+            ledger.on_order_update(pending)  # Fill raced the claim - filledshares is cumulative
+
+    def on_order_update(self, order_data: Dict) -> bool:
+        """Route an order update to its owner's ledger"""
+        order_id = str(order_data.get('orderid', ''))
+        with self.lock:
+            if not self.ledgers or not order_id:
+                return False
+            ledger = self.ledgers.get(self.owners.get(order_id))
+            if ledger is None:
+                self._unclaimed.pop(order_id, None)
+                self._unclaimed[order_id] = order_data
+                if len(self._unclaimed) > self.MAX_UNCLAIMED:
+                    self._unclaimed.pop(next(iter(self._unclaimed)))
+                return False
+        return ledger.on_order_update(order_data)
+
+    def set_stream_live(self, live: bool):
+        with self.lock:
+            self.stream_live = live
+            ledgers = list(self.ledgers.values())
+        for ledger in ledgers:
+            ledger.set_stream_live(live)
+
+    def net(self, strategy_ids: Iterable[str]) -> Dict[str, int]:
+        """Summed positions of these strategies' ledgers"""
+        total: Dict[str, int] = {}
+        for strategy_id in strategy_ids:
+            ledger = self.ledgers.get(strategy_id)
+            for sec_id, qty in (ledger.snapshot() if ledger else {}).items():
+                total[sec_id] = total.get(sec_id, 0) + qty
+        return total
+
+    def symbol(self, security_id: str) -> Optional[str]:
+        for ledger in list(self.ledgers.values()):
+            if security_id in ledger.symbols:
+                return ledger.symbols[security_id]
+        return None
+
+    def get_stats(self) -> Dict:
+        return {strategy_id: ledger.get_stats() for strategy_id, ledger in list(self.ledgers.items())}
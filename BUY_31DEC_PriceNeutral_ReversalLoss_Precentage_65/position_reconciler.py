@@ -7,11 +7,20 @@ Position Reconciler - ENHANCED with Manual Hedge Detection & Sync
 ✅ HYBRID: Updated for 2-level price-neutral + Level 3 hard stop
 ✅ FIXED: Correct hedge identification for price-neutral strategy
 ✅ CRITICAL FIX: Corrected all LONG/SHORT sign errors (7 bugs fixed)
+📒 EVENT-DRIVEN: Expected vs order-update ledger diffed every candle (zero REST),
+   full REST reconcile is a low-frequency audit that also reseeds the ledger
+🌐 SCOPED: only positions in this strategy's underlying + expiry (config.owns_symbol) are
+   compared - other strategies in the same account are not "manual" changes
+🧩 SHARED BOOK: strategies on the same underlying + expiry (config.BOOK_PEERS) diff their own
+   order-attributed ledger, and the REST audit subtracts the peers' ledgers from the broker net
+🧩 Hedge sign / classification from the hedge side (BUY → LONG same type, SELL → SHORT opposite type)
 """
 
 from typing import Dict, List, Optional, Tuple
 from angelone_api import api
 from config import config
+from hedge_side import hedge_side
+from position_ledger import PositionLedger
 import time
 from datetime import datetime
 
@@ -23,17 +32,37 @@ class PositionReconciler:
         self.last_reconciliation_time = None
         self.discrepancy_count = 0
         self.max_allowed_discrepancies = 3
-        self.reconciliation_interval = 300  # 5 minutes in seconds
+        self.reconciliation_interval = config.POSITION_AUDIT_INTERVAL_SECONDS  # REST audit (ledger trusted)
+        self.fallback_interval = config.POSITION_FALLBACK_INTERVAL_SECONDS  # REST cadence without ledger
 
         # Event-driven reconciliation
         self.pending_reconciliation = False
         self.last_order_fill_time = None
         self.reconciliation_cooldown = 5  # Wait 5s after order fill
 
+        # 📒 Ledger diff state (consecutive mismatches before a REST audit)
+        self.ledger_mismatch_streak = 0
+        self.ledger_mismatch_limit = config.POSITION_LEDGER_MISMATCH_CHECKS
+        self.last_ledger_result = None
+
         # 🔥 NEW: Manual intervention tracking
         self.manual_changes_detected = []
         self.last_manual_sync_time = None
 
+        # 🔀 Hedge classification maintained from position-book deltas
+        self.hedge_positions: Dict[str, str] = {}  # securityId -> 'CE' / 'PE' (leg it hedges)
+        self._hedge_map_strike = None
+        self._pending_deltas: List[Dict] = []
+        api.subscribe_positions(self._on_position_delta)
+        self._ledger()  # Shared book: own ledger exists before this strategy's first order
+
+    @staticmethod
+    def _ledger() -> PositionLedger:
+        """📒 Account ledger - or this strategy's own fills when another strategy trades the same book"""
+        if config.BOOK_PEERS:
+            return api.strategy_ledgers.ledger(config.STRATEGY_ID)
+        return api.position_ledger
+
     def should_reconcile(self) -> bool:
         """Check if reconciliation needed"""
         # Priority 1: Pending reconciliation after order fill
@@ -45,28 +74,99 @@ class PositionReconciler:
             else:
                 return True
 
-        # Priority 2: Fallback periodic check
+        # Priority 2: Periodic REST audit (long interval while the ledger is trusted)
         if self.last_reconciliation_time is None:
             return True
 
+        interval = self.reconciliation_interval if self._ledger().is_trusted() else self.fallback_interval
         elapsed = (config.get_current_ist_time() - self.last_reconciliation_time).total_seconds()
-        return elapsed >= self.reconciliation_interval
+        return elapsed >= interval
 
     def mark_order_filled(self):
-        """Mark that an order was filled - triggers reconciliation"""
-        self.pending_reconciliation = True
+        """Mark that an order was filled - ledger check, REST only if ledger not trusted"""
         self.last_order_fill_time = time.time()
-        print(f"   📌 Reconciliation scheduled (after order fill)")
+        if self._ledger().is_trusted():
+            print(f"   📌 Ledger check scheduled (after order fill)")
+        else:
+            self.pending_reconciliation = True
+            print(f"   📌 Reconciliation scheduled (after order fill)")
+
+    def check_ledger(self, straddle_manager, hedge_manager) -> Optional[Dict]:
+        """
+        📒 Zero-REST diff of expected positions vs the order-update ledger
+
+        A mismatch seen on POSITION_LEDGER_MISMATCH_CHECKS consecutive checks
+        (fills in flight settle within one check) schedules a REST audit,
+        which does the manual-change detection and sync.
+
+        Returns:
+            Diff dict or None if the ledger is not trusted (stream down / not seeded)
+        """
+        ledger = self._ledger()
+        if not ledger.is_trusted():
+            return None
+
+        expected = self.build_expected_positions(straddle_manager, hedge_manager)
+        result = ledger.diff(expected, owns=config.owns_symbol)
+        self.last_ledger_result = result
+
+        if result['matched']:
+            self.ledger_mismatch_streak = 0
+            return result
+
+        self.ledger_mismatch_streak += 1
+        print(f"⚠️ Ledger mismatch ({self.ledger_mismatch_streak}/{self.ledger_mismatch_limit})")
+        for m in result['missing_positions']:
+            print(f"   🔴 {m['security_id']}: Expected {m['expected']}, Ledger {m['actual']}")
+        for e in result['extra_positions']:
+            print(f"   🟡 {e['symbol'] or e['security_id']}: {e['quantity']}")
 
-    def get_actual_positions(self) -> List[Dict]:
-        """Fetch actual positions from broker"""
+        if self.ledger_mismatch_streak >= self.ledger_mismatch_limit and not self.pending_reconciliation:
+            self.pending_reconciliation = True
+            print(f"   📌 REST audit scheduled (ledger mismatch)")
+
+        return result
+
+    @staticmethod
+    def owned_positions(positions: List[Dict]) -> List[Dict]:
+        """Positions in this strategy's underlying + expiry"""
+        return [pos for pos in positions if config.owns_symbol(pos.get('tradingsymbol'))]
+
+    @staticmethod
+    def attributed_positions(positions: List[Dict]) -> List[Dict]:
+        """
+        🧩 Shared book: broker net minus what the peers' own fills account for
+        A peer position the broker does not show comes back negative - never hidden
+        """
+        if not config.BOOK_PEERS:
+            return positions
+        peers = api.strategy_ledgers.net(config.BOOK_PEERS)
+        attributed = []
+        for pos in positions:
+            sec_id = str(pos.get('securityId', ''))
+            qty = int(pos.get('netQty', 0)) - peers.pop(sec_id, 0)
+            if qty:
+                attributed.append({**pos, 'netQty': qty})
+        for sec_id, qty in peers.items():
+            if qty:
+                attributed.append({'securityId': sec_id, 'netQty': -qty,
+                                   'tradingsymbol': api.strategy_ledgers.symbol(sec_id)})
+        return attributed
+
+    @staticmethod
+    def strategy_positions(positions: List[Dict]) -> List[Dict]:
+        """This strategy's share of the account: own underlying + expiry, peers' fills removed"""
+        return PositionReconciler.attributed_positions(PositionReconciler.owned_positions(positions))
+
+    def get_actual_positions(self, owned_only: bool = True) -> List[Dict]:
+        """Fetch actual positions from broker (owned_only=False → the whole account)"""
         try:
             positions = api.get_positions(force_refresh=True)
 
             if positions:
                 print(f"📋 Fetched {len(positions)} actual positions from broker")
 
-            return positions
+            return self.strategy_positions(positions) if owned_only else positions
 
         except Exception as e:
             print(f"❌ Error fetching positions: {str(e)}")
@@ -76,21 +176,23 @@ class PositionReconciler:
         """Build expected positions dictionary"""
         expected = {}
         try:
-            # Straddle CE leg
-            if straddle_manager.ce_leg and straddle_manager.straddle_active:
+            # Straddle CE leg (not once bought back - a partial exit keeps only what is still open)
+            if straddle_manager.ce_leg and straddle_manager.straddle_active and straddle_manager.ce_leg.is_active:
                 expected[str(straddle_manager.ce_leg.security_id)] = -straddle_manager.ce_leg.lot_size
 
             # Straddle PE leg
-            if straddle_manager.pe_leg and straddle_manager.straddle_active:
+            if straddle_manager.pe_leg and straddle_manager.straddle_active and straddle_manager.pe_leg.is_active:
                 expected[str(straddle_manager.pe_leg.security_id)] = -straddle_manager.pe_leg.lot_size
 
-            # CE Hedge - SELL creates SHORT position (FIXED SIGN)
+            # CE Hedge - sign from the leg's hedge side (SELL → SHORT, BUY → LONG)
             if straddle_manager.ce_leg and straddle_manager.ce_leg.hedge_active:
-                expected[str(straddle_manager.ce_leg.hedge_security_id)] = -straddle_manager.ce_leg.lot_size  # ✅ CORRECT
+                leg = straddle_manager.ce_leg
+                expected[str(leg.hedge_security_id)] = leg.HEDGE_QTY_SIGN * leg.lot_size
 
-            # PE Hedge - SELL creates SHORT position (FIXED SIGN)
+            # PE Hedge - sign from the leg's hedge side (SELL → SHORT, BUY → LONG)
             if straddle_manager.pe_leg and straddle_manager.pe_leg.hedge_active:
-                expected[str(straddle_manager.pe_leg.hedge_security_id)] = -straddle_manager.pe_leg.lot_size  # ✅ CORRECT
+                leg = straddle_manager.pe_leg
+                expected[str(leg.hedge_security_id)] = leg.HEDGE_QTY_SIGN * leg.lot_size
 
             return expected
         except Exception as e:
@@ -126,67 +228,106 @@ class PositionReconciler:
         print(f"   🎯 Detected manual hedge level: {closest} (Loss: {current_loss_pct:.1f}%)")
         return closest
 
+    def _classify_hedge(self, pos: Dict, straddle_strike: int) -> Optional[str]:
+        """
+        🔥 CORRECTED: Classify one position as a hedge for the CE or PE leg
+
+        HEDGE SIDE LOGIC (hedge_side.py):
+        - BUY:  LONG position, SAME type  (CE LONG = hedge for CE leg, PE LONG = hedge for PE leg)
+        - SELL: SHORT position, OPPOSITE type (PE SHORT = hedge for CE leg, CE SHORT = hedge for PE leg)
+
+        Returns:
+            'CE' / 'PE' (leg the position hedges) or None
+        """
+        qty = pos.get('netQty', 0)
+        symbol = pos.get('tradingsymbol') or ''
+        side = hedge_side()
+
+        # BUG #1/#2 FIXED: Only positions on the hedge side's sign are potential hedges
+        if qty * side.qty_sign <= 0 or not config.owns_symbol(symbol):
+            return None
+
+        try:
+            # Parse strike from symbol (format: NIFTY25NOV2525900CE)
+            option_type = 'CE' if symbol.endswith('CE') else 'PE' if symbol.endswith('PE') else None
+            if option_type:
+                hedge_strike = int(symbol[:-2][-5:])  # Last 5 digits before CE / PE
+                # Only identify as hedge if it's NOT the straddle strike
+                if hedge_strike != straddle_strike:
+                    leg_type = side.hedged_leg(option_type)
+                    print(f"   🛡️ Identified {leg_type} leg hedge ({option_type} {'LONG' if qty > 0 else 'SHORT'}): "
+                          f"{symbol} (Strike: {hedge_strike})")
+                    return leg_type
+
+        except Exception as e:
+            print(f"   ⚠️ Could not parse strike from {symbol}: {e}")
+
+        return None
+
     def identify_hedge_positions(self, actual_positions: List[Dict],
                                  straddle_manager) -> Tuple[List[str], List[str]]:
         """
-        🔥 CORRECTED: Identify which actual positions are hedges vs straddle legs
-        
-        PRICE-NEUTRAL LOGIC:
-        - CE leg losing (market UP) → SELL PE hedge on profit side
-        - PE leg losing (market DOWN) → SELL CE hedge on profit side
-        
+        Full scan: identify which positions are hedges vs straddle legs
+
         Returns:
             (ce_hedge_ids, pe_hedge_ids) where:
-            - ce_hedge_ids: PE positions (SHORT) = hedges for CE leg
-            - pe_hedge_ids: CE positions (SHORT) = hedges for PE leg
+            - ce_hedge_ids: positions hedging the CE leg (see _classify_hedge)
+            - pe_hedge_ids: positions hedging the PE leg
         """
-        ce_hedge_ids = []  # PE positions (SHORT) = hedges for CE leg
-        pe_hedge_ids = []  # CE positions (SHORT) = hedges for PE leg
+        ce_hedge_ids = []
+        pe_hedge_ids = []
 
         if not straddle_manager.straddle_active:
             return ce_hedge_ids, pe_hedge_ids
 
-        straddle_strike = straddle_manager.strike
-
         for pos in actual_positions:
-            sec_id = str(pos.get('securityId', ''))
-            qty = pos.get('netQty', 0)
-            symbol = pos.get('tradingsymbol', '')
-
-            # BUG #1 FIXED: Skip if quantity is zero (no position)
-            if qty == 0:
-                continue
-
-            # BUG #2 FIXED: SHORT positions are potential hedges (we SELL hedges)
-            if qty < 0:
-                try:
-                    # Parse strike from symbol (format: NIFTY25NOV2525900CE)
-                    if 'CE' in symbol:
-                        strike_str = symbol.split('CE')[0][-5:]  # Last 5 digits before CE
-                        hedge_strike = int(strike_str)
-                        
-                        # CE position (SHORT) = Hedge for PE leg (when PE losing, market DOWN)
-                        # Only identify as hedge if it's NOT the straddle strike
-                        if hedge_strike != straddle_strike:
-                            pe_hedge_ids.append(sec_id)
-                            # BUG #4 FIXED: Updated print statement
-                            print(f"   🛡️ Identified PE leg hedge (CE SHORT): {symbol} (Strike: {hedge_strike})")
-
-                    elif 'PE' in symbol:
-                        strike_str = symbol.split('PE')[0][-5:]  # Last 5 digits before PE
-                        hedge_strike = int(strike_str)
-                        
-                        # PE position (SHORT) = Hedge for CE leg (when CE losing, market UP)
-                        # Only identify as hedge if it's NOT the straddle strike
-                        if hedge_strike != straddle_strike:
-                            ce_hedge_ids.append(sec_id)
-                            # BUG #5 FIXED: Updated print statement
-                            print(f"   🛡️ Identified CE leg hedge (PE SHORT): {symbol} (Strike: {hedge_strike})")
-                            
-                except Exception as e:
-                    print(f"   ⚠️ Could not parse strike from {symbol}: {e}")
-                    pass
+            side = self._classify_hedge(pos, straddle_manager.strike)
+            if side == 'CE':
+                ce_hedge_ids.append(str(pos.get('securityId', '')))
+            elif side == 'PE':
+                pe_hedge_ids.append(str(pos.get('securityId', '')))
+
+        return ce_hedge_ids, pe_hedge_ids
+
+    def _on_position_delta(self, delta: Dict):
+        """🔀 Position-book delta from api.get_positions (applied at next reconcile)"""
+        self._pending_deltas.append(delta)
+
+    def update_hedge_positions(self, straddle_manager) -> Tuple[List[str], List[str]]:
+        """
+        🔀 Incremental hedge identification - only added/changed/removed
+        positions are (re)classified. Full rescan only when the straddle changes.
+
+        Returns:
+            (ce_hedge_ids, pe_hedge_ids) - same shape as identify_hedge_positions
+        """
+        deltas, self._pending_deltas = self._pending_deltas, []
 
+        if not straddle_manager.straddle_active:
+            self.hedge_positions = {}
+            self._hedge_map_strike = None
+            return [], []
+
+        strike = straddle_manager.strike
+        if strike != self._hedge_map_strike:
+            # New straddle - classification depends on strike, rescan the book once
+            self.hedge_positions = {}
+            self._hedge_map_strike = strike
+            deltas = [{'added': list(api.position_map.values()), 'removed': [], 'changed': []}]
+
+        for delta in deltas:
+            for pos in delta['removed']:
+                self.hedge_positions.pop(str(pos['securityId']), None)
+            for pos in delta['added'] + delta['changed']:
+                sec_id = str(pos['securityId'])
+                side = self._classify_hedge(pos, strike)
+                if side:
+                    self.hedge_positions[sec_id] = side
+                else:
+                    self.hedge_positions.pop(sec_id, None)
+
+        ce_hedge_ids = [sec_id for sec_id, side in self.hedge_positions.items() if side == 'CE']
+        pe_hedge_ids = [sec_id for sec_id, side in self.hedge_positions.items() if side == 'PE']
         return ce_hedge_ids, pe_hedge_ids
 
     def reconcile(self, straddle_manager, hedge_manager) -> Dict:
@@ -213,9 +354,15 @@ class PositionReconciler:
             for sec_id, qty in expected.items():
                 print(f"   {sec_id}: {'+' if qty > 0 else ''}{qty}")
 
-            # Fetch actual positions
-            time.sleep(1)
-            actual_positions = self.get_actual_positions()
+            # Fetch actual positions (fills are confirmed by the order stream - no settle sleep)
+            account_positions = self.get_actual_positions(owned_only=False)
+
+            # 📒 Audit reseeds the (account-wide) ledger (an empty book here may be a failed fetch)
+            if account_positions:
+                api.position_ledger.seed(account_positions)
+            actual_positions = self.strategy_positions(account_positions)
+            if account_positions and config.BOOK_PEERS:
+                self._ledger().seed(actual_positions)  # 🧩 Shared book: own ledger = attributed share
 
             # Build actual positions dict
             actual = {}
@@ -229,10 +376,8 @@ class PositionReconciler:
             for sec_id, qty in actual.items():
                 print(f"   {sec_id}: {'+' if qty > 0 else ''}{qty}")
 
-            # 🔥 NEW: Identify hedge positions with CORRECTED logic
-            ce_hedge_ids, pe_hedge_ids = self.identify_hedge_positions(
-                actual_positions, straddle_manager
-            )
+            # 🔀 Identify hedge positions from position-book deltas (CORRECTED logic)
+            ce_hedge_ids, pe_hedge_ids = self.update_hedge_positions(straddle_manager)
 
             # Compare and detect manual changes
             missing = []
@@ -272,8 +417,8 @@ class PositionReconciler:
                         'quantity': actual_qty
                     })
 
-                    # BUG #7 FIXED: Detect manual hedge addition (SHORT position)
-                    if actual_qty < 0:  # SHORT position
+                    # BUG #7 FIXED: Detect manual hedge addition (position on the hedge side's sign)
+                    if actual_qty * hedge_side().qty_sign > 0:
                         if sec_id in ce_hedge_ids:
                             change = self._detect_manual_hedge_addition(
                                 sec_id, 'CE', actual_positions, straddle_manager
@@ -373,6 +518,7 @@ class PositionReconciler:
                 self.discrepancy_count = 0
 
             self.pending_reconciliation = False
+            self.ledger_mismatch_streak = 0
 
             return {
                 'matched': matched,
@@ -429,12 +575,13 @@ class PositionReconciler:
                                       actual_positions: List[Dict],
                                       straddle_manager) -> Optional[Dict]:
         """🔥 NEW: Detect manual hedge addition"""
-        # Find the position details
-        pos_details = None
-        for pos in actual_positions:
-            if str(pos.get('securityId')) == security_id:
-                pos_details = pos
-                break
+        # Find the position details (keyed snapshot, list scan as fallback)
+        pos_details = api.position_map.get(security_id)
+        if not pos_details:
+            for pos in actual_positions:
+                if str(pos.get('securityId')) == security_id:
+                    pos_details = pos
+                    break
 
         if not pos_details:
             return None
@@ -0,0 +1,283 @@
+"""
+Replay Engine - DETERMINISTIC REPLAY OF A RECORDED LIVE SESSION
+✅ Feeds a tick log (tick_recorder.py) into AngelOneAPI through the mock broker
+✅ Runs the real LiveTrader.process_candle + CandleScheduler decision path
+✅ Virtual clock: time.time / time.monotonic / time.sleep / config.get_current_ist_time
+   all follow the log - sleeps advance the clock and deliver the ticks they cover
+✅ Max speed (default) or paced (--speed 1 = real time)
+✅ Orders placed by the replayed bot fill at the replayed LTP; recorded order
+   updates are only re-fed with --orders (e.g. to audit the ledger against the live run)
+✅ Journal + Excel go to the replay output directory, never the live files
+✅ Offline - no .env / broker credentials needed (config checks them only at login)
+
+Usage:
+    python replay_engine.py tick_logs/ticks_20251231_091455.bin
+    python replay_engine.py tick_logs/ticks_20251231_091455.bin --speed 1 --out replay_output
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+import pytz
+from config import config
+from tick_recorder import read_log, KIND_MARKET, KIND_ORDER, KIND_SCRIP, KIND_META
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+class ReplayClock:
+    """
+    Virtual wall/monotonic clock driven by the replay thread
+    Sleeps on the replay thread advance the clock (and deliver events);
+    sleeps on other threads yield briefly without moving time
+    """
+
+    def __init__(self, start: float, speed: float = 0.0,
+                 on_advance: Optional[Callable[[float], None]] = None):
+        self.now = start
+        self.speed = speed              # 0 = as fast as possible, 1 = real time
+        self.on_advance = on_advance    # Delivers events up to the target time
+        self.owner = threading.current_thread()
+        self._originals = None
+
+    # Patched functions ---------------------------------------------------
+
+    def time(self) -> float:
+        return self.now
+
+    def ist_now(self) -> datetime:
+        return datetime.fromtimestamp(self.now, IST)
+
+    def sleep(self, seconds: float):
+        if threading.current_thread() is not self.owner:
+            self._originals['sleep'](min(max(seconds, 0.0), 0.01))
+            return
+        if seconds > 0:
+            self.advance_to(self.now + seconds)
+
+    # Driving --------------------------------------------------------------
+
+    def step(self, target: float):
+        """Move to target (paced in real time when speed > 0)"""
+        if target <= self.now:
+            return
+        if self.speed > 0:
+            self._originals['sleep']((target - self.now) / self.speed)
+        self.now = target
+
+    def advance_to(self, target: float):
+        if self.on_advance:
+            self.on_advance(target)
+        self.step(target)
+
+    def install(self):
+        self._originals = {
+            'time': time.time, 'monotonic': time.monotonic, 'sleep': time.sleep,
+            'ist': config.get_current_ist_time,
+        }
+        time.time = self.time
+        time.monotonic = self.time
+        time.sleep = self.sleep
+        config.get_current_ist_time = self.ist_now
+
+    def uninstall(self):
+        if not self._originals:
+            return
+        time.time = self._originals['time']
+        time.monotonic = self._originals['monotonic']
+        time.sleep = self._originals['sleep']
+        del config.get_current_ist_time  # Back to the class method
+        self._originals = None
+
+
+class ReplayEngine:
+    """Replays a tick log through MockBroker → AngelOneAPI → LiveTrader"""
+
+    def __init__(self, path: str, speed: float = 0.0, feed_recorded_orders: bool = False,
+                 output_dir: str = 'replay_output'):
+        self.path = path
+        self.speed = speed
+        self.feed_recorded_orders = feed_recorded_orders
+        self.output_dir = output_dir
+
+        self.meta: Dict = {}
+        self.scrips: List[Dict] = []
+        self.events: List[Tuple[float, int, bytes]] = []
+        self._load()
+
+        self.index = 0
+        self.clock = ReplayClock(self.events[0][0] if self.events else time.time(), speed,
+                                 on_advance=self._deliver_until)
+        self.broker = None
+        self.trader = None
+
+        # Stats
+        self.ticks_delivered = 0
+        self.orders_delivered = 0
+        self.candles = 0
+
+    def _load(self):
+        for kind, ts, payload in read_log(self.path):
+            if kind == KIND_META:
+                self.meta = json.loads(payload)
+            elif kind == KIND_SCRIP:
+                self.scrips.append(json.loads(payload))
+            elif kind in (KIND_MARKET, KIND_ORDER):
+                self.events.append((ts, kind, payload))
+        self.events.sort(key=lambda event: event[0])  # Two WS threads interleave
+        print(f"🎞️ Loaded {len(self.events):,} events, {len(self.scrips)} contracts from {self.path}")
+
+    @property
+    def exhausted(self) -> bool:
+        return self.index >= len(self.events)
+
+    # ------------------------------------------------------------------
+    # Event delivery
+    # ------------------------------------------------------------------
+
+    def _deliver_until(self, target: float):
+        """Deliver every event with recv_ts <= target, in order, at its own time"""
+        events = self.events
+        while self.index < len(events) and events[self.index][0] <= target:
+            ts, kind, payload = events[self.index]
+            self.index += 1
+            self.clock.step(ts)
+            if kind == KIND_MARKET:
+                self.broker.push_frame(payload)
+                self.ticks_delivered += 1
+            elif self.feed_recorded_orders:
+                for ws in list(self.broker.order_sockets):
+                    ws.on_message(None, payload.decode('utf-8'))
+                self.orders_delivered += 1
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def _configure(self):
+        """Contract metadata from the log, outputs to the replay directory"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        config.JOURNAL_DIR = os.path.join(self.output_dir, 'trade_journal')
+        config.EXCEL_LOG_PATH = os.path.join(self.output_dir, f"{stem}_replay.xlsx")
+        if self.meta.get('expiry'):
+            config.EXPIRY_DATE = self.meta['expiry']
+        if self.meta.get('lot_size'):
+            config.LOT_SIZE = int(self.meta['lot_size'])
+
+    def _install_broker(self):
+        from angelone_api import api
+        from mock_broker import MockBroker
+
+        if api.tick_recorder:
+            api.tick_recorder.close()  # Never record a replay
+            api.tick_recorder = None
+
+        self.broker = MockBroker()
+        for scrip in self.scrips:
+            self.broker.add_scrip(scrip['symbol'], scrip['security_id'], scrip.get('lot_size', 0), scrip.get('strike', 0))
+            api.scrip_master[scrip['symbol']] = {
+                'token': scrip['security_id'],
+                'name': config.UNDERLYING,
+                'expiry': self.meta.get('expiry', ''),
+                'strike': scrip.get('strike', 0),
+                'lotsize': scrip.get('lot_size', config.LOT_SIZE),
+            }
+        self.broker.install(api)
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    def run(self) -> Dict:
+        if not self.events:
+            print("⚠️ Tick log has no events")
+            return {}
+
+        self._configure()
+        self.clock.install()
+        wall_start = self._real_time()
+        virtual_start = self.clock.now
+        try:
+            self._install_broker()
+
+            from live_trader_main import LiveTrader
+            self.trader = LiveTrader()
+            self.trader.running = True
+
+            # First aligned boundary, then the same loop body as LiveTrader.main_loop
+            self.trader.scheduler.wait_for_next_candle()
+            while self.trader.running and not self.exhausted:
+                self.trader.process_candle()
+                self.candles += 1
+                self.trader.scheduler.wait_for_next_candle()
+        finally:
+            virtual_span = self.clock.now - virtual_start
+            self.clock.uninstall()
+            if self.trader:
+                self.trader.excel_logger.close()
+
+        wall_seconds = self._real_time() - wall_start
+        return self._summary(virtual_span, wall_seconds)
+
+    @staticmethod
+    def _real_time() -> float:
+        return time.perf_counter()  # Not patched by the clock
+
+    def _summary(self, virtual_span: float, wall_seconds: float) -> Dict:
+        summary = {
+            'log': self.path,
+            'candles': self.candles,
+            'ticks': self.ticks_delivered,
+            'recorded_orders_fed': self.orders_delivered,
+            'orders_placed': len(self.broker.orders),
+            'session_seconds': round(virtual_span, 1),
+            'wall_seconds': round(wall_seconds, 2),
+            'speedup': round(virtual_span / wall_seconds, 1) if wall_seconds > 0 else None,
+            'scheduler': self.trader.scheduler.get_metrics() if self.trader else {},
+        }
+        if self.trader:
+            day = datetime.fromtimestamp(self.events[0][0], IST).date()
+            summary['journal'] = self.trader.excel_logger.journal.summarize(day)
+        from latency_tracker import latency
+        summary['latency'] = {stage: f"p50 {stats['p50_ms']}ms / p95 {stats['p95_ms']}ms (n={stats['count']})"
+                              for stage, stats in latency.get_stats()['stages'].items()}
+        return summary
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a recorded tick log through the live trader")
+    parser.add_argument('log', help="tick log written by the tick recorder (TICK_RECORD_ENABLED=true)")
+    parser.add_argument('--speed', type=float, default=0.0, help="1 = real time, 0 = max speed (default)")
+    parser.add_argument('--orders', action='store_true', help="also feed the recorded order updates")
+    parser.add_argument('--out', default='replay_output', help="journal / Excel output directory")
+    args = parser.parse_args()
+
+    from bot_logging import setup_logging, flush_logs
+    config.LOG_DIR = os.path.join(args.out, 'bot_logs')
+    setup_logging()
+
+    engine = ReplayEngine(args.log, speed=args.speed, feed_recorded_orders=args.orders, output_dir=args.out)
+    summary = engine.run()
+    flush_logs()
+
+    print(f"\n{'=' * 60}")
+    print(f"🎞️ REPLAY COMPLETE - {os.path.basename(args.log)}")
+    print(f"{'=' * 60}")
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            print(f"   {key.replace('_', ' ').title()}:")
+            for sub_key, sub_value in value.items():
+                print(f"      {sub_key}: {sub_value}")
+        else:
+            print(f"   {key.replace('_', ' ').title()}: {value}")
+    print(f"{'=' * 60}\n")
+
+
+if __name__ == "__main__":
+    main()
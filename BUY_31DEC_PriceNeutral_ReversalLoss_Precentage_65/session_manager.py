@@ -0,0 +1,151 @@
+"""
+Session Manager - BACKGROUND RE-LOGIN WORKER
+✅ All re-logins run on one dedicated thread - never on the trading loop
+✅ Auth errors just request a re-login; callers that need REST wait for a ready session
+✅ Proactive refresh ahead of expiry (SESSION_VALIDITY_HOURS - SESSION_REFRESH_AHEAD_MINUTES)
+✅ Login swaps the SmartConnect session atomically - WebSocket feeds keep serving ticks
+✅ Failed re-login retried with backoff (5s → 10s → 30s → 60s)
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+import threading
+import time
+from config import config
+from bot_logging import get_logger
+
+log = get_logger('session_manager')
+
+
+class SessionManager:
+    """Owns the broker session lifecycle on a background worker"""
+
+    RETRY_BACKOFF_SECONDS = [5, 10, 30, 60]
+
+    def __init__(self, login_fn: Callable[[], bool]):
+        self.login_fn = login_fn
+
+        self.ready = threading.Event()       # Set while a valid session exists
+        self._wakeup = threading.Event()     # Re-login requested
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.pending_reason: Optional[str] = None
+        self.session_started: Optional[datetime] = None
+        self.expires_at: Optional[datetime] = None
+
+        # Stats
+        self.relogins = 0
+        self.failed_attempts = 0
+        self.last_relogin_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def mark_logged_in(self):
+        """Record a successful login (called by login_fn)"""
+        self.session_started = config.get_current_ist_time()
+        self.expires_at = self.session_started + timedelta(hours=config.SESSION_VALIDITY_HOURS)
+        if not self._wakeup.is_set():  # A re-login requested during this login keeps callers waiting
+            self.ready.set()
+
+    def start(self):
+        """Start the worker (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="session-manager")
+        self._thread.start()
+        log.info("🔐 Session manager started (background re-login)")
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Caller API
+    # ------------------------------------------------------------------
+
+    def request_relogin(self, reason: str):
+        """Non-blocking: mark session invalid and wake the worker"""
+        if not self.ready.is_set() and self._wakeup.is_set():
+            return  # Already pending
+        log.warning("🔐 Re-login requested (%s) - handled in background", reason)
+        self.pending_reason = reason
+        self.ready.clear()
+        self._wakeup.set()
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Block up to timeout for a ready session (True if ready)"""
+        return self.ready.wait(timeout)
+
+    def is_ready(self) -> bool:
+        return self.ready.is_set()
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _seconds_until_refresh(self) -> float:
+        if not self.expires_at:
+            return 60.0
+        refresh_at = self.expires_at - timedelta(minutes=config.SESSION_REFRESH_AHEAD_MINUTES)
+        return max(0.0, (refresh_at - config.get_current_ist_time()).total_seconds())
+
+    def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            # Sleep until a re-login request or the proactive refresh time
+            timeout = 0 if attempt else min(self._seconds_until_refresh(), 60.0)
+            requested = self._wakeup.wait(timeout)
+            if self._stop.is_set():
+                return
+
+            if not requested and self._seconds_until_refresh() > 0:
+                continue  # Periodic wake-up, nothing due
+
+            reason = self.pending_reason or 'proactive refresh before expiry'
+            # Cleared BEFORE the login - a request arriving meanwhile (AB1007 on the new token) sets it again
+            self._wakeup.clear()
+            self.pending_reason = None
+            start = time.monotonic()
+            success = False
+            try:
+                success = self.login_fn()
+            except Exception as e:
+                log.exception("❌ Background re-login error: %s", e)
+
+            if success:
+                self.last_relogin_seconds = time.monotonic() - start
+                self.relogins += 1
+                attempt = 0
+                if self._wakeup.is_set():
+                    log.warning("🔐 Re-login requested again during login (%s) - logging in again",
+                                self.pending_reason)
+                    continue
+                self.ready.set()
+                log.info("🔐 Session ready (%s) in %.1fs", reason, self.last_relogin_seconds,
+                         extra={'relogin_s': round(self.last_relogin_seconds, 2)})
+                continue
+
+            # Retry the same request (unless a newer one replaced it)
+            self.pending_reason = self.pending_reason or reason
+            self._wakeup.set()
+
+            self.failed_attempts += 1
+            delay = self.RETRY_BACKOFF_SECONDS[min(attempt, len(self.RETRY_BACKOFF_SECONDS) - 1)]
+            attempt += 1
+            log.error("⚠️ Background re-login failed (%s) - retry in %ds", reason, delay)
+            if self._stop.wait(delay):
+                return
+
+    def get_status(self) -> Dict:
+        return {
+            'ready': self.ready.is_set(),
+            'pending_reason': self.pending_reason,
+            'expires_at': self.expires_at.strftime('%Y-%m-%d %H:%M:%S') if self.expires_at else None,
+            'relogins': self.relogins,
+            'failed_attempts': self.failed_attempts,
+            'last_relogin_seconds': round(self.last_relogin_seconds, 2),
+        }
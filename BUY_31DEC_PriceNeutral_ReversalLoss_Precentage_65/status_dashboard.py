@@ -0,0 +1,330 @@
+"""
+Status Dashboard - POSITION STATUS OFF THE TRADING THREAD
+✅ Trading loop only publishes a plain-data snapshot (numbers, no text) once per candle
+✅ Renderers read the latest snapshot at their own refresh rate:
+   - console: status block on stdout when a new snapshot arrives (paused while the Ctrl+C menu is open)
+   - web: local auto-refreshing page (/) + raw snapshot (/status.json)
+✅ Ctrl+C menu (P&L, hedge status) formats the same snapshot
+
+Env:
+    DASHBOARD_MODE=console        # console | web | both | off
+    DASHBOARD_REFRESH_SECONDS=2
+    DASHBOARD_HOST=127.0.0.1
+    DASHBOARD_PORT=9109
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+import html
+import json
+import threading
+import time
+from config import config
+from bot_logging import get_logger
+
+log = get_logger('status_dashboard')
+
+
+# ----------------------------------------------------------------------
+# Snapshot (trading thread - arithmetic only)
+# ----------------------------------------------------------------------
+
+def _level_target(leg, pct: float, level, hard_stop: bool = False) -> Dict:
+    return {
+        'level': level,
+        'hard_stop': hard_stop,
+        'pct': pct,
+        'price': leg.entry_premium * (1 + pct / 100),
+        'distance': pct - leg.current_loss_pct,
+    }
+
+
+def _leg_snapshot(leg, name: str) -> Dict:
+    """Everything the status views show for one leg"""
+    levels = config.PROGRESSIVE_HEDGING_LEVELS
+    pending = [i + 1 for i in range(len(levels)) if (i + 1) not in leg.completed_levels]
+    snapshot = {
+        'name': name,
+        'symbol': leg.symbol,
+        'strike': leg.strike,
+        'entry_premium': leg.entry_premium,
+        'current_premium': leg.current_premium,
+        'loss_pct': leg.current_loss_pct,
+        'completed_levels': list(leg.completed_levels),
+        'pending_level': pending[0] if pending else None,
+        'pending_trigger_pct': levels[pending[0] - 1] if pending else None,
+        'hedge': None,
+        'next': None,
+        'exit_zone': None,
+    }
+
+    try:
+        snapshot['pnl'] = leg.get_pnl()
+    except Exception as e:
+        snapshot['pnl'] = None
+        snapshot['pnl_error'] = str(e)
+
+    if leg.hedge_active:
+        snapshot['hedge'] = {
+            'level': leg.hedge_level,
+            'symbol': leg.hedge_symbol,
+            'entry_premium': leg.hedge_entry_premium,
+            'current_premium': leg.hedge_current_premium,
+            'pnl': leg.hedge_pnl(leg.hedge_current_premium) if leg.hedge_current_premium else None,
+        }
+        # L1 active → next is L2, L2 active → next is the L3 hard stop
+        if leg.hedge_level == 1:
+            snapshot['next'] = _level_target(leg, levels[1], 2)
+        elif leg.hedge_level == 2:
+            snapshot['next'] = _level_target(leg, config.LEVEL_3_HARD_STOP, 3, hard_stop=True)
+        # L1 exits at break-even, L2 exits at the L1 trigger level
+        exit_zone_pct = levels[0] if leg.hedge_level == 2 else 0
+        snapshot['exit_zone'] = _level_target(leg, exit_zone_pct, None)
+    else:
+        next_level = leg.get_next_level()
+        if next_level:
+            snapshot['next'] = _level_target(leg, leg.next_stop_loss_pct, next_level)
+        else:
+            snapshot['next'] = _level_target(leg, config.LEVEL_3_HARD_STOP, 3, hard_stop=True)
+
+    return snapshot
+
+
+def build_snapshot(trader) -> Dict:
+    """Plain-data view of the trader - no formatting, no I/O"""
+    from angelone_api import api
+
+    manager = trader.straddle_manager
+    active = bool(manager.straddle_active and manager.ce_leg and manager.pe_leg)
+    legs = [_leg_snapshot(manager.ce_leg, 'CE'), _leg_snapshot(manager.pe_leg, 'PE')] if active else []
+    pnls = [leg['pnl'] for leg in legs]
+
+    return {
+        'ts': time.time(),
+        'time': config.get_current_ist_time().strftime('%Y-%m-%d %H:%M:%S'),
+        'underlying': config.UNDERLYING,
+        'strategy': config.STRATEGY_ID,
+        'hedge_side': config.HEDGE_SIDE,
+        'candle': trader.candle_count,
+        'cooldown_candles': trader.candles_to_wait,
+        'straddle_active': active,
+        'legs': legs,
+        'total_pnl': sum(pnls) if legs and None not in pnls else None,
+        'ws_online': bool(api.ws_enabled and api.market_ws),
+    }
+
+
+class StatusBoard:
+    """Latest snapshot + version (publish is a reference swap)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot: Optional[Dict] = None
+        self.version = 0
+
+    def publish(self, snapshot: Dict):
+        with self.lock:
+            self.snapshot = snapshot
+            self.version += 1
+
+    def latest(self) -> Tuple[int, Optional[Dict]]:
+        with self.lock:
+            return self.version, self.snapshot
+
+
+# ----------------------------------------------------------------------
+# Text views (renderer threads / menus)
+# ----------------------------------------------------------------------
+
+def render_status(snapshot: Optional[Dict]) -> List[str]:
+    """🎯 Position status block (the per-candle view)"""
+    if not snapshot or not snapshot['straddle_active']:
+        return []
+
+    lines = [f"🎯 {snapshot.get('strategy', '')} POSITION STATUS - {snapshot.get('hedge_side', '')} HEDGE:", f"{'─'*60}"]
+    for leg in snapshot['legs']:
+        hedge = leg['hedge']
+        status_icon = "🛡️" if hedge else "✅"
+        lines.append(f"   {leg['name']}: {status_icon} ₹{leg['current_premium']:.2f} | Loss: {leg['loss_pct']:+.1f}%")
+
+        if hedge:
+            lines.append(f"        ✅ L{hedge['level']} HEDGE ACTIVE: {hedge['symbol']}")
+
+        target = leg['next']
+        if target:
+            up = " UP" if hedge else ""
+            if target['hard_stop']:
+                lines.append(f"        🚨 NEXT: L3 HARD STOP at {target['pct']:.0f}% (₹{target['price']:.2f})")
+            else:
+                lines.append(f"        ⏫ NEXT: L{target['level']} at {target['pct']:.0f}% (₹{target['price']:.2f})")
+            lines.append(f"        📏 Distance{up}: {target['distance']:+.1f}%")
+
+        exit_zone = leg['exit_zone']
+        if exit_zone:
+            lines.append(f"        📉 Exit zone: {exit_zone['pct']:.0f}% (₹{exit_zone['price']:.2f})")
+            lines.append(f"        📏 Distance DOWN: {exit_zone['distance']:+.1f}%")
+
+        if hedge and hedge['pnl'] is not None:
+            hedge_icon = "💚" if hedge['pnl'] >= 0 else "❌"
+            lines.append(f"        {hedge_icon} Hedge P&L: ₹{hedge['pnl']:+.2f}")
+
+        lines.append(f"{'─'*60}")
+
+    ce, pe = snapshot['legs']
+    if snapshot['total_pnl'] is not None:
+        pnl_icon = "💰" if snapshot['total_pnl'] >= 0 else "💸"
+        lines.append(f"   {pnl_icon} P&L: CE ₹{ce['pnl']:+.2f} | PE ₹{pe['pnl']:+.2f} | TOTAL ₹{snapshot['total_pnl']:+.2f}")
+    else:
+        error = ce.get('pnl_error') or pe.get('pnl_error')
+        lines.append(f"   💰 P&L: Calculation Error: {error}")
+
+    if snapshot['ws_online']:
+        lines.append(f"   📡 WebSocket: [ONLINE]")
+    return lines
+
+
+def render_hedge_status(snapshot: Optional[Dict]) -> List[str]:
+    """📊 Detailed hedge status (Ctrl+C menu option 7)"""
+    lines = ["\n" + "="*80, "📊 CURRENT HEDGE STATUS", "="*80]
+    if not snapshot or not snapshot['straddle_active']:
+        lines.extend(["No active straddle", "="*80])
+        return lines
+
+    for leg in snapshot['legs']:
+        lines.append(f"\n{leg['name']} LEG:")
+        lines.append(f"  Current Loss: {leg['loss_pct']:+.1f}%")
+        lines.append(f"  Completed Levels: {leg['completed_levels'] if leg['completed_levels'] else 'None'}")
+
+        if leg['pending_level']:
+            lines.append(f"  ⏭️ Next Level: {leg['pending_level']} (triggers at {leg['pending_trigger_pct']:.1f}%)")
+        else:
+            lines.append(f"  ⚠️ All levels completed - At Level 3 ({config.LEVEL_3_HARD_STOP:.1f}%)")
+
+        hedge = leg['hedge']
+        if hedge:
+            lines.append(f"\n  🛡️ ACTIVE HEDGE:")
+            lines.append(f"     Level: {hedge['level']}")
+            lines.append(f"     Symbol: {hedge['symbol']}")
+            lines.append(f"     Entry: ₹{hedge['entry_premium']:.2f} (at {leg['loss_pct']:.1f}% loss)")
+            lines.append(f"     Current: ₹{hedge['current_premium'] or 0:.2f}")
+            if hedge['pnl'] is not None:
+                pnl_icon = "💰" if hedge['pnl'] >= 0 else "💸"
+                lines.append(f"     {pnl_icon} Hedge P&L: ₹{hedge['pnl']:+.2f}")
+        else:
+            lines.append(f"\n  ❌ No active hedge")
+
+        lines.append(f"  {'-'*76}")
+
+    if snapshot['total_pnl'] is not None:
+        ce, pe = snapshot['legs']
+        lines.append(f"\n💰 TOTAL P&L:")
+        lines.append(f"  CE: ₹{ce['pnl']:+.2f} | PE: ₹{pe['pnl']:+.2f} | TOTAL: ₹{snapshot['total_pnl']:+.2f}")
+
+    lines.append("="*80)
+    return lines
+
+
+# ----------------------------------------------------------------------
+# Renderers
+# ----------------------------------------------------------------------
+
+class ConsoleRenderer:
+    """Prints the status block for each new snapshot, at most once per refresh"""
+
+    def __init__(self, board: StatusBoard, refresh: float = None,
+                 paused: Optional[Callable[[], bool]] = None):
+        self.board = board
+        self.refresh = refresh or config.DASHBOARD_REFRESH_SECONDS
+        self.paused = paused or (lambda: False)
+        self.stop_event = threading.Event()
+        self.rendered_version = 0
+        self.thread = threading.Thread(target=self._run, name="StatusConsole", daemon=True)
+
+    def _run(self):
+        while not self.stop_event.wait(self.refresh):
+            version, snapshot = self.board.latest()
+            if version == self.rendered_version or self.paused():
+                continue
+            self.rendered_version = version
+            try:
+                lines = render_status(snapshot)
+            except Exception as e:
+                lines = [f"⚠️ Status render error: {e}"]
+            if lines:
+                print('\n'.join(lines))
+
+    def start(self) -> 'ConsoleRenderer':
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class DashboardServer:
+    """Local status page: / (auto-refresh HTML) and /status.json"""
+
+    def __init__(self, board: StatusBoard, host: str = None, port: int = None, refresh: float = None):
+        self.board = board
+        refresh = refresh or config.DASHBOARD_REFRESH_SECONDS
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                version, snapshot = server.board.latest()
+                if self.path.startswith('/status.json'):
+                    body = json.dumps({'version': version, 'snapshot': snapshot}, default=str).encode('utf-8')
+                    content_type = 'application/json'
+                elif self.path == '/' or self.path.startswith('/?'):
+                    body = server.page(snapshot, refresh).encode('utf-8')
+                    content_type = 'text/html; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Browser polls every refresh - keep stdout for trading
+
+        self.httpd = ThreadingHTTPServer((host or config.DASHBOARD_HOST,
+                                          config.DASHBOARD_PORT if port is None else port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="DashboardServer", daemon=True)
+
+    @staticmethod
+    def page(snapshot: Optional[Dict], refresh: float) -> str:
+        if snapshot is None:
+            header, lines = "Waiting for first candle...", []
+        else:
+            header = f"{snapshot.get('strategy', '')} | Candle #{snapshot['candle']} | {snapshot['time']} IST"
+            if snapshot['cooldown_candles']:
+                header += f" | Cooldown: {snapshot['cooldown_candles']} candle(s)"
+            lines = render_status(snapshot) + render_hedge_status(snapshot) if snapshot['straddle_active'] \
+                else ["📭 No active positions"]
+        body = html.escape('\n'.join(lines))
+        return (f"<!doctype html><html><head><meta charset='utf-8'>"
+                f"<meta http-equiv='refresh' content='{max(1, int(refresh))}'>"
+                f"<title>Angel One Live Trader</title></head>"
+                f"<body style='font-family: monospace'><h3>{html.escape(header)}</h3><pre>{body}</pre></body></html>")
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'DashboardServer':
+        self.thread.start()
+        log.info("🖥️ Status dashboard: %s/", self.url)
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# Global board
+status_board = StatusBoard()
@@ -1,9 +1,9 @@
 """
 Straddle Manager - PURE PRICE-NEUTRAL HEDGING
-NO BUFFER/NO TRAILING - Hold SELL hedges until Level 3
+NO BUFFER/NO TRAILING - Hold hedges until Level 3 (BUY or SELL per HEDGE_SIDE)
 Logs every leg and hedge action to Excel with timestamps
 FIXED: Straddle leg exits now use verified orders with retry logic
-TRUE SIMULTANEOUS ORDER FIRING: Uses threading for instant execution
+TRUE SIMULTANEOUS ORDER FIRING: Entry legs go out as one basket (api.place_basket)
 ✅ BATCH API OPTIMIZATIONS ADDED
 ✅ FIXED: WebSocket-only verification for order fills
 ✅ FIXED: Race condition protection
@@ -14,16 +14,24 @@ TRUE SIMULTANEOUS ORDER FIRING: Uses threading for instant execution
 ✅ CORRECTED: Price-neutral hedging with both legs passed to hedge manager
 ✅ FIXED: Hedge premium update with correct option types
 ✅ FIXED: Added critical operation locks
+⚡ Straddle exit fires legs + hedges concurrently (exit_engine.py)
 """
 
 from typing import Optional, Dict, Tuple, List
 from datetime import datetime
 from leg import Leg
+from hedge_side import hedge_side
 from hedge_manager import HedgeManager
+from exit_engine import exit_engine
 from angelone_api import api
 from config import config
+from option_chain_arrays import ChainArrays
+from latency_tracker import latency
+from lock_manager import LockTimeout, leg_key, instrument_key
+from bot_logging import get_logger
 import time
-import threading
+
+log = get_logger('straddle_manager')
 
 
 class StraddleManager:
@@ -39,6 +47,7 @@ class StraddleManager:
         self.strike = None
         self.entry_time = None
         self.session_id = 0
+        self.pending_exit_reason = None  # Set while a partial exit leaves contracts open (retried)
 
         # Track number of hedges used per leg
         self.ce_hedges_count = 0
@@ -47,19 +56,23 @@ class StraddleManager:
         # 🔥 HYBRID: Cache for price-neutral hedge calculation
         self._global_option_chain = None
 
+        # ⏱️ Per-order latency rows go to the trade journal
+        if excel_logger:
+            latency.set_sink(excel_logger.log_order_latency)
+
     def enter_straddle(self, spot_price: float, option_chain: Dict, manual_strike: Optional[int] = None) -> bool:
         """✅ FIX 4: Enter new straddle with CRITICAL LOCK"""
         # ✅ CRITICAL FIX: Initialize all variables BEFORE try block to avoid undefined references
-        ce_result = None
-        pe_result = None
+        basket = None
         ce_symbol = None
         pe_symbol = None
         ce_security_id = None
         pe_security_id = None
         success = False
+        lease = None
         
         if self.straddle_active:
-            print("[WARN] Straddle already active")
+            log.warning("[WARN] Straddle already active")
             return False
 
         try:
@@ -74,17 +87,17 @@ class StraddleManager:
                 pe_premium = strike_data.get('PE', 0)
                 
                 if not ce_premium or not pe_premium:
-                    print(f"[ERROR] Manual strike {strike} has invalid premiums in option chain")
+                    log.error(f"[ERROR] Manual strike {strike} has invalid premiums in option chain")
                     return False
                 
-                print(f"\n[MANUAL] Using manual strike: {strike}")
-                print(f"   CE Premium: ₹{ce_premium:.2f}")
-                print(f"   PE Premium: ₹{pe_premium:.2f}")
-                print(f"   Total: ₹{ce_premium + pe_premium:.2f}")
+                log.info(f"\n[MANUAL] Using manual strike: {strike}")
+                log.info(f"   CE Premium: ₹{ce_premium:.2f}")
+                log.info(f"   PE Premium: ₹{pe_premium:.2f}")
+                log.info(f"   Total: ₹{ce_premium + pe_premium:.2f}")
             else:
                 # AUTO MODE: Scan for best strike
                 strike, ce_premium, pe_premium = self.scan_best_straddle(spot_price, option_chain)
-                print(f"🎯 AUTO selected strike: {strike}")
+                log.info(f"🎯 AUTO selected strike: {strike}")
 
             # CRITICAL FIX: Enhanced premium validation with better error handling
             max_reasonable_premium = spot_price * 0.10  # 10% of spot as upper limit
@@ -92,30 +105,30 @@ class StraddleManager:
             
             # Check for unreasonably high premiums
             if ce_premium > max_reasonable_premium:
-                print(f"[WARN] CE premium too high: Rs.{ce_premium:.2f} > Rs.{max_reasonable_premium:.2f}, skipping entry")
+                log.warning(f"[WARN] CE premium too high: Rs.{ce_premium:.2f} > Rs.{max_reasonable_premium:.2f}, skipping entry")
                 return False
                 
             if pe_premium > max_reasonable_premium:
-                print(f"[WARN] PE premium too high: Rs.{pe_premium:.2f} > Rs.{max_reasonable_premium:.2f}, skipping entry")
+                log.warning(f"[WARN] PE premium too high: Rs.{pe_premium:.2f} > Rs.{max_reasonable_premium:.2f}, skipping entry")
                 return False
                 
             # Check for unreasonably low premiums (likely bad data)
             if ce_premium < min_reasonable_premium:
-                print(f"[WARN] CE premium too low: Rs.{ce_premium:.2f} < Rs.{min_reasonable_premium:.2f}, skipping entry")
+                log.warning(f"[WARN] CE premium too low: Rs.{ce_premium:.2f} < Rs.{min_reasonable_premium:.2f}, skipping entry")
                 return False
                 
             if pe_premium < min_reasonable_premium:
-                print(f"[WARN] PE premium too low: Rs.{pe_premium:.2f} < Rs.{min_reasonable_premium:.2f}, skipping entry")
+                log.warning(f"[WARN] PE premium too low: Rs.{pe_premium:.2f} < Rs.{min_reasonable_premium:.2f}, skipping entry")
                 return False
 
             # Check if premiums are too far apart (indication of bad data or wrong strike)
             if ce_premium > 0 and pe_premium > 0:
                 premium_ratio = min(ce_premium, pe_premium) / max(ce_premium, pe_premium)
                 if premium_ratio < 0.3:
-                    print(f"[WARN] Premiums too imbalanced - ratio: {premium_ratio:.2f}, CE: Rs.{ce_premium:.2f}, PE: Rs.{pe_premium:.2f}, skipping entry")
+                    log.warning(f"[WARN] Premiums too imbalanced - ratio: {premium_ratio:.2f}, CE: Rs.{ce_premium:.2f}, PE: Rs.{pe_premium:.2f}, skipping entry")
                     return False
             else:
-                print(f"[WARN] Invalid premiums - CE: {ce_premium}, PE: {pe_premium}, skipping entry")
+                log.warning(f"[WARN] Invalid premiums - CE: {ce_premium}, PE: {pe_premium}, skipping entry")
                 return False
 
             # Get option details
@@ -123,177 +136,86 @@ class StraddleManager:
             pe_data = self._find_straddle_in_chain(option_chain, strike, 'PE')
 
             if not ce_data or not pe_data:
-                print(f"[ERROR] Option data not found for strike {strike}")
+                log.error(f"[ERROR] Option data not found for strike {strike}")
                 return False
 
             ce_symbol, ce_security_id = ce_data
             pe_symbol, pe_security_id = pe_data
 
-            print(f"\n{'=' * 80}")
-            print(f"ENTERING STRADDLE - TRUE SIMULTANEOUS FIRING")
-            print(f"{'=' * 80}")
-            print(f"Strike: {strike}")
-            print(f"CE: {ce_symbol} (Rs.{ce_premium:.2f})")
-            print(f"PE: {pe_symbol} (Rs.{pe_premium:.2f})")
-            print(f"Total Premium: Rs.{ce_premium + pe_premium:.2f}")
+            log.info(f"\n{'=' * 80}")
+            log.info(f"ENTERING STRADDLE - TRUE SIMULTANEOUS FIRING")
+            log.info(f"{'=' * 80}")
+            log.info(f"Strike: {strike}")
+            log.info(f"CE: {ce_symbol} (Rs.{ce_premium:.2f})")
+            log.info(f"PE: {pe_symbol} (Rs.{pe_premium:.2f})")
+            log.info(f"Total Premium: Rs.{ce_premium + pe_premium:.2f}")
 
             entry_time = config.get_current_ist_time()
 
             # 🔥 HYBRID: Cache option chain for price-neutral hedge calculation
             self._global_option_chain = option_chain
-            StraddleManager._global_option_chain = option_chain
-
-            # 🔥 FIX 4: Acquire critical lock
-            api.acquire_critical_lock(f"STRADDLE_ENTRY_{strike}")
 
-            # FIRE BOTH ORDERS SIMULTANEOUSLY USING THREADS
-            print(f"\n[FIRING] BOTH LEGS SIMULTANEOUSLY...")
-
-            # Use threads to place orders simultaneously
-            order_results = {}
-
-            ce_thread = threading.Thread(
-                target=self._place_order_thread,
-                args=('CE', ce_symbol, ce_security_id, order_results)
-            )
+            # ⏱️ Tick-to-trade span: decision made on the CE leg's last tick
+            latency.begin('STRADDLE_ENTRY', str(strike))
+            latency.trigger('STRADDLE_ENTRY', str(strike), tick_ts=api.get_tick_time(ce_security_id))
 
-            pe_thread = threading.Thread(
-                target=self._place_order_thread,
-                args=('PE', pe_symbol, pe_security_id, order_results)
+            # 🔒 Both legs + both contracts (hedges on other instruments are not blocked)
+            lease = api.locks.acquire(
+                f"STRADDLE_ENTRY_{strike}",
+                [leg_key('CE'), leg_key('PE'), instrument_key(ce_security_id), instrument_key(pe_security_id)]
             )
 
-            # Start both threads
-            ce_thread.start()
-            pe_thread.start()
-
-            # Wait for both threads to complete
-            ce_thread.join()
-            pe_thread.join()
-
-            # Check results
-            ce_result = order_results.get('CE', {'success': False, 'message': 'No result'})
-            pe_result = order_results.get('PE', {'success': False, 'message': 'No result'})
-
-            # Log failed attempts
-            if not ce_result.get('success'):
-                error_message = ce_result.get('message', 'Unknown error')
-                print(f"   [ERROR] CE Order failed: {error_message}")
-                if self.excel_logger:
-                    self.excel_logger.log_leg_action(
-                        leg_type="CE", action="SELL", time=entry_time,
-                        strike=strike, symbol=ce_symbol, security_id=ce_security_id,
-                        premium=ce_premium, quantity=config.LOT_SIZE,
-                        order_status="FAILED", notes=error_message
-                    )
-
-            if not pe_result.get('success'):
-                error_message = pe_result.get('message', 'Unknown error')
-                print(f"   [ERROR] PE Order failed: {error_message}")
-                if self.excel_logger:
-                    self.excel_logger.log_leg_action(
-                        leg_type="PE", action="SELL", time=entry_time,
-                        strike=strike, symbol=pe_symbol, security_id=pe_security_id,
-                        premium=pe_premium, quantity=config.LOT_SIZE,
-                        order_status="FAILED", notes=error_message
-                    )
-
-            # If both failed or one failed, rollback
-            if not ce_result.get('success') or not pe_result.get('success'):
-                print(f"\n[ROLLBACK] Rolling back successful orders...")
-
-                # Rollback CE if it was successful but PE failed
-                if ce_result.get('success') and not pe_result.get('success'):
-                    print(f"   [ROLLBACK] Rolling back CE order...")
-                    api.place_order(
-                        transaction_type='BUY',
-                        symbol=ce_symbol,
-                        security_id=ce_security_id,
-                        quantity=config.LOT_SIZE
-                    )
-
-                # Rollback PE if it was successful but CE failed
-                if pe_result.get('success') and not ce_result.get('success'):
-                    print(f"   [ROLLBACK] Rolling back PE order...")
-                    api.place_order(
-                        transaction_type='BUY',
-                        symbol=pe_symbol,
-                        security_id=pe_security_id,
-                        quantity=config.LOT_SIZE
-                    )
-
-                print(f"[ERROR] Straddle entry aborted - simultaneous execution failed")
-                return False
-
-            # Both orders placed successfully, get order IDs
-            ce_order_id = ce_result.get('order_id')
-            pe_order_id = pe_result.get('order_id')
-
-            if not ce_order_id or not pe_order_id:
-                print(f"[ERROR] Missing order IDs - CE: {ce_order_id}, PE: {pe_order_id}")
-                return False
-
-            # ✅ FIXED: Use WebSocket-only verification (REST fallback disabled)
-            print(f"\n[VERIFYING] Verifying order execution via WebSocket...")
-            time.sleep(2)
-
-            # 🔥 FIXED: Use WebSocket-only verification with race condition protection
-            ce_filled = api.verify_order_fill_websocket(ce_order_id, max_wait=30)
-            time.sleep(0.5)
-            pe_filled = api.verify_order_fill_websocket(pe_order_id, max_wait=30)
-
-            # Rollback logic if verification fails
-            if not ce_filled or not pe_filled:
-                print(f"\n[WARN] ORDER VERIFICATION FAILED")
-                print(f"   CE Filled: {ce_filled}")
-                print(f"   PE Filled: {pe_filled}")
-
-                if ce_filled and not pe_filled:
-                    print(f"[ROLLBACK] Rolling back CE order...")
-                    api.place_order(
-                        transaction_type='BUY',
-                        symbol=ce_symbol,
-                        security_id=ce_security_id,
-                        quantity=config.LOT_SIZE
-                    )
-
-                if pe_filled and not ce_filled:
-                    print(f"[ROLLBACK] Rolling back PE order...")
-                    api.place_order(
-                        transaction_type='BUY',
-                        symbol=pe_symbol,
-                        security_id=pe_security_id,
-                        quantity=config.LOT_SIZE
-                    )
+            # 🧺 FIRE BOTH LEGS AS ONE BASKET (pre-validated, shared order pool, auto rollback)
+            log.info(f"\n[FIRING] BOTH LEGS SIMULTANEOUSLY...")
+
+            basket = api.place_basket(f"STRADDLE_ENTRY_{strike}", [
+                {'name': 'CE', 'transaction_type': 'SELL', 'symbol': ce_symbol,
+                 'security_id': ce_security_id, 'quantity': config.LOT_SIZE},
+                {'name': 'PE', 'transaction_type': 'SELL', 'symbol': pe_symbol,
+                 'security_id': pe_security_id, 'quantity': config.LOT_SIZE},
+            ], max_wait=30)
+            ce_order = basket.legs['CE']
+            pe_order = basket.legs['PE']
+
+            if not basket.filled:
+                # Log failed attempts
+                for order, premium in ((ce_order, ce_premium), (pe_order, pe_premium)):
+                    if order.filled:
+                        continue
+                    log.error(f"   [ERROR] {order.name} Order failed: {order.message}")
+                    if self.excel_logger:
+                        self.excel_logger.log_leg_action(
+                            leg_type=order.name, action="SELL", time=entry_time,
+                            strike=strike, symbol=order.symbol, security_id=order.security_id,
+                            premium=premium, quantity=config.LOT_SIZE,
+                            order_status="FAILED", notes=order.message
+                        )
 
-                print(f"[ERROR] Straddle entry aborted - verification failed")
+                log.info(f"   CE Filled: {ce_order.filled}")
+                log.info(f"   PE Filled: {pe_order.filled}")
+                log.error(f"[ERROR] Straddle entry aborted - basket {basket.basket_id} {basket.state}")
                 return False
 
-            # 🔥 CRITICAL FIX: Get ACTUAL fill prices from order book
-            print(f"\n[VERIFYING] Fetching actual fill prices from broker...")
-
-            # Get actual fill price for CE
-            actual_ce_price = api.get_order_fill_price(ce_order_id)
+            # 🔥 CRITICAL FIX: ACTUAL fill prices (one order book call for the basket)
+            actual_ce_price = ce_order.fill_price
             if actual_ce_price:
                 ce_slippage = actual_ce_price - ce_premium
-                print(f"   📊 CE: Decision ₹{ce_premium:.2f} → Fill ₹{actual_ce_price:.2f} (Slippage: {ce_slippage:+.2f})")
+                log.info(f"   📊 CE: Decision ₹{ce_premium:.2f} → Fill ₹{actual_ce_price:.2f} (Slippage: {ce_slippage:+.2f})")
                 ce_premium = actual_ce_price  # Use actual fill price
             else:
-                print(f"   ⚠️ Could not fetch CE fill price, using market price")
+                log.warning(f"   ⚠️ Could not fetch CE fill price, using market price")
                 # Fallback to current market price
                 actual_ce_price = api.get_ltp_with_retry(ce_security_id, max_retries=3)
                 if actual_ce_price:
                     ce_premium = actual_ce_price
 
-            time.sleep(0.5)
-
-            # Get actual fill price for PE
-            actual_pe_price = api.get_order_fill_price(pe_order_id)
+            actual_pe_price = pe_order.fill_price
             if actual_pe_price:
                 pe_slippage = actual_pe_price - pe_premium
-                print(f"   📊 PE: Decision ₹{pe_premium:.2f} → Fill ₹{actual_pe_price:.2f} (Slippage: {pe_slippage:+.2f})")
+                log.info(f"   📊 PE: Decision ₹{pe_premium:.2f} → Fill ₹{actual_pe_price:.2f} (Slippage: {pe_slippage:+.2f})")
                 pe_premium = actual_pe_price  # Use actual fill price
             else:
-                print(f"   ⚠️ Could not fetch PE fill price, using market price")
+                log.warning(f"   ⚠️ Could not fetch PE fill price, using market price")
                 # Fallback to current market price
                 actual_pe_price = api.get_ltp_with_retry(pe_security_id, max_retries=3)
                 if actual_pe_price:
@@ -302,9 +224,9 @@ class StraddleManager:
             # Calculate total slippage
             if actual_ce_price and actual_pe_price:
                 total_slippage = (actual_ce_price - ce_premium) + (actual_pe_price - pe_premium)
-                print(f"   💰 Total Entry Premium (ACTUAL): ₹{ce_premium + pe_premium:.2f}")
+                log.info(f"   💰 Total Entry Premium (ACTUAL): ₹{ce_premium + pe_premium:.2f}")
                 if abs(total_slippage) > 1.0:
-                    print(f"   ⚠️ Total Slippage: ₹{total_slippage:+.2f}")
+                    log.warning(f"   ⚠️ Total Slippage: ₹{total_slippage:+.2f}")
 
             # Create leg objects with ACTUAL fill premiums
             self.ce_leg = Leg(
@@ -333,23 +255,9 @@ class StraddleManager:
             self.ce_hedges_count = 0
             self.pe_hedges_count = 0
 
-            # ✅ FIXED: Subscribe to WebSocket using market_ws with correct format
-            if api.ws_enabled and api.market_ws:
-                try:
-                    # Subscribe to straddle legs
-                    token_list = [{
-                        "exchangeType": 2,  # NSE_FO
-                        "tokens": [ce_security_id, pe_security_id]
-                    }]
-                    
-                    api.market_ws.subscribe(
-                        correlation_id=f"straddle_{int(time.time())}",
-                        mode=1,  # LTP mode
-                        token_list=token_list
-                    )
-                    print("[OK] Subscribed straddle legs to WebSocket")
-                except Exception as e:
-                    print(f"[WARN] WebSocket subscription failed: {e}")
+            # ✅ Subscribe straddle legs to WebSocket (pinned - chain window moves never drop them)
+            api.subscribe_instruments_to_websocket([{'security_id': ce_security_id},
+                                                    {'security_id': pe_security_id}])
 
             # LOG TO EXCEL
             if self.excel_logger:
@@ -378,95 +286,63 @@ class StraddleManager:
                     order_status="FILLED", notes="Straddle Entry"
                 )
 
-            print(f"\n[OK] STRADDLE ENTRY SUCCESSFUL")
-            print(f"   Session ID: {self.session_id}")
-            print(f"   Strike: {strike}")
-            print(f"   Entry Time: {entry_time.strftime('%H:%M:%S')}")
-            print(f"   [OK] BOTH LEGS EXECUTED SIMULTANEOUSLY")
-            print(f"{'=' * 80}\n")
+            log.info(f"\n[OK] STRADDLE ENTRY SUCCESSFUL")
+            log.info(f"   Session ID: {self.session_id}")
+            log.info(f"   Strike: {strike}")
+            log.info(f"   Entry Time: {entry_time.strftime('%H:%M:%S')}")
+            log.info(f"   [OK] BOTH LEGS EXECUTED SIMULTANEOUSLY")
+            log.info(f"{'=' * 80}\n")
 
             success = True
             return True
 
+        except LockTimeout as e:
+            log.warning(f"[WARN] Straddle entry skipped - {e}")
+            return False
+
         except Exception as e:
-            print(f"[ERROR] Straddle entry error: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception(f"[ERROR] Straddle entry error: {e}")
             
             # 🔥 CRITICAL: Clean up on error
-            print("\n" + "="*80)
-            print("🚨 STRADDLE ENTRY FAILED - POSITIONS MAY BE OPEN!")
-            print("="*80)
-            print(f"   CE Order: {ce_result.get('order_id') if ce_result else 'Unknown'}")
-            print(f"   PE Order: {pe_result.get('order_id') if pe_result else 'Unknown'}")
-            print("\n⚠️ CHECK YOUR BROKER TERMINAL AND SQUARE OFF MANUALLY IF NEEDED!")
-            print("="*80 + "\n")
+            log.error("\n" + "="*80)
+            log.error("🚨 STRADDLE ENTRY FAILED - POSITIONS MAY BE OPEN!")
+            log.error("="*80)
+            log.error(f"   CE Order: {basket.legs['CE'].order_id if basket else 'Unknown'}")
+            log.error(f"   PE Order: {basket.legs['PE'].order_id if basket else 'Unknown'}")
+            log.error("\n⚠️ CHECK YOUR BROKER TERMINAL AND SQUARE OFF MANUALLY IF NEEDED!")
+            log.error("="*80 + "\n")
             
             return False  # ✅ Return False, don't crash completely
         finally:
             # 🔥 FIX 4: Always release lock
-            api.release_critical_lock(f"STRADDLE_ENTRY_{strike}")
+            if lease:
+                lease.release()
+            latency.end()
 
     def scan_best_straddle(self, spot_price: float, option_chain: Dict) -> Tuple[int, float, float]:
         """FIXED: Select straddle with minimum CE-PE premium difference from ALL available strikes"""
         base_atm = round(spot_price / config.STRIKE_INTERVAL) * config.STRIKE_INTERVAL
 
         # CRITICAL FIX: Use ALL strikes from the option chain that was fetched
-        available_strikes = list(option_chain.keys())
-        
-        if not available_strikes:
-            print("[ERROR] No strikes available in option chain")
+        if not option_chain:
+            log.error("[ERROR] No strikes available in option chain")
             return base_atm, 0, 0
 
-        min_diff = float('inf')
-        best_strike = base_atm
-        best_ce_premium = 0
-        best_pe_premium = 0
-        strikes_considered = 0
+        # ⚡ Vectorized: min |CE - PE| over aligned chain arrays
+        chain = ChainArrays.from_chain(option_chain)
+        best = chain.best_straddle()
+        strikes_considered = chain.valid_count()
 
-        for strike in available_strikes:
-            strike_data = option_chain[strike]
-            ce_premium = strike_data.get('CE', 0)
-            pe_premium = strike_data.get('PE', 0)
+        if best is None:
+            log.error(f"\n[ERROR] No strike with both CE and PE quoted ({len(chain)} strikes)")
+            return base_atm, 0, 0
 
-            if ce_premium > 0 and pe_premium > 0:
-                diff = abs(ce_premium - pe_premium)
-                if diff < min_diff:
-                    min_diff = diff
-                    best_strike = strike
-                    best_ce_premium = ce_premium
-                    best_pe_premium = pe_premium
-                strikes_considered += 1
+        best_strike, best_ce_premium, best_pe_premium, min_diff = best
 
-        print(f"\n[OK] Scanned {strikes_considered} strikes | Best: {best_strike} | CE: Rs.{best_ce_premium:.2f} | PE: Rs.{best_pe_premium:.2f} | Diff: Rs.{min_diff:.2f}")
+        log.info(f"\n[OK] Scanned {strikes_considered} strikes | Best: {best_strike} | CE: Rs.{best_ce_premium:.2f} | PE: Rs.{best_pe_premium:.2f} | Diff: Rs.{min_diff:.2f}")
 
         return best_strike, best_ce_premium, best_pe_premium
 
-    def _place_order_thread(self, order_type: str, symbol: str, security_id: str, result_dict: dict):
-        """
-        Place order in a separate thread
-        🔥 UPDATED: Handles new response format with order_status
-        """
-        try:
-            order_result = api.place_order(
-                transaction_type='SELL',
-                symbol=symbol,
-                security_id=security_id,
-                quantity=config.LOT_SIZE
-            )
-            result_dict[order_type] = order_result
-            
-            # 🔥 NEW: Log immediate order status if available
-            if order_result.get('success') and order_result.get('order_status'):
-                print(f"   📊 {order_type} immediate status: {order_result['order_status']}")
-                
-        except Exception as e:
-            result_dict[order_type] = {
-                'success': False,
-                'message': str(e),
-                'order_status': None
-            }
-
     def update_positions(self, option_chain: Dict) -> Optional[str]:
         """SIMPLE: Premiums → Hedges → Level 3"""
         if not self.straddle_active:
@@ -474,16 +350,21 @@ class StraddleManager:
 
         # FIX: Added null checks for legs
         if not self.ce_leg or not self.pe_leg:
-            print("[ERROR] Legs not initialized")
+            log.error("[ERROR] Legs not initialized")
             return None
 
+        # Previous exit left contracts open - finish it before any hedging on a half-closed straddle
+        if self.pending_exit_reason:
+            log.warning(f"🚨 Incomplete exit pending - retrying: {self.pending_exit_reason}")
+            return self.pending_exit_reason
+
         # 🔥 OPTIMIZED: Get all premiums from option chain first
         ce_premium = self._get_premium_from_chain(option_chain, self.strike, 'CE')
         pe_premium = self._get_premium_from_chain(option_chain, self.strike, 'PE')
         
         # If option chain fetch failed, try batch API directly
         if not ce_premium or not pe_premium:
-            print("[WARN] Premium missing from chain, trying batch API...")
+            log.warning("[WARN] Premium missing from chain, trying batch API...")
             
             # 🔥 Use batch API as fallback
             ce_hedge_id = self.ce_leg.hedge_security_id if self.ce_leg.hedge_active else None
@@ -503,7 +384,7 @@ class StraddleManager:
                 pe_hedge_premium = premiums.get('pe_hedge')
                 
                 if not ce_premium or not pe_premium:
-                    print("[ERROR] Could not get current premiums from batch API")
+                    log.error("[ERROR] Could not get current premiums from batch API")
                     return None
                 
                 # Update all at once
@@ -515,37 +396,29 @@ class StraddleManager:
                 if pe_hedge_premium and self.pe_leg.hedge_active:
                     self.pe_leg.update_hedge_premium(pe_hedge_premium)
             else:
-                print("[ERROR] Could not get current premiums")
+                log.error("[ERROR] Could not get current premiums")
                 return None
         else:
             # Got premiums from chain, update legs
             self.ce_leg.update_premium(ce_premium)
             self.pe_leg.update_premium(pe_premium)
 
-            # 🔥 FIXED: Update hedge premiums with CORRECT option types
-            if self.ce_leg.hedge_active and hasattr(self.ce_leg, 'hedge_strike'):
-                # 🔥 FIX: CE hedge is PE on profit side
-                opposing_type = 'PE' if self.ce_leg.option_type == 'CE' else 'CE'
-                ce_hedge_premium = self._get_premium_from_chain(
-                    option_chain, self.ce_leg.hedge_strike, opposing_type)
-                if ce_hedge_premium:
-                    self.ce_leg.update_hedge_premium(ce_hedge_premium)
-
-            if self.pe_leg.hedge_active and hasattr(self.pe_leg, 'hedge_strike'):
-                # 🔥 FIX: PE hedge is CE on profit side
-                opposing_type = 'CE' if self.pe_leg.option_type == 'PE' else 'PE'
-                pe_hedge_premium = self._get_premium_from_chain(
-                    option_chain, self.pe_leg.hedge_strike, opposing_type)
-                if pe_hedge_premium:
-                    self.pe_leg.update_hedge_premium(pe_hedge_premium)
+            # 🔥 FIXED: Update hedge premiums with the hedge side's option type
+            # (BUY: same type as the leg, SELL: opposite type on the profit side)
+            for leg in (self.ce_leg, self.pe_leg):
+                if leg.hedge_active and hasattr(leg, 'hedge_strike'):
+                    hedge_premium = self._get_premium_from_chain(
+                        option_chain, leg.hedge_strike, leg.hedge_side.hedge_type(leg))
+                    if hedge_premium:
+                        leg.update_hedge_premium(hedge_premium)
 
         # Check premium ratio exit FIRST
         if self.check_premium_ratio_force_exit():
             return "Premium Ratio Force Exit"
 
         # 🔥 FIXED: Pass BOTH legs for true price neutrality
-        self.hedge_manager.process_leg_hedging(self.ce_leg, self.pe_leg, option_chain)
-        self.hedge_manager.process_leg_hedging(self.pe_leg, self.ce_leg, option_chain)
+        # ⚡ Both legs decided on this chain, then their orders fired together (one latency span per leg)
+        self.hedge_manager.process_hedging(self.ce_leg, self.pe_leg, option_chain)
         
         # Level 3 ONLY
         if self.ce_leg.is_level_3_triggered():
@@ -563,7 +436,7 @@ class StraddleManager:
 
         action = event.get('action')
 
-        if action == 'HEDGE_SELL':
+        if action in ('HEDGE_BUY', 'HEDGE_SELL'):
             self.excel_logger.log_hedge_entry(
                 leg_type=leg_type,
                 level=event['level'],
@@ -577,7 +450,7 @@ class StraddleManager:
             # Log leg action
             self.excel_logger.log_leg_action(
                 leg_type=leg_type,
-                action="SELL",
+                action=action.split('_')[1],
                 time=config.get_current_ist_time(),
                 strike=event['strike'],
                 symbol=f"{leg_type} Hedge L{event['level']}",
@@ -609,7 +482,7 @@ class StraddleManager:
             # Log leg action
             self.excel_logger.log_leg_action(
                 leg_type=leg_type,
-                action="BUY",
+                action=hedge_side().exit_side,
                 time=config.get_current_ist_time(),
                 strike=0,
                 symbol=f"{leg_type} Hedge L{event['level']}",
@@ -635,188 +508,131 @@ class StraddleManager:
         ratio = min(ce_premium, pe_premium) / max(ce_premium, pe_premium)
 
         if ratio <= config.FORCE_EXIT_RATIO:
-            print(f"\n{'=' * 80}")
-            print(f"PREMIUM RATIO EXIT TRIGGERED")
-            print(f"{'=' * 80}")
-            print(f"   Ratio: {ratio:.3f} <= {config.FORCE_EXIT_RATIO}")
-            print(f"   CE: Rs.{ce_premium:.2f} | PE: Rs.{pe_premium:.2f}")
-            print(f"{'=' * 80}")
+            log.info(f"\n{'=' * 80}")
+            log.info(f"PREMIUM RATIO EXIT TRIGGERED")
+            log.info(f"{'=' * 80}")
+            log.info(f"   Ratio: {ratio:.3f} <= {config.FORCE_EXIT_RATIO}")
+            log.info(f"   CE: Rs.{ce_premium:.2f} | PE: Rs.{pe_premium:.2f}")
+            log.info(f"{'=' * 80}")
             return True
 
         return False
 
     def exit_straddle(self, reason: str) -> Dict:
-        """✅ FIX 4: Exit complete straddle with CRITICAL LOCK"""
+        """✅ FIX 4: Exit complete straddle with CRITICAL LOCK - legs + hedges closed concurrently (exit_engine.py)"""
         if not self.straddle_active:
-            print("[WARN] No active straddle to exit")
+            log.warning("[WARN] No active straddle to exit")
             return None
 
         # FIX: Added comprehensive null checks
         if not self.ce_leg or not self.pe_leg:
-            print("[ERROR] Legs not initialized properly")
+            log.error("[ERROR] Legs not initialized properly")
             return None
 
+        lease = None
         try:
-            # 🔥 FIX 4: Acquire critical lock
-            api.acquire_critical_lock(f"STRADDLE_EXIT_{self.strike}")
+            # ⏱️ Exit decision was made on the last chain tick
+            latency.begin('STRADDLE_EXIT', str(self.strike))
+            latency.trigger('STRADDLE_EXIT', str(self.strike), tick_ts=api.get_tick_time(self.ce_leg.security_id))
+
+            # 🔒 Both legs + every contract being closed - waits out an in-flight hedge order (longer deadline)
+            keys = [leg_key('CE'), leg_key('PE'),
+                    instrument_key(self.ce_leg.security_id), instrument_key(self.pe_leg.security_id)]
+            keys += [instrument_key(leg.hedge_security_id) for leg in (self.ce_leg, self.pe_leg) if leg.hedge_active]
+            lease = api.locks.acquire(f"STRADDLE_EXIT_{self.strike}", keys,
+                                      timeout=config.LOCK_EXIT_TIMEOUT_SECONDS)
             
-            print(f"\n{'=' * 80}")
-            print(f"EXITING STRADDLE - {reason}")
-            print(f"{'=' * 80}")
+            log.info(f"\n{'=' * 80}")
+            log.info(f"EXITING STRADDLE - {reason}")
+            log.info(f"{'=' * 80}")
 
             exit_time = config.get_current_ist_time()
 
-            # Calculate hedge P&L
-            ce_hedge_pnl = getattr(self.ce_leg, 'realized_hedge_pnl', 0)
-            pe_hedge_pnl = getattr(self.pe_leg, 'realized_hedge_pnl', 0)
-
-            # Check for ACTIVE hedges
-            if self.ce_leg.hedge_active:
-                print(f"\n[FETCHING] Fetching active CE hedge price...")
-                ce_hedge_premium = api.get_ltp_with_retry(
-                    self.ce_leg.hedge_security_id, max_retries=3)
-
-                if ce_hedge_premium and hasattr(self.ce_leg, 'hedge_entry_premium'):
-                    self.ce_leg.hedge_current_premium = ce_hedge_premium
-                    active_ce_hedge_pnl = (self.ce_leg.hedge_entry_premium - ce_hedge_premium) * config.LOT_SIZE
-                    ce_hedge_pnl += active_ce_hedge_pnl
-                    print(f"   [OK] Active CE hedge L{self.ce_leg.hedge_level}: Rs.{active_ce_hedge_pnl:,.2f}")
-
-            if self.pe_leg.hedge_active:
-                print(f"\n[FETCHING] Fetching active PE hedge price...")
-                pe_hedge_premium = api.get_ltp_with_retry(
-                    self.pe_leg.hedge_security_id, max_retries=3)
-
-                if pe_hedge_premium and hasattr(self.pe_leg, 'hedge_entry_premium'):
-                    self.pe_leg.hedge_current_premium = pe_hedge_premium
-                    active_pe_hedge_pnl = (self.pe_leg.hedge_entry_premium - pe_hedge_premium) * config.LOT_SIZE
-                    pe_hedge_pnl += active_pe_hedge_pnl
-                    print(f"   [OK] Active PE hedge L{self.pe_leg.hedge_level}: Rs.{active_pe_hedge_pnl:,.2f}")
-
-            # Get straddle leg P&L
+            # Straddle leg P&L at the exit decision
             ce_breakdown = self.ce_leg.get_pnl_breakdown()
             pe_breakdown = self.pe_leg.get_pnl_breakdown()
 
-            total_pnl = ce_breakdown['leg_pnl'] + pe_breakdown['leg_pnl'] + ce_hedge_pnl + pe_hedge_pnl
-
-            print(f"\nP&L BREAKDOWN:")
-            print(f"{'-' * 60}")
-            print(f"   CE Straddle: Rs.{ce_breakdown['leg_pnl']:,.2f}")
-            print(f"   PE Straddle: Rs.{pe_breakdown['leg_pnl']:,.2f}")
-            print(f"   CE Hedges:   Rs.{ce_hedge_pnl:,.2f}")
-            print(f"   PE Hedges:   Rs.{pe_hedge_pnl:,.2f}")
-            print(f"{'-' * 60}")
-            print(f"   TOTAL P&L: Rs.{total_pnl:,.2f}")
-            print(f"{'-' * 60}")
-
-            # Exit hedges
-            self.hedge_manager.exit_all_hedges(self.ce_leg, self.pe_leg)
-
-            # FIXED: Buy back straddle legs - CRITICAL ORDERS with ACTUAL FILL PRICE TRACKING
-            print(f"\n[SQUARING OFF] Buying back straddle legs (with ACTUAL fill price tracking)...")
+            # FIXED: Buy back straddle legs + sell hedges - CRITICAL ORDERS with ACTUAL FILL PRICE TRACKING
+            log.info(f"\n[SQUARING OFF] Closing straddle legs and hedges (with ACTUAL fill price tracking)...")
 
+            orders = {}
             try:
-                # CE Leg - CRITICAL order with verification
-                print(f"   [SQUARING OFF] Squaring off CE leg...")
-                ce_result = api.place_order_with_verification(
-                    transaction_type='BUY',
-                    symbol=self.ce_leg.symbol,
-                    security_id=self.ce_leg.security_id,
-                    quantity=config.LOT_SIZE,
-                    is_critical=True  # CRITICAL: 3 attempts with 20s pause
-                )
-                
-                # 🔥 NEW: Get actual exit fill price
-                if ce_result and ce_result.get('success') and ce_result.get('order_id'):
-                    time.sleep(1)  # Wait for order book update
-                    actual_ce_exit = api.get_order_fill_price(ce_result['order_id'])
-                    if actual_ce_exit:
-                        print(f"   💰 CE actual exit price: ₹{actual_ce_exit:.2f}")
-                        self.ce_leg.current_premium = actual_ce_exit  # Update with actual
-                
-                if not ce_result or not ce_result.get('success'):
-                    print(f"   [ERROR] CE leg exit FAILED - MANUAL INTERVENTION REQUIRED!")
-                    # Still log the attempt
-                    if self.excel_logger:
-                        self.excel_logger.log_leg_action(
-                            leg_type="CE", action="BUY", time=exit_time,
-                            strike=self.strike, symbol=self.ce_leg.symbol,
-                            security_id=self.ce_leg.security_id,
-                            premium=self.ce_leg.current_premium,
-                            quantity=config.LOT_SIZE,
-                            order_status="FAILED", 
-                            notes=f"Straddle Exit Failed: {ce_result.get('message', 'Unknown error') if ce_result else 'No response'}"
-                        )
+                orders = exit_engine.square_off([self.ce_leg, self.pe_leg])
+            except Exception as e:
+                log.error(f"\n{'=' * 60}")
+                log.error(f"CRITICAL ERROR EXITING STRADDLE LEGS")
+                log.error(f"{'=' * 60}")
+                log.exception(f"   Exception: {e}")
+                log.error(f"   CE Symbol: {self.ce_leg.symbol}")
+                log.error(f"   PE Symbol: {self.pe_leg.symbol}")
+                log.error(f"   MANUAL INTERVENTION REQUIRED!")
+                log.error(f"{'=' * 60}\n")
+
+            for leg in (self.ce_leg, self.pe_leg):
+                if not leg.is_active and f"{leg.name}_HEDGE" not in orders:
+                    continue  # Bought back by an earlier (partial) exit
+                hedge_order = orders.get(f"{leg.name}_HEDGE")
+                if hedge_order and hedge_order.filled:
+                    log.info(f"   💰 {leg.name} hedge actual exit: ₹{hedge_order.price:.2f}")
+                    leg.close_hedge(hedge_order.price)
+
+                leg_order = orders.get(leg.name)
+                if leg_order and leg_order.fill_price:
+                    log.info(f"   💰 {leg.name} actual exit price: ₹{leg_order.fill_price:.2f}")
+                    leg.current_premium = leg_order.fill_price  # Update with actual
+
+                if not leg.is_active:
+                    continue  # Only its hedge was closed this time
+                if leg_order and leg_order.filled:
+                    leg.is_active = False
                 else:
-                    # Log successful CE leg exit
-                    if self.excel_logger:
-                        self.excel_logger.log_leg_action(
-                            leg_type="CE", action="BUY", time=exit_time,
-                            strike=self.strike, symbol=self.ce_leg.symbol,
-                            security_id=self.ce_leg.security_id,
-                            premium=self.ce_leg.current_premium,
-                            quantity=config.LOT_SIZE,
-                            order_status="FILLED" if ce_result.get('filled') else "PENDING",
-                            notes="Straddle Exit"
-                        )
+                    log.error(f"   [ERROR] {leg.name} leg exit FAILED - MANUAL INTERVENTION REQUIRED!")
 
-                time.sleep(0.5)
+                if self.excel_logger:
+                    if leg_order and leg_order.success:
+                        order_status = "FILLED" if leg_order.filled else "PENDING"
+                        notes = "Straddle Exit"
+                    else:
+                        order_status = "FAILED"
+                        notes = f"Straddle Exit Failed: {leg_order.message if leg_order else 'No response'}"
+                    self.excel_logger.log_leg_action(
+                        leg_type=leg.name, action="BUY", time=exit_time,
+                        strike=self.strike, symbol=leg.symbol,
+                        security_id=leg.security_id,
+                        premium=leg.current_premium,
+                        quantity=config.LOT_SIZE,
+                        order_status=order_status,
+                        notes=notes
+                    )
 
-                # PE Leg - CRITICAL order with verification
-                print(f"   [SQUARING OFF] Squaring off PE leg...")
-                pe_result = api.place_order_with_verification(
-                    transaction_type='BUY',
-                    symbol=self.pe_leg.symbol,
-                    security_id=self.pe_leg.security_id,
-                    quantity=config.LOT_SIZE,
-                    is_critical=True  # CRITICAL: 3 attempts with 20s pause
-                )
-                
-                # 🔥 NEW: Get actual exit fill price
-                if pe_result and pe_result.get('success') and pe_result.get('order_id'):
-                    time.sleep(1)  # Wait for order book update
-                    actual_pe_exit = api.get_order_fill_price(pe_result['order_id'])
-                    if actual_pe_exit:
-                        print(f"   💰 PE actual exit price: ₹{actual_pe_exit:.2f}")
-                        self.pe_leg.current_premium = actual_pe_exit  # Update with actual
-                
-                if not pe_result or not pe_result.get('success'):
-                    print(f"   [ERROR] PE leg exit FAILED - MANUAL INTERVENTION REQUIRED!")
-                    # Still log the attempt
-                    if self.excel_logger:
-                        self.excel_logger.log_leg_action(
-                            leg_type="PE", action="BUY", time=exit_time,
-                            strike=self.strike, symbol=self.pe_leg.symbol,
-                            security_id=self.pe_leg.security_id,
-                            premium=self.pe_leg.current_premium,
-                            quantity=config.LOT_SIZE,
-                            order_status="FAILED",
-                            notes=f"Straddle Exit Failed: {pe_result.get('message', 'Unknown error') if pe_result else 'No response'}"
-                        )
-                else:
-                    # Log successful PE leg exit
-                    if self.excel_logger:
-                        self.excel_logger.log_leg_action(
-                            leg_type="PE", action="BUY", time=exit_time,
-                            strike=self.strike, symbol=self.pe_leg.symbol,
-                            security_id=self.pe_leg.security_id,
-                            premium=self.pe_leg.current_premium,
-                            quantity=config.LOT_SIZE,
-                            order_status="FILLED" if pe_result.get('filled') else "PENDING",
-                            notes="Straddle Exit"
-                        )
+            # Anything still open (cover not filled / its hedge kept) stays monitored, reconciled and
+            # part of EOD square-off - the exit is retried on the next candle
+            still_open = [name for leg in (self.ce_leg, self.pe_leg)
+                          for name, is_open in ((leg.name, leg.is_active), (f"{leg.name}_HEDGE", leg.hedge_active))
+                          if is_open]
+            if still_open:
+                self.pending_exit_reason = reason
+                log.error(f"🚨 STRADDLE EXIT INCOMPLETE - still open: {', '.join(still_open)} "
+                          f"(straddle kept active, exit retried next candle)")
+                return None
 
-            except Exception as e:
-                print(f"\n{'=' * 60}")
-                print(f"CRITICAL ERROR EXITING STRADDLE LEGS")
-                print(f"{'=' * 60}")
-                print(f"   Exception: {e}")
-                print(f"   CE Symbol: {self.ce_leg.symbol}")
-                print(f"   PE Symbol: {self.pe_leg.symbol}")
-                print(f"   MANUAL INTERVENTION REQUIRED!")
-                print(f"{'=' * 60}\n")
-                import traceback
-                traceback.print_exc()
+            # Hedge P&L: closed hedges at their fills (hedge side: BUY exit - entry), any hedge kept open at its LTP
+            ce_hedge_breakdown = self.ce_leg.get_pnl_breakdown()
+            pe_hedge_breakdown = self.pe_leg.get_pnl_breakdown()
+            ce_hedge_pnl = ce_hedge_breakdown['realized_hedge_pnl'] + ce_hedge_breakdown['current_hedge_pnl']
+            pe_hedge_pnl = pe_hedge_breakdown['realized_hedge_pnl'] + pe_hedge_breakdown['current_hedge_pnl']
+
+            total_pnl = ce_breakdown['leg_pnl'] + pe_breakdown['leg_pnl'] + ce_hedge_pnl + pe_hedge_pnl
+
+            log.info(f"\nP&L BREAKDOWN:")
+            log.info(f"{'-' * 60}")
+            log.info(f"   CE Straddle: Rs.{ce_breakdown['leg_pnl']:,.2f}")
+            log.info(f"   PE Straddle: Rs.{pe_breakdown['leg_pnl']:,.2f}")
+            log.info(f"   CE Hedges:   Rs.{ce_hedge_pnl:,.2f}")
+            log.info(f"   PE Hedges:   Rs.{pe_hedge_pnl:,.2f}")
+            log.info(f"{'-' * 60}")
+            log.info(f"   TOTAL P&L: Rs.{total_pnl:,.2f}")
+            log.info(f"{'-' * 60}")
 
             # LOG COMPLETE EXIT TO EXCEL
             if self.excel_logger:
@@ -834,15 +650,16 @@ class StraddleManager:
                     pe_hedges_used=self.pe_hedges_count
                 )
 
-            # Reset state
+            # Reset state - every leg and hedge is closed
             self.straddle_active = False
+            self.pending_exit_reason = None
             self.ce_leg = None
             self.pe_leg = None
             self.strike = None
             self.entry_time = None
 
-            print(f"\n[OK] STRADDLE EXITED SUCCESSFULLY")
-            print(f"{'=' * 80}\n")
+            log.info(f"\n[OK] STRADDLE EXITED SUCCESSFULLY")
+            log.info(f"{'=' * 80}\n")
 
             return {
                 'exit_time': exit_time,
@@ -850,12 +667,17 @@ class StraddleManager:
                 'exit_reason': reason
             }
             
+        except LockTimeout as e:
+            log.error(f"🚨 Straddle exit blocked - {e}")
+            return None
         except Exception as e:
-            print(f"[ERROR] Straddle exit error: {e}")
+            log.error(f"[ERROR] Straddle exit error: {e}")
             return None
         finally:
             # 🔥 FIX 4: Always release lock
-            api.release_critical_lock(f"STRADDLE_EXIT_{self.strike}")
+            if lease:
+                lease.release()
+            latency.end()
 
     def _find_straddle_in_chain(self, option_chain: Dict, strike: int,
                                 option_type: str) -> Optional[Tuple[str, str]]:
@@ -0,0 +1,155 @@
+"""
+Tick Recorder - COMPACT BINARY LOG OF EVERYTHING THE LIVE BOT SAW
+✅ Raw SmartWebSocketV2 binary frames (51 bytes per LTP tick) with receive timestamps
+✅ Order-update WebSocket messages (as received)
+✅ Resolved option symbols (symbol → token) so a replay can rebuild the chain offline
+✅ Buffered writes on the WebSocket threads, flushed every TICK_RECORD_FLUSH_SECONDS
+✅ Self-delimiting records - a crash-truncated tail is ignored on read
+
+Enable with TICK_RECORD_ENABLED=true; replay with replay_engine.py
+
+Log layout:
+    MAGIC, then repeated [kind uint8][recv_ts float64][length uint32][payload]
+"""
+
+from typing import Dict, Iterator, Optional, Tuple
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+from config import config
+from bot_logging import get_logger
+
+log = get_logger('tick_recorder')
+
+MAGIC = b'TICKLOG1'
+RECORD = struct.Struct('<BdI')
+
+KIND_MARKET = 1  # Raw market WebSocket binary frame
+KIND_ORDER = 2   # Order-update WebSocket message (JSON text)
+KIND_SCRIP = 3   # Resolved option contract (JSON)
+KIND_META = 4    # Session metadata (JSON) - first record of every log
+
+BINARY = 2  # websocket-client ABNF.OPCODE_BINARY
+
+
+class TickRecorder:
+    """Appends ticks and order updates to one log file per process run"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or config.TICK_RECORD_DIR
+        self.lock = threading.Lock()
+        self.path: Optional[str] = None
+        self.file = None  # Opened lazily on the first record
+        self.closed = False
+
+        self._scrips = set()
+        self._last_flush = 0.0
+
+        # Stats
+        self.records = 0
+        self.bytes_written = 0
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = config.get_current_ist_time().strftime('%Y%m%d_%H%M%S')
+        self.path = os.path.join(self.directory, f"ticks_{stamp}.bin")
+        self.file = open(self.path, 'wb', buffering=1 << 20)
+        self.file.write(MAGIC)
+        self.bytes_written += len(MAGIC)
+
+        meta = {
+            'expiry': config.EXPIRY_DATE,
+            'lot_size': config.LOT_SIZE,
+            'strike_interval': config.STRIKE_INTERVAL,
+            'candle_interval': config.CANDLE_INTERVAL_SECONDS,
+            'started': config.get_current_ist_time().isoformat(),
+        }
+        self._write(KIND_META, json.dumps(meta).encode('utf-8'), time.time())
+        atexit.register(self.close)
+        log.info("🎞️ Tick recorder: %s", self.path)
+
+    def _write(self, kind: int, payload: bytes, ts: float):
+        self.file.write(RECORD.pack(kind, ts, len(payload)))
+        self.file.write(payload)
+        self.records += 1
+        self.bytes_written += RECORD.size + len(payload)
+
+    def record(self, kind: int, payload: bytes):
+        """Append one record stamped with the receive time"""
+        ts = time.time()
+        with self.lock:
+            if self.closed:
+                return
+            if self.file is None:
+                self._open()
+            self._write(kind, payload, ts)
+            if ts - self._last_flush >= config.TICK_RECORD_FLUSH_SECONDS:
+                self.file.flush()
+                self._last_flush = ts
+
+    def wrap_market_ws(self, ws):
+        """Record raw binary frames ahead of whatever decoder is installed on ws"""
+        inner = ws._on_data
+        record = self.record
+
+        def on_data(wsapp, data, data_type, continue_flag):
+            if data_type == BINARY:
+                record(KIND_MARKET, bytes(data))
+            inner(wsapp, data, data_type, continue_flag)
+
+        ws._on_data = on_data
+
+    def record_order(self, message):
+        """Order-update message as received (str or dict)"""
+        if isinstance(message, (bytes, bytearray)):
+            payload = bytes(message)
+        elif isinstance(message, str):
+            payload = message.encode('utf-8')
+        else:
+            payload = json.dumps(message).encode('utf-8')
+        self.record(KIND_ORDER, payload)
+
+    def record_scrip(self, scrip: Dict):
+        """Resolved option contract (once per symbol)"""
+        symbol = scrip.get('symbol')
+        if not symbol or symbol in self._scrips:
+            return
+        self._scrips.add(symbol)
+        self.record(KIND_SCRIP, json.dumps(scrip).encode('utf-8'))
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                log.info("🎞️ Tick log closed: %s records, %.1f MB → %s",
+                         f"{self.records:,}", self.bytes_written / 1e6, self.path)
+
+    def get_stats(self) -> Dict:
+        return {'path': self.path, 'records': self.records, 'bytes': self.bytes_written}
+
+
+def read_log(path: str) -> Iterator[Tuple[int, float, bytes]]:
+    """Yield (kind, recv_ts, payload) - a truncated tail record is dropped"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a tick log")
+
+    offset = len(MAGIC)
+    header = RECORD.size
+    while offset + header <= len(data):
+        kind, ts, size = RECORD.unpack_from(data, offset)
+        offset += header
+        if offset + size > len(data):
+            break  # Crash-truncated tail
+        yield kind, ts, data[offset:offset + size]
+        offset += size
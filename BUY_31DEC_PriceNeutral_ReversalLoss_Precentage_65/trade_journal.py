@@ -0,0 +1,336 @@
+"""
+Trade Journal - APPEND-ONLY COLUMNAR SYSTEM OF RECORD
+✅ One Arrow IPC stream file per trading day (trade_journal/journal_YYYYMMDD.arrows)
+✅ O(1) append: one single-row record batch per event, flushed + fsync'd
+✅ Crash tolerant: truncated tail batch is ignored on read
+✅ CSV fallback (same columns) when pyarrow is not installed
+✅ Analytics read the journal directly - Excel is generated on demand
+
+Usage (analytics):
+    python trade_journal.py                 # today's summary
+    python trade_journal.py 2025-12-31      # summary for a day
+    python trade_journal.py 2025-12-31 --excel report.xlsx
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import csv
+import glob
+import os
+import shutil
+import threading
+from config import config
+from bot_logging import get_logger
+
+log = get_logger('trade_journal')
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    PYARROW_AVAILABLE = False
+
+
+# Event → payload fields (order = Excel replay order)
+EVENT_FIELDS = {
+    'ENTRY': ['entry_time', 'atm_strike', 'ce_premium', 'pe_premium', 'spot_price'],
+    'LEG_ACTION': ['leg_type', 'action', 'time', 'strike', 'symbol', 'security_id',
+                   'premium', 'quantity', 'order_status', 'notes'],
+    'HEDGE_ENTRY': ['leg_type', 'level', 'strike', 'entry_time', 'entry_premium', 'entry_loss_pct'],
+    'HEDGE_EXIT': ['leg_type', 'level', 'exit_time', 'exit_premium', 'exit_loss_pct', 'duration',
+                   'trail_activated', 'hedge_pnl', 'exit_reason'],
+    'EXIT': ['exit_time', 'duration', 'ce_exit_premium', 'pe_exit_premium', 'ce_pnl', 'pe_pnl',
+             'ce_hedge_pnl', 'pe_hedge_pnl', 'total_pnl', 'exit_reason',
+             'ce_hedges_used', 'pe_hedges_used'],
+    'MANUAL': ['intervention_type', 'leg_type', 'level', 'time', 'notes'],
+    'ORDER_LATENCY': ['order_id', 'action', 'symbol', 'order_status', 'latency_ms', 'tick_age_ms', 'stages'],
+}
+
+# Column → type ('str' | 'int' | 'float' | 'bool')
+COLUMNS = {
+    'logged_at': 'str', 'event': 'str', 'trade_id': 'int',
+    'leg_type': 'str', 'action': 'str', 'intervention_type': 'str',
+    'level': 'int', 'strike': 'int', 'atm_strike': 'int',
+    'symbol': 'str', 'security_id': 'str', 'quantity': 'int',
+    'order_status': 'str', 'notes': 'str',
+    'time': 'str', 'entry_time': 'str', 'exit_time': 'str', 'duration': 'float',
+    'premium': 'float', 'ce_premium': 'float', 'pe_premium': 'float', 'spot_price': 'float',
+    'entry_premium': 'float', 'entry_loss_pct': 'float',
+    'exit_premium': 'float', 'exit_loss_pct': 'float',
+    'trail_activated': 'bool', 'hedge_pnl': 'float', 'exit_reason': 'str',
+    'ce_exit_premium': 'float', 'pe_exit_premium': 'float',
+    'ce_pnl': 'float', 'pe_pnl': 'float', 'ce_hedge_pnl': 'float', 'pe_hedge_pnl': 'float',
+    'total_pnl': 'float', 'ce_hedges_used': 'int', 'pe_hedges_used': 'int',
+    'order_id': 'str', 'latency_ms': 'float', 'tick_age_ms': 'float', 'stages': 'str',
+}
+
+_CASTS = {
+    'str': str,
+    'int': lambda v: int(float(v)),
+    'float': float,
+    'bool': lambda v: v if isinstance(v, bool) else str(v).lower() in ('true', '1', 'yes'),
+}
+
+if PYARROW_AVAILABLE:
+    _ARROW_TYPES = {'str': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_()}
+    SCHEMA = pa.schema([(name, _ARROW_TYPES[kind]) for name, kind in COLUMNS.items()])
+else:
+    SCHEMA = None
+
+
+def _coerce(row: Dict) -> Dict:
+    """Cast row values to column types (missing/empty → None)"""
+    out = {}
+    for name, kind in COLUMNS.items():
+        value = row.get(name)
+        if value is None or value == '':
+            out[name] = None
+        else:
+            try:
+                out[name] = _CASTS[kind](value)
+            except (TypeError, ValueError):
+                out[name] = None
+    return out
+
+
+class TradeJournal:
+    """Append-only per-day event journal"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or config.JOURNAL_DIR
+        self.extension = 'arrows' if PYARROW_AVAILABLE else 'csv'
+        self.lock = threading.Lock()
+
+        self.current_day: Optional[date] = None
+        self.sink = None
+        self.writer = None  # pyarrow stream writer or csv.DictWriter
+
+        os.makedirs(self.directory, exist_ok=True)
+        if not PYARROW_AVAILABLE:
+            log.warning("⚠️ pyarrow not installed - trade journal using CSV fallback")
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+
+    def path_for(self, day: date, extension: str = None) -> str:
+        return os.path.join(self.directory, f"journal_{day.strftime('%Y%m%d')}.{extension or self.extension}")
+
+    def available_days(self) -> List[date]:
+        """Days with a journal file (either format)"""
+        days = set()
+        for path in glob.glob(os.path.join(self.directory, 'journal_*.*')):
+            stem = os.path.basename(path).split('.')[0]
+            try:
+                days.add(datetime.strptime(stem.replace('journal_', ''), '%Y%m%d').date())
+            except ValueError:
+                continue
+        return sorted(days)
+
+    # ------------------------------------------------------------------
+    # Append
+    # ------------------------------------------------------------------
+
+    def append(self, event: str, payload: Dict):
+        """Append one event (O(1)) - flushed and fsync'd before returning"""
+        now = config.get_current_ist_time()
+        row = dict(payload)
+        row['event'] = event
+        row['logged_at'] = now.strftime('%Y-%m-%d %H:%M:%S')
+        row = _coerce(row)
+
+        with self.lock:
+            if self.current_day != now.date() or self.writer is None:
+                self._open_day(now.date())
+
+            if PYARROW_AVAILABLE:
+                batch = pa.record_batch(
+                    [pa.array([row[name]], type=field.type) for name, field in zip(SCHEMA.names, SCHEMA)],
+                    schema=SCHEMA
+                )
+                self.writer.write_batch(batch)
+            else:
+                self.writer.writerow({k: ('' if v is None else v) for k, v in row.items()})
+
+            self.sink.flush()
+            os.fsync(self.sink.fileno())
+
+    def _open_day(self, day: date):
+        """Open (or reopen after restart) the day's journal for appending"""
+        self._close_writer()
+        path = self.path_for(day)
+
+        if PYARROW_AVAILABLE:
+            # Arrow IPC streams cannot be appended after close - rewrite the
+            # existing day's batches once at startup, then append O(1)
+            existing = self._read_arrow_batches(path) if os.path.exists(path) else []
+            backup = path + '.bak'
+            if existing:
+                shutil.copyfile(path, backup)
+
+            self.sink = open(path, 'wb')
+            self.writer = pa.ipc.new_stream(self.sink, SCHEMA)
+            for batch in existing:
+                if batch.schema != SCHEMA:
+                    # Journal written before new columns were added - widen with nulls
+                    batch = pa.RecordBatch.from_pylist(batch.to_pylist(), schema=SCHEMA)
+                self.writer.write_batch(batch)
+            self.sink.flush()
+
+            if existing:
+                os.remove(backup)
+        else:
+            is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+            if not is_new:
+                self._migrate_csv_header(path)
+            self.sink = open(path, 'a', newline='', encoding='utf-8')
+            self.writer = csv.DictWriter(self.sink, fieldnames=list(COLUMNS))
+            if is_new:
+                self.writer.writeheader()
+
+        self.current_day = day
+        log.info("📓 Trade journal: %s", path)
+
+    @staticmethod
+    def _migrate_csv_header(path: str):
+        """Rewrite a CSV journal whose header predates the current COLUMNS"""
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames == list(COLUMNS):
+                return
+            rows = list(reader)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(COLUMNS), extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def _close_writer(self):
+        try:
+            if PYARROW_AVAILABLE and self.writer is not None:
+                self.writer.close()
+            if self.sink is not None:
+                self.sink.close()
+        except Exception as e:
+            log.error("⚠️ Journal close error: %s", e)
+        self.writer = None
+        self.sink = None
+
+    def close(self):
+        with self.lock:
+            self._close_writer()
+
+    # ------------------------------------------------------------------
+    # Read / query
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _read_arrow_batches(path: str) -> list:
+        """Read all complete batches (a crash-truncated tail is dropped)"""
+        batches = []
+        if os.path.exists(path + '.bak'):
+            # Crashed during startup rewrite - the backup is authoritative
+            shutil.copyfile(path + '.bak', path)
+            os.remove(path + '.bak')
+        try:
+            with open(path, 'rb') as f:
+                reader = pa.ipc.open_stream(f)
+                while True:
+                    try:
+                        batches.append(reader.read_next_batch())
+                    except StopIteration:
+                        break
+        except (pa.ArrowInvalid, OSError, EOFError):
+            pass  # Truncated tail / empty file
+        return batches
+
+    def read_day(self, day: date = None) -> List[Dict]:
+        """All events for a day as row dicts (in append order)"""
+        day = day or config.get_current_ist_time().date()
+        rows = []
+
+        arrow_path = self.path_for(day, 'arrows')
+        if PYARROW_AVAILABLE and os.path.exists(arrow_path):
+            with self.lock:
+                if self.sink is not None and self.current_day == day:
+                    self.sink.flush()
+                for batch in self._read_arrow_batches(arrow_path):
+                    rows.extend(batch.to_pylist())
+
+        csv_path = self.path_for(day, 'csv')
+        if os.path.exists(csv_path):
+            with open(csv_path, newline='', encoding='utf-8') as f:
+                rows.extend(_coerce(row) for row in csv.DictReader(f))
+
+        return rows
+
+    def query(self, days: List[date] = None, event: str = None, trade_id: int = None) -> List[Dict]:
+        """Filter events across days (default: all available days)"""
+        rows = []
+        for day in days or self.available_days():
+            for row in self.read_day(day):
+                if event and row['event'] != event:
+                    continue
+                if trade_id is not None and row['trade_id'] != trade_id:
+                    continue
+                rows.append(row)
+        return rows
+
+    def to_table(self, days: List[date] = None):
+        """pyarrow.Table of journal events (use .to_pandas() for analysis)"""
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for to_table() - use query() instead")
+        return pa.Table.from_pylist(self.query(days), schema=SCHEMA)
+
+    def last_trade_id(self, day: date = None) -> int:
+        """Highest trade # journaled for the day (continue numbering after restart)"""
+        ids = [row['trade_id'] for row in self.read_day(day) if row['trade_id'] is not None]
+        return max(ids) if ids else 0
+
+    def summarize(self, day: date = None) -> Dict:
+        """Daily P&L summary straight from the journal"""
+        rows = self.read_day(day)
+        exits = [r for r in rows if r['event'] == 'EXIT']
+        hedge_exits = [r for r in rows if r['event'] == 'HEDGE_EXIT']
+        latencies = sorted(r['latency_ms'] for r in rows
+                           if r['event'] == 'ORDER_LATENCY' and r['latency_ms'] is not None)
+        return {
+            'trades': sum(1 for r in rows if r['event'] == 'ENTRY'),
+            'closed_trades': len(exits),
+            'net_pnl': round(sum(r['total_pnl'] or 0 for r in exits), 2),
+            'winners': sum(1 for r in exits if (r['total_pnl'] or 0) > 0),
+            'hedges': sum(1 for r in rows if r['event'] == 'HEDGE_ENTRY'),
+            'hedge_pnl': round(sum(r['hedge_pnl'] or 0 for r in hedge_exits), 2),
+            'leg_actions': sum(1 for r in rows if r['event'] == 'LEG_ACTION'),
+            'manual_interventions': sum(1 for r in rows if r['event'] == 'MANUAL'),
+            'orders_timed': len(latencies),
+            'median_trigger_to_fill_ms': latencies[len(latencies) // 2] if latencies else None,
+            'max_trigger_to_fill_ms': latencies[-1] if latencies else None,
+        }
+
+
+def main():
+    """Print a day's summary from the journal, optionally export Excel"""
+    import sys
+
+    args = sys.argv[1:]
+    day = datetime.strptime(args[0], '%Y-%m-%d').date() if args and not args[0].startswith('--') else None
+    journal = TradeJournal()
+    summary = journal.summarize(day)
+
+    print(f"\n{'=' * 60}")
+    print(f"📓 TRADE JOURNAL - {(day or config.get_current_ist_time().date()).isoformat()}")
+    print(f"{'=' * 60}")
+    for key, value in summary.items():
+        print(f"   {key.replace('_', ' ').title()}: {value}")
+    print(f"{'=' * 60}\n")
+
+    if '--excel' in args:
+        from excel_logger import build_workbook
+        out = args[args.index('--excel') + 1]
+        build_workbook(journal.read_day(day), out)
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,7 @@ import os
 import json
 import pandas as pd
 import numpy as np
+from option_chain_arrays import ChainArrays
 from datetime import datetime, time as dtime
 from pathlib import Path
 import glob
@@ -187,37 +188,38 @@ class HistoricalDataManager:
         except:
             return None
 
+    def get_chain_arrays(self, strikes, timestamp, option_types=('CE', 'PE')):
+        """Build aligned ChainArrays for strikes at timestamp (missing prices → 0)"""
+        columns = {}
+        for option_type in ('CE', 'PE'):
+            if option_type in option_types:
+                symbols = [self._build_option_symbol(strike, option_type) for strike in strikes]
+                prices = [self.get_option_price(symbol, timestamp) or 0 for symbol in symbols]
+            else:
+                symbols, prices = [None] * len(strikes), [0] * len(strikes)
+            columns[option_type] = (symbols, prices)
+
+        return ChainArrays(
+            strikes, columns['CE'][1], columns['PE'][1],
+            ce_symbols=columns['CE'][0], pe_symbols=columns['PE'][0]
+        )
+
     def find_atm_strike(self, spot_price, timestamp):
         """Find ATM strike using ±7 method with minimum CE-PE difference"""
         base_strike = round(spot_price / config.STRIKE_INTERVAL) * config.STRIKE_INTERVAL
 
         print(f"\n[SCAN] Scanning straddles within +/-{config.ATM_RANGE} strikes of {int(base_strike)}...")
 
-        best_strike = None
-        min_difference = float('inf')
-
-        # Check ±7 strikes
-        for offset in range(-config.ATM_RANGE, config.ATM_RANGE + 1):
-            strike = base_strike + (offset * config.STRIKE_INTERVAL)
-
-            # Build symbols
-            ce_symbol = self._build_option_symbol(strike, 'CE')
-            pe_symbol = self._build_option_symbol(strike, 'PE')
+        # Check ±ATM_RANGE strikes - vectorized min |CE - PE|
+        offsets = np.arange(-config.ATM_RANGE, config.ATM_RANGE + 1)
+        strikes = base_strike + offsets * config.STRIKE_INTERVAL
+        best = self.get_chain_arrays(strikes, timestamp).best_straddle()
 
-            # Get premiums
-            ce_price = self.get_option_price(ce_symbol, timestamp)
-            pe_price = self.get_option_price(pe_symbol, timestamp)
-
-            if ce_price and pe_price and ce_price > 0 and pe_price > 0:
-                difference = abs(ce_price - pe_price)
-                print(f"     Strike {int(strike)}: CE={ce_price:.2f}, PE={pe_price:.2f}, Diff={difference:.2f}")
-
-                if difference < min_difference:
-                    min_difference = difference
-                    best_strike = strike
+        if not best:
+            return None
 
-        if best_strike:
-            print(f"     [OK] Selected: {int(best_strike)} (Diff: {min_difference:.2f})")
+        best_strike, ce_price, pe_price, min_difference = best
+        print(f"     [OK] Selected: {best_strike} (CE={ce_price:.2f}, PE={pe_price:.2f}, Diff: {min_difference:.2f})")
 
         return best_strike
 
@@ -242,10 +244,6 @@ class HistoricalDataManager:
         # Search range: 500 points in each direction
         search_range = 10  # 10 strikes = 500 points
 
-        best_strike = None
-        best_symbol = None
-        min_diff = float('inf')
-
         # ✅ MODIFIED: For losing CE (market up), buy OTM CE (above current)
         # For losing PE (market down), buy OTM PE (below current)
         if option_type == 'CE':
@@ -257,19 +255,17 @@ class HistoricalDataManager:
             start_strike = base_strike - (search_range * config.STRIKE_INTERVAL)
             end_strike = current_strike - config.STRIKE_INTERVAL
 
-        strike = start_strike
-        while strike <= end_strike:
-            symbol = self._build_option_symbol(strike, option_type)
-            price = self.get_option_price(symbol, timestamp)
+        if start_strike > end_strike:
+            return None, None
 
-            if price and price > 0:
-                diff = abs(price - target_premium)
-                if diff < min_diff:
-                    min_diff = diff
-                    best_strike = strike
-                    best_symbol = symbol
+        strikes = np.arange(start_strike, end_strike + config.STRIKE_INTERVAL, config.STRIKE_INTERVAL)
+        chain = self.get_chain_arrays(strikes, timestamp, option_types=(option_type,))
+        best = chain.nearest_premium(option_type, target_premium)
+        if not best:
+            return None, None
 
-            strike += config.STRIKE_INTERVAL
+        best_strike = best[0]
+        best_symbol = self._build_option_symbol(best_strike, option_type)
 
         return best_strike, best_symbol
 
@@ -0,0 +1,104 @@
+"""
+Option Chain Arrays - VECTORIZED CHAIN VIEW
+✅ Aligned NumPy arrays (strikes, CE, PE, tokens, symbols) built once per chain
+✅ Straddle selection and hedge candidate filtering
+   are single vectorized expressions instead of Python loops
+✅ Same class used by live, paper and backtest code paths
+"""
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+
+class ChainArrays:
+    """Option chain as aligned arrays sorted by strike"""
+
+    def __init__(self, strikes, ce, pe, ce_tokens=None, pe_tokens=None,
+                 ce_symbols=None, pe_symbols=None):
+        order = np.argsort(np.asarray(strikes, dtype=np.int64), kind='stable')
+        n = len(order)
+
+        self.strikes = np.asarray(strikes, dtype=np.int64)[order]
+        self.ce = np.nan_to_num(np.asarray(ce, dtype=np.float64)[order])
+        self.pe = np.nan_to_num(np.asarray(pe, dtype=np.float64)[order])
+        self.ce_tokens = self._aligned(ce_tokens, order, n)
+        self.pe_tokens = self._aligned(pe_tokens, order, n)
+        self.ce_symbols = self._aligned(ce_symbols, order, n)
+        self.pe_symbols = self._aligned(pe_symbols, order, n)
+
+    @staticmethod
+    def _aligned(values, order, n):
+        if values is None:
+            return np.full(n, None, dtype=object)
+        return np.asarray(values, dtype=object)[order]
+
+    @classmethod
+    def from_chain(cls, option_chain: Dict) -> 'ChainArrays':
+        """Build from the {strike: {'CE', 'PE', 'CE_symbol', ...}} chain dict"""
+        strikes = list(option_chain.keys())
+        rows = [option_chain[s] for s in strikes]
+        return cls(
+            strikes,
+            [row.get('CE') or 0 for row in rows],
+            [row.get('PE') or 0 for row in rows],
+            ce_tokens=[row.get('CE_security_id') for row in rows],
+            pe_tokens=[row.get('PE_security_id') for row in rows],
+            ce_symbols=[row.get('CE_symbol') for row in rows],
+            pe_symbols=[row.get('PE_symbol') for row in rows],
+        )
+
+    def __len__(self) -> int:
+        return len(self.strikes)
+
+    def premiums(self, option_type: str) -> np.ndarray:
+        """CE or PE premium column"""
+        return self.ce if option_type == 'CE' else self.pe
+
+    def valid_mask(self, min_premium: float = 0) -> np.ndarray:
+        """Strikes where both CE and PE are quoted above min_premium"""
+        return (self.ce > min_premium) & (self.pe > min_premium)
+
+    def valid_count(self, min_premium: float = 0) -> int:
+        return int(np.count_nonzero(self.valid_mask(min_premium)))
+
+    def best_straddle(self) -> Optional[Tuple[int, float, float, float]]:
+        """
+        Strike with minimum |CE - PE| among fully quoted strikes
+
+        Returns:
+            (strike, ce_premium, pe_premium, diff) or None
+        """
+        diff = np.where(self.valid_mask(), np.abs(self.ce - self.pe), np.inf)
+        if not len(diff) or not np.isfinite(diff.min()):
+            return None
+        i = int(np.argmin(diff))
+        return int(self.strikes[i]), float(self.ce[i]), float(self.pe[i]), float(diff[i])
+
+    def hedge_candidates(self, option_type: str, straddle_strike: int) -> np.ndarray:
+        """
+        Boolean mask of OTM strikes on the losing side
+        CE losing → strikes ABOVE straddle strike
+        PE losing → strikes BELOW straddle strike
+        """
+        if option_type == 'CE':
+            return self.strikes > straddle_strike
+        return self.strikes < straddle_strike
+
+    def nearest_premium(self, option_type: str, target_premium: float,
+                        mask: Optional[np.ndarray] = None) -> Optional[Tuple[int, float]]:
+        """
+        Strike whose premium is closest to target within mask
+
+        Returns:
+            (strike, premium) or None
+        """
+        prem = self.premiums(option_type)
+        ok = prem > 0
+        if mask is not None:
+            ok &= mask
+        if not ok.any():
+            return None
+        diff = np.where(ok, np.abs(prem - target_premium), np.inf)
+        i = int(np.argmin(diff))
+        return int(self.strikes[i]), float(prem[i])
+